@@ -0,0 +1,251 @@
+"""Benchmark: vazão e latência das rotas de leitura com sessão síncrona vs. assíncrona.
+
+Cria um catálogo sintético em um SQLite temporário e dispara requisições
+(detalhe de um livro, página de /books/ e página de /categories/) com muitos
+clientes concorrentes contra a aplicação em processo (ASGI, sem rede), com o
+cache de respostas desligado para que toda requisição consulte o banco.
+
+O modo "async" usa as rotas da aplicação (`async def` + AsyncSession). O modo
+"sync" usa uma réplica das mesmas rotas com handlers `def` e a Session
+síncrona, que o FastAPI executa no threadpool (40 threads), como era antes da
+migração. Os dois modos usam engines com o mesmo tamanho de pool.
+
+O SQLite local não tem espera de rede; `--latency-ms` acrescenta um atraso a
+cada comando SQL para simular a ida e volta até um banco remoto (time.sleep
+na thread do modo sync, asyncio.sleep no modo async).
+
+Uso:
+    uv run python -m benchmarks.bench_async_db [--concurrency 500] [--latency-ms 0,2]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+CATEGORIES = ["Poetry", "Travel", "Mystery", "Historical Fiction", "Food and Drink", "Music"]
+
+
+def simulate_latency(engine, seconds: float, blocking: bool) -> None:
+    """Atrasa cada comando SQL do engine (síncrono) em `seconds`."""
+    from sqlalchemy.util import await_only
+
+    dialect = engine.dialect
+    do_execute = dialect.do_execute
+
+    def delayed(cursor, statement, parameters, context=None):
+        if blocking:
+            time.sleep(seconds)
+        else:
+            # Dentro do greenlet do AsyncSession: cede o event loop durante a espera
+            await_only(asyncio.sleep(seconds))
+        do_execute(cursor, statement, parameters, context)
+
+    dialect.do_execute = delayed
+
+
+def sync_app(engine):
+    """Réplica síncrona das rotas medidas (mesmas consultas, handlers `def`)."""
+    from fastapi import Depends, FastAPI, HTTPException, Request
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+
+    from src.api.conditional import conditional_get
+    from src.api.pagination import total_pages
+    from src.api.schemas.book import BookSchema
+    from src.models.book import Book
+    from src.models.category import Category
+    from src.services.response_cache import ResponseCache, get_response_cache
+
+    app = FastAPI(dependencies=[Depends(conditional_get)])
+
+    def get_db():
+        # Uma sessão por requisição: a dependência e o handler podem rodar em
+        # threads diferentes do threadpool, então a SessionLocal (por thread)
+        # seria compartilhada entre requisições concorrentes
+        with Session(bind=engine) as db:
+            yield db
+
+    def read_page(db: Session, stmt, order_column, page: int, per_page: int):
+        total = db.scalar(select(func.count()).select_from(stmt.subquery()))
+        ordered = stmt.order_by(order_column).offset((page - 1) * per_page).limit(per_page + 1)
+        result = db.execute(ordered)
+        items = result.scalars().all()
+        return items[:per_page], {"total": total, "pages": total_pages(total, per_page)}
+
+    @app.get("/books/")
+    def all_books(
+        request: Request,
+        page: int = 1,
+        per_page: int = 10,
+        db: Session = Depends(get_db),
+        cache: ResponseCache = Depends(get_response_cache),
+    ):
+        def build():
+            items, meta = read_page(db, select(Book), Book.id, page, per_page)
+            return {"data": [BookSchema.model_validate(book) for book in items], **meta}
+
+        return cache.respond(request, build)
+
+    @app.get("/categories/")
+    def all_categories(
+        request: Request,
+        per_page: int = 10,
+        db: Session = Depends(get_db),
+        cache: ResponseCache = Depends(get_response_cache),
+    ):
+        def build():
+            stmt = select(Category).where(Category.book_count > 0)
+            items, meta = read_page(db, stmt, Category.name, 1, per_page)
+            data = [
+                {
+                    "name": category.name,
+                    "book_count": category.book_count,
+                    "avg_price": float(category.avg_price),
+                }
+                for category in items
+            ]
+            return {"data": data, **meta}
+
+        return cache.respond(request, build)
+
+    @app.get("/books/{book_id}")
+    def single_book(
+        request: Request,
+        book_id: int,
+        db: Session = Depends(get_db),
+        cache: ResponseCache = Depends(get_response_cache),
+    ):
+        def build():
+            book = db.get(Book, book_id)
+            if not book:
+                raise HTTPException(status_code=404, detail="Book not found")
+            return BookSchema.model_validate(book)
+
+        return cache.respond(request, build)
+
+    return app
+
+
+def seed(books: int) -> None:
+    """Cria as tabelas e insere `books` livros sintéticos no banco de DATABASE_URL."""
+    from src.extensions import SessionLocal, engine
+    from src.models import Base
+    from src.models.book import Book
+
+    rng = random.Random(42)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(
+            Book(
+                title=f"Book {i}",
+                price=round(rng.uniform(10, 60), 2),
+                rating=rng.randint(1, 5),
+                availability=rng.random() < 0.8,
+                category=rng.choice(CATEGORIES),
+            )
+            for i in range(books)
+        )
+        db.commit()
+
+
+async def run(app, books: int, requests: int, concurrency: int):
+    from src.services.response_cache import ResponseCache, get_response_cache
+
+    cache = ResponseCache(None)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    rng = random.Random(7)
+    urls = [
+        rng.choice(
+            [
+                f"/books/{rng.randint(1, books)}",
+                f"/books/?page={rng.randint(1, 50)}&per_page=20",
+                "/categories/",
+            ]
+        )
+        for _ in range(requests)
+    ]
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None)
+
+    async def client_loop(client):
+        while urls:
+            url = urls.pop()
+            start = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits)
+    async with client:
+        # Aquecimento
+        await client.get("/categories/")
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    app.dependency_overrides.pop(get_response_cache, None)
+    return np.array(latencies), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--latency-ms", default="0,2", help="atrasos por comando SQL")
+    parser.add_argument("--pool-size", type=int, default=100)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # O engine da aplicação é criado na importação de src.extensions
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        from sqlalchemy import create_engine
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        from src.app import app
+        from src.extensions import async_database_url, enable_sqlite_savepoints, get_async_db
+
+        seed(args.books)
+        print(f"{args.requests} requisições, {args.concurrency} clientes concorrentes")
+        print(f"{'atraso (ms)':>11} {'modo':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8}")
+        for latency in (float(value) for value in args.latency_ms.split(",")):
+            pool = {"pool_size": args.pool_size, "max_overflow": 0}
+            engine = create_engine(os.environ["DATABASE_URL"], **pool)
+            async_url = async_database_url(os.environ["DATABASE_URL"])
+            async_engine = create_async_engine(async_url, **pool)
+            # Como em src.extensions: SAVEPOINTs só no engine síncrono
+            enable_sqlite_savepoints(engine)
+            if latency:
+                simulate_latency(engine, latency / 1000, blocking=True)
+                simulate_latency(async_engine.sync_engine, latency / 1000, blocking=False)
+            sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+            # Mesma fila FIFO de src.extensions.get_async_db, do tamanho do pool
+            slots = asyncio.Semaphore(args.pool_size)
+
+            async def get_bench_db():
+                async with slots, sessions() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_db] = get_bench_db
+            for mode, target in (("sync", sync_app(engine)), ("async", app)):
+                latencies, elapsed = asyncio.run(
+                    run(target, args.books, args.requests, args.concurrency)
+                )
+                print(
+                    f"{latency:11.1f} {mode:>6} {np.percentile(latencies, 50) * 1000:9.2f} "
+                    f"{np.percentile(latencies, 99) * 1000:9.2f} {len(latencies) / elapsed:8.0f}"
+                )
+            app.dependency_overrides.pop(get_async_db, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Microbenchmark: páginas por segundo de cada backend de extração.
+
+Extrai repetidamente os detalhes das páginas do corpus de testes
+(`tests/fixtures/books_toscrape`) com cada backend registrado em `EXTRACTORS`.
+
+Uso:
+    uv run python -m benchmarks.bench_extractors [--rounds 50]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from src.services.scraping.core import BASE_URL
+from src.services.scraping.extractors import EXTRACTORS, get_extractor
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "books_toscrape"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    # A página quebrada é ignorada para não medir o custo do logging de erro
+    pages = [
+        (str(path), path.read_text(encoding="utf-8"))
+        for path in sorted(CORPUS_DIR.glob("*.html"))
+        if path.stem != "broken-page"
+    ]
+    total = len(pages) * args.rounds
+    print(f"{len(pages)} páginas x {args.rounds} rodadas = {total} extrações")
+
+    baseline = None
+    for name in sorted(EXTRACTORS):
+        extractor = get_extractor(name)
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for url, html_content in pages:
+                extractor.extract(html_content, url, BASE_URL)
+        rate = total / (time.perf_counter() - start)
+        baseline = baseline or (rate if name == "bs4" else None)
+        relative = f"{rate / baseline:6.1f}x" if baseline else ""
+        print(f"{name:6s}: {rate:9.1f} páginas/s {relative}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark: parsing inline (event loop) vs. pool de processos.
+
+Executa o crawler completo contra a réplica local do site (`fake_site`) e mede a
+vazão em livros por segundo para o parsing feito no event loop e para o parsing
+feito no `ProcessPoolExecutor`.
+
+Uso:
+    uv run python -m benchmarks.bench_parsing [--pages 25] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_site import FakeSite
+from src.services.scraping.core import build_client, scrape_all_books_async
+
+
+async def _crawl(site: FakeSite, concurrency: int, parse_workers: int) -> int:
+    async with build_client(concurrency, transport=site.transport()) as client:
+        books = await scrape_all_books_async(
+            "https://books.toscrape.com/catalogue/page-1.html",
+            client=client,
+            max_concurrency=concurrency,
+            parse_workers=parse_workers,
+        )
+    return len(books)
+
+
+def run(site: FakeSite, concurrency: int, parse_workers: int) -> float:
+    start = time.perf_counter()
+    count = asyncio.run(_crawl(site, concurrency, parse_workers))
+    elapsed = time.perf_counter() - start
+    assert count == site.total_books, f"esperado {site.total_books}, obtido {count}"
+    return count / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--books-per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    site = FakeSite(args.pages, args.books_per_page, args.latency)
+    print(
+        f"{site.total_books} livros, latência {args.latency * 1000:.0f} ms, "
+        f"concorrência {args.concurrency}, {os.cpu_count()} CPUs"
+    )
+    inline = run(site, args.concurrency, parse_workers=0)
+    print(f"inline (event loop)          : {inline:8.1f} livros/s")
+    pooled = run(site, args.concurrency, parse_workers=args.workers)
+    print(f"process pool ({args.workers:2d} workers)   : {pooled:8.1f} livros/s")
+    print(f"speedup                      : {pooled / inline:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: latência e vazão de POST /ml/predictions com e sem micro-batching.
+
+Treina um modelo em um catálogo sintético e mede a vazão da chamada direta ao
+modelo por tamanho de lote. Em seguida dispara requisições de um livro cada,
+com vários clientes concorrentes, contra a aplicação em processo (ASGI, sem
+rede) e mede p50/p99 da latência e a vazão para cada janela de agrupamento
+(0 = sem micro-batching).
+
+Uso:
+    uv run python -m benchmarks.bench_predictions [--requests 5000] [--concurrency 64]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from src.app import app
+from src.services.ml import LinearModel, PredictionService, get_prediction_service
+
+CATEGORIES = ["Poetry", "Travel", "Mystery", "Historical Fiction", "Food and Drink", "Music"]
+WORDS = ["light", "attic", "river", "night", "stone"]
+
+
+def synthetic_books(books: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(1, 6))),
+            "price": round(rng.uniform(10, 60), 2),
+            "rating": rng.randint(1, 5),
+            "availability": rng.random() < 0.8,
+            "category": rng.choice(CATEGORIES),
+        }
+        for _ in range(books)
+    ]
+
+
+async def run(service: PredictionService, books, requests: int, concurrency: int):
+    app.dependency_overrides[get_prediction_service] = lambda: service
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    queue = list(range(requests))
+
+    async def client_loop(client):
+        while queue:
+            book = books[queue.pop() % len(books)]
+            start = time.perf_counter()
+            response = await client.post("/ml/predictions", json={"books": [book]})
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Aquecimento
+        await client.post("/ml/predictions", json={"books": books[:1]})
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    app.dependency_overrides.pop(get_prediction_service, None)
+    return np.array(latencies), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--windows", default="0,1,2,5", help="janelas em ms")
+    args = parser.parse_args()
+
+    books = synthetic_books(10_000)
+    columns = {field: np.array([book[field] for book in books]) for field in books[0]}
+    rows = [{key: value for key, value in book.items() if key != "price"} for book in books]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.npz"
+        LinearModel.fit(columns, target="price").save(path)
+        service = PredictionService(path, window=0, max_batch=512)
+        for batch in (1, 32, 512):
+            start = time.perf_counter()
+            for offset in range(0, 10_000, batch):
+                service.predict(rows[offset : offset + batch])
+            elapsed = time.perf_counter() - start
+            print(f"modelo direto, lotes de {batch:>3}: {10_000 / elapsed:10.0f} livros/s")
+
+        print(f"{args.requests} requisições de 1 livro, {args.concurrency} clientes concorrentes")
+        print(
+            f"{'janela (ms)':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8} "
+            f"{'livros/lote':>12}"
+        )
+        for window in (float(w) for w in args.windows.split(",")):
+            service = PredictionService(path, window=window / 1000, max_batch=512)
+            latencies, elapsed = asyncio.run(run(service, rows, args.requests, args.concurrency))
+            stats = service.stats()
+            print(
+                f"{window:11.1f} {np.percentile(latencies, 50) * 1000:9.2f} "
+                f"{np.percentile(latencies, 99) * 1000:9.2f} {len(latencies) / elapsed:8.0f} "
+                f"{stats['mean_batch_size']:12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: busca por substring (ILIKE '%termo%') vs. índice FTS5.
+
+Gera uma tabela sintética de livros em um SQLite em arquivo e mede, para
+alguns termos, o custo da busca como feita pela rota /books/search (contagem
++ primeira página): o filtro ILIKE antigo, que varre a tabela inteira, e a
+busca `q=` pelo índice de texto completo.
+
+Uso:
+    uv run python -m benchmarks.bench_search [--books 1000000] [--repeat 5]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base
+from src.models.book import Book
+from src.models.category import category_ids, refresh_category_totals
+from src.services.catalog import apply_search
+
+WORDS = (
+    "light attic velvet secret garden history night river coffee shadow "
+    "winter empire dragon silent ocean letters memory glass kingdom stone "
+    "midnight orchard crown summer journey poetry mountain island hunger "
+    "café ángel corazón música"
+).split()
+CATEGORIES = ["Poetry", "Travel", "Mystery", "Historical Fiction", "Food and Drink", "Música"]
+TERMS = ["coffee", "cafe", "midnight orchard", "xyzzy"]
+
+
+def populate(session, books: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    ids = category_ids(session, CATEGORIES)
+    batch = []
+    for i in range(books):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 6)))
+        batch.append(
+            {
+                "title": f"{title} {i}",
+                "price": 10 + i % 50,
+                "rating": 1 + i % 5,
+                "availability": True,
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "category_id": ids[CATEGORIES[i % len(CATEGORIES)]],
+            }
+        )
+        if len(batch) == 50_000:
+            session.execute(insert(Book), batch)
+            batch.clear()
+    if batch:
+        session.execute(insert(Book), batch)
+    refresh_category_totals(session, ids.values())
+    session.commit()
+
+
+def ilike_search(session, term: str):
+    query = session.query(Book).filter(Book.title.ilike(f"%{term}%"))
+    return query.count(), query.order_by(Book.id).limit(10).all()
+
+
+def fts_search(session, term: str):
+    stmt, rank = apply_search(select(Book), term, session.get_bind().dialect.name)
+    total = session.scalar(select(func.count()).select_from(stmt.subquery()))
+    return total, session.scalars(stmt.order_by(rank, Book.id).limit(10)).all()
+
+
+def timed(search, session, term: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total, _ = search(session, term)
+        best = min(best, time.perf_counter() - start)
+    return total, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'search.db'}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        start = time.perf_counter()
+        populate(session, args.books)
+        print(f"{args.books} livros gerados em {time.perf_counter() - start:.1f} s")
+        print(f"{'termo':<18} {'ILIKE (ms)':>11} {'FTS5 (ms)':>10}  resultados (ILIKE / FTS5)")
+
+        for term in TERMS:
+            ilike_total, ilike = timed(ilike_search, session, term, args.repeat)
+            fts_total, fts = timed(fts_search, session, term, args.repeat)
+            print(
+                f"{term:<18} {ilike * 1000:11.1f} {fts * 1000:10.1f} "
+                f" {ilike_total:>8} / {fts_total}"
+            )
+
+        session.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
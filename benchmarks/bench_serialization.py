@@ -0,0 +1,141 @@
+"""Benchmark: CPU por requisição de /books/?per_page=100 com objetos do ORM vs. linhas simples.
+
+Cria um catálogo sintético em um SQLite temporário e mede o tempo de CPU do
+processo (`time.process_time`) por requisição de uma página de 100 livros,
+com a aplicação em processo (ASGI, sem rede) e o cache de respostas
+desligado, para que toda requisição consulte o banco e serialize a página.
+
+O modo "orm" usa uma réplica da rota como era antes do caminho rápido:
+objetos `Book` do ORM, `BookSchema.model_validate` em cada livro e
+`render_json` (`jsonable_encoder` + json). O modo "rows" usa a rota da
+aplicação: tuplas de colunas e uma única serialização da página pelo
+pydantic-core (`render_book_page`).
+
+Uso:
+    uv run python -m benchmarks.bench_serialization [--books 10000] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+CATEGORIES = ["Poetry", "Travel", "Mystery", "Historical Fiction", "Food and Drink", "Music"]
+
+
+def orm_app():
+    """Réplica de /books/ com objetos do ORM e validação de cada livro."""
+    from fastapi import Depends, FastAPI, Query, Request
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from src.api.pagination import paginate
+    from src.api.schemas.book import BookSchema
+    from src.extensions import get_async_db
+    from src.models.book import Book
+    from src.services.response_cache import ResponseCache, get_response_cache
+
+    app = FastAPI()
+
+    @app.get("/books/", response_model=dict)
+    async def all_books(
+        request: Request,
+        page: int = Query(1, ge=1),
+        per_page: int = Query(10, ge=1),
+        db: AsyncSession = Depends(get_async_db),
+        cache: ResponseCache = Depends(get_response_cache),
+    ):
+        async def build():
+            items, meta = await paginate(
+                request, db, select(Book), Book.id, lambda book: book.id, page, per_page
+            )
+            return {"data": [BookSchema.model_validate(book) for book in items], **meta}
+
+        return await cache.respond_async(request, build)
+
+    return app
+
+
+def seed(books: int) -> None:
+    """Cria as tabelas e insere `books` livros sintéticos no banco de DATABASE_URL."""
+    from src.extensions import SessionLocal, engine
+    from src.models import Base
+    from src.models.book import Book
+
+    rng = random.Random(42)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(
+            Book(
+                title=f"Book {i}",
+                price=round(rng.uniform(10, 60), 2),
+                rating=rng.randint(1, 5),
+                availability=rng.random() < 0.8,
+                category=rng.choice(CATEGORIES),
+                image=f"https://books.toscrape.com/media/cache/{i}.jpg",
+            )
+            for i in range(books)
+        )
+        db.commit()
+
+
+async def run(app, books: int, requests: int, per_page: int):
+    """CPU (s) de cada requisição, feitas uma de cada vez."""
+    from src.services.response_cache import ResponseCache, get_response_cache
+
+    cache = ResponseCache(None)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    rng = random.Random(7)
+    pages = max(1, books // per_page)
+    urls = [f"/books/?page={rng.randint(1, pages)}&per_page={per_page}" for _ in range(requests)]
+    cpu = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Aquecimento
+        for url in urls[:20]:
+            await client.get(url)
+        for url in urls:
+            start = time.process_time()
+            response = await client.get(url)
+            cpu.append(time.process_time() - start)
+            assert response.status_code == 200, response.text
+    app.dependency_overrides.pop(get_response_cache, None)
+    return np.array(cpu)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # O engine da aplicação é criado na importação de src.extensions
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        from src.app import app
+
+        seed(args.books)
+        print(f"{args.requests} requisições de /books/?per_page={args.per_page}")
+        print(f"{'modo':>6} {'CPU média (ms)':>15} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        results = {}
+        for mode, target in (("orm", orm_app()), ("rows", app)):
+            cpu = asyncio.run(run(target, args.books, args.requests, args.per_page))
+            results[mode] = cpu.mean()
+            print(
+                f"{mode:>6} {cpu.mean() * 1000:15.3f} {np.percentile(cpu, 50) * 1000:9.3f} "
+                f"{np.percentile(cpu, 99) * 1000:9.3f}"
+            )
+        print(f"redução de CPU por requisição: {1 - results['rows'] / results['orm']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
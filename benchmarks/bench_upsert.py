@@ -0,0 +1,103 @@
+"""Benchmark: persistência linha a linha vs. upsert em lote.
+
+Grava um catálogo de livros (metade já existente no banco) em um SQLite em
+arquivo, comparando a implementação anterior de `save_books_to_db` (SELECT +
+commit por livro) com `upsert_books`.
+
+Uso:
+    uv run python -m benchmarks.bench_upsert [--books 1000]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.extensions import enable_sqlite_savepoints
+from src.models import Base
+from src.models.book import Book
+from src.services.catalog import upsert_books
+
+
+def make_books(count: int, version: int):
+    return [
+        {
+            "title": f"Book Number {i}",
+            "price": 10.0 + version + i % 50,
+            "rating": 1 + i % 5,
+            "availability": "In stock (22 available)",
+            "category": f"Category {i % 50}",
+            "image_url": f"https://books.toscrape.com/media/{i}.jpg",
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_save(db, books_data):
+    """Implementação anterior: uma consulta e um commit por livro."""
+    saved_count = 0
+    for book_data in books_data:
+        existing_book = db.query(Book).filter(Book.title == book_data["title"]).first()
+        if existing_book:
+            existing_book.price = book_data["price"]
+            existing_book.rating = book_data["rating"]
+            existing_book.availability = "In stock" in book_data.get("availability", "")
+            existing_book.category = book_data["category"]
+            existing_book.image = book_data.get("image_url")
+        else:
+            db.add(
+                Book(
+                    title=book_data["title"],
+                    price=book_data["price"],
+                    rating=book_data["rating"],
+                    availability="In stock" in book_data.get("availability", ""),
+                    category=book_data["category"],
+                    image=book_data.get("image_url"),
+                )
+            )
+        db.commit()
+        saved_count += 1
+    return saved_count
+
+
+def run(save, books: int, workdir: Path) -> float:
+    engine = create_engine(f"sqlite:///{workdir / f'{save.__name__}.db'}")
+    enable_sqlite_savepoints(engine)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)
+
+    with session() as db:
+        upsert_books(db, make_books(books // 2, version=0))
+
+    with session() as db:
+        start = time.perf_counter()
+        saved = save(db, make_books(books, version=1))
+        elapsed = time.perf_counter() - start
+    assert saved == books
+    engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=1000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        legacy = run(legacy_save, args.books, workdir)
+        bulk = run(upsert_books, args.books, workdir)
+
+    print(f"{args.books} livros ({args.books // 2} já existentes), SQLite em arquivo")
+    print(f"linha a linha (SELECT + commit): {legacy * 1000:9.1f} ms")
+    print(f"upsert em lote                 : {bulk * 1000:9.1f} ms")
+    print(f"speedup                        : {legacy / bulk:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Réplica local do books.toscrape.com usada pelos benchmarks.
+
+As páginas seguem a marcação do site real (cabeçalho, breadcrumb, galeria,
+descrição e tabela de informações do produto), com tamanho semelhante, para que
+o custo de parsing medido seja representativo.
+"""
+
+import asyncio
+import hashlib
+
+import httpx
+
+RATINGS = ["One", "Two", "Three", "Four", "Five"]
+CATEGORIES = ["Poetry", "Travel", "Mystery", "Historical Fiction", "Science Fiction"]
+
+DESCRIPTION = (
+    "It's hard to imagine a world without A Light in the Attic. This now-classic "
+    "collection of poetry and drawings from Shel Silverstein celebrates its 20th "
+    "anniversary with this special edition. Silverstein's humorous and creative "
+    "verse can amuse the dowdiest of readers. "
+) * 8
+
+
+def book_title(index: int) -> str:
+    return f"Book Number {index}"
+
+
+def book_page(index: int) -> str:
+    """Página de produto no formato do books.toscrape.com."""
+    title = book_title(index)
+    category = CATEGORIES[index % len(CATEGORIES)]
+    rating = RATINGS[index % len(RATINGS)]
+    digest = hashlib.md5(title.encode()).hexdigest()
+    price = 10 + (index * 7919 % 5000) / 100
+    rows = "".join(
+        f"<tr>\n<th>{name}</th><td>{value}</td>\n</tr>\n"
+        for name, value in [
+            ("UPC", digest[:16]),
+            ("Product Type", "Books"),
+            ("Price (excl. tax)", f"£{price:.2f}"),
+            ("Price (incl. tax)", f"£{price:.2f}"),
+            ("Tax", "£0.00"),
+            ("Availability", "In stock (22 available)"),
+            ("Number of reviews", "0"),
+        ]
+    )
+    stars = '<i class="icon-star"></i>\n' * 5
+    return f"""<!DOCTYPE html>
+<!--[if lt IE 7]>      <html lang="en-us" class="no-js lt-ie9 lt-ie8 lt-ie7"> <![endif]-->
+<!--[if gt IE 8]><!--> <html lang="en-us" class="no-js"> <!--<![endif]-->
+<head>
+<title>{title} | Books to Scrape - Sandbox</title>
+<meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+<meta name="created" content="24th Jun 2016 09:29" />
+<meta name="description" content="{DESCRIPTION[:200]}" />
+<meta name="viewport" content="width=device-width" />
+<link rel="stylesheet" type="text/css" href="../../static/oscar/css/styles.css" />
+</head>
+<body id="default" class="default">
+<header class="header container-fluid">
+<div class="page_inner"><div class="row">
+<div class="col-sm-8 h1"><a href="../../index.html">Books to Scrape</a>
+<small> We love being scraped!</small></div>
+</div></div>
+</header>
+<div class="container-fluid page"><div class="page_inner">
+<ul class="breadcrumb">
+<li><a href="../../index.html">Home</a></li>
+<li><a href="../category/books_1/index.html">Books</a></li>
+<li><a href="../category/books/{category.lower()}_2/index.html">{category}</a></li>
+<li class="active">{title}</li>
+</ul>
+<div id="messages"></div>
+<div class="content"><div id="promotions"></div><div id="content_inner">
+<article class="product_page">
+<div class="row">
+<div class="col-sm-6">
+<div id="product_gallery" class="carousel"><div class="thumbnail">
+<div class="carousel-inner"><div class="item active">
+<img src="../../media/cache/{digest[:2]}/{digest[2:4]}/{digest}.jpg" alt="{title}" />
+</div></div></div></div>
+</div>
+<div class="col-sm-6 product_main">
+<h1>{title}</h1>
+<p class="price_color">£{price:.2f}</p>
+<p class="instock availability">
+<i class="icon-ok"></i>
+In stock (22 available)
+</p>
+<p class="star-rating {rating}">
+{stars}</p>
+<hr/>
+<div class="alert alert-warning" role="alert"><strong>Warning!</strong> This is a demo
+website for web scraping purposes. Prices and ratings here were randomly assigned and
+have no real meaning.</div>
+</div>
+</div>
+<div id="product_description" class="sub-header"><h2>Product Description</h2></div>
+<p>{DESCRIPTION}</p>
+<div class="sub-header"><h2>Product Information</h2></div>
+<table class="table table-striped">
+{rows}</table>
+</article>
+</div></div></div></div>
+<footer class="footer container-fluid"></footer>
+<script src="../../static/oscar/js/bootstrap3/bootstrap.min.js" type="text/javascript"></script>
+</body>
+</html>
+"""
+
+
+def catalogue_page(page: int, books_per_page: int, pages: int) -> str:
+    """Página de listagem do catálogo com `books_per_page` livros."""
+    first = (page - 1) * books_per_page
+    items = "".join(
+        f"""<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">
+<div class="image_container"><a href="book-{i}/index.html"><img src="x.jpg" /></a></div>
+<p class="star-rating {RATINGS[i % 5]}"></p>
+<h3><a href="book-{i}/index.html" title="{book_title(i)}">{book_title(i)}</a></h3>
+<div class="product_price"><p class="price_color">£10.00</p></div>
+</article></li>
+"""
+        for i in range(first, first + books_per_page)
+    )
+    next_link = (
+        f'<li class="next"><a href="page-{page + 1}.html">next</a></li>'
+        if page < pages
+        else ""
+    )
+    return (
+        "<html><body><section><ol class='row'>"
+        f"{items}</ol><ul class='pager'>{next_link}</ul></section></body></html>"
+    )
+
+
+class FakeSite:
+    """Transporte httpx que serve o catálogo local com latência simulada."""
+
+    def __init__(self, pages: int = 10, books_per_page: int = 20, latency: float = 0.02):
+        self.pages = pages
+        self.books_per_page = books_per_page
+        self.latency = latency
+
+    @property
+    def total_books(self) -> int:
+        return self.pages * self.books_per_page
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        path = request.url.path
+        if "/page-" in path:
+            page = int(path.rsplit("page-", 1)[1].split(".")[0])
+            body = catalogue_page(page, self.books_per_page, self.pages)
+        else:
+            body = book_page(int(path.split("/")[-2].split("-")[1]))
+        return httpx.Response(
+            200, text=body, headers={"content-type": "text/html; charset=utf-8"}
+        )
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handler)
@@ -0,0 +1,89 @@
+"""add categories table
+
+Revision ID: 4f8a2c1d6e93
+Revises: b81e5f3c92d6
+Create Date: 2026-10-18 21:05:44.120937
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8a2c1d6e93"
+down_revision: Union[str, Sequence[str], None] = "b81e5f3c92d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# No SQLite o batch recria a tabela books e descarta os triggers da busca textual
+SQLITE_FTS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, category ON books "
+    "WHEN old.title IS NOT new.title OR old.category IS NOT new.category BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); "
+    "INSERT INTO books_fts(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+]
+
+
+def _restore_search_triggers() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in SQLITE_FTS_TRIGGERS:
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "categories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("book_count", sa.Integer(), nullable=False),
+        sa.Column("avg_price", sa.Numeric(precision=8, scale=2), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_categories_name", "categories", ["name"], unique=True)
+
+    # Uma categoria por nome distinto, com os totais dos livros existentes
+    op.execute(
+        "INSERT INTO categories (name, book_count, avg_price) "
+        "SELECT category, COUNT(*), AVG(price) FROM books GROUP BY category"
+    )
+    op.add_column("books", sa.Column("category_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE books SET category_id = "
+        "(SELECT id FROM categories WHERE categories.name = books.category)"
+    )
+
+    op.drop_index("ix_books_category_id", table_name="books")
+    with op.batch_alter_table("books") as batch_op:
+        batch_op.alter_column("category_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key(
+            "fk_books_category_id_categories", "categories", ["category_id"], ["id"]
+        )
+    op.create_index("ix_books_category_id", "books", ["category_id", "id"], unique=False)
+    _restore_search_triggers()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_category_id", table_name="books")
+    with op.batch_alter_table("books") as batch_op:
+        batch_op.drop_constraint("fk_books_category_id_categories", type_="foreignkey")
+        batch_op.drop_column("category_id")
+    op.create_index("ix_books_category_id", "books", ["category", "id"], unique=False)
+    _restore_search_triggers()
+
+    op.drop_index("ix_categories_name", table_name="categories")
+    op.drop_table("categories")
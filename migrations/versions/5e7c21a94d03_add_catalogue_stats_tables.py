@@ -0,0 +1,58 @@
+"""add catalogue stats tables
+
+Revision ID: 5e7c21a94d03
+Revises: 8963a9c71948
+Create Date: 2026-10-18 19:02:44.118305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e7c21a94d03"
+down_revision: Union[str, Sequence[str], None] = "8963a9c71948"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "category_stats",
+        sa.Column("category", sa.String(length=120), nullable=False),
+        sa.Column("books", sa.Integer(), nullable=False),
+        sa.Column("price_sum", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("available", sa.Integer(), nullable=False),
+        sa.Column("rating_1", sa.Integer(), nullable=False),
+        sa.Column("rating_2", sa.Integer(), nullable=False),
+        sa.Column("rating_3", sa.Integer(), nullable=False),
+        sa.Column("rating_4", sa.Integer(), nullable=False),
+        sa.Column("rating_5", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category"),
+    )
+    op.create_table(
+        "price_counts",
+        sa.Column("category", sa.String(length=120), nullable=False),
+        sa.Column("price", sa.Numeric(precision=8, scale=2), nullable=False),
+        sa.Column("books", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category", "price"),
+    )
+    op.create_table(
+        "stats_snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("overview", sa.JSON(), nullable=False),
+        sa.Column("categories", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("stats_snapshots")
+    op.drop_table("price_counts")
+    op.drop_table("category_stats")
@@ -0,0 +1,35 @@
+"""add catalog version table
+
+Revision ID: 6a1f0c3e8b27
+Revises: 4f8a2c1d6e93
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1f0c3e8b27"
+down_revision: Union[str, Sequence[str], None] = "4f8a2c1d6e93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "catalog_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("generation", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO catalog_version (id, generation) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("catalog_version")
@@ -0,0 +1,54 @@
+"""add worker lease to scraping_jobs
+
+Revision ID: 7c4e9a2d5b18
+Revises: 5e7c21a94d03
+Create Date: 2026-10-18 19:02:41.517306
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e9a2d5b18"
+down_revision: Union[str, Sequence[str], None] = "5e7c21a94d03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "scraping_jobs",
+        sa.Column("full", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.add_column(
+        "scraping_jobs", sa.Column("worker_id", sa.String(length=120), nullable=True)
+    )
+    op.add_column(
+        "scraping_jobs",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "scraping_jobs", sa.Column("heartbeat_at", sa.DateTime(), nullable=True)
+    )
+    op.add_column(
+        "scraping_jobs", sa.Column("lease_expires_at", sa.DateTime(), nullable=True)
+    )
+    op.create_index(
+        "ix_scraping_jobs_status_id", "scraping_jobs", ["status", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_scraping_jobs_status_id", table_name="scraping_jobs")
+    with op.batch_alter_table("scraping_jobs") as batch_op:
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("attempts")
+        batch_op.drop_column("worker_id")
+        batch_op.drop_column("full")
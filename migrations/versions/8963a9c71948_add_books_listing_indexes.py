@@ -0,0 +1,35 @@
+"""add books listing indexes
+
+Revision ID: 8963a9c71948
+Revises: b3d2f170e4b1
+Create Date: 2026-10-18 18:21:07.340192
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8963a9c71948"
+down_revision: Union[str, Sequence[str], None] = "b3d2f170e4b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_books_rating_id", "books", [sa.text("rating DESC"), "id"], unique=False
+    )
+    op.create_index("ix_books_price_id", "books", ["price", "id"], unique=False)
+    op.create_index("ix_books_category_id", "books", ["category", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_books_category_id", table_name="books")
+    op.drop_index("ix_books_price_id", table_name="books")
+    op.drop_index("ix_books_rating_id", table_name="books")
@@ -0,0 +1,69 @@
+"""add scraping_shards table
+
+Revision ID: 9d3f61c0a7e4
+Revises: 7c4e9a2d5b18
+Create Date: 2026-10-18 19:48:12.904517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d3f61c0a7e4"
+down_revision: Union[str, Sequence[str], None] = "7c4e9a2d5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "scraping_jobs", sa.Column("shard_by", sa.String(length=20), nullable=True)
+    )
+    op.create_table(
+        "scraping_shards",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("start_url", sa.String(length=255), nullable=False),
+        sa.Column("max_pages", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("worker_id", sa.String(length=120), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("books_scraped", sa.Integer(), nullable=True),
+        sa.Column("books_saved", sa.Integer(), nullable=True),
+        sa.Column("pages_fetched", sa.Integer(), nullable=True),
+        sa.Column("pages_not_modified", sa.Integer(), nullable=True),
+        sa.Column("pages_changed", sa.Integer(), nullable=True),
+        sa.Column("error_message", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["job_id"], ["scraping_jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scraping_shards_status_job_position",
+        "scraping_shards",
+        ["status", "job_id", "position"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_scraping_shards_job_position",
+        "scraping_shards",
+        ["job_id", "position"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_scraping_shards_job_position", table_name="scraping_shards")
+    op.drop_index("ix_scraping_shards_status_job_position", table_name="scraping_shards")
+    op.drop_table("scraping_shards")
+    with op.batch_alter_table("scraping_jobs") as batch_op:
+        batch_op.drop_column("shard_by")
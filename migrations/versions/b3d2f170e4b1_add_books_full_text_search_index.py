@@ -0,0 +1,75 @@
+"""add books full-text search index
+
+Revision ID: b3d2f170e4b1
+Revises: cd05aa3a7579
+Create Date: 2026-10-18 17:42:31.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d2f170e4b1"
+down_revision: Union[str, Sequence[str], None] = "cd05aa3a7579"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, category, content='books', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, category ON books "
+    "WHEN old.title IS NOT new.title OR old.category IS NOT new.category BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); "
+    "INSERT INTO books_fts(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+    # Indexa os livros já existentes
+    "INSERT INTO books_fts(books_fts) VALUES ('rebuild')",
+]
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TABLE IF EXISTS books_fts",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION books_search_document(title text, category text) "
+    "RETURNS tsvector AS $$ SELECT to_tsvector('simple', public.unaccent("
+    "'public.unaccent', coalesce(title, '') || ' ' || coalesce(category, ''))) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE",
+    "CREATE INDEX IF NOT EXISTS ix_books_search ON books "
+    "USING gin (books_search_document(title, category))",
+]
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_books_search",
+    "DROP FUNCTION IF EXISTS books_search_document(text, text)",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
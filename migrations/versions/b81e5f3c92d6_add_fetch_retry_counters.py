@@ -0,0 +1,34 @@
+"""add fetch retry counters to scraping jobs and shards
+
+Revision ID: b81e5f3c92d6
+Revises: 9d3f61c0a7e4
+Create Date: 2026-10-18 21:15:37.208143
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b81e5f3c92d6"
+down_revision: Union[str, Sequence[str], None] = "9d3f61c0a7e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("scraping_jobs", "scraping_shards"):
+        op.add_column(table, sa.Column("retries", sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column("throttled", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("scraping_shards", "scraping_jobs"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("throttled")
+            batch_op.drop_column("retries")
@@ -0,0 +1,40 @@
+"""add page counters to scraping_jobs
+
+Revision ID: cd05aa3a7579
+Revises: 0671e50f7a9a
+Create Date: 2026-10-18 16:55:12.104213
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "cd05aa3a7579"
+down_revision: Union[str, Sequence[str], None] = "0671e50f7a9a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "scraping_jobs", sa.Column("pages_fetched", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "scraping_jobs", sa.Column("pages_not_modified", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "scraping_jobs", sa.Column("pages_changed", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("scraping_jobs") as batch_op:
+        batch_op.drop_column("pages_changed")
+        batch_op.drop_column("pages_not_modified")
+        batch_op.drop_column("pages_fetched")
@@ -0,0 +1,35 @@
+"""add generations to stats snapshots
+
+Revision ID: d47b0e6f1c35
+Revises: 6a1f0c3e8b27
+Create Date: 2026-10-20 09:41:08.517260
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d47b0e6f1c35"
+down_revision: Union[str, Sequence[str], None] = "6a1f0c3e8b27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ("generation", "built_generation"):
+        op.add_column(
+            "stats_snapshots",
+            sa.Column(column, sa.Integer(), nullable=False, server_default="0"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("stats_snapshots") as batch_op:
+        batch_op.drop_column("built_generation")
+        batch_op.drop_column("generation")
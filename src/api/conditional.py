@@ -0,0 +1,62 @@
+"""GET condicional (ETag / If-None-Match) das rotas de leitura do catálogo."""
+
+import logging
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+
+from src.services.response_cache import ResponseCache, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara o cabeçalho If-None-Match com o ETag atual (comparação fraca).
+
+    Args:
+        if_none_match: Valor do cabeçalho (lista de ETags separados por vírgula ou "*")
+        etag: ETag atual da resposta
+
+    Returns:
+        True se algum dos ETags enviados corresponde ao atual
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_get(
+    request: Request, cache: ResponseCache = Depends(get_response_cache)
+) -> None:
+    """
+    Dependency que responde 304 quando o cliente já tem a versão atual.
+
+    O ETag depende apenas da geração do catálogo e dos parâmetros da rota,
+    então a verificação acontece antes de abrir a sessão do banco ou
+    serializar qualquer dado. Usada como dependência dos roteadores de
+    leitura; as respostas 200 recebem o ETag em `ResponseCache.respond`.
+
+    Args:
+        request: Requisição atendida
+        cache: Cache de respostas do catálogo
+
+    Raises:
+        HTTPException: 304 (sem corpo) se o If-None-Match corresponder
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return
+    try:
+        headers = cache.headers(request)
+    except Exception as e:
+        logger.warning(f"Não foi possível calcular o ETag: {e}")
+        return
+    if etag_matches(if_none_match, headers["ETag"]):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,185 @@
+"""Paginação das rotas de listagem: por offset (page) ou keyset (cursor)."""
+
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from src.conf import Conf
+
+# Limite superior do parâmetro per_page das rotas de listagem
+MAX_PER_PAGE = Conf.MAX_PER_PAGE
+
+
+def encode_cursor(value: Any) -> str:
+    """Codifica a chave do último item de uma página em um cursor opaco."""
+    raw = json.dumps([value], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor opaco; vazio indica o início da listagem
+
+    Returns:
+        A chave do último item da página anterior (None para o início)
+
+    Raises:
+        HTTPException: 400 se o cursor for inválido
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        (value,) = json.loads(raw)
+        return value
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def total_pages(total: int, per_page: int) -> int:
+    """Calcula o número de páginas para um total de itens."""
+    return (total // per_page) + (1 if total % per_page else 0)
+
+
+def _sort_key(order_column: Any) -> Tuple[Any, bool]:
+    """Separa uma expressão de ordenação em (coluna, descendente)."""
+    if isinstance(order_column, UnaryExpression) and order_column.modifier is operators.desc_op:
+        return order_column.element, True
+    return order_column, False
+
+
+def keyset_filter(order_columns: Tuple[Any, ...], last_key: List[Any]) -> Any:
+    """
+    Monta a condição "depois da última chave" para uma ordenação composta.
+
+    Para `(rating DESC, id)` e a chave `[4, 17]` gera
+    `rating <= 4 AND (rating < 4 OR (rating = 4 AND id > 17))`: o primeiro termo
+    é uma faixa sobre a coluna líder do índice e o restante desempata.
+
+    Args:
+        order_columns: Expressões de ordenação (colunas ou `desc(coluna)`)
+        last_key: Valores das colunas no último item da página anterior
+
+    Returns:
+        Expressão SQL do filtro
+    """
+    columns = [_sort_key(order_column) for order_column in order_columns]
+    clauses = []
+    for position, (column, descending) in enumerate(columns):
+        previous = [
+            previous_column == value
+            for (previous_column, _), value in zip(columns[:position], last_key)
+        ]
+        value = last_key[position]
+        clauses.append(and_(*previous, column < value if descending else column > value))
+    if len(clauses) == 1:
+        return clauses[0]
+    leading, descending = columns[0]
+    bound = leading <= last_key[0] if descending else leading >= last_key[0]
+    return and_(bound, or_(*clauses))
+
+
+async def paginate(
+    request: Request,
+    db: AsyncSession,
+    stmt: Select,
+    order_column: Any,
+    key: Callable[[Any], Any],
+    page: int,
+    per_page: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    as_rows: bool = False,
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Pagina uma consulta por offset ou, se `cursor` for informado, por keyset.
+
+    No modo cursor a página seguinte é lida com `order_column > última chave`
+    (ver `keyset_filter`), uma busca por faixa no índice, em vez de descartar
+    `offset` linhas. Em ambos
+    os modos é lido um item a mais para saber se existe próxima página, então a
+    contagem total (`COUNT(*)`) só é executada quando `include_total` é True.
+
+    Args:
+        request: Request usado para montar as URLs de navegação
+        db: Sessão assíncrona do banco de dados
+        stmt: Consulta já filtrada (sem ordenação); com uma única entidade ou
+            coluna os itens são os próprios valores, senão as linhas
+        order_column: Coluna única e indexada usada na ordenação, ou uma tupla de
+            expressões cuja combinação é única (ex.: `(desc(Book.rating), Book.id)`)
+        key: Função que extrai o valor de `order_column` de um item (uma lista
+            de valores quando `order_column` é uma tupla)
+        page: Página atual (modo offset)
+        per_page: Itens por página
+        cursor: Cursor opaco da página; vazio inicia o modo cursor
+        include_total: Se o total de itens e de páginas deve ser calculado
+        as_rows: Retorna sempre as linhas, mesmo com uma única coluna (consultas
+            cuja projeção depende da requisição)
+
+    Returns:
+        Tupla com os itens da página e os metadados de paginação
+    """
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(stmt.subquery()))
+    order_columns = order_column if isinstance(order_column, tuple) else (order_column,)
+    ordered = stmt.order_by(*order_columns)
+
+    if cursor is not None:
+        last_key = decode_cursor(cursor)
+        if last_key is not None:
+            if not isinstance(order_column, tuple):
+                last_key = [last_key]
+            elif not isinstance(last_key, list) or len(last_key) != len(order_columns):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            ordered = ordered.where(keyset_filter(order_columns, last_key))
+        page_number = None
+    else:
+        ordered = ordered.offset((page - 1) * per_page)
+        page_number = page
+
+    result = await db.execute(ordered.limit(per_page + 1))
+    single = len(stmt.column_descriptions) == 1 and not as_rows
+    items: List[Any] = list(result.scalars() if single else result)
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    next_cursor = encode_cursor(key(items[-1])) if has_next else None
+
+    if cursor is not None:
+        next_url = (
+            str(request.url.include_query_params(cursor=next_cursor))
+            if has_next
+            else None
+        )
+        prev_url = None
+    else:
+        next_url = (
+            str(request.url.include_query_params(page=page + 1, per_page=per_page))
+            if has_next
+            else None
+        )
+        prev_url = (
+            str(request.url.include_query_params(page=page - 1, per_page=per_page))
+            if page > 1
+            else None
+        )
+
+    meta: Dict[str, Any] = {
+        "page": page_number,
+        "per_page": per_page,
+        "total": total,
+        "pages": total_pages(total, per_page) if total is not None else None,
+        "next": next_url,
+        "previous": prev_url,
+        "next_cursor": next_cursor,
+    }
+    return items, meta
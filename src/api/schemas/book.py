@@ -1,8 +1,10 @@
 """Schemas Pydantic para validação de dados da API."""
 
-from typing import Optional
+import functools
+from typing import Any, List, Mapping, Optional, Tuple
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from typing_extensions import TypedDict
 
 
 class BookSchema(BaseModel):
@@ -30,6 +32,107 @@ class BookSchema(BaseModel):
     image: Optional[str] = None
 
 
+class BookRecord(TypedDict):
+    """Livro nas listagens: os campos de `BookSchema`, serializados sem validação."""
+
+    id: int
+    title: str
+    price: float
+    rating: int
+    availability: bool
+    category: str
+    image: Optional[str]
+
+
+class BookPage(TypedDict):
+    """Página de uma listagem de livros (itens e metadados de `paginate`)."""
+
+    data: List[BookRecord]
+    page: Optional[int]
+    per_page: int
+    total: Optional[int]
+    pages: Optional[int]
+    next: Optional[str]
+    previous: Optional[str]
+    next_cursor: Optional[str]
+
+
+BOOK_FIELDS = tuple(BookRecord.__annotations__)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Converte o parâmetro `fields` (ex.: "title,price") nos campos de `BookRecord`.
+
+    Args:
+        fields: Nomes dos campos separados por vírgula (vazio = todos)
+
+    Returns:
+        tuple: Campos pedidos, na ordem de `BOOK_FIELDS` (uma chave canônica
+        para o cache dos schemas)
+
+    Raises:
+        ValueError: Se algum campo não existir
+    """
+    requested = {field.strip() for field in (fields or "").split(",") if field.strip()}
+    unknown = requested - set(BOOK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in BOOK_FIELDS if field in requested) or BOOK_FIELDS
+
+
+# Os schemas parciais são criados uma vez por conjunto de campos (no máximo 2**7)
+@functools.lru_cache(maxsize=None)
+def book_record_type(fields: Tuple[str, ...]) -> type:
+    """`BookRecord` restrito aos campos informados."""
+    if fields == BOOK_FIELDS:
+        return BookRecord
+    return TypedDict(  # type: ignore[operator]
+        f"BookRecord_{'_'.join(fields)}",
+        {field: BookRecord.__annotations__[field] for field in fields},
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _book_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    return TypeAdapter(book_record_type(fields))
+
+
+@functools.lru_cache(maxsize=None)
+def _book_page_adapter(fields: Tuple[str, ...]) -> TypeAdapter:
+    if fields == BOOK_FIELDS:
+        return TypeAdapter(BookPage)
+    page = TypedDict(  # type: ignore[misc]
+        f"BookPage_{'_'.join(fields)}",
+        {**BookPage.__annotations__, "data": List[book_record_type(fields)]},  # type: ignore[misc]
+    )
+    return TypeAdapter(page)
+
+
+def render_book(record: Mapping[str, Any], fields: Tuple[str, ...] = BOOK_FIELDS) -> bytes:
+    """Serializa um livro com os campos informados (ver `render_book_page`)."""
+    return _book_adapter(fields).dump_json(record)
+
+
+def render_book_page(payload: Mapping[str, Any], fields: Tuple[str, ...] = BOOK_FIELDS) -> bytes:
+    """
+    Serializa uma página de livros em JSON de uma só vez (pydantic-core).
+
+    Os livros são dicionários montados a partir das linhas da consulta, sem
+    passar por objetos do ORM, `BookSchema.model_validate` ou `jsonable_encoder`;
+    com todos os campos, o JSON gerado é o mesmo de `render_json` sobre os
+    `BookSchema`.
+
+    Args:
+        payload: Página no formato de `BookPage`
+        fields: Campos de cada livro (ver `parse_fields`)
+
+    Returns:
+        bytes: JSON da página (UTF-8)
+    """
+    return _book_page_adapter(fields).dump_json(payload)
+
+
 class UserSchema(BaseModel):
     """Schema para representação de um usuário na API."""
 
@@ -0,0 +1,37 @@
+"""Schemas Pydantic da rota de predições de ML."""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.conf import Conf
+
+
+class BookFeaturesSchema(BaseModel):
+    """
+    Dados de um livro enviados para predição.
+
+    O campo previsto pelo modelo (`price` ou `rating`) pode ser omitido; os
+    demais são obrigatórios para o modelo carregado.
+
+    Attributes:
+        title: Título do livro
+        price: Preço do livro
+        rating: Avaliação do livro (1-5)
+        availability: Indica se o livro está disponível
+        category: Categoria do livro
+    """
+
+    title: str
+    price: Optional[float] = Field(None, ge=0)
+    rating: Optional[int] = Field(None, ge=0, le=5)
+    availability: bool = True
+    category: str
+
+
+class PredictionRequest(BaseModel):
+    """Lote de livros para predição."""
+
+    books: List[BookFeaturesSchema] = Field(
+        ..., min_length=1, max_length=Conf.ML_MAX_ROWS_PER_REQUEST
+    )
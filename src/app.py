@@ -1,19 +1,48 @@
 """Aplicação principal FastAPI para consulta de livros."""
 
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from src.conf import Conf
+from src.routes.admin_routes import router as admin_router
 from src.routes.book_routes import router as book_router
 from src.routes.category_routes import router as category_router
 from src.routes.health_routes import router as health_router
+from src.routes.metrics_routes import router as metrics_router
 from src.routes.ml_routes import router as ml_router
 from src.routes.scraping_routes import router as scraping_router
 from src.routes.stats_routes import router as stats_router
 from src.routes.user_routes import router as user_router
+from src.services.metrics import MetricsMiddleware, start_multiprocess
+from src.services.ml import get_prediction_service
+from src.services.profiling import ProfilingMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carrega e aquece o modelo de predições, se houver, antes de aceitar requisições."""
+    if Conf.METRICS_ENABLED:
+        start_multiprocess()
+    service = get_prediction_service()
+    if service.path.exists():
+        try:
+            service.model
+        except Exception as e:
+            logger.error(f"Falha ao carregar o modelo de predições: {e}")
+    else:
+        logger.info(f"Modelo de predições não encontrado em {service.path}")
+    yield
+
 
 app = FastAPI(
     title="Tech Challenge API",
     version="1.0",
     description="API pública para consulta de livros extraídos via web scraping",
+    lifespan=lifespan,
 )
 
 # Registra todos os roteadores
@@ -24,3 +53,13 @@ app.include_router(category_router)
 app.include_router(scraping_router)
 app.include_router(stats_router)
 app.include_router(ml_router)
+
+# Métricas das requisições, expostas em /metrics
+if Conf.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+# Perfis sob demanda (cabeçalho X-Profile ou sorteio), consultados em /admin/profiles
+if Conf.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(admin_router)
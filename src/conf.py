@@ -1,9 +1,146 @@
 import os
+from typing import Optional
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
 
+def _env_bool(name: str, default: bool) -> bool:
+    """Lê uma variável de ambiente booleana ("true"/"1"/"yes")."""
+    value = _env_optional_bool(name)
+    return default if value is None else value
+
+
+def _env_optional_bool(name: str) -> Optional[bool]:
+    """Lê uma variável de ambiente booleana; None se ela não estiver definida."""
+    value = os.getenv(name)
+    if value is None:
+        return None
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 class Conf:
     V1_ROOT = "/api/v1"
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'db', 'dbzao.db')}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # API: limite superior do parâmetro per_page das listagens
+    MAX_PER_PAGE = int(os.getenv("MAX_PER_PAGE", "100"))
+
+    # API: cache das respostas de leitura do catálogo ("memory", "redis" ou "none")
+    RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # API: intervalo (s) entre as leituras da geração do catálogo no banco
+    RESPONSE_CACHE_GENERATION_TTL = float(os.getenv("RESPONSE_CACHE_GENERATION_TTL", "1"))
+    # API: max-age (s) do Cache-Control das rotas de leitura (0 = sempre revalidar)
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+    # ML: linhas lidas por bloco e por record batch na exportação das features
+    ML_CHUNK_SIZE = int(os.getenv("ML_CHUNK_SIZE", "10000"))
+    # ML: modelo servido em /ml/predictions e micro-batching das requisições
+    ML_MODEL_PATH = os.getenv("ML_MODEL_PATH", "data/model.npz")
+    ML_BATCH_WINDOW_MS = float(os.getenv("ML_BATCH_WINDOW_MS", "2"))
+    ML_MAX_BATCH_SIZE = int(os.getenv("ML_MAX_BATCH_SIZE", "512"))
+    ML_MAX_ROWS_PER_REQUEST = int(os.getenv("ML_MAX_ROWS_PER_REQUEST", "1000"))
+
+    # API: linhas lidas e serializadas por bloco na exportação do catálogo
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+    # Métricas: endpoint /metrics, middleware das rotas e tempo das consultas SQL
+    METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+    # Métricas: diretório compartilhado pelos processos (workers do uvicorn e
+    # worker de scraping) e intervalo (s) de gravação; vazio = só o processo atual
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+    METRICS_WRITE_INTERVAL = float(os.getenv("METRICS_WRITE_INTERVAL", "5"))
+    # Métricas: fingerprints de consultas SQL distintos por engine (os demais viram "other")
+    METRICS_MAX_SQL_STATEMENTS = int(os.getenv("METRICS_MAX_SQL_STATEMENTS", "200"))
+
+    # Perfis sob demanda: middleware e /admin/profiles (desligados por padrão;
+    # ligados exigem PROFILING_TOKEN). Uma requisição é medida com o cabeçalho
+    # X-Profile (com o token) ou por sorteio entre os caminhos com os prefixos listados
+    PROFILING_ENABLED = _env_bool("PROFILING_ENABLED", False)
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_PATHS = [
+        path.strip() for path in os.getenv("PROFILING_PATHS", "").split(",") if path.strip()
+    ]
+    # Perfis: profiler de CPU ("auto" = pyinstrument se instalado, senão
+    # cprofile; ou "cprofile" / "pyinstrument") e ring buffer em disco
+    PROFILING_BACKEND = os.getenv("PROFILING_BACKEND", "auto")
+    PROFILING_DIR = os.getenv("PROFILING_DIR", "data/profiles")
+    PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "100"))
+
+    # Persistência: pool de conexões de cada engine (ignorado no SQLite em memória)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Persistência: reciclagem (s, -1 = nunca) e teste das conexões antes do uso
+    # (não definidos = padrão do dialeto: desligados no SQLite, 1800 s e ligado nos demais)
+    DB_POOL_RECYCLE = int(os.environ["DB_POOL_RECYCLE"]) if os.getenv("DB_POOL_RECYCLE") else None
+    DB_POOL_PRE_PING = _env_optional_bool("DB_POOL_PRE_PING")
+
+    # Persistência: sessões assíncronas simultâneas das rotas (fila FIFO à frente
+    # do pool de conexões; padrão = pool_size + max_overflow; 0 = sem limite)
+    DB_MAX_ASYNC_SESSIONS = int(
+        os.getenv("DB_MAX_ASYNC_SESSIONS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW))
+    )
+
+    # SQLite: PRAGMAs de cada conexão (vazio = padrão do SQLite). O WAL permite
+    # leituras durante as escritas do scraping; cache_size negativo é em KiB
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+    SQLITE_CACHE_SIZE = os.getenv("SQLITE_CACHE_SIZE", "-65536")
+    SQLITE_MMAP_SIZE = os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+
+    # Persistência: tamanho dos lotes do upsert de livros
+    UPSERT_CHUNK_SIZE = int(os.getenv("UPSERT_CHUNK_SIZE", "500"))
+
+    # Scraping: limite global de requisições simultâneas e pool de conexões
+    SCRAPING_MAX_CONCURRENCY = int(os.getenv("SCRAPING_MAX_CONCURRENCY", "20"))
+    SCRAPING_KEEPALIVE_EXPIRY = float(os.getenv("SCRAPING_KEEPALIVE_EXPIRY", "30"))
+    SCRAPING_HTTP2 = _env_bool("SCRAPING_HTTP2", True)
+
+    # Scraping: processos dedicados ao parsing do HTML (0 = parsing no event loop)
+    SCRAPING_PARSE_WORKERS = int(
+        os.getenv("SCRAPING_PARSE_WORKERS", str(os.cpu_count() or 1))
+    )
+    # Scraping: backend do extrator de detalhes dos livros ("lxml" ou "bs4")
+    SCRAPING_PARSER_BACKEND = os.getenv("SCRAPING_PARSER_BACKEND", "lxml")
+    # Scraping: cache em disco dos validadores HTTP (ETag/Last-Modified)
+    SCRAPING_CACHE_FILE = os.getenv("SCRAPING_CACHE_FILE", "data/http_cache.json")
+    # Scraping: livros gravados por lote (banco, CSV e progresso do job) durante a coleta
+    SCRAPING_WRITE_BATCH_SIZE = int(os.getenv("SCRAPING_WRITE_BATCH_SIZE", "100"))
+    # Scraping: CSV com os livros coletados, atualizado por cada shard
+    SCRAPING_CSV_FILE = os.getenv("SCRAPING_CSV_FILE", "data/books.csv")
+
+    # Scraping: worker dedicado (espera com a fila vazia, lease dos jobs e
+    # máximo de execuções de um job cujo worker foi interrompido)
+    SCRAPING_WORKER_POLL_INTERVAL = float(os.getenv("SCRAPING_WORKER_POLL_INTERVAL", "5"))
+    SCRAPING_JOB_LEASE_SECONDS = float(os.getenv("SCRAPING_JOB_LEASE_SECONDS", "60"))
+    SCRAPING_JOB_MAX_ATTEMPTS = int(os.getenv("SCRAPING_JOB_MAX_ATTEMPTS", "3"))
+    # Scraping: divisão dos jobs em shards ("none", "pages" ou "category") e
+    # páginas do catálogo por shard na divisão "pages"
+    SCRAPING_SHARD_BY = os.getenv("SCRAPING_SHARD_BY", "pages")
+    SCRAPING_SHARD_PAGES = int(os.getenv("SCRAPING_SHARD_PAGES", "10"))
+
+    # Scraping: timeouts por requisição (segundos)
+    SCRAPING_CONNECT_TIMEOUT = float(os.getenv("SCRAPING_CONNECT_TIMEOUT", "5"))
+    SCRAPING_READ_TIMEOUT = float(os.getenv("SCRAPING_READ_TIMEOUT", "15"))
+    SCRAPING_POOL_TIMEOUT = float(os.getenv("SCRAPING_POOL_TIMEOUT", "30"))
+
+    # Scraping: limite de taxa por host (token bucket; 0 = sem limite)
+    SCRAPING_RATE_LIMIT = float(os.getenv("SCRAPING_RATE_LIMIT", "50"))
+    SCRAPING_RATE_BURST = float(os.getenv("SCRAPING_RATE_BURST", "50"))
+    # Scraping: retentativas de erros de rede e respostas 429/5xx (backoff
+    # exponencial com jitter a partir da espera base, limitado à espera máxima)
+    SCRAPING_MAX_RETRIES = int(os.getenv("SCRAPING_MAX_RETRIES", "3"))
+    SCRAPING_RETRY_BASE_DELAY = float(os.getenv("SCRAPING_RETRY_BASE_DELAY", "0.5"))
+    SCRAPING_RETRY_MAX_DELAY = float(os.getenv("SCRAPING_RETRY_MAX_DELAY", "30"))
+    # Scraping: concorrência adaptativa (AIMD) entre o mínimo e SCRAPING_MAX_CONCURRENCY,
+    # reduzida quando a latência média (s) ou a taxa de erros passam dos limites
+    SCRAPING_MIN_CONCURRENCY = int(os.getenv("SCRAPING_MIN_CONCURRENCY", "1"))
+    SCRAPING_LATENCY_TARGET = float(os.getenv("SCRAPING_LATENCY_TARGET", "2"))
+    SCRAPING_ERROR_THRESHOLD = float(os.getenv("SCRAPING_ERROR_THRESHOLD", "0.1"))
@@ -1,19 +1,118 @@
 """Configuração e gerenciamento de conexão com o banco de dados."""
 
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+from src.conf import Conf
+from src.services.database import (
+    PoolMetrics,
+    create_async_database_engine,
+    create_database_engine,
+)
+from src.services.metrics import instrument_queries
+from src.services.profiling import instrument_profiling
+
 load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+_database_url = os.getenv("DATABASE_URL")
+if not _database_url:
+    raise RuntimeError("DATABASE_URL não definida (ex.: DATABASE_URL=sqlite:///db.sqlite3)")
+DATABASE_URL: str = _database_url
+
+# Driver assíncrono usado no lugar do driver síncrono de cada banco
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    """
+    Converte a URL do banco para o driver assíncrono equivalente.
+
+    `sqlite:///db.sqlite3` vira `sqlite+aiosqlite:///db.sqlite3` e
+    `postgresql://...` (ou `postgresql+psycopg2://...`) vira
+    `postgresql+asyncpg://...`. URLs que já usam um driver assíncrono, ou de
+    bancos sem driver conhecido, são mantidas.
+
+    Args:
+        url: URL de conexão (a mesma de DATABASE_URL)
+
+    Returns:
+        URL de conexão para `create_async_engine`
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is not None and parsed.get_driver_name() not in ASYNC_DRIVERS.values():
+        parsed = parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+    return parsed.render_as_string(hide_password=False)
+
+
+def enable_sqlite_savepoints(engine: Engine) -> None:
+    """
+    Faz o driver pysqlite respeitar transações e SAVEPOINTs.
+
+    O pysqlite só emite BEGIN antes de comandos DML, o que faz um SAVEPOINT
+    iniciado fora de transação ser efetivado no RELEASE. Desligando o controle
+    do driver e emitindo o BEGIN no início da transação do SQLAlchemy, os
+    SAVEPOINTs (`Session.begin_nested`) passam a funcionar corretamente.
+
+    O BEGIN é adiado (DEFERRED), a não ser que a conexão venha de um engine
+    criado por `immediate_transactions`.
+
+    Args:
+        engine: Engine a ser configurado (ignorado se não for SQLite)
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        mode = connection.get_execution_options().get("sqlite_begin")
+        connection.exec_driver_sql(f"BEGIN {mode}" if mode else "BEGIN")
+
+
+def immediate_transactions(engine: Engine) -> Engine:
+    """
+    Engine derivado de `engine` (mesmo pool) cujas transações começam com BEGIN IMMEDIATE.
+
+    Uma transação DEFERRED que lê antes de gravar só pede o lock de escrita
+    na primeira gravação e, se outra conexão gravou nesse meio tempo, falha
+    com SQLITE_BUSY sem esperar o `busy_timeout`. Com BEGIN IMMEDIATE o lock
+    é obtido (esperando o `busy_timeout`) já no início da transação. Só tem
+    efeito em engines configurados com `enable_sqlite_savepoints`.
+
+    Args:
+        engine: Engine base
 
-# Cria o engine do SQLAlchemy
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    Returns:
+        Engine: Engine para as sessões de escrita
+    """
+    return engine.execution_options(sqlite_begin="IMMEDIATE")
+
+
+# Contadores dos pools de conexões (expostos em /health/database)
+pool_metrics = {"sync": PoolMetrics("sync"), "async": PoolMetrics("async")}
+
+# Cria o engine do SQLAlchemy com o perfil do dialeto (pool e PRAGMAs do SQLite)
+engine = create_database_engine(DATABASE_URL, pool_metrics["sync"])
+enable_sqlite_savepoints(engine)
 SessionLocal = scoped_session(
     sessionmaker(autocommit=False, autoflush=False, bind=engine)
 )
+# Sessões que leem e depois gravam em lote (upsert do worker de scraping):
+# transações curtas, com o lock de escrita obtido já no BEGIN
+WriteSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=immediate_transactions(engine)
+)
 
 
 def get_db():
@@ -28,3 +127,59 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Engine assíncrono das rotas `async def`; o síncrono acima continua sendo
+# usado pelo Alembic, pelos jobs em background e pelas rotas de ML/estatísticas.
+# As rotas não usam SAVEPOINTs, então o SQLite fica no modo padrão do driver
+# (BEGIN só antes de escritas): no aiosqlite cada comando é uma ida e volta
+# até a thread da conexão, e as leituras economizam o BEGIN
+async_engine = create_async_database_engine(
+    async_database_url(DATABASE_URL), pool_metrics["async"]
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Tempo das consultas dos dois engines (db_query_duration_seconds em /metrics)
+if Conf.METRICS_ENABLED:
+    instrument_queries(engine, "sync")
+    instrument_queries(async_engine.sync_engine, "async")
+
+# Consultas das fases de perfil (X-Profile, worker --profile); sem perfil em
+# andamento o custo é uma leitura de ContextVar por consulta
+instrument_profiling(engine)
+instrument_profiling(async_engine.sync_engine)
+
+# A fila de espera do pool assíncrono não é justa: uma requisição nova pode
+# pegar a conexão devolvida antes de quem já esperava, e sob muita
+# concorrência algumas esperam até o timeout do pool. O semáforo (FIFO)
+# limita as sessões abertas à capacidade do pool e atende por ordem de chegada.
+async_session_slots = (
+    asyncio.Semaphore(Conf.DB_MAX_ASYNC_SESSIONS) if Conf.DB_MAX_ASYNC_SESSIONS > 0 else None
+)
+
+
+@asynccontextmanager
+async def async_session_slot():
+    """Ocupa uma vaga de `async_session_slots` (se houver limite), medindo a espera."""
+    if async_session_slots is None:
+        yield
+        return
+    start = time.perf_counter()
+    async with async_session_slots:
+        pool_metrics["async"].record_queue_wait(time.perf_counter() - start)
+        yield
+
+
+async def get_async_db():
+    """
+    Dependency para obter uma sessão assíncrona do banco de dados.
+
+    Aguarda uma vaga em `async_session_slots` (por ordem de chegada) antes de
+    abrir a sessão; a espera entra em `pool_metrics["async"]`.
+
+    Yields:
+            AsyncSession: Sessão assíncrona que será fechada automaticamente
+    """
+    async with async_session_slot(), AsyncSessionLocal() as db:
+        yield db
+
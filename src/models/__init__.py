@@ -6,7 +6,21 @@ Base = declarative_base()
 
 # Importa os modelos para garantir que estejam registrados com Base
 from src.models.book import Book  # noqa: E402
-from src.models.scraping_job import ScrapingJob  # noqa: E402
+from src.models.catalog_version import CatalogVersion  # noqa: E402
+from src.models.category import Category  # noqa: E402
+from src.models.scraping_job import ScrapingJob, ScrapingShard  # noqa: E402
+from src.models.stats import CategoryStats, PriceCount, StatsSnapshot  # noqa: E402
 from src.models.user import User  # noqa: E402
 
-__all__ = ["Base", "Book", "User", "ScrapingJob"]
+__all__ = [
+    "Base",
+    "Book",
+    "CatalogVersion",
+    "Category",
+    "User",
+    "ScrapingJob",
+    "ScrapingShard",
+    "CategoryStats",
+    "PriceCount",
+    "StatsSnapshot",
+]
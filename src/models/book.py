@@ -1,8 +1,10 @@
 """Modelo de dados para livros."""
 
-from sqlalchemy import Boolean, Column, Integer, Numeric, String
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, Numeric, String, event, inspect
+from sqlalchemy.orm import Session
 
 from src.models import Base
+from src.models.category import category_ids, refresh_category_totals
 
 
 class Book(Base):  # type: ignore[valid-type, misc]
@@ -15,7 +17,8 @@ class Book(Base):  # type: ignore[valid-type, misc]
         price: Preço do livro
         rating: Avaliação do livro (1-5)
         availability: Indica se o livro está disponível em estoque
-        category: Categoria do livro
+        category: Nome da categoria do livro (cópia usada pela busca textual)
+        category_id: Categoria do livro (preenchida a partir de `category`)
         image: URL da imagem do livro
     """
 
@@ -26,4 +29,44 @@ class Book(Base):  # type: ignore[valid-type, misc]
     rating = Column(Integer, nullable=False)
     availability = Column(Boolean, nullable=False, default=True)
     category = Column(String(120), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     image = Column(String(120), nullable=True)
+
+    # Índices compostos das listagens ordenadas (o id desempata a paginação keyset)
+    __table_args__ = (
+        Index("ix_books_rating_id", rating.desc(), id),
+        Index("ix_books_price_id", price, id),
+        Index("ix_books_category_id", category_id, id),
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _resolve_categories(session, flush_context, instances):
+    """Preenche `category_id` dos livros novos ou que mudaram de categoria."""
+    books = [
+        book
+        for book in (*session.new, *session.dirty)
+        if isinstance(book, Book)
+        and book.category is not None
+        and (book.category_id is None or inspect(book).attrs.category.history.added)
+    ]
+    if books:
+        with session.no_autoflush:
+            ids = category_ids(session, {book.category for book in books})
+        for book in books:
+            book.category_id = ids[book.category]
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_categories(session, flush_context):
+    """Atualiza os totais das categorias dos livros gravados pelo ORM."""
+    touched = set()
+    for book in (*session.new, *session.deleted):
+        if isinstance(book, Book):
+            touched.add(book.category_id)
+    for book in session.dirty:
+        if isinstance(book, Book):
+            attrs = inspect(book).attrs
+            if attrs.category_id.history.has_changes() or attrs.price.history.has_changes():
+                touched.update(attrs.category_id.history.sum())
+    refresh_category_totals(session, touched)
@@ -0,0 +1,23 @@
+"""Modelo da versão (geração) do catálogo, compartilhada pelos processos."""
+
+from sqlalchemy import Column, Integer
+
+from src.models import Base
+
+
+class CatalogVersion(Base):  # type: ignore[valid-type, misc]
+    """
+    Geração do catálogo: incrementada a cada gravação de livros.
+
+    Fica no banco para que o worker de scraping e os processos da API vejam o
+    mesmo valor; o cache de respostas e os ETags da API dependem dela.
+
+    Attributes:
+        id: Sempre 1 (linha única)
+        generation: Geração atual do catálogo
+    """
+
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,101 @@
+"""Modelo de dados para categorias de livros."""
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import ColumnElement, Index, Integer, Numeric, String, func, insert, select, update
+from sqlalchemy.orm import Mapped, Session, mapped_column
+
+from src.models import Base
+
+
+class Category(Base):  # type: ignore[valid-type, misc]
+    """
+    Categoria de livros, referenciada por `Book.category_id`.
+
+    `book_count` e `avg_price` são mantidos a cada gravação de livros
+    (ver `refresh_category_totals`), então a listagem das categorias não
+    precisa percorrer a tabela books.
+
+    Attributes:
+        id: Identificador único da categoria
+        name: Nome da categoria (único)
+        book_count: Número de livros da categoria
+        avg_price: Preço médio dos livros da categoria (None sem livros)
+    """
+
+    __tablename__ = "categories"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
+    book_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    avg_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(8, 2), nullable=True)
+
+    # Busca por nome e listagem ordenada (keyset) das categorias
+    __table_args__ = (Index("ix_categories_name", name, unique=True),)
+
+
+def category_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Identificadores das categorias pelo nome, criando as que não existem.
+
+    Args:
+        db: Sessão do banco de dados
+        names: Nomes das categorias
+
+    Returns:
+        dict: Identificador de cada nome
+    """
+    names = set(names)
+    if not names:
+        return {}
+    query = select(Category.name, Category.id).where(Category.name.in_(names))
+    ids = dict(db.execute(query).all())
+    missing = [{"name": name, "book_count": 0} for name in sorted(names - ids.keys())]
+    if missing:
+        dialect = db.get_bind().dialect.name
+        # O Insert de cada dialeto é um tipo próprio, com o mesmo on_conflict_do_nothing
+        stmt: Any
+        if dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+                stmt = sqlite_insert(Category)
+            else:
+                from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+
+                stmt = postgresql_insert(Category)
+            # Outro worker pode criar a mesma categoria ao mesmo tempo
+            stmt = stmt.on_conflict_do_nothing(index_elements=["name"])
+        else:
+            stmt = insert(Category)
+        db.execute(stmt, missing)
+        ids.update(db.execute(query).all())
+    return ids
+
+
+def refresh_category_totals(db: Session, ids: Iterable[int]) -> None:
+    """
+    Recalcula `book_count` e `avg_price` das categorias informadas.
+
+    Cada total é uma busca no índice (category_id, id) dos livros da própria
+    categoria, não uma varredura da tabela books.
+
+    Args:
+        db: Sessão do banco de dados
+        ids: Identificadores das categorias cujos livros mudaram
+    """
+    from src.models.book import Book
+
+    ids = sorted({category_id for category_id in ids if category_id is not None})
+    if not ids:
+        return
+    same_category: ColumnElement[bool] = Book.category_id == Category.id
+    db.connection().execute(
+        update(Category)
+        .where(Category.id.in_(ids))
+        .values(
+            book_count=select(func.count()).where(same_category).scalar_subquery(),
+            avg_price=select(func.avg(Book.price)).where(same_category).scalar_subquery(),
+        )
+    )
@@ -1,8 +1,10 @@
 """Modelo de dados para jobs de scraping."""
 
 from datetime import datetime, timezone
+from typing import Optional
 
-from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models import Base
 
@@ -20,19 +22,114 @@ class ScrapingJob(Base):  # type: ignore[valid-type, misc]
         books_saved: Número de livros salvos no banco
         error_message: Mensagem de erro se o job falhou
         csv_file: Caminho do arquivo CSV gerado
+        pages_fetched: Páginas de livros respondidas pelo servidor (inclui 304)
+        pages_not_modified: Páginas sem alteração desde a última coleta
+        pages_changed: Páginas novas ou alteradas desde a última coleta
+        retries: Requisições repetidas após erro de rede ou resposta 429/5xx
+        throttled: Respostas 429 (Too Many Requests) recebidas
+        full: Coleta completa, ignorando o cache de validadores HTTP
+        shard_by: Divisão do job em shards ("none", "pages" ou "category")
+        worker_id: Worker que executa (ou executou) o job
+        attempts: Execuções iniciadas (reiniciadas após falha do worker)
+        heartbeat_at: Última renovação do lease pelo worker
+        lease_expires_at: Fim do lease; depois dele o job volta para a fila
     """
 
     __tablename__ = "scraping_jobs"
 
-    id = Column(Integer, primary_key=True)
-    status = Column(
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(
         String(20), nullable=False, default="pending"
     )  # pending, in_progress, completed, error
-    started_at = Column(
+    started_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
-    completed_at = Column(DateTime, nullable=True)
-    books_scraped = Column(Integer, nullable=True)
-    books_saved = Column(Integer, nullable=True)
-    error_message = Column(Text, nullable=True)
-    csv_file = Column(String(255), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    books_scraped: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    books_saved: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    csv_file: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    pages_fetched: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages_not_modified: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages_changed: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    retries: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    throttled: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    full: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    shard_by: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    shards = relationship(
+        "ScrapingShard",
+        back_populates="job",
+        order_by="ScrapingShard.position",
+        cascade="all, delete-orphan",
+    )
+
+    # Fila dos workers: próximo job pendente e jobs com lease vencido
+    __table_args__ = (Index("ix_scraping_jobs_status_id", status, id),)
+
+
+class ScrapingShard(Base):  # type: ignore[valid-type, misc]
+    """
+    Parte de um job de scraping, executada e registrada de forma independente.
+
+    Cada shard percorre uma faixa de páginas do catálogo ou a listagem de uma
+    categoria e grava os seus livros ao terminar (checkpoint); um job
+    interrompido é retomado a partir dos shards ainda não concluídos.
+
+    Attributes:
+        id: Identificador único do shard
+        job_id: Job ao qual o shard pertence
+        position: Ordem do shard no job
+        start_url: Primeira página de listagem do shard
+        max_pages: Páginas de listagem percorridas (None = até a última)
+        status: Status do shard (pending, in_progress, completed, error)
+        worker_id: Worker que executa (ou executou) o shard
+        attempts: Execuções iniciadas
+        heartbeat_at: Última renovação do lease pelo worker
+        lease_expires_at: Fim do lease; depois dele o shard volta para a fila
+        completed_at: Timestamp de conclusão
+        books_scraped: Livros coletados pelo shard
+        books_saved: Livros gravados no banco pelo shard
+        pages_fetched: Páginas de livros respondidas pelo servidor (inclui 304)
+        pages_not_modified: Páginas sem alteração desde a última coleta
+        pages_changed: Páginas novas ou alteradas desde a última coleta
+        retries: Requisições repetidas após erro de rede ou resposta 429/5xx
+        throttled: Respostas 429 (Too Many Requests) recebidas
+        error_message: Mensagem de erro se o shard falhou
+    """
+
+    __tablename__ = "scraping_shards"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    job_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("scraping_jobs.id", ondelete="CASCADE"), nullable=False
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_url: Mapped[str] = mapped_column(String(255), nullable=False)
+    max_pages: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    worker_id: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    books_scraped: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    books_saved: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages_fetched: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages_not_modified: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages_changed: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    retries: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    throttled: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    job = relationship("ScrapingJob", back_populates="shards")
+
+    # Fila dos workers (próximo shard pendente) e progresso de cada job
+    __table_args__ = (
+        Index("ix_scraping_shards_status_job_position", status, job_id, position),
+        Index("ix_scraping_shards_job_position", job_id, position, unique=True),
+    )
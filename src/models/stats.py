@@ -0,0 +1,78 @@
+"""Modelos das estatísticas pré-calculadas do catálogo."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy import JSON, DateTime, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import Base
+
+
+class CategoryStats(Base):  # type: ignore[valid-type, misc]
+    """
+    Agregados de uma categoria, mantidos de forma incremental.
+
+    Attributes:
+        category: Nome da categoria
+        books: Número de livros
+        price_sum: Soma dos preços (para a média)
+        available: Livros disponíveis em estoque
+        rating_1..rating_5: Histograma das avaliações
+    """
+
+    __tablename__ = "category_stats"
+
+    category: Mapped[str] = mapped_column(String(120), primary_key=True)
+    books: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    price_sum: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    available: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class PriceCount(Base):  # type: ignore[valid-type, misc]
+    """
+    Histograma de preços por categoria (base de mínimo, máximo e percentis).
+
+    Attributes:
+        category: Nome da categoria
+        price: Preço
+        books: Número de livros da categoria com esse preço
+    """
+
+    __tablename__ = "price_counts"
+
+    category: Mapped[str] = mapped_column(String(120), primary_key=True)
+    price: Mapped[Decimal] = mapped_column(Numeric(8, 2), primary_key=True)
+    books: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class StatsSnapshot(Base):  # type: ignore[valid-type, misc]
+    """
+    Snapshot das estatísticas servido pelas rotas /stats.
+
+    Attributes:
+        id: Sempre 1 (linha única)
+        overview: Métricas gerais da coleção
+        categories: Métricas por categoria
+        updated_at: Momento do último recálculo
+        generation: Incrementada a cada alteração dos agregados
+        built_generation: Geração dos agregados usada no último recálculo
+            (diferente de `generation` quando o snapshot está desatualizado)
+    """
+
+    __tablename__ = "stats_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    overview: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    categories: Mapped[List[Dict[str, Any]]] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
+    )
+    generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    built_generation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
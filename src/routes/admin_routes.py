@@ -0,0 +1,65 @@
+"""Rotas administrativas: perfis gravados sob demanda."""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from src.services.profiling import ProfileStore, get_profile_store, token_matches
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_profile_token(x_profile: Optional[str] = Header(None)) -> None:
+    """
+    Dependency que exige o token de perfis no cabeçalho `X-Profile`.
+
+    Sem PROFILING_TOKEN configurado o acesso é negado.
+
+    Raises:
+        HTTPException: 403 se o token estiver ausente ou incorreto
+    """
+    if not token_matches(x_profile):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+def list_profiles(
+    limit: int = Query(20, ge=1, le=1000, description="Máximo de perfis retornados"),
+    store: ProfileStore = Depends(get_profile_store),
+):
+    """
+    Lista os perfis gravados, do mais recente para o mais antigo.
+
+    Cada perfil traz o tipo (requisição ou job), a duração e, por fase, a
+    duração, o número de consultas SQL e o tempo gasto nelas; o relatório
+    do profiler e as consultas ficam em /admin/profiles/{profile_id}.
+
+    Args:
+        limit: Máximo de perfis retornados
+        store: Ring buffer de perfis
+
+    Returns:
+        list: Resumos dos perfis
+    """
+    return store.list(limit)
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profile_token)])
+def get_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)):
+    """
+    Retorna um perfil completo: relatório do profiler e consultas SQL de cada fase.
+
+    Args:
+        profile_id: Identificador do perfil (cabeçalho `X-Profile-Id` da resposta)
+        store: Ring buffer de perfis
+
+    Returns:
+        dict: O perfil gravado
+
+    Raises:
+        HTTPException: 404 se o perfil não existir (ou já tiver saído do ring buffer)
+    """
+    profile = store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -1,135 +1,416 @@
 """Rotas para consulta e pesquisa de livros."""
 
-from typing import Optional
+import functools
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Float, Select, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.schemas.book import BookSchema
-from src.extensions import get_db
+from src.api.conditional import conditional_get
+from src.api.pagination import MAX_PER_PAGE, paginate
+from src.api.schemas.book import (
+    BOOK_FIELDS,
+    BookSchema,
+    parse_fields,
+    render_book,
+    render_book_page,
+)
+from src.extensions import get_async_db
 from src.models.book import Book
+from src.models.category import Category
+from src.services.catalog import (
+    COMPRESSIONS,
+    EXTENSIONS,
+    FORMATS,
+    apply_search,
+    export_query,
+    stream_export,
+)
+from src.services.response_cache import ResponseCache, get_response_cache
 
-router = APIRouter(prefix="/books", tags=["books"])
+router = APIRouter(prefix="/books", tags=["books"], dependencies=[Depends(conditional_get)])
+
+# Colunas das listagens, lidas como tuplas (sem objetos do ORM); o preço já vem como float
+LIST_COLUMNS = {
+    "id": Book.id,
+    "title": Book.title,
+    "price": type_coerce(Book.price, Float).label("price"),
+    "rating": Book.rating,
+    "availability": Book.availability,
+    "category": Book.category,
+    "image": Book.image,
+}
+
+
+def book_fields(
+    fields: Optional[str] = Query(
+        None,
+        max_length=200,
+        description="Campos de cada livro, separados por vírgula (ex.: title,price)",
+    ),
+) -> Tuple[str, ...]:
+    """
+    Dependency do parâmetro `fields` (sparse fieldsets).
+
+    Raises:
+        HTTPException: 400 se algum campo não existir
+    """
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def list_query(fields: Tuple[str, ...] = BOOK_FIELDS) -> Select:
+    """
+    Consulta base das listagens de livros: apenas as colunas pedidas.
+
+    O `id` (chave da paginação) é sempre lido; se não foi pedido, fica depois
+    dos campos pedidos e não entra na resposta (ver `book_records`).
+    """
+    names = fields if "id" in fields else (*fields, "id")
+    return select(*(LIST_COLUMNS[name] for name in names))
+
+
+def book_records(
+    rows: Iterable[Any], fields: Tuple[str, ...] = BOOK_FIELDS
+) -> List[Dict[str, Any]]:
+    """Converte as linhas de `list_query` em livros (colunas extras, como o rank, ficam de fora)."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def filter_books(stmt: Select, title: Optional[str], category: Optional[str]) -> Select:
+    """
+    Aplica os filtros por substring de título e categoria de /books/search.
+
+    A substring da categoria é procurada na tabela categories; os livros são
+    filtrados pelo `category_id`, uma comparação de inteiros no índice.
+    """
+    if title:
+        stmt = stmt.where(Book.title.ilike(f"%{title}%"))
+    if category:
+        matching = select(Category.id).where(Category.name.ilike(f"%{category}%"))
+        stmt = stmt.where(Book.category_id.in_(matching))
+    return stmt
 
 
 @router.get("/", response_model=dict)
-def all_books(
+async def all_books(
     request: Request,
     page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    per_page: int = Query(10, ge=1, le=MAX_PER_PAGE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    fields: Tuple[str, ...] = Depends(book_fields),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Lista todos os livros disponíveis no banco de dados com paginação.
 
+    Com `fields` apenas as colunas pedidas são lidas do banco e serializadas.
+
     Args:
         request: Request object para construir URLs
         page: Número da página (padrão: 1)
         per_page: Quantidade de itens por página (padrão: 10)
+        cursor: Cursor da página (modo keyset); vazio inicia a listagem
+        include_total: Se o total de itens deve ser calculado (padrão: True)
+        fields: Campos de cada livro (padrão: todos)
         db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
 
     Returns:
         dict: Livros paginados com metadados de paginação
     """
-    query = db.query(Book).order_by(Book.id)
-    total = query.count()
-    items = query.offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = (total // per_page) + (1 if total % per_page else 0)
-
-    base_url = str(request.url.remove_query_params(["page"]))
-    next_url = (
-        f"{base_url}?page={page + 1}&per_page={per_page}"
-        if page < total_pages
-        else None
-    )
-    prev_url = f"{base_url}?page={page - 1}&per_page={per_page}" if page > 1 else None
-
-    return {
-        "data": [BookSchema.model_validate(book) for book in items],
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "pages": total_pages,
-        "next": next_url,
-        "previous": prev_url,
-    }
+
+    async def build():
+        items, meta = await paginate(
+            request,
+            db,
+            list_query(fields),
+            Book.id,
+            lambda row: row.id,
+            page,
+            per_page,
+            cursor,
+            include_total,
+            as_rows=True,
+        )
+        return {"data": book_records(items, fields), **meta}
+
+    render = functools.partial(render_book_page, fields=fields)
+    return await cache.respond_async(request, build, render=render)
 
 
 @router.get("/search", response_model=dict)
-def search(
+async def search(
     request: Request,
+    q: Optional[str] = Query(None, max_length=200),
     title: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    per_page: int = Query(10, ge=1, le=MAX_PER_PAGE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    fields: Tuple[str, ...] = Depends(book_fields),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
-    Busca livros por título e/ou categoria com paginação.
+    Busca livros por texto livre, título e/ou categoria com paginação.
+
+    Com `q` a busca usa o índice de texto completo sobre título e categoria:
+    todos os termos precisam aparecer, cada termo casa como prefixo, acentos e
+    maiúsculas são ignorados e os resultados vêm ordenados por relevância.
+    Com `fields` apenas as colunas pedidas são lidas do banco e serializadas.
 
     Args:
         request: Request object para construir URLs
+        q: Texto da busca em título e categoria (opcional)
         title: Título do livro para busca (opcional)
         category: Categoria do livro para busca (opcional)
         page: Número da página (padrão: 1)
         per_page: Quantidade de itens por página (padrão: 10)
+        cursor: Cursor da página (modo keyset); vazio inicia a listagem
+        include_total: Se o total de itens deve ser calculado (padrão: True)
+        fields: Campos de cada livro (padrão: todos)
         db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
 
     Returns:
         dict: Livros encontrados com metadados de paginação
     """
-    query = db.query(Book)
-    if title:
-        query = query.filter(Book.title.ilike(f"%{title}%"))
-    if category:
-        query = query.filter(Book.category.ilike(f"%{category}%"))
-    total = query.count()
-    items = query.order_by(Book.id).offset((page - 1) * per_page).limit(per_page).all()
-    total_pages = (total // per_page) + (1 if total % per_page else 0)
-
-    base_url = str(request.url.remove_query_params(["page"]))
-    next_url = f"{base_url}&page={page + 1}" if page < total_pages else None
-    prev_url = f"{base_url}&page={page - 1}" if page > 1 else None
-
-    return {
-        "data": [BookSchema.model_validate(book) for book in items],
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "pages": total_pages,
-        "next": next_url,
-        "previous": prev_url,
-    }
 
+    async def build():
+        stmt = filter_books(list_query(fields), title, category)
 
-@router.get("/top-rated", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def top_rated():
-    """Lista os livros com melhor avaliação (não implementado)."""
-    return {"message": "Not implemented"}
+        if q is None:
+            items, meta = await paginate(
+                request,
+                db,
+                stmt,
+                Book.id,
+                lambda row: row.id,
+                page,
+                per_page,
+                cursor,
+                include_total,
+                as_rows=True,
+            )
+            return {"data": book_records(items, fields), **meta}
 
+        stmt, rank = apply_search(stmt, q, db.get_bind().dialect.name)
+        rows, meta = await paginate(
+            request,
+            db,
+            stmt.add_columns(rank),
+            (rank, Book.id),
+            lambda row: [row[-1], row.id],
+            page,
+            per_page,
+            cursor,
+            include_total,
+        )
+        return {"data": book_records(rows, fields), **meta}
+
+    render = functools.partial(render_book_page, fields=fields)
+    return await cache.respond_async(request, build, render=render)
+
+
+@router.get("/top-rated", response_model=dict)
+async def top_rated(
+    request: Request,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=MAX_PER_PAGE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Lista os livros com melhor avaliação, da maior para a menor nota.
+
+    A ordenação `(rating DESC, id)` é servida pelo índice `ix_books_rating_id`.
+
+    Args:
+        request: Request object para construir URLs
+        min_rating: Avaliação mínima dos livros listados (opcional)
+        page: Número da página (padrão: 1)
+        per_page: Quantidade de itens por página (padrão: 10)
+        cursor: Cursor da página (modo keyset); vazio inicia a listagem
+        include_total: Se o total de itens deve ser calculado (padrão: True)
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        dict: Livros ordenados por avaliação com metadados de paginação
+    """
 
-@router.get("/price-range", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def price_range(min: Optional[float] = Query(None), max: Optional[float] = Query(None)):
-    """Filtra livros dentro de uma faixa de preço específica (não implementado)."""
-    return {"message": "Not implemented"}
+    async def build():
+        stmt = list_query()
+        if min_rating is not None:
+            stmt = stmt.where(Book.rating >= min_rating)
+        items, meta = await paginate(
+            request,
+            db,
+            stmt,
+            (Book.rating.desc(), Book.id),
+            lambda row: [row.rating, row.id],
+            page,
+            per_page,
+            cursor,
+            include_total,
+        )
+        return {"data": book_records(items), **meta}
+
+    return await cache.respond_async(request, build, render=render_book_page)
+
+
+@router.get("/price-range", response_model=dict)
+async def price_range(
+    request: Request,
+    min: Optional[float] = Query(None, ge=0),
+    max: Optional[float] = Query(None, ge=0),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(10, ge=1, le=MAX_PER_PAGE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Filtra livros dentro de uma faixa de preço, do mais barato ao mais caro.
+
+    A faixa e a ordenação `(price, id)` são servidas pelo índice `ix_books_price_id`.
+
+    Args:
+        request: Request object para construir URLs
+        min: Preço mínimo (opcional)
+        max: Preço máximo (opcional)
+        page: Número da página (padrão: 1)
+        per_page: Quantidade de itens por página (padrão: 10)
+        cursor: Cursor da página (modo keyset); vazio inicia a listagem
+        include_total: Se o total de itens deve ser calculado (padrão: True)
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        dict: Livros da faixa de preço com metadados de paginação
+
+    Raises:
+        HTTPException: 400 se `min` for maior que `max`
+    """
+    if min is not None and max is not None and min > max:
+        raise HTTPException(status_code=400, detail="min must be less than or equal to max")
+
+    async def build():
+        stmt = list_query()
+        if min is not None:
+            stmt = stmt.where(Book.price >= min)
+        if max is not None:
+            stmt = stmt.where(Book.price <= max)
+        items, meta = await paginate(
+            request,
+            db,
+            stmt,
+            (Book.price, Book.id),
+            lambda row: [row.price, row.id],
+            page,
+            per_page,
+            cursor,
+            include_total,
+        )
+        return {"data": book_records(items), **meta}
+
+    return await cache.respond_async(request, build, render=render_book_page)
+
+
+@router.get("/export")
+async def export_books(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    compression: str = Query("none", pattern="^(none|gzip|zstd)$"),
+    q: Optional[str] = Query(None, max_length=200),
+    title: Optional[str] = Query(None),
+    category: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Exporta o catálogo inteiro (ou o resultado de uma busca) em streaming.
+
+    Aceita os mesmos filtros de /books/search. As linhas são lidas do banco em
+    blocos (`yield_per`), serializadas e comprimidas bloco a bloco e enviadas
+    à medida que ficam prontas, sem montar a resposta inteira em memória.
+
+    Args:
+        request: Request object (ETag da resposta)
+        format: "ndjson" (um objeto JSON por linha) ou "csv" (com cabeçalho)
+        compression: "none", "gzip" ou "zstd"
+        q: Texto da busca em título e categoria (opcional)
+        title: Título do livro para busca (opcional)
+        category: Categoria do livro para busca (opcional)
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo (apenas para o ETag)
+
+    Returns:
+        StreamingResponse: Arquivo `books.<formato>[.gz|.zst]` em streaming
+
+    Raises:
+        HTTPException: 501 se a compressão zstd não estiver disponível
+    """
+    stmt = filter_books(export_query(), title, category)
+    if q is not None:
+        stmt, _ = apply_search(stmt, q, db.get_bind().dialect.name)
+    try:
+        content = stream_export(db, stmt, format, compression)
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    filename = f"books.{format}{EXTENSIONS.get(compression, '')}"
+    headers = {
+        **(await cache.headers_async(request)),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    media_type = COMPRESSIONS[compression] or FORMATS[format]
+    return StreamingResponse(content, media_type=media_type, headers=headers)
 
 
 @router.get("/{book_id}", response_model=BookSchema)
-def single_book(book_id: int, db: Session = Depends(get_db)):
+async def single_book(
+    request: Request,
+    book_id: int,
+    fields: Tuple[str, ...] = Depends(book_fields),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
     """
     Retorna os detalhes completos de um livro específico pelo ID.
 
     Args:
+        request: Request object (chave do cache)
         book_id: ID do livro
+        fields: Campos do livro (padrão: todos)
         db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
 
     Returns:
-        BookSchema: Detalhes do livro
+        BookSchema: Detalhes do livro (apenas os campos pedidos)
 
     Raises:
         HTTPException: 404 se o livro não for encontrado
     """
-    book = db.query(Book).filter_by(id=book_id).first()
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return BookSchema.model_validate(book)
+
+    async def build():
+        result = await db.execute(list_query(fields).where(Book.id == book_id))
+        row = result.first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        return book_records([row], fields)[0]
+
+    render = functools.partial(render_book, fields=fields)
+    return await cache.respond_async(request, build, render=render)
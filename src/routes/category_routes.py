@@ -1,53 +1,71 @@
 """Rotas para consulta de categorias de livros."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.extensions import get_db
-from src.models.book import Book
+from src.api.conditional import conditional_get
+from src.api.pagination import MAX_PER_PAGE, paginate
+from src.extensions import get_async_db
+from src.models.category import Category
+from src.services.response_cache import ResponseCache, get_response_cache
 
-router = APIRouter(prefix="/categories", tags=["categories"])
+router = APIRouter(
+    prefix="/categories", tags=["categories"], dependencies=[Depends(conditional_get)]
+)
 
 
 @router.get("/")
-def all_categories(
+async def all_categories(
     request: Request,
     page: int = Query(1, ge=1),
-    per_page: int = Query(10, ge=1),
-    db: Session = Depends(get_db),
+    per_page: int = Query(10, ge=1, le=MAX_PER_PAGE),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(True),
+    db: AsyncSession = Depends(get_async_db),
+    cache: ResponseCache = Depends(get_response_cache),
 ):
     """
     Lista todas as categorias de livros disponíveis com paginação.
 
+    As categorias vêm da tabela categories, com o número de livros e o preço
+    médio mantidos pela gravação dos livros; categorias sem livros são omitidas.
+
     Args:
         request: Request object para construir URLs
         page: Número da página (padrão: 1)
         per_page: Quantidade de itens por página (padrão: 10)
+        cursor: Cursor da página (modo keyset); vazio inicia a listagem
+        include_total: Se o total de categorias deve ser calculado (padrão: True)
         db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
 
     Returns:
         dict: Categorias paginadas com metadados de paginação
     """
-    subquery = db.query(Book.category).distinct().order_by(Book.category)
-    total = subquery.count()
-    items = subquery.offset((page - 1) * per_page).limit(per_page).all()
-    data = [{"name": category[0]} for category in items]
-    total_pages = (total // per_page) + (1 if total % per_page else 0)
-
-    base_url = str(request.url.remove_query_params(["page"]))
-    next_url = (
-        f"{base_url}?page={page + 1}&per_page={per_page}"
-        if page < total_pages
-        else None
-    )
-    prev_url = f"{base_url}?page={page - 1}&per_page={per_page}" if page > 1 else None
-
-    return {
-        "data": data,
-        "page": page,
-        "per_page": per_page,
-        "total": total,
-        "pages": total_pages,
-        "next": next_url,
-        "previous": prev_url,
-    }
+
+    async def build():
+        items, meta = await paginate(
+            request,
+            db,
+            select(Category).where(Category.book_count > 0),
+            Category.name,
+            lambda category: category.name,
+            page,
+            per_page,
+            cursor,
+            include_total,
+        )
+        data = [
+            {
+                "name": category.name,
+                "book_count": category.book_count,
+                "avg_price": float(category.avg_price) if category.avg_price is not None else None,
+            }
+            for category in items
+        ]
+        return {"data": data, **meta}
+
+    return await cache.respond_async(request, build)
@@ -4,13 +4,14 @@ from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 from sqlalchemy import literal_column, select
 
-from src.extensions import SessionLocal
+from src.extensions import AsyncSessionLocal, async_engine, engine, pool_metrics
+from src.services.response_cache import get_response_cache
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("/")
-def health():
+async def health():
     """
     Verifica o status da API e a conectividade com o banco de dados.
 
@@ -21,9 +22,8 @@ def health():
     db_status = "up"
     error = False
     try:
-        db = SessionLocal()
-        db.execute(select(literal_column("1")))
-        db.close()
+        async with AsyncSessionLocal() as db:
+            await db.execute(select(literal_column("1")))
     except Exception as e:
         status_ = "error"
         db_status = f"[DB Health Error] {e}"
@@ -34,3 +34,35 @@ def health():
         else status.HTTP_200_OK,
         content={"status": status_, "database": db_status},
     )
+
+
+@router.get("/cache")
+async def cache_stats():
+    """
+    Retorna os contadores do cache de respostas do catálogo.
+
+    Returns:
+        dict: Backend, acertos, falhas, remoções e geração do catálogo
+    """
+    return get_response_cache().stats()
+
+
+@router.get("/database")
+async def database_stats():
+    """
+    Retorna o perfil e os contadores dos pools de conexões.
+
+    Os tempos de espera por conexão (`wait_ms`) e, nas rotas assíncronas, por
+    uma vaga de sessão (`queue_wait_ms`) servem para dimensionar
+    `DB_POOL_SIZE`, `DB_MAX_OVERFLOW` e `DB_MAX_ASYNC_SESSIONS`.
+
+    Returns:
+        dict: Dialeto do banco e métricas dos pools síncrono e assíncrono
+    """
+    return {
+        "dialect": engine.dialect.name,
+        "pools": {
+            "sync": pool_metrics["sync"].snapshot(engine.pool),
+            "async": pool_metrics["async"].snapshot(async_engine.sync_engine.pool),
+        },
+    }
@@ -0,0 +1,27 @@
+"""Rota de métricas no formato do Prometheus."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.services.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+# Content-Type do formato de texto do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Retorna as métricas da API e do scraping no formato de texto do Prometheus.
+
+    Inclui latência e contagem das requisições por rota, requisições em
+    andamento, tempo das consultas SQL por fingerprint e os contadores do
+    pipeline de scraping. Com METRICS_MULTIPROC_DIR os valores são a soma de
+    todos os processos (workers do uvicorn e worker de scraping).
+
+    Returns:
+        PlainTextResponse: Métricas no formato de texto (versão 0.0.4)
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,23 +1,277 @@
-"""Rotas para integração com Machine Learning (não implementadas)."""
+"""Rotas para integração com Machine Learning."""
 
-from fastapi import APIRouter, status
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.api.conditional import conditional_get
+from src.api.schemas.ml import PredictionRequest
+from src.extensions import get_db
+from src.services.ml import (
+    MEDIA_TYPES,
+    STREAM_FORMATS,
+    PredictionService,
+    build_features,
+    category_vocabulary,
+    get_prediction_service,
+    iter_columns,
+    read_columns,
+    read_vocabulary,
+    render_table,
+    split_mask,
+    stream_table,
+)
+from src.services.response_cache import ResponseCache, get_response_cache
 
 router = APIRouter(prefix="/ml", tags=["ml"])
 
+FORMAT_PATTERN = "^(json|arrow|parquet)$"
+TRAINING_FORMAT_PATTERN = "^(json|csv|arrow|parquet)$"
+ENCODING_PATTERN = "^(integer|onehot)$"
+
+
+def respond_table(request: Request, cache: ResponseCache, build, output: str):
+    """
+    Serializa (e guarda no cache) a tabela montada por `build` no formato pedido.
+
+    `build` devolve o par (colunas, metadados) aceito por `render_table`.
+    """
+    try:
+        return cache.respond(
+            request,
+            build,
+            render=lambda payload: render_table(payload[0], output, payload[1]),
+            media_type=MEDIA_TYPES[output],
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+
+
+def stream_blocks(
+    bind: Union[Engine, Connection], build: Callable[[Dict[str, np.ndarray]], Dict[str, np.ndarray]]
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Aplica `build` a cada bloco de livros lido do banco, em uma sessão própria.
+
+    A sessão da requisição já pode ter sido fechada enquanto a resposta é
+    transmitida. Uma categoria criada depois da leitura do vocabulário fica
+    com o código -1 (como uma categoria desconhecida).
+    """
+    with Session(bind=bind) as session:
+        for columns in iter_columns(session):
+            yield build(columns)
+
+
+def stream_response(
+    request: Request,
+    cache: ResponseCache,
+    batches: Iterable[Dict[str, np.ndarray]],
+    output: str,
+    metadata: Dict[str, Any],
+) -> StreamingResponse:
+    """
+    Transmite os blocos da tabela no formato pedido, sem passar pelo cache de respostas.
+
+    Cada bloco é serializado e enviado antes do próximo ser lido (ver
+    `stream_table`); a resposta leva o ETag e o Cache-Control do catálogo.
+    """
+    try:
+        content = stream_table(batches, output, metadata)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    return StreamingResponse(
+        content, media_type=MEDIA_TYPES[output], headers=cache.headers(request)
+    )
+
+
+def training_table(
+    columns: Dict[str, np.ndarray],
+    vocabulary: List[str],
+    encoding: str,
+    target: str,
+    split: str,
+    test_size: float,
+    seed: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Monta as linhas do dataset de treinamento para um conjunto de livros.
+
+    Cada linha depende só do livro, do vocabulário e dos parâmetros, então a
+    tabela pode ser montada de uma vez ou bloco a bloco com o mesmo resultado.
+    """
+    features = build_features(columns, vocabulary, encoding)
+    labels = features.pop(target)
+    is_test = split_mask(columns["id"], test_size, seed)
+    table = {
+        "id": columns["id"],
+        **features,
+        "target": labels,
+        "split": np.where(is_test, "test", "train"),
+    }
+    if split != "all":
+        keep = is_test if split == "test" else ~is_test
+        table = {column: values[keep] for column, values in table.items()}
+    return table
+
+
+@router.get("/features", dependencies=[Depends(conditional_get)])
+def ml_features(
+    request: Request,
+    format: str = Query("json", pattern=FORMAT_PATTERN),
+    encoding: str = Query("integer", pattern=ENCODING_PATTERN),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Features de todo o catálogo, uma linha por livro.
+
+    Features: `price`, `rating`, `availability` (0/1), `title_length`,
+    `title_tokens` e a categoria codificada como inteiro (`category_code`,
+    índice em `categories`) ou one-hot (`category=<nome>`). As colunas são
+    calculadas de forma vetorizada e a resposta é colunar. Arrow e Parquet
+    são gerados em streaming, um bloco de `ML_CHUNK_SIZE` livros por vez; o
+    JSON é montado inteiro e fica no cache de respostas.
+
+    Args:
+        request: Request object (chave do cache de respostas)
+        format: "json", "arrow" (Arrow IPC stream) ou "parquet"
+        encoding: Codificação da categoria: "integer" ou "onehot"
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        Tabela com a coluna `id` seguida das features; no JSON as colunas
+        ficam em `data` e o vocabulário das categorias em `categories`
+    """
+    if format in STREAM_FORMATS:
+        vocabulary = read_vocabulary(db)
+        batches = stream_blocks(
+            db.get_bind(),
+            lambda columns: {"id": columns["id"], **build_features(columns, vocabulary, encoding)},
+        )
+        metadata = {"categories": vocabulary, "encoding": encoding}
+        return stream_response(request, cache, batches, format, metadata)
+
+    def build():
+        columns = read_columns(db)
+        vocabulary = category_vocabulary(columns["category"])
+        features = build_features(columns, vocabulary, encoding)
+        return (
+            {"id": columns["id"], **features},
+            {"categories": vocabulary, "encoding": encoding},
+        )
+
+    return respond_table(request, cache, build, format)
+
+
+@router.get("/training-data", dependencies=[Depends(conditional_get)])
+def ml_training_data(
+    request: Request,
+    target: str = Query("price", pattern="^(price|rating)$"),
+    split: str = Query("all", pattern="^(all|train|test)$"),
+    test_size: float = Query(0.2, ge=0, le=1),
+    seed: int = Query(42, ge=0),
+    format: str = Query("json", pattern=TRAINING_FORMAT_PATTERN),
+    encoding: str = Query("integer", pattern=ENCODING_PATTERN),
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Dataset de treinamento: features, alvo e separação treino/teste.
+
+    A separação é determinística: depende apenas do id do livro, de `seed` e
+    de `test_size`, então chamadas repetidas devolvem os mesmos conjuntos (e
+    o mesmo ETag) até o catálogo mudar. CSV, Arrow e Parquet são gerados em
+    streaming, um bloco de `ML_CHUNK_SIZE` livros por vez; o JSON (colunar)
+    é montado inteiro e fica no cache de respostas.
+
+    Args:
+        request: Request object (chave do cache de respostas)
+        target: Coluna alvo ("price" ou "rating"), removida das features
+        split: Conjunto devolvido: "all", "train" ou "test"
+        test_size: Fração aproximada dos livros no conjunto de teste
+        seed: Semente da separação treino/teste
+        format: "json", "csv", "arrow" (Arrow IPC stream) ou "parquet"
+        encoding: Codificação da categoria: "integer" ou "onehot"
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        Tabela com `id`, as features, `target` e `split` ("train"/"test")
+    """
+    options: Dict[str, Any] = {
+        "encoding": encoding,
+        "target": target,
+        "split": split,
+        "test_size": test_size,
+        "seed": seed,
+    }
+    metadata = {key: value for key, value in options.items() if key != "split"}
+
+    if format in STREAM_FORMATS:
+        vocabulary = read_vocabulary(db)
+        batches = stream_blocks(
+            db.get_bind(), lambda columns: training_table(columns, vocabulary, **options)
+        )
+        return stream_response(
+            request, cache, batches, format, {"categories": vocabulary, **metadata}
+        )
+
+    def build():
+        columns = read_columns(db)
+        vocabulary = category_vocabulary(columns["category"])
+        return (
+            training_table(columns, vocabulary, **options),
+            {"categories": vocabulary, **metadata},
+        )
+
+    return respond_table(request, cache, build, format)
+
+
+@router.post("/predictions")
+async def ml_predictions(
+    payload: PredictionRequest,
+    service: PredictionService = Depends(get_prediction_service),
+):
+    """
+    Predições do modelo servido pela API para um lote de livros.
+
+    O modelo é carregado uma única vez e as features são montadas pela mesma
+    transformação de /ml/features. Requisições concorrentes que chegam dentro
+    da janela de `ML_BATCH_WINDOW_MS` são agrupadas em uma única chamada
+    vetorizada ao modelo.
 
-@router.get("/features", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def ml_features():
-    """Dados formatados para features de modelos de ML (não implementado)."""
-    return {"message": "Not implemented"}
+    Args:
+        payload: Livros (`books`) a serem avaliados
+        service: Serviço de predições
 
+    Returns:
+        dict: Alvo do modelo e uma predição por livro, na ordem enviada
 
-@router.get("/training-data", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def ml_training_data():
-    """Dataset para treinamento de modelos de ML (não implementado)."""
-    return {"message": "Not implemented"}
+    Raises:
+        HTTPException: 503 se não houver modelo; 422 se faltar algum campo
+            usado pelo modelo
+    """
+    try:
+        model = service.model
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Nenhum modelo disponível para predições",
+        )
 
+    rows = [book.model_dump() for book in payload.books]
+    for index, row in enumerate(rows):
+        missing = [field for field in model.inputs if row.get(field) is None]
+        if missing:
+            raise HTTPException(
+                status_code=422,
+                detail=f"books[{index}]: campos obrigatórios para o modelo: {missing}",
+            )
 
-@router.post("/predictions", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def ml_predictions():
-    """Endpoint para receber predições de modelos de ML (não implementado)."""
-    return {"message": "Not implemented"}
+    predictions = await service.predict_async(rows)
+    return {"target": model.target, "predictions": np.round(predictions, 4).tolist()}
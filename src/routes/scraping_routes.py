@@ -1,16 +1,15 @@
 import logging
-import pathlib
-from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Literal, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.extensions import get_db
+from src.extensions import get_async_db
 from src.models.book import Book
-from src.models.scraping_job import ScrapingJob
-from src.services.scraping import scrape_all_books
-from src.services.scraping.file_handler import save_books_to_csv
+from src.models.category import Category
+from src.models.scraping_job import ScrapingJob, ScrapingShard
+from src.services.scraping import ACTIVE_STATUSES, enqueue_job, resume_job, shard_progress
 
 router = APIRouter(prefix="/scraping", tags=["scraping"])
 
@@ -18,149 +17,36 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def run_scraping_job(job_id: int):
-    """
-    Executa o job de scraping em background.
-
-    Args:
-        job_id: ID do job de scraping
-    """
-    from src.extensions import SessionLocal
-
-    db = SessionLocal()
-
-    try:
-        # Busca o job
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
-        if not job:
-            logger.error(f"Job {job_id} não encontrado")
-            return
-
-        # Atualiza status para in_progress
-        job.status = "in_progress"
-        db.commit()
-
-        logger.info(f"Iniciando scraping job {job_id}...")
-
-        # Executa o scraping
-        books_data = scrape_all_books()
-
-        if not books_data:
-            job.status = "error"
-            job.error_message = "Nenhum dado foi coletado durante o scraping"
-            job.completed_at = datetime.now(timezone.utc)
-            db.commit()
-            logger.error(f"Job {job_id} falhou: nenhum dado coletado")
-            return
-
-        logger.info(f"Job {job_id}: {len(books_data)} livros coletados")
-
-        # Salva no banco de dados
-        saved_count = save_books_to_db(db, books_data)
-
-        # Salva em arquivo CSV
-        csv_file = pathlib.Path("data/books.csv")
-        csv_saved = save_books_to_csv(csv_file, books_data)
-
-        # Atualiza job como completo
-        job.status = "completed"
-        job.completed_at = datetime.now(timezone.utc)
-        job.books_scraped = len(books_data)
-        job.books_saved = saved_count
-        job.csv_file = str(csv_file) if csv_saved else None
-        db.commit()
-
-        logger.info(f"Job {job_id} concluído com sucesso")
-
-    except Exception as e:
-        logger.error(f"Erro durante scraping job {job_id}: {e}")
-        try:
-            job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
-            if job:
-                job.status = "error"
-                job.error_message = str(e)
-                job.completed_at = datetime.now(timezone.utc)
-                db.commit()
-        except Exception as update_error:
-            logger.error(f"Erro ao atualizar status do job {job_id}: {update_error}")
-    finally:
-        db.close()
-
-
-def save_books_to_db(db: Session, books_data: list[Dict[str, Any]]) -> int:
-    """
-    Salva os dados dos livros coletados no banco de dados.
-
-    Args:
-        db: Sessão do banco de dados
-        books_data: Lista de dicionários com os dados dos livros
-
-    Returns:
-        Número de livros salvos
-    """
-    saved_count = 0
-
-    for book_data in books_data:
-        try:
-            # Verifica se o livro já existe
-            existing_book = (
-                db.query(Book).filter(Book.title == book_data["title"]).first()
-            )
-
-            if existing_book:
-                # Atualiza o livro existente
-                existing_book.price = book_data["price"]
-                existing_book.rating = book_data["rating"]
-                existing_book.availability = "In stock" in book_data.get(
-                    "availability", ""
-                )
-                existing_book.category = book_data["category"]
-                existing_book.image = book_data.get("image_url")
-                db.commit()
-            else:
-                # Cria um novo livro
-                new_book = Book(
-                    title=book_data["title"],
-                    price=book_data["price"],
-                    rating=book_data["rating"],
-                    availability="In stock" in book_data.get("availability", ""),
-                    category=book_data["category"],
-                    image=book_data.get("image_url"),
-                )
-                db.add(new_book)
-                db.commit()
-
-            saved_count += 1
-
-        except Exception as e:
-            logger.error(
-                f"Erro ao salvar livro '{book_data.get('title', 'unknown')}': {e}"
-            )
-            db.rollback()
-            continue
-
-    return saved_count
-
-
 @router.post("/trigger")
-def trigger_scraping(
-    background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+async def trigger_scraping(
+    full: bool = Query(False),
+    resume: bool = Query(True),
+    shard_by: Optional[Literal["none", "pages", "category"]] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Dict[str, Any]:
     """
     Endpoint para disparar o scraping de livros de forma assíncrona.
 
-    O scraping é executado em background e o status pode ser consultado
-    via endpoint /scraping/status.
+    A API apenas enfileira o job na tabela `scraping_jobs`; ele é dividido em
+    shards e executado por workers de scraping
+    (`python -m src.services.scraping.worker`) e o status pode ser consultado
+    via endpoint /scraping/status. Se o último job terminou com shards com
+    erro, ele é retomado a partir dos shards não concluídos.
+
+    Args:
+        full: Ignora o cache de validadores HTTP e coleta o catálogo inteiro
+        resume: Retoma o último job com erro em vez de criar um novo
+        shard_by: Divisão em shards do novo job (padrão: SCRAPING_SHARD_BY)
 
     Returns:
         Dicionário com o ID do job criado e informações para acompanhamento
     """
     try:
         # Verifica se já existe um job em andamento
-        active_job = (
-            db.query(ScrapingJob)
-            .filter(ScrapingJob.status.in_(["pending", "in_progress"]))
-            .first()
+        active_job = await db.scalar(
+            select(ScrapingJob)
+            .where(ScrapingJob.status.in_(ACTIVE_STATUSES))
+            .limit(1)
         )
 
         if active_job:
@@ -171,20 +57,27 @@ def trigger_scraping(
                 "job_status": active_job.status,
             }
 
-        # Cria um novo job
-        new_job = ScrapingJob(status="pending", started_at=datetime.now(timezone.utc))
-        db.add(new_job)
-        db.commit()
-        db.refresh(new_job)
-
-        # Adiciona o job à fila de background tasks
-        background_tasks.add_task(run_scraping_job, new_job.id)
+        # Retoma o último job, se falhou, a partir dos shards não concluídos
+        last_job = await db.scalar(select(ScrapingJob).order_by(ScrapingJob.id.desc()).limit(1))
+        if resume and last_job is not None and last_job.status == "error":
+            job_id = last_job.id
+            if await db.run_sync(lambda session: resume_job(session, job_id)):
+                return {
+                    "status": "resumed",
+                    "message": "Job retomado a partir dos shards não concluídos",
+                    "job_id": job_id,
+                    "check_status_url": f"/scraping/status?job_id={job_id}",
+                }
+
+        # Enfileira um novo job para os workers de scraping
+        new_job = enqueue_job(db, full, shard_by)
+        await db.commit()
 
         logger.info(f"Job de scraping {new_job.id} criado e adicionado à fila")
 
         return {
             "status": "started",
-            "message": "Scraping iniciado em background",
+            "message": "Scraping enfileirado; será executado por um worker de scraping",
             "job_id": new_job.id,
             "check_status_url": f"/scraping/status?job_id={new_job.id}",
         }
@@ -197,8 +90,8 @@ def trigger_scraping(
 
 
 @router.get("/status")
-def scraping_status(
-    job_id: int = None, db: Session = Depends(get_db)
+async def scraping_status(
+    job_id: int = None, db: AsyncSession = Depends(get_async_db)
 ) -> Dict[str, Any]:
     """
     Retorna o status do scraping.
@@ -210,15 +103,19 @@ def scraping_status(
         Dicionário com o status do job e estatísticas do banco de dados
     """
     # Estatísticas do banco de dados
-    total_books = db.query(Book).count()
-    total_categories = db.query(Book.category).distinct().count()
+    total_books = (await db.execute(select(func.count()).select_from(Book))).scalar_one()
+    total_categories = (
+        await db.execute(select(func.count()).select_from(Category).where(Category.book_count > 0))
+    ).scalar_one()
 
     # Busca informações do job
     if job_id:
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+        job = await db.get(ScrapingJob, job_id)
     else:
         # Pega o job mais recente
-        job = db.query(ScrapingJob).order_by(ScrapingJob.started_at.desc()).first()
+        job = await db.scalar(
+            select(ScrapingJob).order_by(ScrapingJob.started_at.desc()).limit(1)
+        )
 
     response: Dict[str, Any] = {
         "database": {
@@ -237,8 +134,45 @@ def scraping_status(
             "books_scraped": job.books_scraped,
             "books_saved": job.books_saved,
             "csv_file": job.csv_file,
+            "pages_fetched": job.pages_fetched,
+            "pages_not_modified": job.pages_not_modified,
+            "pages_changed": job.pages_changed,
+            "retries": job.retries,
+            "throttled": job.throttled,
             "error_message": job.error_message,
+            "full": job.full,
+            "worker_id": job.worker_id,
+            "attempts": job.attempts,
+            "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+            "shard_by": job.shard_by,
         }
+        # Progresso por shard (checkpoints do job)
+        shards = (
+            await db.scalars(
+                select(ScrapingShard)
+                .where(ScrapingShard.job_id == job.id)
+                .order_by(ScrapingShard.position)
+            )
+        ).all()
+        job_info["progress"] = shard_progress(shards)
+        job_info["shards"] = [
+            {
+                "position": shard.position,
+                "start_url": shard.start_url,
+                "max_pages": shard.max_pages,
+                "status": shard.status,
+                "worker_id": shard.worker_id,
+                "attempts": shard.attempts,
+                "books_scraped": shard.books_scraped,
+                "books_saved": shard.books_saved,
+                "pages_fetched": shard.pages_fetched,
+                "retries": shard.retries,
+                "throttled": shard.throttled,
+                "completed_at": shard.completed_at.isoformat() if shard.completed_at else None,
+                "error_message": shard.error_message,
+            }
+            for shard in shards
+        ]
         response["last_job"] = job_info
     else:
         response["last_job"] = None
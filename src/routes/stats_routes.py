@@ -1,17 +1,65 @@
-"""Rotas para estatísticas e insights sobre os livros (não implementadas)."""
+"""Rotas para estatísticas e insights sobre os livros."""
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/stats", tags=["stats"])
+from src.api.conditional import conditional_get
+from src.extensions import get_db
+from src.services.response_cache import ResponseCache, get_response_cache
+from src.services.stats import get_snapshot
 
+router = APIRouter(prefix="/stats", tags=["stats"], dependencies=[Depends(conditional_get)])
 
-@router.get("/overview", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def stats_overview():
-    """Estatísticas gerais da coleção (não implementado)."""
-    return {"message": "Not implemented"}
 
+@router.get("/overview", response_model=dict)
+def stats_overview(
+    request: Request,
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Estatísticas gerais da coleção.
 
-@router.get("/categories", status_code=status.HTTP_501_NOT_IMPLEMENTED)
-def stats_categories():
-    """Estatísticas detalhadas por categoria (não implementado)."""
-    return {"message": "Not implemented"}
+    As métricas são pré-calculadas e atualizadas a cada job de scraping a
+    partir dos livros alterados; a rota apenas lê o snapshot.
+
+    Args:
+        request: Request object (chave do cache de respostas)
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        dict: Total de livros e categorias, disponibilidade, resumo dos preços
+        (média, mínimo, máximo e percentis) e histograma das avaliações
+    """
+
+    def build():
+        snapshot = get_snapshot(db)
+        return {**snapshot.overview, "updated_at": snapshot.updated_at.isoformat()}
+
+    return cache.respond(request, build)
+
+
+@router.get("/categories", response_model=dict)
+def stats_categories(
+    request: Request,
+    db: Session = Depends(get_db),
+    cache: ResponseCache = Depends(get_response_cache),
+):
+    """
+    Estatísticas detalhadas por categoria.
+
+    Args:
+        request: Request object (chave do cache de respostas)
+        db: Sessão do banco de dados
+        cache: Cache de respostas do catálogo
+
+    Returns:
+        dict: Métricas de cada categoria, em ordem alfabética
+    """
+
+    def build():
+        snapshot = get_snapshot(db)
+        return {"data": snapshot.categories, "updated_at": snapshot.updated_at.isoformat()}
+
+    return cache.respond(request, build)
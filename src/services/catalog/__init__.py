@@ -0,0 +1,25 @@
+from .export import COMPRESSIONS, EXTENSIONS, FORMATS, export_query, stream_export
+from .search import apply_search, create_search_index, drop_search_index, rebuild_search_index
+from .upsert import book_row, upsert_books
+from .version import (
+    DatabaseGeneration,
+    bump_catalog_generation,
+    catalog_generation,
+)
+
+__all__ = [
+    "COMPRESSIONS",
+    "EXTENSIONS",
+    "FORMATS",
+    "DatabaseGeneration",
+    "apply_search",
+    "book_row",
+    "bump_catalog_generation",
+    "catalog_generation",
+    "create_search_index",
+    "drop_search_index",
+    "export_query",
+    "rebuild_search_index",
+    "stream_export",
+    "upsert_books",
+]
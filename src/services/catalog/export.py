@@ -0,0 +1,144 @@
+"""Exportação do catálogo em streaming (NDJSON ou CSV, com compressão opcional)."""
+
+import csv
+import io
+import json
+import logging
+import zlib
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf import Conf
+from src.models.book import Book
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ("id", "title", "price", "rating", "availability", "category", "image")
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+COMPRESSIONS = {"none": None, "gzip": "application/gzip", "zstd": "application/zstd"}
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def export_query() -> Select:
+    """Consulta base da exportação: apenas as colunas exportadas, sem objetos do ORM."""
+    return select(*(getattr(Book, column) for column in EXPORT_COLUMNS))
+
+
+def _compressor(compression: str) -> Any:
+    """
+    Cria o compressor incremental do formato pedido.
+
+    Raises:
+        ValueError: Se a compressão não for reconhecida
+        RuntimeError: Se a compressão zstd for pedida sem o pacote 'zstandard'
+    """
+    if compression == "none":
+        return None
+    if compression == "gzip":
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError(
+                "A compressão zstd requer o pacote 'zstandard' "
+                "(instale com o extra: tech_challenge_1[zstd])"
+            ) from e
+        return zstandard.ZstdCompressor().compressobj()
+    raise ValueError(f"Compressão desconhecida: {compression}")
+
+
+def _encode(rows: Sequence[Any], output: str) -> bytes:
+    """Serializa um bloco de linhas como NDJSON ou CSV."""
+    if output == "ndjson":
+        lines = (
+            json.dumps(
+                {
+                    "id": row[0],
+                    "title": row[1],
+                    "price": float(row[2]),
+                    "rating": row[3],
+                    "availability": row[4],
+                    "category": row[5],
+                    "image": row[6],
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+            for row in rows
+        )
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        (row[0], row[1], f"{row[2]:.2f}", row[3], str(row[4]).lower(), row[5], row[6] or "")
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_export(
+    db: AsyncSession,
+    stmt: Select,
+    output: str = "ndjson",
+    compression: str = "none",
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Gera o conteúdo da exportação em blocos, com memória constante.
+
+    A consulta é executada em uma sessão própria, ligada ao mesmo engine de
+    `db` (a sessão da requisição já pode ter sido fechada enquanto a resposta
+    é transmitida), com `yield_per`: o driver entrega as linhas em blocos de
+    `chunk_size` (cursor do lado do servidor no PostgreSQL) e cada bloco é
+    serializado e comprimido antes do próximo ser lido.
+
+    Args:
+        db: Sessão assíncrona da requisição (define o engine usado)
+        stmt: Consulta sobre as colunas de `EXPORT_COLUMNS` (ver `export_query`)
+        output: "ndjson" ou "csv"
+        compression: "none", "gzip" ou "zstd"
+        chunk_size: Linhas por bloco (padrão: Conf.EXPORT_CHUNK_SIZE)
+
+    Returns:
+        Iterador assíncrono com os blocos de bytes da resposta
+
+    Raises:
+        ValueError: Se o formato ou a compressão não forem reconhecidos
+        RuntimeError: Se a compressão zstd for pedida sem o pacote 'zstandard'
+    """
+    if output not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {output}")
+    # Validados aqui, antes do início da resposta, e não no primeiro bloco
+    compressor = _compressor(compression)
+    bind = db.bind
+    stmt = stmt.order_by(Book.id).execution_options(
+        yield_per=chunk_size or Conf.EXPORT_CHUNK_SIZE
+    )
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor is not None else data
+
+    async def blocks() -> AsyncIterator[bytes]:
+        exported = 0
+        async with AsyncSession(bind=bind) as session:
+            if output == "csv":
+                yield emit((",".join(EXPORT_COLUMNS) + "\n").encode("utf-8"))
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield emit(_encode(rows, output))
+        if compressor is not None:
+            yield compressor.flush()
+        logger.info(f"Exportação concluída: {exported} livros ({output}, {compression})")
+
+    async def generate() -> AsyncIterator[bytes]:
+        # O compressor pode reter um bloco inteiro; blocos vazios não são enviados
+        async for data in blocks():
+            if data:
+                yield data
+
+    return generate()
@@ -0,0 +1,136 @@
+"""Índice de busca textual dos livros (FTS5 no SQLite, tsvector no PostgreSQL)."""
+
+import re
+from typing import Any, List, Tuple
+
+from sqlalchemy import Select, column, event, false, func, literal_column, or_, table
+from sqlalchemy.engine import Connection
+
+from src.models.book import Book
+
+# Tabela virtual FTS5 (conteúdo externo: os textos ficam apenas em books)
+FTS_TABLE = "books_fts"
+# rank é a coluna oculta do FTS5 com o bm25 da busca (negativo; menor é melhor)
+books_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, category, content='books', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON books BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON books BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, category ON books "
+    "WHEN old.title IS NOT new.title OR old.category IS NOT new.category BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, category) "
+    "VALUES ('delete', old.id, old.title, old.category); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, category) "
+    "VALUES (new.id, new.title, new.category); END",
+)
+SQLITE_DROP = (
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+)
+
+# No PostgreSQL um índice GIN de expressão é mantido pelo próprio banco
+POSTGRES_CREATE = (
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION books_search_document(title text, category text) "
+    "RETURNS tsvector AS $$ SELECT to_tsvector('simple', public.unaccent("
+    "'public.unaccent', coalesce(title, '') || ' ' || coalesce(category, ''))) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE",
+    "CREATE INDEX IF NOT EXISTS ix_books_search ON books "
+    "USING gin (books_search_document(title, category))",
+)
+POSTGRES_DROP = (
+    "DROP INDEX IF EXISTS ix_books_search",
+    "DROP FUNCTION IF EXISTS books_search_document(text, text)",
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def create_search_index(connection: Connection) -> None:
+    """Cria o índice de busca textual (ignorado em dialetos sem suporte)."""
+    dialect = connection.dialect.name
+    statements = {"sqlite": SQLITE_CREATE, "postgresql": POSTGRES_CREATE}.get(dialect, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Remove o índice de busca textual."""
+    dialect = connection.dialect.name
+    statements = {"sqlite": SQLITE_DROP, "postgresql": POSTGRES_DROP}.get(dialect, ())
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Reconstrói o índice FTS5 a partir da tabela books (apenas SQLite)."""
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+@event.listens_for(Book.__table__, "after_create")
+def _create_with_books(target, connection, **kw):
+    """Cria o índice junto com a tabela books (ex.: `metadata.create_all`)."""
+    create_search_index(connection)
+
+
+@event.listens_for(Book.__table__, "before_drop")
+def _drop_with_books(target, connection, **kw):
+    """Remove o índice antes da tabela books (ex.: `metadata.drop_all`)."""
+    drop_search_index(connection)
+
+
+def search_terms(q: str) -> List[str]:
+    """Separa o texto da busca em termos (palavras), descartando pontuação."""
+    return _TOKEN_RE.findall(q)
+
+
+def apply_search(stmt: Select, q: str, dialect: str) -> Tuple[Select, Any]:
+    """
+    Filtra a consulta de livros pelo texto `q` no título e na categoria.
+
+    Todos os termos precisam aparecer (E lógico) e cada termo casa como prefixo,
+    ignorando maiúsculas e acentos ("cafe" encontra "Café" e "Cafeteria").
+
+    Args:
+        stmt: `select` sobre Book
+        q: Texto da busca
+        dialect: Nome do dialeto do banco (ex.: `db.get_bind().dialect.name`)
+
+    Returns:
+        Tupla com a consulta filtrada e a expressão de relevância, em que
+        valores menores indicam resultados mais relevantes
+    """
+    terms = search_terms(q)
+    if not terms:
+        return stmt.filter(false()), Book.id
+
+    if dialect == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        stmt = stmt.join(books_fts, books_fts.c.rowid == Book.id).filter(
+            literal_column(FTS_TABLE).op("MATCH")(match)
+        )
+        return stmt, books_fts.c.rank
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(
+            "simple", func.unaccent(" & ".join(f"{term}:*" for term in terms))
+        )
+        document = func.books_search_document(Book.title, Book.category)
+        return stmt.filter(document.op("@@")(tsquery)), -func.ts_rank(document, tsquery)
+
+    # Outros dialetos: cada termo por substring, sem ordenação por relevância
+    for term in terms:
+        stmt = stmt.filter(
+            or_(Book.title.ilike(f"%{term}%"), Book.category.ilike(f"%{term}%"))
+        )
+    return stmt, Book.id
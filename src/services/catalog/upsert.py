@@ -0,0 +1,188 @@
+"""Persistência em lote (upsert) dos livros coletados."""
+
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import Executable, bindparam, insert, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.conf import Conf
+from src.models.book import Book
+from src.models.category import category_ids, refresh_category_totals
+from src.services.stats import StatsKey, stats_key, update_stats
+
+from .version import bump_catalog_generation
+
+logger = logging.getLogger(__name__)
+
+# Colunas atualizadas quando o livro (identificado pelo título) já existe
+UPDATE_COLUMNS = ("price", "rating", "availability", "category", "category_id", "image")
+
+
+def book_row(book_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte um livro coletado pelo scraper em uma linha da tabela books.
+
+    Args:
+        book_data: Dicionário com os dados do livro (formato do scraper)
+
+    Returns:
+        Dicionário com os valores das colunas da tabela books
+    """
+    return {
+        "title": book_data["title"],
+        "price": book_data["price"],
+        "rating": book_data["rating"],
+        "availability": "In stock" in book_data.get("availability", ""),
+        "category": book_data["category"],
+        "image": book_data.get("image_url"),
+    }
+
+
+def _row_stats_key(row: Dict[str, Any]) -> StatsKey:
+    """Campos de uma linha da tabela books que entram nas estatísticas."""
+    return stats_key(row["category"], row["price"], row["rating"], row["availability"])
+
+
+def _upsert(db: Session, rows: List[Dict[str, Any]], existing: Mapping[str, Any]) -> None:
+    """Executa o upsert de um lote de linhas com o comando do dialeto."""
+    table = Book.__table__
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        # O Insert de cada dialeto é um tipo próprio, com o mesmo on_conflict_do_update
+        upsert: Any
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            upsert = sqlite_insert(table)
+        else:
+            from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+
+            upsert = postgresql_insert(table)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[table.c.title],
+            set_={column: upsert.excluded[column] for column in UPDATE_COLUMNS},
+        )
+        db.execute(upsert, rows)
+        return
+
+    # Dialetos sem ON CONFLICT: INSERT dos novos e UPDATE em lote dos existentes
+    new_rows = [row for row in rows if row["title"] not in existing]
+    old_rows = [{**row, "b_title": row["title"]} for row in rows if row["title"] in existing]
+    if new_rows:
+        db.execute(insert(table), new_rows)
+    if old_rows:
+        stmt = (
+            update(table)
+            .where(table.c.title == bindparam("b_title"))
+            .values({column: bindparam(column) for column in UPDATE_COLUMNS})
+        )
+        db.execute(stmt, old_rows)
+
+
+def upsert_books(
+    db: Session, books_data: List[Dict[str, Any]], chunk_size: Optional[int] = None
+) -> int:
+    """Insere ou atualiza os livros em lote, em uma única transação.
+
+    O estado anterior dos livros do lote é carregado por título, em consultas
+    de até `chunk_size` títulos, e os livros são gravados em lotes com
+    `INSERT ... ON CONFLICT(title) DO UPDATE`. Cada lote roda em um
+    SAVEPOINT: se falhar, apenas esse lote é refeito linha a linha, isolando
+    os livros com erro sem perder os demais. Erros do próprio banco
+    (`OperationalError`, como SQLITE_BUSY) não são isolados: são propagados
+    e a transação inteira é desfeita por quem chama. As estatísticas do
+    catálogo são atualizadas na mesma transação, apenas com os livros que de
+    fato mudaram (veja `src.services.stats.update_stats`), assim como os
+    totais das categorias dos livros gravados (`book_count` e `avg_price`) e
+    a geração do catálogo (`bump_catalog_generation`), que invalida o cache
+    de respostas e os ETags de todos os processos da API.
+
+    Args:
+        db: Sessão do banco de dados
+        books_data: Lista de dicionários com os dados dos livros
+        chunk_size: Tamanho dos lotes (padrão: Conf.UPSERT_CHUNK_SIZE)
+
+    Returns:
+        Número de livros salvos
+
+    Raises:
+        OperationalError: Se o banco falhar durante a gravação
+    """
+    chunk_size = chunk_size or Conf.UPSERT_CHUNK_SIZE
+
+    # Um título repetido no mesmo comando falharia no ON CONFLICT: vale o último
+    rows_by_title: Dict[str, Dict[str, Any]] = {}
+    for book_data in books_data:
+        try:
+            row = book_row(book_data)
+        except (KeyError, TypeError) as e:
+            logger.error(
+                f"Erro ao salvar livro '{book_data.get('title', 'unknown')}': {e}"
+            )
+            continue
+        rows_by_title[row["title"]] = row
+    rows = list(rows_by_title.values())
+
+    # Categorias referenciadas pelo lote (criadas se ainda não existirem)
+    ids = category_ids(db, {row["category"] for row in rows})
+    for row in rows:
+        row["category_id"] = ids[row["category"]]
+
+    # Estado anterior dos livros do lote que já existem, base do delta das estatísticas
+    existing: Dict[str, Any] = {}
+    previous_categories: Dict[str, int] = {}
+    titles = list(rows_by_title)
+    for start in range(0, len(titles), chunk_size):
+        query: Executable = select(
+            Book.title,
+            Book.category,
+            Book.category_id,
+            Book.price,
+            Book.rating,
+            Book.availability,
+        ).where(Book.title.in_(titles[start : start + chunk_size]))
+        for title, category, category_id, price, rating, availability in db.execute(query):
+            existing[title] = stats_key(category, price, rating, availability)
+            previous_categories[title] = category_id
+    saved: List[Dict[str, Any]] = []
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start : start + chunk_size]
+        try:
+            with db.begin_nested():
+                _upsert(db, chunk, existing)
+            saved.extend(chunk)
+            continue
+        except OperationalError:
+            # Banco ocupado ou indisponível: o lote inteiro falha, sem gravar um a um
+            raise
+        except Exception as e:
+            logger.warning(f"Falha no lote de {len(chunk)} livros, gravando um a um: {e}")
+
+        for row in chunk:
+            try:
+                with db.begin_nested():
+                    _upsert(db, [row], existing)
+                saved.append(row)
+            except OperationalError:
+                raise
+            except Exception as e:
+                logger.error(f"Erro ao salvar livro '{row['title']}': {e}")
+
+    update_stats(db, ((existing.get(row["title"]), _row_stats_key(row)) for row in saved))
+    refresh_category_totals(
+        db,
+        [row["category_id"] for row in saved]
+        + [previous_categories[row["title"]] for row in saved if row["title"] in existing],
+    )
+    if saved:
+        bump_catalog_generation(db)
+    db.commit()
+    inserted = len([row for row in saved if row["title"] not in existing])
+    logger.info(
+        f"{len(saved)} livros salvos ({inserted} novos, "
+        f"{len(saved) - inserted} atualizados)"
+    )
+    return len(saved)
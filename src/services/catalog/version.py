@@ -0,0 +1,116 @@
+"""Geração do catálogo guardada no banco (tabela catalog_version)."""
+
+import threading
+import time
+from typing import Callable, Optional, cast
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from src.conf import Conf
+from src.models.catalog_version import CatalogVersion
+
+# Linha única da tabela catalog_version
+CATALOG_VERSION_ID = 1
+
+
+def catalog_generation(db: Session) -> int:
+    """
+    Geração atual do catálogo.
+
+    Args:
+        db: Sessão do banco de dados
+
+    Returns:
+        int: Geração (0 se o catálogo nunca foi gravado)
+    """
+    generation = db.scalar(
+        select(CatalogVersion.generation).where(CatalogVersion.id == CATALOG_VERSION_ID)
+    )
+    return generation or 0
+
+
+def bump_catalog_generation(db: Session) -> None:
+    """
+    Incrementa a geração do catálogo na transação da sessão.
+
+    Chamada na mesma transação que grava os livros: a nova geração só fica
+    visível para a API junto com os dados que ela identifica.
+
+    Args:
+        db: Sessão do banco de dados (o commit fica a cargo de quem chama)
+    """
+    table = CatalogVersion.__table__
+    result = cast(
+        CursorResult,
+        db.execute(
+            update(table)
+            .where(table.c.id == CATALOG_VERSION_ID)
+            .values(generation=table.c.generation + 1)
+        ),
+    )
+    if result.rowcount == 0:
+        db.execute(insert(table).values(id=CATALOG_VERSION_ID, generation=1))
+
+
+class DatabaseGeneration:
+    """
+    Geração do catálogo lida do banco, fonte da geração do cache de respostas.
+
+    O worker de scraping incrementa a geração na transação de cada lote
+    gravado (`bump_catalog_generation`); cada processo da API a relê no
+    máximo uma vez a cada `ttl` segundos, então as respostas em cache e os
+    ETags passam a refletir a gravação em até `ttl` segundos. A releitura é
+    uma consulta síncrona: as rotas assíncronas consultam `stale` e a fazem
+    no threadpool (ver `ResponseCache.respond_async`).
+
+    Args:
+        session_factory: Cria as sessões de leitura (padrão: `src.extensions.SessionLocal`)
+        ttl: Intervalo (s) entre as leituras (padrão: Conf.RESPONSE_CACHE_GENERATION_TTL)
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.ttl = Conf.RESPONSE_CACHE_GENERATION_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._value = 0
+        self._expires_at = 0.0
+
+    def _session(self) -> Session:
+        if self.session_factory is not None:
+            return self.session_factory()
+        from src.extensions import SessionLocal
+
+        return SessionLocal()
+
+    def stale(self) -> bool:
+        """Se a próxima `generation` relê a geração do banco."""
+        return time.monotonic() >= self._expires_at
+
+    def generation(self) -> int:
+        """Geração atual (relida do banco depois de `ttl` segundos)."""
+        now = time.monotonic()
+        if now < self._expires_at:
+            return self._value
+        with self._session() as db:
+            value = catalog_generation(db)
+        with self._lock:
+            self._value = value
+            self._expires_at = now + self.ttl
+        return value
+
+    def bump_generation(self) -> int:
+        """Incrementa a geração em uma transação própria e retorna o novo valor."""
+        with self._session() as db:
+            bump_catalog_generation(db)
+            db.commit()
+            value = catalog_generation(db)
+        with self._lock:
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+        return value
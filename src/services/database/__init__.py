@@ -0,0 +1,23 @@
+from .metrics import PoolMetrics, instrument_pool, measured_pool_class
+from .profiles import (
+    PROFILE_DEFAULTS,
+    apply_sqlite_pragmas,
+    create_async_database_engine,
+    create_database_engine,
+    engine_options,
+    is_memory_database,
+    sqlite_pragmas,
+)
+
+__all__ = [
+    "PROFILE_DEFAULTS",
+    "PoolMetrics",
+    "apply_sqlite_pragmas",
+    "create_async_database_engine",
+    "create_database_engine",
+    "engine_options",
+    "instrument_pool",
+    "is_memory_database",
+    "measured_pool_class",
+    "sqlite_pragmas",
+]
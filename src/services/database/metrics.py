@@ -0,0 +1,164 @@
+"""Métricas do pool de conexões: checkouts, conexões abertas e tempo de espera."""
+
+import threading
+import time
+from typing import Any, Dict, Type
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """
+    Contadores de uso do pool de conexões de um engine.
+
+    Registra os checkouts, as conexões abertas, os timeouts e o tempo gasto
+    para obter uma conexão do pool (espera por uma conexão livre mais a
+    abertura de conexões novas). Também acumula a espera na fila de sessões
+    assíncronas (`async_session_slots`), que fica à frente do pool.
+
+    Args:
+        name: Nome do engine nas métricas ("sync" ou "async")
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera os contadores."""
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.queue_waits = 0
+            self.queue_wait_total = 0.0
+            self.queue_wait_max = 0.0
+
+    def record_checkout(self, seconds: float, checked_out) -> None:
+        """
+        Registra uma obtenção de conexão do pool.
+
+        Args:
+            seconds: Tempo até a conexão ser entregue
+            checked_out: Conexões em uso logo após o checkout (None se o pool não informa)
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if checked_out is not None:
+                self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_queue_wait(self, seconds: float) -> None:
+        """Registra a espera de uma requisição por uma vaga de sessão assíncrona."""
+        with self._lock:
+            self.queue_waits += 1
+            self.queue_wait_total += seconds
+            self.queue_wait_max = max(self.queue_wait_max, seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        """Registra uma obtenção de conexão que expirou (`pool_timeout`)."""
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        """
+        Estado atual do pool e contadores acumulados.
+
+        Args:
+            pool: Pool do engine (`engine.pool`)
+
+        Returns:
+            dict: Configuração e ocupação do pool, contadores e tempos em ms
+        """
+        with self._lock:
+            return {
+                "pool": type(pool).__name__.removeprefix("Measured"),
+                "size": _pool_value(pool, "size"),
+                "checked_out": _pool_value(pool, "checkedout"),
+                "overflow": _pool_value(pool, "overflow"),
+                "peak_checked_out": self.peak_checked_out,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "total": round(self.wait_total * 1000, 3),
+                    "mean": round(self.wait_total * 1000 / self.checkouts, 3)
+                    if self.checkouts
+                    else None,
+                    "max": round(self.wait_max * 1000, 3),
+                },
+                "queue_wait_ms": {
+                    "count": self.queue_waits,
+                    "total": round(self.queue_wait_total * 1000, 3),
+                    "max": round(self.queue_wait_max * 1000, 3),
+                },
+            }
+
+
+def _pool_value(pool: Pool, name: str):
+    """Valor de `pool.<name>()`, ou None em pools sem esse contador (ex.: StaticPool)."""
+    method = getattr(pool, name, None)
+    try:
+        return method() if method is not None else None
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def measured_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Cria uma subclasse de `base` que mede cada obtenção de conexão.
+
+    Todo checkout passa por `_do_get`. A medição fica na classe (e não em um
+    evento) porque o pool não emite eventos antes da espera; `Pool.recreate`
+    preserva a classe, então as métricas sobrevivem a `engine.dispose()`.
+
+    Args:
+        base: Classe do pool (ex.: QueuePool, AsyncAdaptedQueuePool)
+        metrics: Destino das medições
+
+    Returns:
+        Subclasse de `base`, usada como `poolclass` do engine
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_timeout(time.perf_counter() - start)
+            raise
+        metrics.record_checkout(time.perf_counter() - start, _pool_value(self, "checkedout"))
+        return record
+
+    return type(f"Measured{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def instrument_pool(pool: Pool, metrics: PoolMetrics) -> None:
+    """
+    Registra os eventos do pool (conexões abertas e devolvidas) que alimentam `metrics`.
+
+    Args:
+        pool: Pool do engine (`engine.pool`)
+        metrics: Destino dos contadores
+    """
+    event.listen(pool, "connect", metrics._on_connect)
+    event.listen(pool, "checkin", metrics._on_checkin)
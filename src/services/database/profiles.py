@@ -0,0 +1,155 @@
+"""Perfis de banco de dados: construção do engine, pool e PRAGMAs por dialeto."""
+
+from typing import Any, Dict, Optional, Type, Union, cast
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+
+from src.conf import Conf
+
+from .metrics import PoolMetrics, instrument_pool, measured_pool_class
+
+# Padrões por dialeto para o que não foi definido no ambiente. O SQLite local
+# não derruba conexões ociosas, então não há o que testar nem reciclar
+PROFILE_DEFAULTS = {
+    "sqlite": {"pool_pre_ping": False, "pool_recycle": -1},
+    "default": {"pool_pre_ping": True, "pool_recycle": 1800},
+}
+
+
+def sqlite_pragmas() -> Dict[str, str]:
+    """
+    PRAGMAs aplicados a cada conexão SQLite, na ordem de execução.
+
+    O `busy_timeout` vem primeiro para que a troca do journal espere por
+    outras conexões em vez de falhar. PRAGMAs configurados como vazios
+    mantêm o padrão do SQLite.
+
+    Returns:
+        dict: Nome e valor de cada PRAGMA
+    """
+    pragmas = {
+        "busy_timeout": Conf.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": Conf.SQLITE_JOURNAL_MODE,
+        "synchronous": Conf.SQLITE_SYNCHRONOUS,
+        "cache_size": Conf.SQLITE_CACHE_SIZE,
+        "mmap_size": Conf.SQLITE_MMAP_SIZE,
+    }
+    return {name: str(value) for name, value in pragmas.items() if str(value) != ""}
+
+
+def is_memory_database(url: URL) -> bool:
+    """Indica se a URL aponta para um SQLite em memória (sem arquivo)."""
+    database = url.database or ""
+    return database in ("", ":memory:") or url.query.get("mode") == "memory"
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Optional[Dict[str, str]] = None) -> None:
+    """
+    Executa os PRAGMAs em toda conexão nova do engine (evento "connect").
+
+    Em bancos em memória o `journal_mode=WAL` não se aplica e é ignorado.
+
+    Args:
+        engine: Engine síncrono (para o assíncrono, `async_engine.sync_engine`)
+        pragmas: PRAGMAs a aplicar (padrão: `sqlite_pragmas()`)
+    """
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+    if is_memory_database(engine.url):
+        pragmas = {name: value for name, value in pragmas.items() if name != "journal_mode"}
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def engine_options(url: Union[str, URL], metrics: Optional[PoolMetrics] = None) -> Dict[str, Any]:
+    """
+    Argumentos de `create_engine`/`create_async_engine` para o banco da URL.
+
+    O pool é o padrão do dialeto (QueuePool/AsyncAdaptedQueuePool; no SQLite
+    em memória, um pool de conexão única), dimensionado por `DB_POOL_SIZE`,
+    `DB_MAX_OVERFLOW` e `DB_POOL_TIMEOUT` quando for uma fila. `pool_recycle`
+    e `pool_pre_ping` seguem o ambiente ou os padrões de `PROFILE_DEFAULTS`.
+    O `check_same_thread=False` só é passado ao driver síncrono do SQLite.
+
+    Args:
+        url: URL de conexão, já com o driver (síncrono ou assíncrono) desejado
+        metrics: Se informado, o pool é trocado por uma subclasse que mede os checkouts
+
+    Returns:
+        dict: Argumentos nomeados do engine
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    defaults = PROFILE_DEFAULTS.get(backend, PROFILE_DEFAULTS["default"])
+    pool_class = cast(Type[DefaultDialect], url.get_dialect()).get_pool_class(url)
+
+    options: Dict[str, Any] = {
+        "pool_pre_ping": Conf.DB_POOL_PRE_PING
+        if Conf.DB_POOL_PRE_PING is not None
+        else defaults["pool_pre_ping"],
+        "pool_recycle": Conf.DB_POOL_RECYCLE
+        if Conf.DB_POOL_RECYCLE is not None
+        else defaults["pool_recycle"],
+    }
+    if issubclass(pool_class, QueuePool):
+        options.update(
+            pool_size=Conf.DB_POOL_SIZE,
+            max_overflow=Conf.DB_MAX_OVERFLOW,
+            pool_timeout=Conf.DB_POOL_TIMEOUT,
+        )
+    if metrics is not None:
+        options["poolclass"] = measured_pool_class(pool_class, metrics)
+    if backend == "sqlite" and url.get_driver_name() == "pysqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+
+def create_database_engine(url: Union[str, URL], metrics: Optional[PoolMetrics] = None) -> Engine:
+    """
+    Cria o engine síncrono com o perfil do dialeto da URL.
+
+    Args:
+        url: URL de conexão (ex.: DATABASE_URL)
+        metrics: Contadores do pool (ver `PoolMetrics`)
+
+    Returns:
+        Engine: Engine configurado; no SQLite, com os PRAGMAs de `sqlite_pragmas`
+    """
+    engine = create_engine(url, **engine_options(url, metrics))
+    _configure(engine, metrics)
+    return engine
+
+
+def create_async_database_engine(
+    url: Union[str, URL], metrics: Optional[PoolMetrics] = None
+) -> AsyncEngine:
+    """
+    Cria o engine assíncrono com o perfil do dialeto da URL.
+
+    Args:
+        url: URL de conexão com driver assíncrono (ver `async_database_url`)
+        metrics: Contadores do pool (ver `PoolMetrics`)
+
+    Returns:
+        AsyncEngine: Engine configurado; no SQLite, com os PRAGMAs de `sqlite_pragmas`
+    """
+    engine = create_async_engine(url, **engine_options(url, metrics))
+    _configure(engine.sync_engine, metrics)
+    return engine
+
+
+def _configure(engine: Engine, metrics: Optional[PoolMetrics]) -> None:
+    if engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(engine)
+    if metrics is not None:
+        instrument_pool(engine.pool, metrics)
@@ -0,0 +1,29 @@
+from .http import MetricsMiddleware, route_template
+from .multiprocess import merge_snapshots, render_metrics, start_multiprocess, write_snapshot
+from .registry import (
+    DEFAULT_BUCKETS,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+)
+from .sql import QueryTimer, fingerprint, instrument_queries
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "QueryTimer",
+    "fingerprint",
+    "instrument_queries",
+    "merge_snapshots",
+    "render_metrics",
+    "route_template",
+    "start_multiprocess",
+    "write_snapshot",
+]
@@ -0,0 +1,82 @@
+"""Métricas das requisições HTTP: contagem, latência e requisições em andamento por rota."""
+
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import REGISTRY
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "Requisições HTTP atendidas", ["method", "route", "status"]
+)
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP (até o fim do corpo da resposta)",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = REGISTRY.gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento", ["method"]
+)
+
+# Rótulo das requisições que não casam com nenhuma rota (evita um rótulo por URL)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Caminho da rota que atendeu a requisição (ex.: `/books/{book_id}`).
+
+    O roteador do Starlette guarda a rota em `scope["route"]`; versões que não
+    fazem isso recebem a rota procurando a primeira que casa com o caminho.
+    """
+    route = scope.get("route")
+    if route is None:
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", ()):
+            if candidate.matches(scope)[0] == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede cada requisição HTTP.
+
+    A latência vai do recebimento da requisição ao envio do último pedaço da
+    resposta (inclui respostas em streaming). Os rótulos usam o modelo da rota,
+    não a URL, para manter o número de séries limitado.
+
+    Args:
+        app: Aplicação ASGI
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = route_template(scope)
+            REQUESTS.labels(method, route, status).inc()
+            REQUEST_DURATION.labels(method, route).observe(elapsed)
@@ -0,0 +1,181 @@
+"""Modo multiprocesso: cada processo grava suas métricas em um diretório compartilhado."""
+
+import atexit
+import json
+import logging
+import os
+import pathlib
+import threading
+from typing import Dict, Optional
+
+from src.conf import Conf
+
+from .registry import REGISTRY, Family, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_GLOB = "metrics-*.json"
+
+
+def snapshot_path(directory: pathlib.Path, pid: Optional[int] = None) -> pathlib.Path:
+    """Arquivo com as métricas do processo `pid` (padrão: o processo atual)."""
+    return directory / f"metrics-{pid or os.getpid()}.json"
+
+
+def write_snapshot(registry: MetricsRegistry, directory: pathlib.Path) -> None:
+    """
+    Grava os valores atuais do processo em `directory`.
+
+    A gravação é atômica (arquivo temporário + rename): quem lê o diretório
+    nunca vê um arquivo pela metade.
+
+    Args:
+        registry: Métricas do processo
+        directory: Diretório compartilhado pelos processos
+    """
+    families = {name: _serializable(family) for name, family in registry.collect().items()}
+    path = snapshot_path(directory)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps({"pid": os.getpid(), "metrics": families}))
+    os.replace(tmp, path)
+
+
+def _serializable(family: Family) -> Family:
+    """Família com as amostras em lista (o JSON não aceita tuplas como chave)."""
+    return {**family, "samples": [[list(key), values] for key, values in family["samples"].items()]}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(directory: pathlib.Path) -> Dict[str, Family]:
+    """
+    Soma as métricas gravadas por todos os processos em `directory`.
+
+    Contadores e histogramas de processos encerrados continuam somados (os
+    totais não regridem quando um worker é reiniciado); gauges, que
+    descrevem o estado atual, só contam processos vivos.
+
+    Args:
+        directory: Diretório compartilhado pelos processos
+
+    Returns:
+        dict: Famílias de métricas no formato de `MetricsRegistry.collect`
+    """
+    merged: Dict[str, Family] = {}
+    for path in sorted(directory.glob(SNAPSHOT_GLOB)):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Métricas ilegíveis em {path}: {e}")
+            continue
+        alive = snapshot["pid"] == os.getpid() or _pid_alive(snapshot["pid"])
+        for name, family in snapshot["metrics"].items():
+            if family["type"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**family, "samples": {}})
+            for key, values in family["samples"]:
+                current = target["samples"].get(tuple(key))
+                target["samples"][tuple(key)] = (
+                    values if current is None else [a + b for a, b in zip(current, values)]
+                )
+    return merged
+
+
+class SnapshotWriter:
+    """
+    Grava periodicamente, em uma thread, as métricas do processo no diretório.
+
+    A última gravação acontece no encerramento do processo (`atexit`).
+
+    Args:
+        registry: Métricas do processo
+        directory: Diretório compartilhado pelos processos
+        interval: Intervalo (s) entre as gravações
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: pathlib.Path, interval: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.pid = os.getpid()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+
+    def start(self) -> "SnapshotWriter":
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def flush(self) -> None:
+        """Grava as métricas agora."""
+        try:
+            write_snapshot(self.registry, self.directory)
+        except OSError as e:
+            logger.error(f"Falha ao gravar as métricas em {self.directory}: {e}")
+
+    def stop(self) -> None:
+        """Interrompe a thread e faz a última gravação."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+
+_writer: Optional[SnapshotWriter] = None
+
+
+def start_multiprocess(
+    directory: Optional[str] = None,
+    interval: Optional[float] = None,
+    registry: MetricsRegistry = REGISTRY,
+) -> Optional[SnapshotWriter]:
+    """
+    Passa a gravar as métricas do processo no diretório compartilhado.
+
+    Chamado na inicialização da API e do worker de scraping; sem diretório
+    configurado as métricas ficam apenas na memória do processo.
+
+    Args:
+        directory: Diretório compartilhado (padrão: Conf.METRICS_MULTIPROC_DIR)
+        interval: Intervalo (s) entre as gravações (padrão: Conf.METRICS_WRITE_INTERVAL)
+        registry: Métricas do processo
+
+    Returns:
+        SnapshotWriter: Gravador do processo, ou None se o modo está desligado
+    """
+    global _writer
+    directory = directory or Conf.METRICS_MULTIPROC_DIR
+    if not directory:
+        return None
+    # Um processo criado por fork herda o gravador do pai, mas não a thread
+    if _writer is None or _writer.pid != os.getpid():
+        interval = Conf.METRICS_WRITE_INTERVAL if interval is None else interval
+        _writer = SnapshotWriter(registry, pathlib.Path(directory), interval).start()
+    return _writer
+
+
+def render_metrics(registry: MetricsRegistry = REGISTRY) -> str:
+    """
+    Exposição das métricas: as do processo ou, no modo multiprocesso, a soma
+    de todos os processos que gravam no diretório.
+
+    Returns:
+        str: Texto no formato do Prometheus
+    """
+    if _writer is None or _writer.pid != os.getpid():
+        return registry.render()
+    _writer.flush()
+    return registry.render(merge_snapshots(_writer.directory))
@@ -0,0 +1,340 @@
+"""Métricas no formato do Prometheus: contadores, gauges e histogramas com rótulos."""
+
+import bisect
+import math
+import os
+import threading
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+# Limites (s) dos histogramas de latência: de 1 ms a 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Família de métricas coletada: tipo, ajuda, rótulos, limites e amostras
+# ({valores dos rótulos: valores}); é também o formato gravado no modo multiprocesso
+Family = Dict[str, Any]
+
+
+class _Cells:
+    """
+    Valores de uma série, separados por thread.
+
+    Cada thread escreve apenas na sua célula, então os incrementos não
+    precisam de lock (nem competem entre si); a leitura soma as células.
+
+    Args:
+        size: Valores por célula (1 em contadores e gauges; os baldes e a soma
+            das observações em histogramas)
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+
+    def cell(self) -> List[float]:
+        """Célula da thread atual (criada no primeiro uso)."""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self.size
+            self._local.cell = cell
+            # list.append é atômico: a leitura vê a célula inteira ou nenhuma
+            self._cells.append(cell)
+            return cell
+
+    def values(self) -> List[float]:
+        """Soma das células de todas as threads."""
+        total = [0.0] * self.size
+        for cell in list(self._cells):
+            for i, value in enumerate(cell):
+                total[i] += value
+        return total
+
+
+class _Series:
+    """Uma série (combinação de valores dos rótulos) de uma métrica."""
+
+    def __init__(self, metric: "Metric"):
+        self._cells = _Cells(self.cell_size(metric))
+
+    @staticmethod
+    def cell_size(metric: "Metric") -> int:
+        """Valores guardados por célula (1 em contadores e gauges)."""
+        return 1
+
+    def values(self) -> List[float]:
+        return self._cells.values()
+
+    def reset(self) -> None:
+        self._cells = _Cells(self._cells.size)
+
+
+class CounterSeries(_Series):
+    def inc(self, amount: float = 1.0) -> None:
+        """Soma `amount` (não negativo) ao contador."""
+        self._cells.cell()[0] += amount
+
+
+class GaugeSeries(_Series):
+    def inc(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._cells.cell()[0] -= amount
+
+
+class HistogramSeries(_Series):
+    def __init__(self, metric: "Metric"):
+        self._buckets = metric.buckets
+        super().__init__(metric)
+
+    @staticmethod
+    def cell_size(metric: "Metric") -> int:
+        # Um balde por limite, o balde +Inf e a soma das observações
+        return len(metric.buckets) + 2
+
+    def observe(self, value: float) -> None:
+        """Registra uma observação no primeiro balde cujo limite é >= `value`."""
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self._buckets, value)] += 1
+        cell[-1] += value
+
+
+class Metric:
+    """
+    Métrica com rótulos; cada combinação de valores é uma série (`labels`).
+
+    Args:
+        name: Nome da métrica (contadores terminam em `_total`)
+        documentation: Texto do `# HELP`
+        labelnames: Nomes dos rótulos
+        buckets: Limites dos baldes (apenas histogramas)
+    """
+
+    type = ""
+    series_class: ClassVar[Type[_Series]] = _Series
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values: Any) -> Any:
+        """
+        Série com os valores de rótulos informados (criada no primeiro uso).
+
+        Args:
+            values: Valores dos rótulos, na ordem de `labelnames`
+
+        Returns:
+            A série, com `inc`/`dec`/`observe` conforme o tipo da métrica
+        """
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera os rótulos {self.labelnames}")
+            # setdefault é atômico: duas threads recebem a mesma série
+            series = self._series.setdefault(key, self.series_class(self))
+        return series
+
+    def reset(self) -> None:
+        """Zera todas as séries (as referências às séries continuam válidas)."""
+        for series in list(self._series.values()):
+            series.reset()
+
+    def collect(self) -> Family:
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "buckets": list(self.buckets) if self.type == "histogram" else [],
+            "samples": {
+                key: series.values() for key, series in list(self._series.items())
+            },
+        }
+
+
+class Counter(Metric):
+    """Contador monotônico."""
+
+    type = "counter"
+    series_class = CounterSeries
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    """Valor que sobe e desce (ex.: requisições em andamento)."""
+
+    type = "gauge"
+    series_class = GaugeSeries
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default.dec(amount)
+
+
+class Histogram(Metric):
+    """Distribuição de observações em baldes fixos, definidos na criação."""
+
+    type = "histogram"
+    series_class = HistogramSeries
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas de um processo.
+
+    As métricas são criadas uma vez (no import dos módulos que as usam) e
+    atualizadas sem lock; `collect` lê os valores e `render` gera o formato
+    de texto do Prometheus. Após um `fork` os valores herdados do processo
+    pai são zerados, para não serem contados duas vezes no modo multiprocesso.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.reset)
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or (
+                    existing.labelnames != metric.labelnames
+                ):
+                    raise ValueError(f"Métrica {metric.name} já registrada com outro tipo")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Cria (ou retorna, se já existir) um contador."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Cria (ou retorna, se já existir) um gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Cria (ou retorna, se já existir) um histograma com os limites `buckets`."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self) -> None:
+        """Zera todas as métricas."""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def collect(self) -> Dict[str, Family]:
+        """Valores atuais de todas as métricas, por nome."""
+        return {name: metric.collect() for name, metric in list(self._metrics.items())}
+
+    def render(self, families: Optional[Dict[str, Family]] = None) -> str:
+        """
+        Gera o formato de texto do Prometheus (versão 0.0.4).
+
+        Args:
+            families: Métricas a exibir (padrão: `collect()`; no modo
+                multiprocesso, a soma dos processos)
+
+        Returns:
+            str: Texto da exposição
+        """
+        families = self.collect() if families is None else families
+        lines: List[str] = []
+        for name in sorted(families):
+            family = families[name]
+            lines.append(f"# HELP {name} {_escape_help(family['help'])}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for sample, labels, value in _samples(name, family):
+                lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def get_sample_value(
+        self, sample: str, labels: Optional[Dict[str, str]] = None
+    ) -> Optional[float]:
+        """
+        Valor de uma amostra da exposição (ex.: `x_bucket` com `le`, `x_sum`, `x_count`).
+
+        Args:
+            sample: Nome da amostra
+            labels: Rótulos da amostra (padrão: nenhum)
+
+        Returns:
+            float: Valor da amostra, ou None se ela não existir
+        """
+        wanted = labels or {}
+        for name, family in self.collect().items():
+            if not sample.startswith(name):
+                continue
+            for sample_name, sample_labels, value in _samples(name, family):
+                if sample_name == sample and sample_labels == wanted:
+                    return value
+        return None
+
+
+def _samples(name: str, family: Family) -> Iterator[Tuple[str, Dict[str, str], float]]:
+    """Amostras da exposição de uma família: (nome, rótulos, valor)."""
+    for key in sorted(family["samples"]):
+        values = family["samples"][key]
+        labels = dict(zip(family["labels"], key))
+        if family["type"] != "histogram":
+            yield name, labels, values[0]
+            continue
+        cumulative = 0.0
+        for bound, count in zip([*family["buckets"], math.inf], values):
+            cumulative += count
+            yield f"{name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield f"{name}_sum", labels, values[-1]
+        yield f"{name}_count", labels, cumulative
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Métricas do processo (API ou worker de scraping)
+REGISTRY = MetricsRegistry()
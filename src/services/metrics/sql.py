@@ -0,0 +1,113 @@
+"""Tempo das consultas SQL por engine e por forma da consulta (fingerprint)."""
+
+import functools
+import hashlib
+import re
+import time
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.conf import Conf
+
+from .registry import REGISTRY
+
+QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds",
+    "Tempo de execução das consultas SQL, por engine e fingerprint da consulta",
+    ["engine", "statement"],
+)
+
+# Rótulo das consultas além do limite de fingerprints distintos
+OTHER_STATEMENT = "other"
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE = re.compile(r"\s+")
+_MAX_LENGTH = 200
+
+
+@functools.lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Forma normalizada de uma consulta, usada como rótulo.
+
+    Literais viram `?`, listas de parâmetros (`IN (?, ?, ?)`, `VALUES` de
+    várias linhas) viram `(...)` e os espaços são colapsados, então consultas
+    que só diferem nos valores ou no tamanho do lote têm o mesmo fingerprint.
+    Consultas longas são truncadas, com um hash do texto completo no fim.
+
+    Args:
+        statement: SQL enviado ao driver
+
+    Returns:
+        str: Fingerprint da consulta
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _NUMBER.sub("?", _STRING.sub("?", normalized))
+    normalized = _REPEATED_LISTS.sub("(...), ...", _PARAMETER_LIST.sub("(...)", normalized))
+    if len(normalized) > _MAX_LENGTH:
+        digest = hashlib.sha1(normalized.encode()).hexdigest()[:8]
+        normalized = f"{normalized[:_MAX_LENGTH]}… [{digest}]"
+    return normalized
+
+
+class QueryTimer:
+    """
+    Mede as consultas de um engine pelos eventos `before/after_cursor_execute`.
+
+    O número de fingerprints distintos é limitado (`max_statements`); as
+    consultas além do limite entram no rótulo "other".
+
+    Args:
+        name: Nome do engine nas métricas ("sync" ou "async")
+        max_statements: Fingerprints distintos por engine
+            (padrão: Conf.METRICS_MAX_SQL_STATEMENTS)
+    """
+
+    def __init__(self, name: str, max_statements: Optional[int] = None):
+        self.name = name
+        self.max_statements = (
+            Conf.METRICS_MAX_SQL_STATEMENTS if max_statements is None else max_statements
+        )
+        self._statements: set = set()
+
+    def label(self, statement: str) -> str:
+        """Rótulo da consulta (o fingerprint, ou "other" após o limite)."""
+        key = fingerprint(statement)
+        if key not in self._statements:
+            if len(self._statements) >= self.max_statements:
+                return OTHER_STATEMENT
+            self._statements.add(key)
+        return key
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is not None:
+            QUERY_DURATION.labels(self.name, self.label(statement)).observe(
+                time.perf_counter() - start
+            )
+
+
+def instrument_queries(engine: Engine, name: str) -> QueryTimer:
+    """
+    Passa a medir as consultas de `engine` em `db_query_duration_seconds`.
+
+    Args:
+        engine: Engine síncrono (no assíncrono, `async_engine.sync_engine`)
+        name: Nome do engine nas métricas
+
+    Returns:
+        QueryTimer: Medidor registrado nos eventos do engine
+    """
+    timer = QueryTimer(name)
+    event.listen(engine, "before_cursor_execute", timer.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", timer.after_cursor_execute)
+    return timer
@@ -0,0 +1,37 @@
+from .features import (
+    FORMATS,
+    MEDIA_TYPES,
+    STREAM_FORMATS,
+    TARGETS,
+    build_features,
+    category_vocabulary,
+    feature_names,
+    iter_columns,
+    read_columns,
+    read_vocabulary,
+    render_table,
+    split_mask,
+    stream_table,
+)
+from .model import LinearModel
+from .serving import MicroBatcher, PredictionService, get_prediction_service
+
+__all__ = [
+    "FORMATS",
+    "LinearModel",
+    "MEDIA_TYPES",
+    "MicroBatcher",
+    "PredictionService",
+    "STREAM_FORMATS",
+    "TARGETS",
+    "build_features",
+    "category_vocabulary",
+    "feature_names",
+    "get_prediction_service",
+    "iter_columns",
+    "read_columns",
+    "read_vocabulary",
+    "render_table",
+    "split_mask",
+    "stream_table",
+]
@@ -0,0 +1,381 @@
+"""Features de ML calculadas de forma vetorizada sobre colunas do catálogo."""
+
+import csv
+import io
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.conf import Conf
+from src.models.book import Book
+from src.services.response_cache import render_json
+
+logger = logging.getLogger(__name__)
+
+# Colunas lidas da tabela books (na ordem do SELECT) e o dtype de cada uma
+COLUMN_DTYPES = {
+    "id": np.int64,
+    "title": np.str_,
+    "price": np.float64,
+    "rating": np.int64,
+    "availability": np.bool_,
+    "category": np.str_,
+}
+BOOK_COLUMNS = tuple(COLUMN_DTYPES)
+
+# Features numéricas sempre presentes, antes da codificação da categoria
+BASE_FEATURES = ("price", "rating", "availability", "title_length", "title_tokens")
+CATEGORY_ENCODINGS = ("integer", "onehot")
+TARGETS = ("price", "rating")
+FORMATS = ("json", "arrow", "parquet")
+# Formatos gerados bloco a bloco por `stream_table` (o JSON colunar precisa da tabela inteira)
+STREAM_FORMATS = ("csv", "arrow", "parquet")
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+Columns = Dict[str, np.ndarray]
+
+
+def iter_columns(db: Session, chunk_size: Optional[int] = None) -> Iterator[Columns]:
+    """
+    Lê a tabela books em blocos, cada um convertido em arrays NumPy.
+
+    As linhas vêm como tuplas (sem instanciar objetos do ORM) em blocos de
+    `chunk_size`; só um bloco fica em memória por vez.
+
+    Args:
+        db: Sessão do banco de dados
+        chunk_size: Linhas por bloco (padrão: Conf.ML_CHUNK_SIZE)
+
+    Yields:
+        Dicionário coluna -> array de cada bloco, com os livros ordenados por
+        id (um bloco vazio se a tabela não tiver livros)
+    """
+    chunk_size = chunk_size or Conf.ML_CHUNK_SIZE
+    stmt = select(*(getattr(Book, column) for column in BOOK_COLUMNS)).order_by(Book.id)
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+
+    empty = True
+    for rows in result.partitions():
+        empty = False
+        yield {
+            column: np.array(values, dtype=COLUMN_DTYPES[column])
+            for column, values in zip(BOOK_COLUMNS, zip(*rows))
+        }
+    if empty:
+        yield {column: np.array([], dtype=dtype) for column, dtype in COLUMN_DTYPES.items()}
+
+
+def read_columns(db: Session, chunk_size: Optional[int] = None) -> Columns:
+    """
+    Lê a tabela books inteira, cada coluna como um array NumPy.
+
+    Os blocos de `iter_columns` são concatenados no final.
+
+    Args:
+        db: Sessão do banco de dados
+        chunk_size: Linhas por bloco (padrão: Conf.ML_CHUNK_SIZE)
+
+    Returns:
+        Dicionário coluna -> array, com os livros ordenados por id
+    """
+    chunks: Dict[str, List[np.ndarray]] = {column: [] for column in BOOK_COLUMNS}
+    for columns in iter_columns(db, chunk_size):
+        for column, values in columns.items():
+            chunks[column].append(values)
+    return {column: np.concatenate(parts) for column, parts in chunks.items()}
+
+
+def read_vocabulary(db: Session) -> List[str]:
+    """
+    Vocabulário das categorias lido do banco, sem carregar a tabela.
+
+    É o mesmo de `category_vocabulary` sobre a coluna inteira, então as
+    features geradas bloco a bloco usam os mesmos códigos.
+
+    Args:
+        db: Sessão do banco de dados
+
+    Returns:
+        Categorias distintas em ordem alfabética
+    """
+    categories: Sequence[str] = db.scalars(select(Book.category).distinct()).all()
+    return category_vocabulary(np.array(categories, dtype=np.str_))
+
+
+def category_vocabulary(categories: np.ndarray) -> List[str]:
+    """Categorias distintas em ordem alfabética (índice = código da categoria)."""
+    return [str(category) for category in np.unique(categories)]
+
+
+def build_features(
+    columns: Columns,
+    vocabulary: Optional[Sequence[str]] = None,
+    encoding: str = "integer",
+) -> Columns:
+    """
+    Calcula as features a partir das colunas dos livros.
+
+    É a mesma transformação usada offline (/ml/features e /ml/training-data)
+    e online (predições), para que as features coincidam.
+
+    Args:
+        columns: Colunas title, price, rating, availability e category
+        vocabulary: Categorias conhecidas (padrão: as presentes em `columns`);
+            categorias fora do vocabulário recebem o código -1 e nenhuma
+            coluna ativa no one-hot
+        encoding: "integer" (category_code) ou "onehot" (category=<nome>)
+
+    Returns:
+        Dicionário feature -> array, na ordem de `feature_names`
+
+    Raises:
+        ValueError: Se a codificação não for reconhecida
+    """
+    if encoding not in CATEGORY_ENCODINGS:
+        raise ValueError(f"Codificação de categoria desconhecida: {encoding}")
+    if vocabulary is None:
+        vocabulary = category_vocabulary(columns["category"])
+
+    titles = np.char.strip(np.asarray(columns["title"], dtype=np.str_))
+    lengths = np.char.str_len(titles).astype(np.int64)
+    tokens = np.where(lengths > 0, np.char.count(titles, " ") + 1, 0).astype(np.int64)
+    features: Columns = {
+        "price": np.asarray(columns["price"], dtype=np.float64),
+        "rating": np.asarray(columns["rating"], dtype=np.int64),
+        "availability": np.asarray(columns["availability"], dtype=np.bool_).astype(np.int64),
+        "title_length": lengths,
+        "title_tokens": tokens,
+    }
+
+    known = np.asarray(vocabulary, dtype=np.str_)
+    categories = np.asarray(columns["category"], dtype=np.str_)
+    # searchsorted exige o vocabulário ordenado; a posição só vale se o valor bater
+    order = np.argsort(known)
+    position = np.searchsorted(known[order], categories)
+    position = np.clip(position, 0, max(len(known) - 1, 0))
+    codes = order[position] if len(known) else np.zeros(len(categories), dtype=np.int64)
+    found = known[codes] == categories if len(known) else np.zeros(len(categories), bool)
+    codes = np.where(found, codes, -1).astype(np.int64)
+
+    if encoding == "integer":
+        features["category_code"] = codes
+    else:
+        for code, category in enumerate(vocabulary):
+            features[f"category={category}"] = (codes == code).astype(np.int64)
+    return features
+
+
+def feature_names(vocabulary: Sequence[str], encoding: str = "integer") -> List[str]:
+    """Nomes das features na ordem produzida por `build_features`."""
+    if encoding == "integer":
+        return [*BASE_FEATURES, "category_code"]
+    return [*BASE_FEATURES, *(f"category={category}" for category in vocabulary)]
+
+
+def split_mask(ids: np.ndarray, test_size: float, seed: int) -> np.ndarray:
+    """
+    Separa treino e teste de forma determinística pelo id do livro.
+
+    Cada id é embaralhado com a semente (mistura splitmix64) e vai para o teste
+    se o hash cair abaixo de `test_size`. O resultado não depende da ordem nem
+    da quantidade de livros, então a mesma chamada devolve sempre o mesmo
+    conjunto e um livro nunca troca de lado quando o catálogo cresce.
+
+    Args:
+        ids: Ids dos livros
+        test_size: Fração aproximada dos livros no conjunto de teste (0 a 1)
+        seed: Semente da separação
+
+    Returns:
+        Array booleano, True para os livros do conjunto de teste
+    """
+    with np.errstate(over="ignore"):
+        x = np.asarray(ids, dtype=np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53) < test_size
+
+
+def _require_pyarrow() -> Any:
+    """Importa o pyarrow, necessário para os formatos Arrow e Parquet."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError(
+            "Os formatos arrow e parquet requerem o pacote 'pyarrow' "
+            "(instale com o extra: tech_challenge_1[arrow])"
+        ) from e
+    return pyarrow
+
+
+def _record_batches(pa: Any, table: Columns, chunk_size: int) -> Iterable[Any]:
+    """Divide as colunas em record batches de até `chunk_size` linhas."""
+    rows = len(next(iter(table.values()))) if table else 0
+    for start in range(0, max(rows, 1), chunk_size):
+        yield pa.record_batch(
+            [pa.array(values[start : start + chunk_size]) for values in table.values()],
+            names=list(table),
+        )
+
+
+def render_table(
+    table: Columns,
+    output: str = "json",
+    metadata: Optional[Dict[str, Any]] = None,
+    chunk_size: Optional[int] = None,
+) -> bytes:
+    """
+    Serializa um conjunto de colunas como JSON, Arrow IPC (stream) ou Parquet.
+
+    No JSON as colunas vão em `data` (formato colunar, uma lista por coluna)
+    junto com `metadata`. No Arrow e no Parquet `metadata` vai nos metadados
+    do schema e as colunas são gravadas em blocos de `chunk_size` linhas.
+
+    Args:
+        table: Dicionário coluna -> array
+        output: "json", "arrow" ou "parquet"
+        metadata: Informações adicionais (vocabulário das categorias, split etc.)
+        chunk_size: Linhas por record batch / row group (padrão: Conf.ML_CHUNK_SIZE)
+
+    Returns:
+        Conteúdo serializado
+
+    Raises:
+        ValueError: Se o formato não for reconhecido
+        RuntimeError: Se o formato requer o pyarrow e ele não está instalado
+    """
+    if output not in FORMATS:
+        raise ValueError(f"Formato desconhecido: {output}")
+    metadata = metadata or {}
+    if output == "json":
+        rows = len(next(iter(table.values()))) if table else 0
+        data = {column: values.tolist() for column, values in table.items()}
+        return render_json({**metadata, "rows": rows, "columns": list(table), "data": data})
+
+    pa = _require_pyarrow()
+    chunk_size = chunk_size or Conf.ML_CHUNK_SIZE
+    schema_metadata = {key: render_json(value) for key, value in metadata.items()}
+    batches = list(_record_batches(pa, table, chunk_size))
+    schema = batches[0].schema.with_metadata(schema_metadata)
+    sink = io.BytesIO()
+    if output == "arrow":
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch.replace_schema_metadata(schema_metadata))
+    else:
+        import pyarrow.parquet as pq
+
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch.replace_schema_metadata(schema_metadata))
+    return sink.getvalue()
+
+
+class _ChunkSink:
+    """
+    Destino de escrita do pyarrow que entrega os bytes gravados a cada `drain`.
+
+    Mantém a posição total (`tell`), usada pelo Parquet para os offsets do
+    rodapé, sem guardar o que já foi entregue.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_table(
+    batches: Iterable[Columns],
+    output: str = "csv",
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Iterator[bytes]:
+    """
+    Serializa blocos de colunas como CSV, Arrow IPC (stream) ou Parquet, um bloco por vez.
+
+    Cada bloco vira linhas do CSV, um record batch ou um row group do
+    Parquet e é entregue antes do próximo ser lido, então a memória usada
+    depende do tamanho do bloco e não da tabela. No Arrow e no Parquet
+    `metadata` vai nos metadados do schema, como em `render_table`; o CSV
+    traz só o cabeçalho com os nomes das colunas.
+
+    Args:
+        batches: Blocos com as mesmas colunas (ao menos um, ainda que vazio)
+        output: "csv", "arrow" ou "parquet"
+        metadata: Informações adicionais (vocabulário das categorias, split etc.)
+
+    Returns:
+        Iterador com os blocos de bytes da resposta
+
+    Raises:
+        ValueError: Se o formato não for reconhecido
+        RuntimeError: Se o formato requer o pyarrow e ele não está instalado
+    """
+    if output not in STREAM_FORMATS:
+        raise ValueError(f"Formato desconhecido: {output}")
+    # Validado aqui, antes do início da resposta, e não no primeiro bloco
+    pa: Any = _require_pyarrow() if output != "csv" else None
+    schema_metadata = {key: render_json(value) for key, value in (metadata or {}).items()}
+
+    def csv_blocks() -> Iterator[bytes]:
+        for index, table in enumerate(batches):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            if index == 0:
+                writer.writerow(table)
+            writer.writerows(zip(*(values.tolist() for values in table.values())))
+            yield buffer.getvalue().encode("utf-8")
+
+    def arrow_blocks() -> Iterator[bytes]:
+        sink = _ChunkSink()
+        writer = None
+        for table in batches:
+            batch = pa.record_batch(
+                [pa.array(values) for values in table.values()], names=list(table)
+            ).replace_schema_metadata(schema_metadata)
+            if writer is None:
+                if output == "arrow":
+                    writer = pa.ipc.new_stream(sink, batch.schema)
+                else:
+                    import pyarrow.parquet as pq
+
+                    writer = pq.ParquetWriter(sink, batch.schema)
+            writer.write_batch(batch)
+            yield sink.drain()
+        if writer is not None:
+            writer.close()
+        yield sink.drain()
+
+    blocks = csv_blocks() if output == "csv" else arrow_blocks()
+    # Um writer que ainda não gravou nada no sink não gera um bloco vazio
+    return (data for data in blocks if data)
@@ -0,0 +1,176 @@
+"""Modelo linear serializado servido pela rota /ml/predictions."""
+
+import argparse
+import json
+import logging
+import pathlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .features import TARGETS, Columns, build_features, category_vocabulary, feature_names
+
+logger = logging.getLogger(__name__)
+
+
+class LinearModel:
+    """
+    Regressão linear (ridge) sobre as features de `build_features`.
+
+    O modelo guarda, além dos pesos, o vocabulário das categorias e a
+    codificação usados no treino, para que as predições online montem
+    exatamente as mesmas features da exportação offline. É serializado em um
+    arquivo `.npz` (sem pickle).
+
+    Args:
+        weights: Peso de cada feature, na ordem de `features`
+        intercept: Termo independente
+        features: Nomes das features usadas pelo modelo
+        vocabulary: Categorias conhecidas no treino
+        encoding: Codificação da categoria ("integer" ou "onehot")
+        target: Coluna prevista ("price" ou "rating")
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        intercept: float,
+        features: Sequence[str],
+        vocabulary: Sequence[str],
+        encoding: str,
+        target: str,
+    ):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.features = list(features)
+        self.vocabulary = list(vocabulary)
+        self.encoding = encoding
+        self.target = target
+
+    @property
+    def inputs(self) -> List[str]:
+        """Colunas dos livros necessárias para montar as features (todas menos o alvo)."""
+        columns = ("title", "price", "rating", "availability", "category")
+        return [column for column in columns if column != self.target]
+
+    @classmethod
+    def fit(
+        cls,
+        columns: Columns,
+        target: str = "price",
+        encoding: str = "onehot",
+        alpha: float = 1.0,
+        vocabulary: Optional[Sequence[str]] = None,
+    ) -> "LinearModel":
+        """
+        Ajusta o modelo às colunas dos livros (mínimos quadrados com ridge).
+
+        Args:
+            columns: Colunas dos livros (ver `read_columns`)
+            target: Coluna prevista ("price" ou "rating")
+            encoding: Codificação da categoria
+            alpha: Regularização ridge
+            vocabulary: Categorias conhecidas (padrão: as presentes em `columns`)
+
+        Returns:
+            LinearModel: Modelo ajustado
+
+        Raises:
+            ValueError: Se o alvo não for reconhecido
+        """
+        if target not in TARGETS:
+            raise ValueError(f"Alvo desconhecido: {target}")
+        if vocabulary is None:
+            vocabulary = category_vocabulary(columns["category"])
+        features = build_features(columns, vocabulary, encoding)
+        labels = features.pop(target).astype(np.float64)
+        names = [name for name in feature_names(vocabulary, encoding) if name != target]
+        matrix = np.column_stack([features[name] for name in names]).astype(np.float64)
+
+        # Centraliza para que o intercepto não seja regularizado
+        mean_x, mean_y = matrix.mean(axis=0), labels.mean()
+        centered = matrix - mean_x
+        gram = centered.T @ centered + alpha * np.eye(len(names))
+        weights = np.linalg.solve(gram, centered.T @ (labels - mean_y))
+        intercept = mean_y - mean_x @ weights
+        return cls(weights, intercept, names, vocabulary, encoding, target)
+
+    def matrix(self, columns: Columns) -> np.ndarray:
+        """Monta a matriz de features (linhas x `features`) a partir das colunas."""
+        features = build_features(columns, self.vocabulary, self.encoding)
+        return np.column_stack([features[name] for name in self.features]).astype(np.float64)
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Predição vetorizada para uma matriz de features."""
+        return matrix @ self.weights + self.intercept
+
+    def save(self, path: pathlib.Path) -> None:
+        """Grava o modelo em um arquivo `.npz`."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "features": self.features,
+            "vocabulary": self.vocabulary,
+            "encoding": self.encoding,
+            "target": self.target,
+        }
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                weights=self.weights,
+                intercept=np.array(self.intercept),
+                meta=np.array(json.dumps(meta)),
+            )
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "LinearModel":
+        """
+        Carrega um modelo gravado com `save`.
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta: Dict[str, Any] = json.loads(str(data["meta"]))
+            return cls(data["weights"], float(data["intercept"]), **meta)
+
+
+def main() -> None:
+    """Treina o modelo com o conjunto de treino do catálogo e grava o arquivo."""
+    from src.conf import Conf
+    from src.extensions import SessionLocal
+
+    from .features import read_columns, split_mask
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--target", choices=TARGETS, default="price")
+    parser.add_argument("--encoding", choices=("integer", "onehot"), default="onehot")
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=Conf.ML_MODEL_PATH)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        columns = read_columns(db)
+    finally:
+        db.close()
+    if not len(columns["id"]):
+        raise SystemExit("Catálogo vazio: execute o scraping antes de treinar o modelo")
+
+    vocabulary = category_vocabulary(columns["category"])
+    is_test = split_mask(columns["id"], args.test_size, args.seed)
+    train = {column: values[~is_test] for column, values in columns.items()}
+    test = {column: values[is_test] for column, values in columns.items()}
+    model = LinearModel.fit(train, args.target, args.encoding, args.alpha, vocabulary)
+
+    if len(test["id"]):
+        errors = model.predict(model.matrix(test)) - test[args.target]
+        logger.info(f"MAE no conjunto de teste: {np.abs(errors).mean():.3f}")
+    model.save(pathlib.Path(args.output))
+    logger.info(f"Modelo ({args.target}) gravado em {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
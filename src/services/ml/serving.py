@@ -0,0 +1,195 @@
+"""Serviço de predições: modelo carregado uma vez e micro-batching das requisições."""
+
+import asyncio
+import logging
+import pathlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.conf import Conf
+
+from .model import LinearModel
+
+logger = logging.getLogger(__name__)
+
+# Linha usada na chamada de aquecimento do modelo
+WARMUP_ROW = {"title": "warm up", "price": 0.0, "rating": 0, "availability": True, "category": ""}
+
+
+def rows_to_columns(rows: Sequence[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Converte as linhas recebidas pela API nas colunas aceitas por `build_features`."""
+    return {
+        "title": np.array([row["title"] for row in rows], dtype=np.str_),
+        "price": np.array([row.get("price") or 0.0 for row in rows], dtype=np.float64),
+        "rating": np.array([row.get("rating") or 0 for row in rows], dtype=np.int64),
+        "availability": np.array([row["availability"] for row in rows], dtype=np.bool_),
+        "category": np.array([row["category"] for row in rows], dtype=np.str_),
+    }
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em uma única chamada vetorizada ao modelo.
+
+    A primeira requisição de um lote abre uma janela de `window` segundos; as
+    que chegarem nesse intervalo entram no mesmo lote, que é executado ao fim
+    da janela ou assim que atingir `max_batch` linhas. Cada requisição recebe
+    apenas as suas predições.
+
+    Args:
+        predict: Função que recebe as linhas do lote e devolve as predições
+        window: Janela de agrupamento em segundos (0 desativa o agrupamento)
+        max_batch: Máximo de linhas por chamada ao modelo
+    """
+
+    def __init__(self, predict, window: float, max_batch: int):
+        self.predict = predict
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.rows = 0
+        self._pending: List[Tuple[Sequence[Dict[str, Any]], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Enfileira as linhas de uma requisição e aguarda as suas predições.
+
+        Args:
+            rows: Linhas de features da requisição
+
+        Returns:
+            Predições das linhas, na mesma ordem
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += len(rows)
+        if self.window <= 0 or self._pending_rows >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Executa o lote pendente e distribui as predições."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        if not pending:
+            return
+
+        rows = [row for request_rows, _ in pending for row in request_rows]
+        try:
+            predictions = self.predict(rows)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(rows)
+        offset = 0
+        for request_rows, future in pending:
+            if not future.done():
+                future.set_result(predictions[offset : offset + len(request_rows)])
+            offset += len(request_rows)
+
+
+class PredictionService:
+    """
+    Serve as predições do modelo gravado em `path`.
+
+    O modelo é carregado uma única vez (no início da aplicação ou na primeira
+    predição) e aquecido com uma chamada de teste. As requisições individuais
+    passam por um `MicroBatcher` por event loop.
+
+    Args:
+        path: Arquivo do modelo (`.npz` gravado por `LinearModel.save`)
+        window: Janela de agrupamento das requisições em segundos
+        max_batch: Máximo de linhas por chamada ao modelo
+    """
+
+    def __init__(self, path: pathlib.Path, window: float, max_batch: int):
+        self.path = path
+        self.window = window
+        self.max_batch = max_batch
+        self._model: Optional[LinearModel] = None
+        self._lock = threading.Lock()
+        self._batchers: Dict[asyncio.AbstractEventLoop, MicroBatcher] = {}
+
+    @property
+    def model(self) -> LinearModel:
+        """
+        Modelo carregado (e aquecido) no primeiro acesso.
+
+        Raises:
+            FileNotFoundError: Se o arquivo do modelo não existir
+        """
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    model = LinearModel.load(self.path)
+                    model.predict(model.matrix(rows_to_columns([WARMUP_ROW])))
+                    self._model = model
+                    logger.info(
+                        f"Modelo de {model.target} carregado de {self.path} em "
+                        f"{(time.perf_counter() - start) * 1000:.1f} ms"
+                    )
+        return self._model
+
+    def predict(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Predição vetorizada (síncrona) para um lote de linhas."""
+        model = self.model
+        return model.predict(model.matrix(rows_to_columns(rows)))
+
+    async def predict_async(self, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """Predição agrupada com as demais requisições concorrentes."""
+        self.model  # carrega fora do lote, propagando FileNotFoundError para a rota
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(loop)
+        if batcher is None:
+            # Um loop novo (outro worker de teste, reinício) descarta o anterior
+            batcher = MicroBatcher(self.predict, self.window, self.max_batch)
+            self._batchers = {loop: batcher}
+        return await batcher.submit(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado do modelo e contadores do micro-batching."""
+        batchers = list(self._batchers.values())
+        batches = sum(batcher.batches for batcher in batchers)
+        rows = sum(batcher.rows for batcher in batchers)
+        return {
+            "loaded": self._model is not None,
+            "target": self._model.target if self._model is not None else None,
+            "batches": batches,
+            "rows": rows,
+            "mean_batch_size": round(rows / batches, 2) if batches else None,
+        }
+
+
+_prediction_service: Optional[PredictionService] = None
+
+
+def get_prediction_service() -> PredictionService:
+    """
+    Dependency que retorna o serviço de predições do processo.
+
+    Returns:
+        PredictionService: Instância única, criada no primeiro uso
+    """
+    global _prediction_service
+    if _prediction_service is None:
+        _prediction_service = PredictionService(
+            pathlib.Path(Conf.ML_MODEL_PATH),
+            window=Conf.ML_BATCH_WINDOW_MS / 1000,
+            max_batch=Conf.ML_MAX_BATCH_SIZE,
+        )
+    return _prediction_service
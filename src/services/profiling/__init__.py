@@ -0,0 +1,29 @@
+from .middleware import ProfilingMiddleware, token_matches
+from .profiler import (
+    PROFILING_BACKENDS,
+    ProfilePhase,
+    ProfileSession,
+    active_session,
+    create_profiler,
+    instrument_profiling,
+    profile_phase,
+    profile_session,
+    resolve_backend,
+)
+from .store import ProfileStore, get_profile_store
+
+__all__ = [
+    "PROFILING_BACKENDS",
+    "ProfilePhase",
+    "ProfileSession",
+    "ProfileStore",
+    "ProfilingMiddleware",
+    "active_session",
+    "create_profiler",
+    "get_profile_store",
+    "instrument_profiling",
+    "profile_phase",
+    "profile_session",
+    "resolve_backend",
+    "token_matches",
+]
@@ -0,0 +1,119 @@
+"""Middleware que grava o perfil das requisições pedidas por cabeçalho ou sorteadas."""
+
+import asyncio
+import hmac
+import random
+from typing import Callable, Optional, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf import Conf
+
+from .profiler import ProfileSession, active_session, create_profiler
+from .store import ProfileStore, get_profile_store
+
+# Cabeçalho que pede o perfil de uma requisição (valor: Conf.PROFILING_TOKEN)
+PROFILE_HEADER = b"x-profile"
+# Cabeçalho da resposta com o identificador do perfil gravado
+PROFILE_ID_HEADER = b"x-profile-id"
+
+
+def token_matches(value: Optional[str], token: Optional[str] = None) -> bool:
+    """
+    Confere o valor do cabeçalho `X-Profile` com o token configurado.
+
+    Sem token configurado nenhum valor é aceito.
+
+    Args:
+        value: Valor recebido
+        token: Token esperado (padrão: Conf.PROFILING_TOKEN)
+
+    Returns:
+        bool: Se o valor autoriza o perfil (ou o acesso aos perfis)
+    """
+    token = Conf.PROFILING_TOKEN if token is None else token
+    if not value or not token:
+        return False
+    return hmac.compare_digest(value.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que grava o perfil de algumas requisições.
+
+    Uma requisição é medida quando traz `X-Profile` com o token de perfis ou
+    quando é sorteada (`sample_rate`, apenas nos caminhos de `paths`). O
+    perfil (relatório do profiler de CPU e consultas SQL com durações) vai
+    para o ring buffer em disco, e a resposta traz `X-Profile-Id` com o
+    identificador para consultá-lo em /admin/profiles. Um perfil por vez é
+    medido em cada processo; as demais requisições seguem normalmente.
+
+    Args:
+        app: Aplicação ASGI
+        sample_rate: Fração das requisições medidas sem o cabeçalho
+            (padrão: Conf.PROFILING_SAMPLE_RATE)
+        paths: Prefixos dos caminhos sorteados (padrão: Conf.PROFILING_PATHS;
+            vazio = todos)
+        store: Destino dos perfis (padrão: `get_profile_store()`)
+        rng: Sorteio (substituível nos testes)
+
+    Raises:
+        RuntimeError: Se PROFILING_TOKEN não estiver configurado (sem ele os
+            perfis, com as consultas SQL, ficariam abertos em /admin/profiles)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: Optional[float] = None,
+        paths: Optional[Sequence[str]] = None,
+        store: Optional[ProfileStore] = None,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.app = app
+        self.sample_rate = Conf.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.paths = tuple(Conf.PROFILING_PATHS if paths is None else paths)
+        self.store = store
+        self.rng = rng
+        # Falha na inicialização (e não na primeira requisição) sem token ou sem o profiler
+        if not Conf.PROFILING_TOKEN:
+            raise RuntimeError("PROFILING_ENABLED requer PROFILING_TOKEN")
+        create_profiler()
+
+    def should_profile(self, scope: Scope) -> bool:
+        """Se a requisição pediu o perfil (cabeçalho) ou foi sorteada."""
+        path = scope["path"]
+        if path.startswith("/admin/profiles"):
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return token_matches(value.decode("latin-1"))
+        if self.sample_rate <= 0:
+            return False
+        if self.paths and not path.startswith(self.paths):
+            return False
+        return self.rng() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        store = self.store or get_profile_store()
+        query = scope.get("query_string", b"").decode("latin-1")
+        meta = {"method": scope["method"], "path": scope["path"], "query": query}
+        session = ProfileSession("request", f"{scope['method']} {scope['path']}", meta)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                session.meta["status"] = message["status"]
+                headers = [*message.get("headers", []), (PROFILE_ID_HEADER, session.id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with active_session(session), session.phase("request"):
+                await self.app(scope, receive, send_with_id)
+        finally:
+            # Gravado fora do event loop, depois de a resposta ser enviada
+            await asyncio.to_thread(store.save, session.as_dict())
@@ -0,0 +1,381 @@
+"""Perfis sob demanda: profiler de CPU e consultas SQL de uma requisição ou de um job."""
+
+import contextlib
+import contextvars
+import cProfile
+import io
+import logging
+import pstats
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.conf import Conf
+
+logger = logging.getLogger(__name__)
+
+PROFILING_BACKENDS = ("auto", "cprofile", "pyinstrument")
+
+# Funções listadas no relatório do cProfile (ordenadas pelo tempo acumulado)
+CPROFILE_TOP = 40
+# Consultas guardadas por fase (as demais só entram na contagem e no tempo total)
+MAX_SQL_STATEMENTS = 500
+
+# Aviso de "auto" sem o pyinstrument, registrado uma vez por processo
+_warned_fallback = False
+
+# Só um profiler de CPU por processo: o cProfile não admite dois ativos ao
+# mesmo tempo, e perfis simultâneos misturariam as requisições
+_profiler_lock = threading.Lock()
+
+_current_phase: contextvars.ContextVar[Optional["ProfilePhase"]] = contextvars.ContextVar(
+    "profile_phase", default=None
+)
+_current_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+
+class CProfileBackend:
+    """
+    Profiler determinístico da biblioteca padrão (todas as chamadas de funções Python).
+
+    Mede a thread inteira: na API, as corrotinas de outras requisições que
+    rodam no event loop durante a requisição medida entram no relatório.
+    """
+
+    name = "cprofile"
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self._profile.enable()
+
+    def stop(self) -> str:
+        self._profile.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(CPROFILE_TOP)
+        return stream.getvalue()
+
+
+class PyinstrumentBackend:
+    """Profiler estatístico (amostragem da pilha), com suporte a código assíncrono."""
+
+    name = "pyinstrument"
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise RuntimeError(
+                "O profiler pyinstrument requer o pacote 'pyinstrument' "
+                "(instale com o extra: tech_challenge_1[profiling])"
+            ) from e
+        self._profiler = Profiler(async_mode="enabled")
+
+    def start(self) -> None:
+        self._profiler.start()
+
+    def stop(self) -> str:
+        self._profiler.stop()
+        return self._profiler.output_text(unicode=False, color=False)
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """
+    Resolve o profiler de CPU configurado.
+
+    "auto" escolhe o pyinstrument quando o pacote está instalado: ele segue
+    a requisição através dos `await` e não mede as corrotinas de outras
+    requisições que rodam no mesmo event loop. Sem o pacote, cai no cProfile
+    (com um aviso no log), que mede toda a thread do event loop.
+
+    Args:
+        backend: "auto", "cprofile" ou "pyinstrument" (padrão: Conf.PROFILING_BACKEND)
+
+    Returns:
+        str: "cprofile" ou "pyinstrument"
+    """
+    backend = backend or Conf.PROFILING_BACKEND
+    if backend != "auto":
+        return backend
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        global _warned_fallback
+        if not _warned_fallback:
+            _warned_fallback = True
+            logger.warning(
+                "pyinstrument não instalado: perfis com o cProfile, que mede também as "
+                "requisições concorrentes no event loop (instale com o extra: "
+                "tech_challenge_1[profiling])"
+            )
+        return "cprofile"
+    return "pyinstrument"
+
+
+def create_profiler(backend: Optional[str] = None):
+    """
+    Cria o profiler de CPU configurado.
+
+    Args:
+        backend: "auto", "cprofile" ou "pyinstrument" (padrão: Conf.PROFILING_BACKEND)
+
+    Returns:
+        Profiler com `start()` e `stop()` (que retorna o relatório em texto)
+
+    Raises:
+        ValueError: Se o backend não existir
+        RuntimeError: Se o backend pyinstrument for pedido sem o pacote instalado
+    """
+    backend = resolve_backend(backend)
+    if backend == "cprofile":
+        return CProfileBackend()
+    if backend == "pyinstrument":
+        return PyinstrumentBackend()
+    raise ValueError(f"Profiler desconhecido: {backend} (use {', '.join(PROFILING_BACKENDS)})")
+
+
+class ProfilePhase:
+    """
+    Uma fase de um perfil: tempo, relatório do profiler de CPU e consultas SQL.
+
+    Attributes:
+        name: Nome da fase (ex.: "request", "plan", "shard 3")
+        duration_ms: Duração da fase
+        report: Relatório do profiler (None se outro perfil ocupava o profiler)
+        sql_count: Consultas executadas na fase
+        sql_ms: Tempo total das consultas
+        statements: Consultas e durações (até MAX_SQL_STATEMENTS)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.duration_ms = 0.0
+        self.report: Optional[str] = None
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.statements: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record_sql(self, statement: str, seconds: float) -> None:
+        """Registra uma consulta executada durante a fase (de qualquer thread)."""
+        ms = seconds * 1000
+        with self._lock:
+            self.sql_count += 1
+            self.sql_ms += ms
+            if len(self.statements) < MAX_SQL_STATEMENTS:
+                self.statements.append({"statement": statement, "duration_ms": round(ms, 3)})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms, 3),
+            "sql": {
+                "count": self.sql_count,
+                "total_ms": round(self.sql_ms, 3),
+                "statements": self.statements,
+            },
+            "report": self.report,
+        }
+
+
+class ProfileSession:
+    """
+    Perfil de uma requisição ou de um job, dividido em fases.
+
+    Cada fase (`phase`) tem o próprio relatório do profiler de CPU e as
+    próprias consultas SQL, capturadas pelos eventos dos engines
+    (`instrument_profiling`) enquanto a fase é a atual no contexto.
+
+    Args:
+        kind: Tipo do perfil ("request" ou "job")
+        name: Descrição (ex.: "GET /books/search" ou "job 12")
+        meta: Dados extras gravados com o perfil (ex.: status da resposta)
+        backend: Profiler de CPU (padrão: Conf.PROFILING_BACKEND)
+
+    Attributes:
+        discard: Se True, `profile_session` não grava o perfil (ex.: nada foi executado)
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        meta: Optional[Dict[str, Any]] = None,
+        backend: Optional[str] = None,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.name = name
+        self.meta = dict(meta or {})
+        self.backend = resolve_backend(backend)
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.phases: List[ProfilePhase] = []
+        self.discard = False
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[ProfilePhase]:
+        """
+        Mede um trecho como uma fase do perfil.
+
+        O profiler de CPU cobre a thread atual; as consultas SQL são
+        capturadas também nas threads e tarefas criadas dentro da fase (que
+        herdam o contexto). Se outro perfil estiver usando o profiler, a fase
+        fica sem relatório, mas o tempo e as consultas são registrados.
+
+        Args:
+            name: Nome da fase
+
+        Yields:
+            ProfilePhase: A fase em andamento
+        """
+        phase = ProfilePhase(name)
+        self.phases.append(phase)
+        acquired = _profiler_lock.acquire(blocking=False)
+        profiler = None
+        token = _current_phase.set(phase)
+        start = time.perf_counter()
+        try:
+            if acquired:
+                profiler = create_profiler(self.backend)
+                profiler.start()
+            yield phase
+        finally:
+            phase.duration_ms = (time.perf_counter() - start) * 1000
+            _current_phase.reset(token)
+            try:
+                if profiler is not None:
+                    phase.report = profiler.stop()
+            finally:
+                if acquired:
+                    _profiler_lock.release()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "backend": self.backend,
+            "meta": self.meta,
+            "phases": [phase.as_dict() for phase in self.phases],
+        }
+
+
+@contextlib.contextmanager
+def active_session(session: ProfileSession) -> Iterator[ProfileSession]:
+    """
+    Torna `session` o perfil atual (ver `profile_phase`) e mede sua duração.
+
+    Não grava o perfil; veja `profile_session`.
+
+    Args:
+        session: Perfil a ativar
+
+    Yields:
+        ProfileSession: O próprio perfil
+    """
+    token = _current_session.set(session)
+    start = time.perf_counter()
+    try:
+        yield session
+    finally:
+        session.duration_ms = (time.perf_counter() - start) * 1000
+        _current_session.reset(token)
+
+
+@contextlib.contextmanager
+def profile_session(
+    kind: str,
+    name: str,
+    meta: Optional[Dict[str, Any]] = None,
+    store: Any = None,
+) -> Iterator[ProfileSession]:
+    """
+    Abre um perfil, que passa a ser o perfil atual, e o grava no ring buffer ao final.
+
+    Dentro da sessão, `profile_phase` divide o trecho em fases; o código que
+    não marca fases pode usar `session.phase` diretamente. Com
+    `session.discard` o perfil não é gravado.
+
+        with profile_session("job", f"job {job_id}"):
+            run_scraping_job(job_id)
+
+    Args:
+        kind: Tipo do perfil ("request" ou "job")
+        name: Descrição do perfil
+        meta: Dados extras gravados com o perfil
+        store: Destino do perfil (padrão: `get_profile_store()`)
+
+    Yields:
+        ProfileSession: O perfil em andamento
+    """
+    from .store import get_profile_store
+
+    session = ProfileSession(kind, name, meta)
+    try:
+        with active_session(session):
+            yield session
+    finally:
+        try:
+            if not session.discard:
+                (store or get_profile_store()).save(session.as_dict())
+        except OSError as e:
+            logger.error(f"Falha ao gravar o perfil {session.id}: {e}")
+
+
+@contextlib.contextmanager
+def profile_phase(name: str) -> Iterator[Optional[ProfilePhase]]:
+    """
+    Marca uma fase do perfil atual; sem perfil ativo (ou dentro de outra fase) não faz nada.
+
+    Args:
+        name: Nome da fase (ex.: "plan", "shard 3")
+
+    Yields:
+        ProfilePhase: A fase em andamento, ou None se nada está sendo medido
+    """
+    session = _current_session.get()
+    if session is None or _current_phase.get() is not None:
+        yield None
+        return
+    with session.phase(name) as phase:
+        yield phase
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_phase.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    phase = _current_phase.get()
+    start = getattr(context, "_profile_start", None)
+    if phase is not None and start is not None:
+        phase.record_sql(statement, time.perf_counter() - start)
+
+
+def instrument_profiling(engine: Engine) -> None:
+    """
+    Registra nos eventos de `engine` a captura das consultas das fases de perfil.
+
+    Fora de uma fase o custo é uma leitura de ContextVar por consulta. Chamadas
+    repetidas para o mesmo engine não duplicam os eventos.
+
+    Args:
+        engine: Engine síncrono (no assíncrono, `async_engine.sync_engine`)
+    """
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,133 @@
+"""Ring buffer em disco dos perfis gravados."""
+
+import json
+import os
+import pathlib
+import re
+from typing import Any, Dict, List, Optional
+
+from src.conf import Conf
+
+# Identificador de um perfil (ver `ProfileSession`); impede caminhos arbitrários
+PROFILE_ID = re.compile(r"^[0-9a-f]{12}$")
+
+
+class ProfileStore:
+    """
+    Guarda os perfis mais recentes em arquivos JSON, um por perfil.
+
+    Ao gravar um perfil além do limite os mais antigos são removidos, então o
+    espaço em disco fica limitado. O diretório pode ser compartilhado pelos
+    workers da API e pelo worker de scraping.
+
+    Args:
+        directory: Diretório dos perfis (padrão: Conf.PROFILING_DIR)
+        max_profiles: Perfis mantidos (padrão: Conf.PROFILING_MAX_PROFILES)
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_profiles: Optional[int] = None):
+        self.directory = pathlib.Path(directory or Conf.PROFILING_DIR)
+        self.max_profiles = max_profiles or Conf.PROFILING_MAX_PROFILES
+
+    def _files(self) -> List[pathlib.Path]:
+        """Arquivos dos perfis, do mais antigo para o mais recente."""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+    def save(self, profile: Dict[str, Any]) -> pathlib.Path:
+        """
+        Grava um perfil e remove os excedentes mais antigos.
+
+        Args:
+            profile: Perfil no formato de `ProfileSession.as_dict`
+
+        Returns:
+            pathlib.Path: Arquivo gravado
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # O nome começa pelo instante de início: a ordem alfabética é a cronológica
+        stamp = profile["started_at"].replace(":", "").replace("-", "")[:22]
+        path = self.directory / f"{stamp}-{profile['id']}.json"
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(json.dumps(profile, ensure_ascii=False))
+        os.replace(tmp, path)
+
+        files = self._files()
+        for old in files[: max(0, len(files) - self.max_profiles)]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Resumo dos perfis guardados, do mais recente para o mais antigo.
+
+        Args:
+            limit: Máximo de perfis retornados (padrão: todos)
+
+        Returns:
+            list: Perfis sem os relatórios e as consultas, com os totais de cada fase
+        """
+        summaries: List[Dict[str, Any]] = []
+        for path in reversed(self._files()):
+            if limit is not None and len(summaries) >= limit:
+                break
+            profile = _read(path)
+            if profile is None:
+                continue
+            summaries.append(
+                {
+                    **{key: value for key, value in profile.items() if key != "phases"},
+                    "phases": [
+                        {
+                            "name": phase["name"],
+                            "duration_ms": phase["duration_ms"],
+                            "sql_count": phase["sql"]["count"],
+                            "sql_ms": phase["sql"]["total_ms"],
+                        }
+                        for phase in profile["phases"]
+                    ],
+                }
+            )
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Perfil completo pelo identificador.
+
+        Args:
+            profile_id: Identificador do perfil (12 dígitos hexadecimais)
+
+        Returns:
+            dict: O perfil, ou None se não existir (ou já tiver sido removido)
+        """
+        if not PROFILE_ID.match(profile_id) or not self.directory.exists():
+            return None
+        for path in self.directory.glob(f"*-{profile_id}.json"):
+            return _read(path)
+        return None
+
+
+def _read(path: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """Conteúdo de um perfil, ou None se o arquivo foi removido entretanto."""
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+_profile_store: Optional[ProfileStore] = None
+
+
+def get_profile_store() -> ProfileStore:
+    """
+    Dependency que retorna o ring buffer de perfis do processo.
+
+    Returns:
+        ProfileStore: Ring buffer configurado por Conf.PROFILING_DIR e
+        Conf.PROFILING_MAX_PROFILES
+    """
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore()
+    return _profile_store
@@ -0,0 +1,12 @@
+from .backends import CacheBackend, MemoryBackend, RedisBackend
+from .cache import ResponseCache, create_backend, get_response_cache, render_json
+
+__all__ = [
+    "CacheBackend",
+    "MemoryBackend",
+    "RedisBackend",
+    "ResponseCache",
+    "create_backend",
+    "get_response_cache",
+    "render_json",
+]
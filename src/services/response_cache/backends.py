@@ -0,0 +1,190 @@
+"""Backends de armazenamento do cache de respostas."""
+
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Armazenamento chave/valor (bytes) com TTL e contador de geração.
+
+    A geração identifica a versão do catálogo: ela faz parte das chaves do
+    cache, então incrementá-la invalida de uma vez todas as respostas salvas.
+    O escopo identifica onde a geração é contada e entra nos ETags.
+    `blocking` indica que as operações fazem I/O de rede, e por isso são
+    executadas fora do event loop pelas rotas assíncronas.
+    """
+
+    name: str
+    scope: str
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Retorna o valor salvo para a chave (None se ausente ou expirado)."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """Salva o valor para a chave."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Descarta todas as entradas."""
+
+    @abstractmethod
+    def generation(self) -> int:
+        """Geração atual do catálogo."""
+
+    @abstractmethod
+    def bump_generation(self) -> int:
+        """Incrementa a geração do catálogo e retorna o novo valor."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas próprias do backend."""
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Cache LRU em memória do processo, limitado por entradas, bytes e TTL.
+
+    Args:
+        max_entries: Número máximo de entradas
+        max_bytes: Tamanho máximo somado das chaves e valores
+        ttl: Tempo de vida das entradas em segundos
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        # A geração em memória recomeça a cada processo: o escopo também muda
+        self.scope = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(key: str, value: bytes) -> int:
+        return len(key) + len(value)
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= self._size(key, value)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        size = self._size(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._bytes += size
+            # Remove as entradas menos usadas até respeitar os limites
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        with self._lock:
+            self._generation += 1
+            # As chaves da geração anterior não serão mais lidas: libera a memória
+            self._entries.clear()
+            self._bytes = 0
+            return self._generation
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisBackend(CacheBackend):
+    """Cache compartilhado em um servidor compatível com Redis.
+
+    Permite que vários workers da API usem o mesmo cache e a mesma geração do
+    catálogo. A expiração e o limite de memória ficam a cargo do servidor
+    (TTL de cada chave e a política `maxmemory` configurada nele).
+
+    Args:
+        url: URL do servidor (ex.: redis://localhost:6379/0)
+        ttl: Tempo de vida das entradas em segundos
+        prefix: Prefixo das chaves gravadas
+        client: Cliente já criado (com a API do redis-py); ignora `url`
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        ttl: float = 300,
+        prefix: str = "response-cache",
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "O backend redis do cache requer o pacote 'redis' "
+                    "(instale com o extra: tech_challenge_1[redis])"
+                ) from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.scope = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}:entry:{key}")
+
+    def set(self, key: str, value: bytes) -> None:
+        self.client.set(f"{self.prefix}:entry:{key}", value, px=int(self.ttl * 1000))
+
+    def clear(self) -> None:
+        # A geração é preservada: ela só pode crescer
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:entry:*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def generation(self) -> int:
+        return int(self.client.get(f"{self.prefix}:generation") or 0)
+
+    def bump_generation(self) -> int:
+        return int(self.client.incr(f"{self.prefix}:generation"))
@@ -0,0 +1,310 @@
+"""Cache de leitura (read-through) das respostas das rotas do catálogo."""
+
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+from src.conf import Conf
+
+from .backends import CacheBackend, MemoryBackend, RedisBackend
+
+logger = logging.getLogger(__name__)
+
+
+class GenerationSource(Protocol):
+    """Origem compartilhada da geração do catálogo (ex.: `DatabaseGeneration`).
+
+    `stale` indica se a próxima chamada a `generation` relê a origem (I/O
+    bloqueante), para que as rotas assíncronas a façam fora do event loop.
+    """
+
+    def generation(self) -> int: ...
+
+    def bump_generation(self) -> int: ...
+
+    def stale(self) -> bool: ...
+
+
+def render_json(payload: Any) -> bytes:
+    """Serializa o payload como o JSONResponse do FastAPI."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class ResponseCache:
+    """Cache das respostas JSON das rotas de leitura do catálogo.
+
+    O catálogo só muda quando o scraping grava livros, então as respostas
+    são guardadas já serializadas e reaproveitadas até que a geração do
+    catálogo seja incrementada ou a entrada expire.
+
+    A geração vem de `generations` quando informado: o worker de scraping
+    roda em outro processo, e a geração guardada no banco é a que ele
+    incrementa. Sem `generations` ela é contada pelo backend (ou no
+    processo, sem backend).
+
+    Args:
+        backend: Armazenamento das respostas (None desativa o cache)
+        generations: Origem compartilhada da geração do catálogo
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        generations: Optional[GenerationSource] = None,
+    ):
+        self.backend = backend
+        self.generations = generations
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        # Sem backend a geração é local; o escopo muda a cada início do processo,
+        # para que ETags emitidos antes de um restart não sejam reaproveitados
+        self._generation = 0
+        self._scope = backend.scope if backend is not None else uuid.uuid4().hex[:8]
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def generation(self) -> int:
+        """Geração atual do catálogo."""
+        if self.generations is not None:
+            return self.generations.generation()
+        if self.backend is None:
+            return self._generation
+        return self.backend.generation()
+
+    @staticmethod
+    def key(request: Request, generation: int) -> str:
+        """Monta a chave normalizada: geração, origem, rota e parâmetros ordenados."""
+        params = urlencode(sorted(request.query_params.multi_items()))
+        return f"{generation}:{request.base_url}{request.url.path.lstrip('/')}?{params}"
+
+    def request_generation(self, request: Request) -> int:
+        """
+        Geração do catálogo vista pela requisição.
+
+        O valor é lido uma única vez e guardado em `request.state`, para que a
+        verificação do If-None-Match, o ETag e a chave do cache usem a mesma
+        geração mesmo que um job termine durante a requisição.
+
+        Args:
+            request: Requisição atendida
+
+        Returns:
+            Geração do catálogo
+        """
+        generation = getattr(request.state, "catalog_generation", None)
+        if generation is None:
+            generation = self.generation()
+            request.state.catalog_generation = generation
+        return generation
+
+    def _generation_blocks(self, request: Request) -> bool:
+        """Se ler a geração da requisição agora faz I/O bloqueante (banco ou rede)."""
+        if getattr(request.state, "catalog_generation", None) is not None:
+            return False
+        if self.generations is not None:
+            return self.generations.stale()
+        return self.backend is not None and self.backend.blocking
+
+    def etag(self, request: Request) -> str:
+        """ETag fraco (W/"...") derivado da geração do catálogo e da chave da rota."""
+        key = self.key(request, self.request_generation(request))
+        digest = hashlib.blake2b(f"{self._scope}:{key}".encode(), digest_size=12)
+        return f'W/"{digest.hexdigest()}"'
+
+    def headers(self, request: Request) -> Dict[str, str]:
+        """Cabeçalhos de validação (ETag e Cache-Control) da resposta."""
+        return {
+            "ETag": self.etag(request),
+            "Cache-Control": f"public, max-age={Conf.HTTP_CACHE_MAX_AGE}, must-revalidate",
+        }
+
+    async def headers_async(self, request: Request) -> Dict[str, str]:
+        """Versão de `headers` para as rotas assíncronas (releitura da geração no threadpool)."""
+        if self._generation_blocks(request):
+            return await run_in_threadpool(self.headers, request)
+        return self.headers(request)
+
+    def _lookup(self, request: Request) -> Tuple[Optional[str], Dict[str, str], Optional[bytes]]:
+        """Cabeçalhos da resposta, chave do cache e corpo salvo (None em um miss)."""
+        key = None
+        headers: Dict[str, str] = {}
+        body = None
+        try:
+            headers = self.headers(request)
+            if self.backend is not None:
+                key = self.key(request, self.request_generation(request))
+                body = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache de respostas indisponível: {e}")
+            self._count("errors")
+        self._count("hits" if body is not None else "misses")
+        return key, headers, body
+
+    def _store(self, key: Optional[str], body: bytes) -> None:
+        """Salva o corpo gerado em um miss (falhas do backend são apenas registradas)."""
+        if self.backend is None or key is None:
+            return
+        try:
+            self.backend.set(key, body)
+        except Exception as e:
+            logger.warning(f"Falha ao salvar no cache de respostas: {e}")
+            self._count("errors")
+
+    def respond(
+        self,
+        request: Request,
+        build: Callable[[], Any],
+        render: Callable[[Any], bytes] = render_json,
+        media_type: str = "application/json",
+    ) -> Response:
+        """
+        Retorna a resposta salva para a requisição ou a gera e salva.
+
+        Args:
+            request: Requisição atendida (define a chave do cache)
+            build: Função que monta o payload da resposta em caso de miss
+            render: Serializa o payload (padrão: JSON)
+            media_type: Content-Type da resposta
+
+        Returns:
+            Response: Resposta (salva ou recém-gerada)
+        """
+        key, headers, body = self._lookup(request)
+        if body is None:
+            body = render(build())
+            self._store(key, body)
+        return Response(body, media_type=media_type, headers=headers)
+
+    async def respond_async(
+        self,
+        request: Request,
+        build: Callable[[], Awaitable[Any]],
+        render: Callable[[Any], bytes] = render_json,
+        media_type: str = "application/json",
+    ) -> Response:
+        """
+        Versão de `respond` para as rotas assíncronas.
+
+        `build` é uma corrotina (consulta com a sessão assíncrona). Com um
+        backend que faz I/O de rede (`CacheBackend.blocking`) a leitura e a
+        gravação no cache rodam no threadpool, sem bloquear o event loop; o
+        mesmo vale para a leitura quando a geração precisa ser relida da
+        origem (`GenerationSource.stale`, uma consulta síncrona ao banco).
+
+        Args:
+            request: Requisição atendida (define a chave do cache)
+            build: Função assíncrona que monta o payload em caso de miss
+            render: Serializa o payload (padrão: JSON)
+            media_type: Content-Type da resposta
+
+        Returns:
+            Response: Resposta (salva ou recém-gerada)
+        """
+        blocking = self.backend is not None and self.backend.blocking
+        if blocking or self._generation_blocks(request):
+            key, headers, body = await run_in_threadpool(self._lookup, request)
+        else:
+            key, headers, body = self._lookup(request)
+        if body is None:
+            body = render(await build())
+            if blocking:
+                await run_in_threadpool(self._store, key, body)
+            else:
+                self._store(key, body)
+        return Response(body, media_type=media_type, headers=headers)
+
+    def invalidate(self) -> int:
+        """Incrementa a geração do catálogo, invalidando as respostas e os ETags."""
+        if self.generations is not None:
+            generation = self.generations.bump_generation()
+        elif self.backend is None:
+            with self._lock:
+                self._generation += 1
+                generation = self._generation
+        else:
+            generation = self.backend.bump_generation()
+        logger.info(f"Cache de respostas invalidado (geração {generation})")
+        return generation
+
+    def clear(self) -> None:
+        """Descarta as respostas salvas e zera os contadores."""
+        if self.backend is not None:
+            self.backend.clear()
+        self.hits = self.misses = self.errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acertos, falhas e métricas do backend."""
+        stats: Dict[str, Any] = {
+            "backend": self.backend.name if self.backend is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "generation": self.generation(),
+        }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def create_backend(name: Optional[str] = None) -> Optional[CacheBackend]:
+    """
+    Cria o backend do cache de respostas a partir da configuração.
+
+    Args:
+        name: "memory", "redis" ou "none" (padrão: Conf.RESPONSE_CACHE_BACKEND)
+
+    Returns:
+        O backend configurado, ou None se o cache estiver desativado
+
+    Raises:
+        ValueError: Se o backend não for reconhecido
+    """
+    name = (name or Conf.RESPONSE_CACHE_BACKEND).lower()
+    if name == "none":
+        return None
+    if name == "memory":
+        return MemoryBackend(
+            max_entries=Conf.RESPONSE_CACHE_MAX_ENTRIES,
+            max_bytes=Conf.RESPONSE_CACHE_MAX_BYTES,
+            ttl=Conf.RESPONSE_CACHE_TTL,
+        )
+    if name == "redis":
+        return RedisBackend(Conf.RESPONSE_CACHE_REDIS_URL, ttl=Conf.RESPONSE_CACHE_TTL)
+    raise ValueError(f"Backend de cache desconhecido: {name}")
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Dependency que retorna o cache de respostas do processo.
+
+    Returns:
+        ResponseCache: Instância única, criada no primeiro uso, com a geração
+        do catálogo lida do banco (ver `DatabaseGeneration`)
+    """
+    from src.services.catalog import DatabaseGeneration
+
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(create_backend(), DatabaseGeneration())
+    return _response_cache
@@ -1,4 +1,61 @@
+from .cache import ValidatorCache
 from .core import scrape_all_books
-from .file_handler import save_books_to_csv, update_books_data
+from .fetch_policy import AimdLimiter, FetchPolicy, RetryPolicy, TokenBucket, parse_retry_after
+from .file_handler import (
+    append_books_to_csv,
+    merge_books_into_csv,
+    merge_changes_into_csv,
+    save_books_to_csv,
+    update_books_data,
+)
+from .pipeline import BookWriter, scrape_to_db, stream_books, write_books
+from .queue import (
+    ACTIVE_STATUSES,
+    LeaseLostError,
+    add_shards,
+    claim_next_job,
+    claim_next_shard,
+    enqueue_job,
+    finish_job,
+    record_progress,
+    recover_stale_jobs,
+    renew_lease,
+    resume_job,
+    shard_progress,
+    update_shard,
+)
+from .sharding import SHARD_STRATEGIES, plan_shards
 
-__all__ = ["scrape_all_books", "save_books_to_csv", "update_books_data"]
+__all__ = [
+    "ACTIVE_STATUSES",
+    "SHARD_STRATEGIES",
+    "ValidatorCache",
+    "AimdLimiter",
+    "BookWriter",
+    "FetchPolicy",
+    "LeaseLostError",
+    "RetryPolicy",
+    "TokenBucket",
+    "add_shards",
+    "append_books_to_csv",
+    "claim_next_job",
+    "claim_next_shard",
+    "enqueue_job",
+    "finish_job",
+    "plan_shards",
+    "record_progress",
+    "recover_stale_jobs",
+    "renew_lease",
+    "resume_job",
+    "scrape_all_books",
+    "scrape_to_db",
+    "stream_books",
+    "shard_progress",
+    "update_shard",
+    "merge_books_into_csv",
+    "merge_changes_into_csv",
+    "parse_retry_after",
+    "save_books_to_csv",
+    "update_books_data",
+    "write_books",
+]
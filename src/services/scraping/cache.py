@@ -0,0 +1,145 @@
+"""Cache em disco dos validadores HTTP (ETag/Last-Modified) das páginas coletadas."""
+
+import hashlib
+import json
+import logging
+import os
+import pathlib
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from .locking import file_lock
+
+
+def content_hash(content: bytes) -> str:
+    """Calcula o hash usado para detectar páginas com conteúdo idêntico."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ValidatorCache:
+    """Validadores HTTP por URL usados para requisições condicionais.
+
+    Para cada URL são guardados o ETag, o Last-Modified e o hash do conteúdo da
+    última resposta. Os validadores de uma página nova ou alterada ficam
+    pendentes até o livro dela ser gravado no banco (`link` e `confirm`); os
+    de páginas que não geraram livro são descartados (`discard`). Só os
+    confirmados são gravados em disco por `save`, para que uma página cujo
+    livro não foi persistido não seja pulada na próxima execução. Como cada
+    shard de um job grava o mesmo arquivo, `save` mescla apenas as URLs
+    atualizadas por esta instância com o conteúdo atual do disco.
+
+    Attributes:
+        path: Caminho do arquivo JSON do cache
+        pages_fetched: Páginas respondidas pelo servidor (inclui 304)
+        pages_not_modified: Páginas sem alteração (304 ou mesmo hash)
+        pages_changed: Páginas novas ou com conteúdo alterado
+    """
+
+    def __init__(self, path: pathlib.Path, entries: Optional[Dict[str, Dict]] = None):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Optional[str]]] = entries or {}
+        self._updated: Dict[str, Dict[str, Optional[str]]] = {}
+        self._pending: Dict[str, Dict[str, Optional[str]]] = {}
+        self._urls_by_title: Dict[str, List[str]] = {}
+        self.pages_fetched = 0
+        self.pages_not_modified = 0
+        self.pages_changed = 0
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "ValidatorCache":
+        """Carrega o cache do disco (ou cria um vazio se o arquivo não existir)."""
+        path = pathlib.Path(path)
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                return cls(path, json.load(cache_file))
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cache de validadores inválido em {path}, ignorando: {e}")
+            return cls(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Descarta os validadores, forçando o download completo das páginas."""
+        self._entries.clear()
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Cabeçalhos If-None-Match/If-Modified-Since para a URL."""
+        entry = self._entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        etag, last_modified = entry.get("etag"), entry.get("last_modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def mark_not_modified(self, url: str) -> None:
+        """Registra uma resposta 304 para a URL."""
+        self.pages_fetched += 1
+        self.pages_not_modified += 1
+
+    def update(self, url: str, response: httpx.Response) -> bool:
+        """Registra a resposta recebida para a URL.
+
+        Os validadores de uma página com o mesmo conteúdo valem de imediato (o
+        livro dela já está no banco); os de uma página nova ou alterada ficam
+        pendentes até `confirm`.
+
+        Args:
+            url: URL buscada
+            response: Resposta 2xx do servidor
+
+        Returns:
+            True se o conteúdo é novo ou mudou, False se é idêntico ao anterior
+        """
+        self.pages_fetched += 1
+        digest = content_hash(response.content)
+        previous = self._entries.get(url)
+        entry: Dict[str, Optional[str]] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": digest,
+        }
+        if previous and previous.get("content_hash") == digest:
+            self._entries[url] = self._updated[url] = entry
+            self.pages_not_modified += 1
+            return False
+        self._pending[url] = entry
+        self.pages_changed += 1
+        return True
+
+    def link(self, url: str, title: str) -> None:
+        """Associa a página pendente `url` ao livro extraído dela."""
+        if url in self._pending:
+            self._urls_by_title.setdefault(title, []).append(url)
+
+    def discard(self, url: str) -> None:
+        """Descarta os validadores pendentes de uma página que não gerou livro."""
+        self._pending.pop(url, None)
+
+    def confirm(self, titles: Iterable[str]) -> None:
+        """Confirma os validadores das páginas dos livros já gravados no banco."""
+        for title in titles:
+            for url in self._urls_by_title.pop(title, ()):
+                entry = self._pending.pop(url, None)
+                if entry is not None:
+                    self._entries[url] = self._updated[url] = entry
+
+    def save(self) -> None:
+        """Mescla as URLs confirmadas ao cache em disco e grava de forma atômica."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.path):
+            entries = type(self).load(self.path)._entries
+            entries.update(self._updated)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(tmp_path, self.path)
+        self._entries.update(entries)
+        self._updated.clear()
@@ -1,17 +1,21 @@
 import asyncio
 import logging
-from enum import IntEnum
-from typing import Any, Dict, List, Optional
+import multiprocessing
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import httpx
 from bs4 import BeautifulSoup
 
+from src.conf import Conf
 
-def clean_title(title: str) -> str:
-    """Limpa o título do livro removendo caracteres problemáticos para CSV."""
-    return title.replace(",", "").strip()
-
+from .cache import ValidatorCache
+from .extractors import Rating, clean_title, get_extractor  # noqa: F401
+from .fetch_policy import FetchPolicy
+from .metrics import PAGES_FETCHED, PARSE_DURATION
 
 # Configuração do logging
 logging.basicConfig(
@@ -27,76 +31,71 @@ HEADERS = {
 }
 
 
-class Rating(IntEnum):
-    """Enum para mapear classificações de estrelas para valores numéricos."""
-
-    ONE = 1
-    TWO = 2
-    THREE = 3
-    FOUR = 4
-    FIVE = 5
-
-
-async def fetch_page(client: httpx.AsyncClient, url: str) -> Optional[str]:
+async def fetch_page(
+    client: httpx.AsyncClient,
+    url: str,
+    cache: Optional[ValidatorCache] = None,
+    policy: Optional[FetchPolicy] = None,
+) -> Optional[str]:
     """Busca o conteúdo de uma única página de forma assíncrona.
 
+    Com um cache de validadores a requisição é condicional (If-None-Match /
+    If-Modified-Since): páginas que responderem 304 ou cujo conteúdo tenha o
+    mesmo hash da última coleta não são retornadas, evitando parsing e escrita
+    no banco. Com uma política de requisições, a taxa por host é limitada e
+    erros de rede e respostas 429/5xx são repetidos com backoff.
+
     Args:
         client: Cliente HTTP assíncrono
         url: URL da página a ser buscada
+        cache: Cache de validadores HTTP (opcional)
+        policy: Política de requisições (opcional; ver `FetchPolicy`)
 
     Returns:
-        O conteúdo HTML da página ou None em caso de erro
+        O conteúdo HTML da página ou None em caso de erro ou página inalterada
     """
+    headers = dict(HEADERS)
+    if cache is not None:
+        headers.update(cache.conditional_headers(url))
     try:
-        response = await client.get(url, headers=HEADERS, follow_redirects=True)
+        if policy is not None:
+            response = await policy.get(client, url, headers)
+        else:
+            response = await client.get(url, headers=headers, follow_redirects=True)
+        if cache is not None and response.status_code == 304:
+            cache.mark_not_modified(url)
+            PAGES_FETCHED.labels("not_modified").inc()
+            return None
         response.raise_for_status()
+        if cache is not None and not cache.update(url, response):
+            PAGES_FETCHED.labels("unchanged").inc()
+            return None
+        PAGES_FETCHED.labels("ok").inc()
         return response.text
+    except httpx.HTTPStatusError as e:
+        PAGES_FETCHED.labels("http_error").inc()
+        logging.error(f"A URL {url} respondeu {e.response.status_code}")
+        return None
     except httpx.RequestError as e:
+        PAGES_FETCHED.labels("network_error").inc()
         logging.error(f"Falha ao buscar a URL {url}: {e}")
         return None
 
 
-def parse_book_details(html_content: str, book_url: str) -> Optional[Dict[str, Any]]:
+def parse_book_details(
+    html_content: str, book_url: str, backend: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
     """Analisa os detalhes de um livro a partir do conteúdo HTML de sua página.
 
     Args:
         html_content: Conteúdo HTML da página do livro
         book_url: URL da página do livro (usado para logging em caso de erro)
+        backend: Backend de parsing (padrão: Conf.SCRAPING_PARSER_BACKEND)
 
     Returns:
         Dicionário com os detalhes do livro ou None em caso de erro
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    try:
-        title = clean_title(soup.find("h1").text)
-        price_str = soup.find("p", class_="price_color").text
-        price = float(price_str.replace("£", "").replace("Â", ""))
-
-        rating_tag = soup.find("p", class_="star-rating")
-        rating_class = rating_tag["class"][-1] if rating_tag else "Zero"
-        rating = getattr(Rating, rating_class.upper(), 0)
-
-        availability_tag = soup.find("p", class_="instock availability")
-        availability = availability_tag.text.strip() if availability_tag else "N/A"
-
-        category_tag = soup.select_one("ul.breadcrumb li:nth-of-type(3) a")
-        category = category_tag.text.strip() if category_tag else "N/A"
-
-        image_tag = soup.select_one("#product_gallery .item img")
-        relative_img_url = image_tag["src"]
-        image_url = urljoin(BASE_URL, relative_img_url)
-
-        return {
-            "title": title,
-            "price": price,
-            "rating": rating,
-            "availability": availability,
-            "category": category,
-            "image_url": image_url,
-        }
-    except (AttributeError, IndexError, ValueError) as e:
-        logging.error(f"Erro ao analisar detalhes do livro em {book_url}: {e}")
-        return None
+    return get_extractor(backend).extract(html_content, book_url, BASE_URL)
 
 
 async def scrape_book_task(
@@ -117,54 +116,429 @@ async def scrape_book_task(
     return None
 
 
-async def scrape_all_books_async() -> List[Dict[str, Any]]:
-    """Lógica principal de scraping assíncrono para todos os livros.
+def parse_catalogue_page(
+    html_content: str, page_url: str
+) -> Tuple[List[str], Optional[str]]:
+    """Extrai os links dos livros e o link da próxima página de um catálogo.
 
-    Busca todas as páginas do catálogo de forma assíncrona e coleta os detalhes
-    de cada livro encontrado.
+    Args:
+        html_content: Conteúdo HTML da página do catálogo
+        page_url: URL da página do catálogo (base para os links relativos)
 
     Returns:
-        Lista de dicionários, onde cada dicionário contém os detalhes de um livro
+        Tupla com a lista de URLs dos livros e a URL da próxima página
+        (None se esta for a última)
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    book_links = [urljoin(page_url, a["href"]) for a in soup.select("h3 a")]
+
+    next_page_tag = soup.select_one("li.next a")
+    next_url = None
+    if next_page_tag and next_page_tag.has_attr("href"):
+        next_url = urljoin(page_url, next_page_tag["href"])
+    return book_links, next_url
+
+
+def parse_page_count(html_content: str) -> Optional[int]:
+    """Número de páginas de uma listagem ("Page 1 of 50"), ou None se não houver paginação."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    current = soup.select_one("li.current")
+    if current is None:
+        return None
+    match = re.search(r"of\s+(\d+)", current.get_text())
+    return int(match.group(1)) if match else None
+
+
+def parse_category_links(html_content: str, page_url: str) -> List[str]:
+    """URLs das listagens de cada categoria, a partir do menu lateral do site."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    return [
+        urljoin(page_url, a["href"])
+        for a in soup.select(".side_categories ul li ul li a")
+        if a.has_attr("href")
+    ]
+
+
+def build_client(
+    max_concurrency: Optional[int] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Cria o cliente HTTP compartilhado pelo crawler.
+
+    O pool de conexões é dimensionado pelo limite de concorrência, mantendo as
+    conexões com o host vivas (keep-alive) entre as requisições e usando HTTP/2
+    quando habilitado em `Conf.SCRAPING_HTTP2`.
+
+    Args:
+        max_concurrency: Número máximo de conexões simultâneas
+            (padrão: Conf.SCRAPING_MAX_CONCURRENCY)
+        transport: Transporte alternativo (usado em testes)
+
+    Returns:
+        Cliente HTTP assíncrono configurado
     """
-    all_books_data = []
-    current_url: Optional[str] = urljoin(BASE_URL, "catalogue/page-1.html")
+    max_concurrency = max_concurrency or Conf.SCRAPING_MAX_CONCURRENCY
+    limits = httpx.Limits(
+        max_connections=max_concurrency,
+        max_keepalive_connections=max_concurrency,
+        keepalive_expiry=Conf.SCRAPING_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        Conf.SCRAPING_READ_TIMEOUT,
+        connect=Conf.SCRAPING_CONNECT_TIMEOUT,
+        pool=Conf.SCRAPING_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        limits=limits,
+        timeout=timeout,
+        http2=Conf.SCRAPING_HTTP2,
+        follow_redirects=True,
+        transport=transport,
+    )
+
+
+def create_parse_executor(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """Cria o pool de processos usado na etapa de parsing do crawler.
+
+    Usa o contexto "spawn" para não herdar threads e conexões do processo da API.
+    Cada processo importa o parser ao iniciar, então o pool deve ser criado uma
+    vez e reaproveitado entre as coletas (ver `ScrapingWorker.parse_executor`).
+
+    Args:
+        workers: Número de processos (padrão: Conf.SCRAPING_PARSE_WORKERS).
+            Zero desabilita o pool e o parsing passa a ser feito no event loop.
+
+    Returns:
+        O executor criado ou None se o parsing deve ser feito inline
+    """
+    workers = Conf.SCRAPING_PARSE_WORKERS if workers is None else workers
+    if workers <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
 
-    async with httpx.AsyncClient() as client:
-        while current_url:
-            logging.info(f"Coletando dados da página: {current_url}")
-            main_page_content = await fetch_page(client, current_url)
+# Rótulo `page` de scraping_parse_duration_seconds de cada função de parsing
+_PARSED_PAGES = {parse_book_details: "book", parse_catalogue_page: "catalogue"}
 
-            if not main_page_content:
-                break
 
-            soup = BeautifulSoup(main_page_content, "html.parser")
-            book_links = [urljoin(current_url, a["href"]) for a in soup.select("h3 a")]
+class CrawlEngine:
+    """Motor de crawling com concorrência limitada.
 
-            tasks = [scrape_book_task(client, link) for link in book_links]
-            results = await asyncio.gather(*tasks)
+    O crawling é organizado em três etapas ligadas por filas limitadas:
 
-            page_books_data = [book for book in results if book]
-            all_books_data.extend(page_books_data)
+    1. Descoberta: percorre as páginas do catálogo e enfileira os links dos
+       livros. A próxima página do catálogo é buscada enquanto os livros da
+       página atual ainda estão sendo coletados.
+    2. Fetch: um conjunto fixo de workers busca as páginas dos livros. Um
+       semáforo global garante que nunca haja mais de `max_concurrency`
+       requisições em andamento; abaixo dele, a `FetchPolicy` limita a taxa
+       por host, repete as falhas temporárias e adapta a concorrência (AIMD).
+    3. Parsing: o HTML baixado é analisado em um `ProcessPoolExecutor`, fora do
+       event loop, para que o parsing (CPU) não bloqueie o I/O de rede e escale
+       com o número de núcleos.
 
-            next_page_tag = soup.select_one("li.next a")
-            if next_page_tag and next_page_tag.has_attr("href"):
-                current_url = urljoin(current_url, next_page_tag["href"])
+    Os livros analisados são devolvidos em uma lista ordenada (`crawl`) ou
+    entregues à medida que ficam prontos (`stream`).
+
+    Attributes:
+        client: Cliente HTTP assíncrono compartilhado
+        max_concurrency: Número máximo de requisições simultâneas
+        executor: Pool de processos do parsing (None para parsing inline)
+        parse_workers: Número de consumidores da etapa de parsing
+        cache: Cache de validadores HTTP usado nas páginas dos livros (opcional)
+        policy: Política de requisições (padrão: criada a partir de `Conf`)
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        parse_workers: Optional[int] = None,
+        cache: Optional[ValidatorCache] = None,
+        policy: Optional[FetchPolicy] = None,
+    ):
+        self.client = client
+        self.cache = cache
+        self.max_concurrency = max_concurrency or Conf.SCRAPING_MAX_CONCURRENCY
+        self.policy = policy or FetchPolicy(max_concurrency=self.max_concurrency)
+        self.executor = executor
+        # Sem pool o parsing é sequencial no event loop: basta um consumidor
+        self.parse_workers = (
+            (parse_workers or Conf.SCRAPING_PARSE_WORKERS or 1) if executor else 1
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def fetch(
+        self, url: str, cache: Optional[ValidatorCache] = None
+    ) -> Optional[str]:
+        """Busca uma página respeitando o limite global de concorrência."""
+        async with self._semaphore:
+            return await fetch_page(self.client, url, cache, self.policy)
+
+    async def parse(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Executa uma função de parsing no pool de processos (ou inline), medindo o tempo."""
+        page = _PARSED_PAGES.get(func, func.__name__)
+        start = time.perf_counter()
+        try:
+            if self.executor is None:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            PARSE_DURATION.labels(page).observe(time.perf_counter() - start)
+
+    async def _discover(
+        self, start_url: str, link_queue: asyncio.Queue, max_pages: Optional[int] = None
+    ) -> None:
+        """Percorre o catálogo enfileirando os links dos livros encontrados."""
+        index = 0
+        pages = 0
+        current_url: Optional[str] = start_url
+        try:
+            while current_url:
+                if max_pages is not None and pages >= max_pages:
+                    logging.info(f"Limite de {max_pages} páginas atingido em {start_url}")
+                    break
+                pages += 1
+                logging.info(f"Coletando dados da página: {current_url}")
+                main_page_content = await self.fetch(current_url)
+                if not main_page_content:
+                    break
+
+                book_links, current_url = await self.parse(
+                    parse_catalogue_page, main_page_content, current_url
+                )
+                for link in book_links:
+                    await link_queue.put((index, link))
+                    index += 1
             else:
                 logging.info(
                     "Coleta de dados concluída. Todas as páginas foram processadas."
                 )
-                current_url = None
+        finally:
+            # Um sinal de parada para cada worker de fetch
+            for _ in range(self.max_concurrency):
+                await link_queue.put(None)
+
+    async def _fetcher(self, link_queue: asyncio.Queue, html_queue: asyncio.Queue) -> None:
+        """Consome links da fila e envia o HTML de cada livro para o parsing."""
+        while True:
+            item = await link_queue.get()
+            if item is None:
+                return
+            index, book_url = item
+            html_content = await self.fetch(book_url, self.cache)
+            if html_content:
+                await html_queue.put((index, book_url, html_content))
+
+    async def _parser(
+        self,
+        html_queue: asyncio.Queue,
+        emit: Callable[[int, Dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """Consome páginas baixadas e entrega os detalhes de cada livro a `emit`."""
+        while True:
+            item = await html_queue.get()
+            if item is None:
+                return
+            index, book_url, html_content = item
+            book = await self.parse(parse_book_details, html_content, book_url)
+            if self.cache is not None:
+                # Os validadores da página só valem depois que o livro for gravado
+                if book:
+                    self.cache.link(book_url, book["title"])
+                else:
+                    self.cache.discard(book_url)
+            if book:
+                await emit(index, book)
+
+    async def _fetch_stage(
+        self,
+        start_url: str,
+        link_queue: asyncio.Queue,
+        html_queue: asyncio.Queue,
+        max_pages: Optional[int] = None,
+    ) -> None:
+        """Executa descoberta e fetch, sinalizando o fim para o parsing."""
+        await asyncio.gather(
+            self._discover(start_url, link_queue, max_pages),
+            *(
+                self._fetcher(link_queue, html_queue)
+                for _ in range(self.max_concurrency)
+            ),
+        )
+        for _ in range(self.parse_workers):
+            await html_queue.put(None)
+
+    async def _run(
+        self,
+        start_url: str,
+        max_pages: Optional[int],
+        emit: Callable[[int, Dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """Executa as três etapas, entregando cada livro analisado a `emit`."""
+        # Filas limitadas impedem que uma etapa se distancie demais da seguinte
+        link_queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+        html_queue: asyncio.Queue = asyncio.Queue(maxsize=self.parse_workers * 2)
+
+        tasks = [
+            asyncio.create_task(
+                self._fetch_stage(start_url, link_queue, html_queue, max_pages)
+            )
+        ]
+        tasks += [
+            asyncio.create_task(self._parser(html_queue, emit))
+            for _ in range(self.parse_workers)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def crawl(
+        self, start_url: str, max_pages: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Executa o crawling a partir de uma página de listagem.
+
+        Args:
+            start_url: URL da primeira página do catálogo (ou de uma categoria)
+            max_pages: Máximo de páginas de listagem percorridas (padrão: até a última)
+
+        Returns:
+            Lista de livros na mesma ordem em que aparecem no catálogo
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+
+        async def collect(index: int, book: Dict[str, Any]) -> None:
+            results[index] = book
+
+        await self._run(start_url, max_pages, collect)
+        return [results[index] for index in sorted(results)]
+
+    async def stream(
+        self, start_url: str, max_pages: Optional[int] = None, buffer_size: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Entrega os livros à medida que são analisados, sem acumulá-los.
+
+        Os livros passam por uma fila limitada: se o consumidor (por exemplo, a
+        gravação no banco) ficar para trás, o crawling espera, e a memória usada
+        não depende do tamanho do catálogo. A ordem é a de conclusão do parsing,
+        não a do catálogo.
+
+        Args:
+            start_url: URL da primeira página do catálogo (ou de uma categoria)
+            max_pages: Máximo de páginas de listagem percorridas (padrão: até a última)
+            buffer_size: Livros analisados aguardando o consumidor
+
+        Yields:
+            Dicionário com os detalhes de cada livro
+        """
+        done = object()
+        book_queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+        async def put(index: int, book: Dict[str, Any]) -> None:
+            await book_queue.put(book)
+
+        async def produce() -> None:
+            try:
+                await self._run(start_url, max_pages, put)
+            finally:
+                await book_queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                book = await book_queue.get()
+                if book is done:
+                    break
+                yield book
+            # Propaga uma eventual falha do crawling
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+
+async def scrape_all_books_async(
+    start_url: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    max_concurrency: Optional[int] = None,
+    parse_workers: Optional[int] = None,
+    cache: Optional[ValidatorCache] = None,
+    max_pages: Optional[int] = None,
+    policy: Optional[FetchPolicy] = None,
+    executor: Optional[Executor] = None,
+) -> List[Dict[str, Any]]:
+    """Lógica principal de scraping assíncrono para todos os livros.
 
-    return all_books_data
+    Busca todas as páginas do catálogo de forma assíncrona e coleta os detalhes
+    de cada livro encontrado, usando o `CrawlEngine`.
 
+    Args:
+        start_url: URL da primeira página do catálogo
+            (padrão: catalogue/page-1.html)
+        client: Cliente HTTP a ser reutilizado (padrão: criado por `build_client`)
+        max_concurrency: Limite de requisições simultâneas
+            (padrão: Conf.SCRAPING_MAX_CONCURRENCY)
+        parse_workers: Processos dedicados ao parsing; zero faz o parsing no
+            event loop (padrão: Conf.SCRAPING_PARSE_WORKERS)
+        cache: Cache de validadores HTTP; quando informado, apenas os livros
+            cujas páginas mudaram desde a última coleta são retornados
+        max_pages: Máximo de páginas de listagem a partir de `start_url`
+            (padrão: até a última; usado pelos shards de um job)
+        policy: Política de requisições (padrão: criada a partir de `Conf`)
+        executor: Pool de parsing reaproveitado (padrão: um pool criado e
+            encerrado nesta coleta, ver `create_parse_executor`)
 
-def scrape_all_books() -> List[Dict[str, Any]]:
+    Returns:
+        Lista de dicionários, onde cada dicionário contém os detalhes de um livro
+    """
+    start_url = start_url or urljoin(BASE_URL, "catalogue/page-1.html")
+    owned = executor is None
+    if owned:
+        executor = create_parse_executor(parse_workers)
+
+    try:
+        if client is not None:
+            engine = CrawlEngine(
+                client, max_concurrency, executor, parse_workers, cache, policy
+            )
+            return await engine.crawl(start_url, max_pages)
+
+        async with build_client(max_concurrency) as client:
+            engine = CrawlEngine(
+                client, max_concurrency, executor, parse_workers, cache, policy
+            )
+            return await engine.crawl(start_url, max_pages)
+    finally:
+        if owned and executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_all_books(
+    cache: Optional[ValidatorCache] = None,
+    start_url: Optional[str] = None,
+    max_pages: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     """Wrapper síncrono para o scraper assíncrono.
 
     Esta função é o ponto de entrada principal para o scraping,
     encapsulando toda a lógica assíncrona em uma interface síncrona.
 
+    Args:
+        cache: Cache de validadores HTTP para coleta incremental (opcional)
+        start_url: Primeira página de listagem (padrão: catalogue/page-1.html)
+        max_pages: Máximo de páginas de listagem (padrão: até a última)
+
     Returns:
         Lista de dicionários, onde cada dicionário contém os detalhes de um livro
     """
-    return asyncio.run(scrape_all_books_async())
+    return asyncio.run(
+        scrape_all_books_async(start_url=start_url, cache=cache, max_pages=max_pages)
+    )
@@ -0,0 +1,195 @@
+"""Extratores dos detalhes de um livro a partir do HTML da página do produto.
+
+Cada backend implementa `BookExtractor` e produz exatamente o mesmo dicionário
+(title, price, rating, availability, category, image_url). O backend usado pelo
+crawler é escolhido por `Conf.SCRAPING_PARSER_BACKEND`.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from enum import IntEnum
+from typing import Any, Dict, Optional, Type
+from urllib.parse import urljoin
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from src.conf import Conf
+
+
+def clean_title(title: str) -> str:
+    """Limpa o título do livro removendo caracteres problemáticos para CSV."""
+    return title.replace(",", "").strip()
+
+
+class Rating(IntEnum):
+    """Enum para mapear classificações de estrelas para valores numéricos."""
+
+    ONE = 1
+    TWO = 2
+    THREE = 3
+    FOUR = 4
+    FIVE = 5
+
+
+def parse_price(price_str: str) -> float:
+    """Converte o preço exibido na página (ex.: "£51.77") em float."""
+    return float(price_str.replace("£", "").replace("Â", ""))
+
+
+def parse_rating(rating_class: str) -> int:
+    """Converte a classe CSS de avaliação (ex.: "Three") no valor numérico."""
+    return getattr(Rating, rating_class.upper(), 0)
+
+
+class BookExtractor(ABC):
+    """Interface dos extratores de detalhes de livros.
+
+    Attributes:
+        name: Nome do backend usado na configuração
+    """
+
+    name: str = ""
+
+    def extract(
+        self, html_content: str, book_url: str, base_url: str
+    ) -> Optional[Dict[str, Any]]:
+        """Extrai os detalhes de um livro.
+
+        Args:
+            html_content: Conteúdo HTML da página do livro
+            book_url: URL da página do livro (usado para logging em caso de erro)
+            base_url: URL base para resolver o link relativo da imagem
+
+        Returns:
+            Dicionário com os detalhes do livro ou None em caso de erro
+        """
+        try:
+            return self._extract(html_content, base_url)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            logging.error(f"Erro ao analisar detalhes do livro em {book_url}: {e}")
+            return None
+
+    @abstractmethod
+    def _extract(self, html_content: str, base_url: str) -> Dict[str, Any]:
+        """Extrai os campos, levantando exceção se a página estiver incompleta."""
+
+
+class SoupExtractor(BookExtractor):
+    """Extrator baseado em BeautifulSoup com o parser `html.parser` (Python puro)."""
+
+    name = "bs4"
+
+    def _extract(self, html_content: str, base_url: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(html_content, "html.parser")
+
+        title = clean_title(soup.find("h1").text)
+        price = parse_price(soup.find("p", class_="price_color").text)
+
+        rating_tag = soup.find("p", class_="star-rating")
+        rating = parse_rating(rating_tag["class"][-1] if rating_tag else "Zero")
+
+        availability_tag = soup.find("p", class_="instock availability")
+        availability = availability_tag.text.strip() if availability_tag else "N/A"
+
+        category_tag = soup.select_one("ul.breadcrumb li:nth-of-type(3) a")
+        category = category_tag.text.strip() if category_tag else "N/A"
+
+        image_tag = soup.select_one("#product_gallery .item img")
+        image_url = urljoin(base_url, image_tag["src"])
+
+        return {
+            "title": title,
+            "price": price,
+            "rating": rating,
+            "availability": availability,
+            "category": category,
+            "image_url": image_url,
+        }
+
+
+def _has_class(name: str) -> str:
+    """Predicado XPath equivalente ao seletor CSS `.name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlExtractor(BookExtractor):
+    """Extrator baseado no parser compilado do lxml.
+
+    O documento é analisado uma única vez e os seis campos são lidos com
+    expressões XPath pré-compiladas equivalentes aos seletores do `SoupExtractor`.
+    """
+
+    name = "lxml"
+
+    _title = etree.XPath("(//h1)[1]")
+    _price = etree.XPath(f"(//p[{_has_class('price_color')}])[1]")
+    _rating = etree.XPath(f"(//p[{_has_class('star-rating')}])[1]/@class")
+    _availability = etree.XPath(
+        "(//p[normalize-space(@class) = 'instock availability'])[1]"
+    )
+    _category = etree.XPath(f"(//ul[{_has_class('breadcrumb')}]//li[3]//a)[1]")
+    _image = etree.XPath(f"(//*[@id='product_gallery']//*[{_has_class('item')}]//img)[1]")
+
+    def _extract(self, html_content: str, base_url: str) -> Dict[str, Any]:
+        try:
+            tree = lxml.html.document_fromstring(html_content)
+        except etree.ParserError as e:
+            raise ValueError(str(e)) from e
+
+        title = clean_title(self._title(tree)[0].text_content())
+        price = parse_price(self._price(tree)[0].text_content())
+
+        rating_class = self._rating(tree)
+        rating = parse_rating(rating_class[0].split()[-1] if rating_class else "Zero")
+
+        availability_tag = self._availability(tree)
+        availability = (
+            availability_tag[0].text_content().strip() if availability_tag else "N/A"
+        )
+
+        category_tag = self._category(tree)
+        category = category_tag[0].text_content().strip() if category_tag else "N/A"
+
+        image_url = urljoin(base_url, self._image(tree)[0].attrib["src"])
+
+        return {
+            "title": title,
+            "price": price,
+            "rating": rating,
+            "availability": availability,
+            "category": category,
+            "image_url": image_url,
+        }
+
+
+EXTRACTORS: Dict[str, Type[BookExtractor]] = {
+    SoupExtractor.name: SoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+_instances: Dict[str, BookExtractor] = {}
+
+
+def get_extractor(name: Optional[str] = None) -> BookExtractor:
+    """Retorna o extrator do backend informado.
+
+    Args:
+        name: Nome do backend (padrão: Conf.SCRAPING_PARSER_BACKEND)
+
+    Returns:
+        Instância (compartilhada) do extrator
+
+    Raises:
+        ValueError: Se o backend não existir
+    """
+    name = name or Conf.SCRAPING_PARSER_BACKEND
+    if name not in EXTRACTORS:
+        raise ValueError(
+            f"Backend de parsing desconhecido: {name!r}. "
+            f"Disponíveis: {', '.join(sorted(EXTRACTORS))}"
+        )
+    if name not in _instances:
+        _instances[name] = EXTRACTORS[name]()
+    return _instances[name]
@@ -0,0 +1,337 @@
+"""Política de requisições do crawler: limite de taxa, retentativas e concorrência AIMD."""
+
+import asyncio
+import collections
+import email.utils
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, Mapping, Optional
+
+import httpx
+
+from src.conf import Conf
+
+from .metrics import RETRIES, THROTTLED
+
+logger = logging.getLogger(__name__)
+
+# Respostas que indicam sobrecarga ou falha temporária do servidor
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera.
+
+    Args:
+        value: Valor do cabeçalho
+        now: Instante de referência para datas (padrão: agora, em UTC)
+
+    Returns:
+        float: Segundos de espera (zero para datas passadas), ou None se ausente ou inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class TokenBucket:
+    """
+    Limite de taxa (token bucket) das requisições a um host.
+
+    Os tokens são repostos a `rate` por segundo até `burst`; cada requisição
+    consome um. `defer` suspende o host inteiro, por exemplo durante o
+    Retry-After de uma resposta 429.
+
+    Args:
+        rate: Requisições por segundo (0 = sem limite)
+        burst: Requisições permitidas de uma vez após um período ocioso
+        clock: Relógio monotônico (substituível nos testes)
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.not_before = 0.0
+        self._lock = asyncio.Lock()
+
+    def defer(self, seconds: float) -> None:
+        """Impede novas requisições ao host pelos próximos `seconds`."""
+        self.not_before = max(self.not_before, self.clock() + seconds)
+
+    async def acquire(self) -> None:
+        """Aguarda um token (e o fim de uma eventual suspensão do host)."""
+        async with self._lock:
+            while True:
+                now = self.clock()
+                if now < self.not_before:
+                    await asyncio.sleep(self.not_before - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RetryPolicy:
+    """
+    Espera entre as tentativas de uma requisição.
+
+    Backoff exponencial com jitter completo (um valor aleatório entre zero e
+    `base_delay * 2 ** tentativa`, limitado a `max_delay`); um Retry-After do
+    servidor tem precedência, também limitado a `max_delay`.
+
+    Args:
+        max_retries: Retentativas após a primeira tentativa
+        base_delay: Espera base (s)
+        max_delay: Espera máxima (s)
+    """
+
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Espera (s) antes da retentativa de número `attempt` (a partir de zero)."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class AimdLimiter:
+    """
+    Limite adaptativo de requisições simultâneas (AIMD).
+
+    O limite cresce de forma aditiva (cerca de +1 a cada `limit` respostas
+    boas) e cai pela metade quando a taxa de erros (média móvel exponencial)
+    passa de `error_threshold` ou a latência média passa de `latency_target`.
+    Cada redução só acontece depois de uma janela de `limit` respostas desde a
+    anterior, para que uma rajada de erros simultâneos conte como um único
+    sinal.
+
+    Args:
+        max_limit: Limite máximo (e inicial)
+        min_limit: Limite mínimo
+        latency_target: Latência média (s) acima da qual o limite é reduzido
+        error_threshold: Taxa de erros acima da qual o limite é reduzido
+    """
+
+    SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        latency_target: float = 2.0,
+        error_threshold: float = 0.1,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.latency_target = latency_target
+        self.error_threshold = error_threshold
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.decreases = 0
+        # A primeira redução não espera uma janela inteira
+        self._since_decrease = self.max_limit
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+
+    @property
+    def capacity(self) -> int:
+        """Requisições simultâneas permitidas agora."""
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self) -> None:
+        """Aguarda uma vaga dentro do limite atual."""
+        while self.in_flight >= self.capacity:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, latency: float, error: bool) -> None:
+        """Libera a vaga e ajusta o limite pela latência e pelo resultado da requisição."""
+        self.in_flight -= 1
+        self._observe(latency, error)
+        for waiter in list(self._waiters)[: max(0, self.capacity - self.in_flight)]:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _observe(self, latency: float, error: bool) -> None:
+        alpha = self.SMOOTHING
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = (1 - alpha) * self.latency + alpha * latency
+        self.error_rate = (1 - alpha) * self.error_rate + alpha * (1.0 if error else 0.0)
+        self._since_decrease += 1
+
+        overloaded = self.error_rate > self.error_threshold or self.latency > self.latency_target
+        if not overloaded:
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        elif self._since_decrease >= self.limit:
+            self.limit = max(float(self.min_limit), self.limit / 2)
+            self._since_decrease = 0
+            self.decreases += 1
+            logger.info(
+                f"Concorrência reduzida para {self.capacity} "
+                f"(erros {self.error_rate:.0%}, latência {self.latency:.2f}s)"
+            )
+
+
+class FetchStats:
+    """
+    Contadores das requisições feitas por uma política.
+
+    Attributes:
+        requests: Requisições enviadas (inclui retentativas)
+        retries: Retentativas após erro de rede ou resposta 429/5xx
+        throttled: Respostas 429 (Too Many Requests)
+        failures: Requisições que falharam após todas as tentativas
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+        }
+
+
+class FetchPolicy:
+    """
+    Executa as requisições do crawler com limite de taxa, retentativas e AIMD.
+
+    Cada requisição aguarda um token do bucket do host e uma vaga no limite
+    adaptativo de concorrência. Erros de rede e respostas 429/5xx são
+    repetidos com backoff (respeitando Retry-After, que também suspende o
+    host); latência e erros observados ajustam a concorrência.
+
+    Args:
+        rate: Requisições por segundo por host (padrão: Conf.SCRAPING_RATE_LIMIT)
+        burst: Rajada do token bucket (padrão: Conf.SCRAPING_RATE_BURST)
+        retry: Política de espera (padrão: a partir das variáveis SCRAPING_RETRY_*)
+        limiter: Limite adaptativo (padrão: até `max_concurrency`)
+        max_concurrency: Teto do limite adaptativo (padrão: Conf.SCRAPING_MAX_CONCURRENCY)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        limiter: Optional[AimdLimiter] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.rate = Conf.SCRAPING_RATE_LIMIT if rate is None else rate
+        self.burst = Conf.SCRAPING_RATE_BURST if burst is None else burst
+        self.retry = retry or RetryPolicy(
+            Conf.SCRAPING_MAX_RETRIES, Conf.SCRAPING_RETRY_BASE_DELAY, Conf.SCRAPING_RETRY_MAX_DELAY
+        )
+        self.limiter = limiter or AimdLimiter(
+            max_concurrency or Conf.SCRAPING_MAX_CONCURRENCY,
+            Conf.SCRAPING_MIN_CONCURRENCY,
+            Conf.SCRAPING_LATENCY_TARGET,
+            Conf.SCRAPING_ERROR_THRESHOLD,
+        )
+        self.stats = FetchStats()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Token bucket do host (criado no primeiro uso)."""
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def get(
+        self, client: httpx.AsyncClient, url: str, headers: Optional[Mapping[str, str]] = None
+    ) -> httpx.Response:
+        """
+        Faz um GET aplicando a política.
+
+        Args:
+            client: Cliente HTTP assíncrono
+            url: URL buscada
+            headers: Cabeçalhos da requisição
+
+        Returns:
+            httpx.Response: Primeira resposta que não pede retentativa, ou a
+            última resposta 429/5xx quando as tentativas se esgotam
+
+        Raises:
+            httpx.RequestError: Erro de rede na última tentativa
+        """
+        bucket = self.bucket(httpx.URL(url).host)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            await self.limiter.acquire()
+            self.stats.requests += 1
+            started = time.monotonic()
+            response: Optional[httpx.Response] = None
+            retry_after: Optional[float] = None
+            try:
+                response = await client.get(url, headers=headers, follow_redirects=True)
+            except httpx.RequestError as e:
+                self.limiter.release(time.monotonic() - started, error=True)
+                if attempt >= self.retry.max_retries:
+                    self.stats.failures += 1
+                    raise
+                logger.warning(f"Erro de rede em {url} ({e}); nova tentativa")
+            except BaseException:
+                self.limiter.release(time.monotonic() - started, error=True)
+                raise
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                self.limiter.release(time.monotonic() - started, error=retryable)
+                if not retryable:
+                    return response
+                if response.status_code == 429:
+                    self.stats.throttled += 1
+                    THROTTLED.inc()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if attempt >= self.retry.max_retries:
+                    self.stats.failures += 1
+                    return response
+                logger.warning(f"{url} respondeu {response.status_code}; nova tentativa")
+
+            delay = self.retry.delay(attempt, retry_after)
+            if retry_after is not None:
+                # O servidor pediu uma pausa: vale para todas as requisições ao host
+                bucket.defer(delay)
+            self.stats.retries += 1
+            RETRIES.inc()
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -1,15 +1,27 @@
 import csv
 import logging
+import os
 import pathlib
 from typing import Any, Callable, Dict, List
 
 from .core import scrape_all_books
+from .locking import file_lock
 
 # Configuração do logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# Cabeçalhos do CSV, para garantir a ordem consistente das colunas
+CSV_HEADERS = [
+    "title",
+    "price",
+    "rating",
+    "availability",
+    "category",
+    "image_url",
+]
+
 
 def save_books_to_csv(
     output_file: pathlib.Path, books_data: List[Dict[str, Any]]
@@ -30,19 +42,9 @@ def save_books_to_csv(
         logging.warning("Nenhum dado disponível para salvar.")
         return False
 
-    # Define os cabeçalhos para garantir a ordem consistente das colunas
-    headers = [
-        "title",
-        "price",
-        "rating",
-        "availability",
-        "category",
-        "image_url",
-    ]
-
     try:
         with open(output_file, "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
             writer.writeheader()
             writer.writerows(books_data)
         logging.info(f"Dados salvos com sucesso no arquivo {output_file}")
@@ -52,6 +54,121 @@ def save_books_to_csv(
         return False
 
 
+def append_books_to_csv(
+    output_file: pathlib.Path, books_data: List[Dict[str, Any]]
+) -> bool:
+    """Acrescenta livros ao final de um CSV (criado com cabeçalho se não existir).
+
+    Usado pela gravação em streaming da coleta completa: cada lote é escrito
+    sem reler o arquivo.
+
+    Args:
+        output_file: Caminho do arquivo CSV
+        books_data: Lista de dicionários com os livros do lote
+
+    Returns:
+        bool: True se os dados foram salvos com sucesso, False caso contrário
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with file_lock(output_file), open(
+            output_file, "a", newline="", encoding="utf-8"
+        ) as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
+            if csvfile.tell() == 0:
+                writer.writeheader()
+            writer.writerows(books_data)
+        return True
+    except IOError as e:
+        logging.error(f"Erro ao salvar o arquivo: {e}")
+        return False
+
+
+def merge_books_into_csv(
+    output_file: pathlib.Path, books_data: List[Dict[str, Any]]
+) -> bool:
+    """Atualiza um CSV existente apenas com os livros informados.
+
+    As linhas existentes são substituídas pelo título e os livros novos são
+    adicionados ao final. O arquivo inteiro é lido e reescrito a cada chamada;
+    para aplicar as alterações de um job de uma vez, ver `merge_changes_into_csv`.
+
+    Args:
+        output_file: Caminho do arquivo CSV
+        books_data: Lista de dicionários com os livros novos ou alterados
+
+    Returns:
+        bool: True se os dados foram salvos com sucesso, False caso contrário
+    """
+    # Os shards de um job atualizam o mesmo arquivo em processos diferentes
+    with file_lock(output_file):
+        rows: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(output_file, newline="", encoding="utf-8") as csvfile:
+                for row in csv.DictReader(csvfile):
+                    rows[row["title"]] = row
+        except FileNotFoundError:
+            pass
+        except (IOError, KeyError, csv.Error) as e:
+            logging.error(f"Erro ao ler o arquivo {output_file}: {e}")
+            return False
+
+        for book in books_data:
+            rows[book["title"]] = book
+        return save_books_to_csv(output_file, list(rows.values()))
+
+
+def merge_changes_into_csv(output_file: pathlib.Path, changes_file: pathlib.Path) -> bool:
+    """Aplica ao CSV os livros acumulados em `changes_file` e remove esse arquivo.
+
+    Os shards de um job incremental (ou reexecutados) acrescentam os livros
+    alterados a `changes_file` durante a coleta (`append_books_to_csv`); no
+    encerramento do job o CSV é percorrido uma única vez, substituindo as
+    linhas pelo título e adicionando os livros novos ao final. Só as
+    alterações ficam em memória; o CSV é reescrito em um arquivo temporário
+    que substitui o original atomicamente.
+
+    Args:
+        output_file: Caminho do arquivo CSV
+        changes_file: CSV com os livros novos ou alterados (pode não existir)
+
+    Returns:
+        bool: True se as alterações foram aplicadas (ou não havia alterações),
+        False caso contrário
+    """
+    try:
+        with file_lock(changes_file), open(changes_file, newline="", encoding="utf-8") as f:
+            changes = {row["title"]: row for row in csv.DictReader(f)}
+    except FileNotFoundError:
+        return True
+    except (IOError, KeyError, csv.Error) as e:
+        logging.error(f"Erro ao ler o arquivo {changes_file}: {e}")
+        return False
+
+    temp_file = output_file.with_name(f".{output_file.name}.tmp")
+    with file_lock(output_file):
+        try:
+            with open(temp_file, "w", newline="", encoding="utf-8") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
+                writer.writeheader()
+                try:
+                    with open(output_file, newline="", encoding="utf-8") as current:
+                        for row in csv.DictReader(current):
+                            writer.writerow(changes.pop(row["title"], row))
+                except FileNotFoundError:
+                    pass
+                writer.writerows(changes.values())
+            os.replace(temp_file, output_file)
+        except (IOError, KeyError, ValueError, csv.Error) as e:
+            logging.error(f"Erro ao atualizar o arquivo {output_file}: {e}")
+            temp_file.unlink(missing_ok=True)
+            return False
+
+    changes_file.unlink(missing_ok=True)
+    logging.info(f"Alterações de {changes_file} aplicadas em {output_file}")
+    return True
+
+
 def update_books_data(
     output_file: pathlib.Path,
     scraper_function: Callable[[], List[Dict[str, Any]]] = scrape_all_books,
@@ -0,0 +1,33 @@
+"""Lock entre processos para os arquivos compartilhados pelos workers de scraping."""
+
+import contextlib
+import pathlib
+import sys
+from typing import Iterator
+
+if sys.platform != "win32":
+    import fcntl
+
+
+@contextlib.contextmanager
+def file_lock(path: pathlib.Path) -> Iterator[None]:
+    """
+    Bloqueia `path` (via `<path>.lock`) enquanto o bloco é executado.
+
+    Os shards de um job rodam em processos diferentes e gravam o mesmo CSV e o
+    mesmo cache de validadores; o lock serializa a leitura e a regravação.
+
+    Args:
+        path: Arquivo protegido
+    """
+    path = pathlib.Path(path)
+    if sys.platform == "win32":  # sem flock; um único worker por máquina
+        yield
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(path.name + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
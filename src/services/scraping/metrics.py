@@ -0,0 +1,34 @@
+"""Métricas do pipeline de scraping (expostas em /metrics)."""
+
+from src.services.metrics import REGISTRY
+
+# Limites (s) do parsing de uma página: de 0,5 ms a 1 s
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Limites (s) da gravação de um lote de livros
+WRITE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PAGES_FETCHED = REGISTRY.counter(
+    "scraping_pages_fetched_total",
+    "Páginas buscadas pelo crawler, por resultado "
+    "(ok, not_modified, unchanged, http_error, network_error)",
+    ["result"],
+)
+PARSE_DURATION = REGISTRY.histogram(
+    "scraping_parse_duration_seconds",
+    "Tempo de parsing de uma página (catálogo ou livro), incluindo a espera pelo pool",
+    ["page"],
+    buckets=PARSE_BUCKETS,
+)
+RETRIES = REGISTRY.counter(
+    "scraping_retries_total", "Retentativas após erro de rede ou resposta 429/5xx"
+)
+THROTTLED = REGISTRY.counter("scraping_throttled_total", "Respostas 429 (Too Many Requests)")
+BOOKS_SCRAPED = REGISTRY.counter("scraping_books_scraped_total", "Livros coletados e gravados")
+BOOKS_UPSERTED = REGISTRY.counter(
+    "scraping_books_upserted_total", "Livros inseridos ou atualizados no banco"
+)
+WRITE_DURATION = REGISTRY.histogram(
+    "scraping_write_duration_seconds",
+    "Tempo de gravação de um lote de livros (banco e CSV)",
+    buckets=WRITE_BUCKETS,
+)
@@ -0,0 +1,198 @@
+"""Pipeline de scraping em streaming: os livros analisados seguem em lotes para o banco e o CSV."""
+
+import asyncio
+import contextlib
+import pathlib
+import time
+from concurrent.futures import Executor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional
+from urllib.parse import urljoin
+
+import httpx
+from sqlalchemy.orm import Session
+
+from src.conf import Conf
+from src.services.catalog import upsert_books
+
+from .cache import ValidatorCache
+from .core import BASE_URL, CrawlEngine, build_client, create_parse_executor
+from .fetch_policy import FetchPolicy
+from .file_handler import append_books_to_csv
+from .metrics import BOOKS_SCRAPED, BOOKS_UPSERTED, WRITE_DURATION
+
+
+async def stream_books(
+    start_url: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    cache: Optional[ValidatorCache] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    max_concurrency: Optional[int] = None,
+    parse_workers: Optional[int] = None,
+    buffer_size: Optional[int] = None,
+    policy: Optional[FetchPolicy] = None,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Coleta os livros entregando cada um assim que é analisado.
+
+    Equivalente a `scrape_all_books_async`, mas sem acumular a lista de
+    livros (ver `CrawlEngine.stream`).
+
+    Args:
+        start_url: URL da primeira página do catálogo
+            (padrão: catalogue/page-1.html)
+        max_pages: Máximo de páginas de listagem a partir de `start_url`
+        cache: Cache de validadores HTTP para coleta incremental (opcional)
+        client: Cliente HTTP a ser reutilizado (padrão: criado por `build_client`)
+        max_concurrency: Limite de requisições simultâneas
+            (padrão: Conf.SCRAPING_MAX_CONCURRENCY)
+        parse_workers: Processos dedicados ao parsing
+            (padrão: Conf.SCRAPING_PARSE_WORKERS)
+        buffer_size: Livros analisados aguardando a gravação
+            (padrão: Conf.SCRAPING_WRITE_BATCH_SIZE)
+        policy: Política de requisições (padrão: criada a partir de `Conf`)
+        executor: Pool de parsing reaproveitado (padrão: um pool criado e
+            encerrado nesta coleta, ver `create_parse_executor`)
+
+    Yields:
+        Dicionário com os detalhes de cada livro
+    """
+    start_url = start_url or urljoin(BASE_URL, "catalogue/page-1.html")
+    buffer_size = buffer_size or Conf.SCRAPING_WRITE_BATCH_SIZE
+    owned = executor is None
+    if owned:
+        executor = create_parse_executor(parse_workers)
+
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            if client is None:
+                client = await stack.enter_async_context(build_client(max_concurrency))
+            engine = CrawlEngine(
+                client, max_concurrency, executor, parse_workers, cache, policy
+            )
+            async for book in engine.stream(start_url, max_pages, buffer_size):
+                yield book
+    finally:
+        if owned and executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BookWriter:
+    """Grava em lotes os livros recebidos do crawler.
+
+    Cada lote é gravado no banco (upsert), acrescentado ao CSV e somado ao
+    progresso do job (`on_batch`). O upsert incrementa a geração do catálogo no banco, o que
+    invalida o cache de respostas da API: os livros ficam visíveis enquanto
+    a coleta continua. Com `cache`, os validadores HTTP das páginas do lote
+    são confirmados quando todos os livros do lote foram gravados; senão
+    ficam pendentes e essas páginas são buscadas de novo na próxima coleta.
+
+    Attributes:
+        db: Sessão do banco de dados (usada apenas pela gravação)
+        csv_file: CSV ao qual cada lote é acrescentado, sem reler o arquivo (o
+            CSV da coleta completa ou o arquivo de alterações do job, ver
+            `merge_changes_into_csv`)
+        on_batch: Chamado com (livros coletados, livros salvos) de cada lote
+        cache: Cache de validadores da coleta (opcional; ver `ValidatorCache.confirm`)
+        books_scraped: Livros recebidos até agora
+        books_saved: Livros gravados no banco até agora
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        csv_file: pathlib.Path,
+        on_batch: Optional[Callable[[int, int], None]] = None,
+        cache: Optional[ValidatorCache] = None,
+    ):
+        self.db = db
+        self.csv_file = csv_file
+        self.on_batch = on_batch
+        self.cache = cache
+        self.books_scraped = 0
+        self.books_saved = 0
+
+    def write(self, books_data: List[Dict[str, Any]]) -> int:
+        """Grava um lote de livros.
+
+        Args:
+            books_data: Livros do lote
+
+        Returns:
+            Número de livros salvos no banco
+        """
+        start = time.perf_counter()
+        saved = upsert_books(self.db, books_data)
+        titles = {book["title"] for book in books_data}
+        if self.cache is not None and saved == len(titles):
+            self.cache.confirm(titles)
+        append_books_to_csv(self.csv_file, books_data)
+        WRITE_DURATION.observe(time.perf_counter() - start)
+        BOOKS_SCRAPED.inc(len(books_data))
+        BOOKS_UPSERTED.inc(saved)
+
+        self.books_scraped += len(books_data)
+        self.books_saved += saved
+        if self.on_batch is not None:
+            self.on_batch(len(books_data), saved)
+        return saved
+
+
+async def write_books(
+    books: AsyncIterable[Dict[str, Any]], writer: BookWriter, batch_size: Optional[int] = None
+) -> BookWriter:
+    """Consome os livros do crawler gravando-os em lotes.
+
+    A gravação de cada lote roda em uma thread, fora do event loop, enquanto
+    o crawling continua até encher a fila de `stream_books`; a memória usada
+    depende apenas do tamanho do lote.
+
+    Args:
+        books: Livros entregues pelo crawler (ver `stream_books`)
+        writer: Destino dos lotes
+        batch_size: Livros por lote (padrão: Conf.SCRAPING_WRITE_BATCH_SIZE)
+
+    Returns:
+        O próprio `writer`, com os totais gravados
+    """
+    batch_size = batch_size or Conf.SCRAPING_WRITE_BATCH_SIZE
+    batch: List[Dict[str, Any]] = []
+    async for book in books:
+        batch.append(book)
+        if len(batch) >= batch_size:
+            await asyncio.to_thread(writer.write, batch)
+            batch = []
+    if batch:
+        await asyncio.to_thread(writer.write, batch)
+    return writer
+
+
+def scrape_to_db(
+    writer: BookWriter,
+    start_url: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    cache: Optional[ValidatorCache] = None,
+    policy: Optional[FetchPolicy] = None,
+    executor: Optional[Executor] = None,
+) -> BookWriter:
+    """Wrapper síncrono: coleta a partir de `start_url` gravando os livros com `writer`.
+
+    Args:
+        writer: Destino dos lotes
+        start_url: Primeira página de listagem (padrão: catalogue/page-1.html)
+        max_pages: Máximo de páginas de listagem (padrão: até a última)
+        cache: Cache de validadores HTTP para coleta incremental (opcional)
+        policy: Política de requisições; os contadores de retentativas ficam
+            em `policy.stats` (padrão: criada a partir de `Conf`)
+        executor: Pool de parsing reaproveitado (padrão: um pool por coleta)
+
+    Returns:
+        O próprio `writer`, com os totais gravados
+    """
+    books = stream_books(
+        start_url=start_url,
+        max_pages=max_pages,
+        cache=cache,
+        policy=policy,
+        executor=executor,
+    )
+    return asyncio.run(write_books(books, writer))
@@ -0,0 +1,486 @@
+"""Fila durável dos jobs de scraping sobre as tabelas `scraping_jobs` e `scraping_shards`."""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union, cast
+
+from sqlalchemy import case, exists, func, or_, select, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models.scraping_job import ScrapingJob, ScrapingShard
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "in_progress")
+
+LeasedModel = Union[Type[ScrapingJob], Type[ScrapingShard]]
+
+
+class LeaseLostError(Exception):
+    """A execução deixou de pertencer ao worker (lease vencido ou reivindicado por outro)."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _updated_rows(db: Session, stmt: Any) -> int:
+    """Executa um UPDATE e retorna o número de linhas afetadas."""
+    return cast(CursorResult, db.execute(stmt)).rowcount
+
+
+def _owned_by(model: LeasedModel, row_id: int, worker_id: Optional[str]) -> tuple:
+    """Critérios de uma linha em execução por `worker_id` com o lease em dia.
+
+    Sem `worker_id` (execução no próprio processo, sem lease) vale só o ID.
+    """
+    if worker_id is None:
+        return (model.id == row_id,)
+    return (
+        model.id == row_id,
+        model.worker_id == worker_id,
+        model.status == "in_progress",
+        model.lease_expires_at > _now(),
+    )
+
+
+def enqueue_job(
+    db: Union[Session, AsyncSession], full: bool = False, shard_by: Optional[str] = None
+) -> ScrapingJob:
+    """
+    Cria um job pendente, que será executado por um worker de scraping.
+
+    Args:
+        db: Sessão do banco de dados (síncrona ou assíncrona; só usa `add`)
+        full: Coleta completa, ignorando o cache de validadores HTTP
+        shard_by: Divisão em shards (padrão: Conf.SCRAPING_SHARD_BY)
+
+    Returns:
+        ScrapingJob: Job criado (ainda não gravado; o chamador faz o commit)
+    """
+    job = ScrapingJob(status="pending", full=full, shard_by=shard_by, started_at=_now())
+    db.add(job)
+    return job
+
+
+def _claim(db: Session, model: LeasedModel, worker_id: str, lease_seconds: float, *order_by: Any):
+    """Reivindica a linha pendente mais antiga de `model` (ver `claim_next_job`)."""
+    oldest_pending = (
+        select(model.id)
+        .where(model.status == "pending")
+        .order_by(*order_by)
+        .limit(1)
+        .scalar_subquery()
+    )
+    while True:
+        now = _now()
+        row_id = db.scalar(
+            update(model)
+            .where(model.id == oldest_pending, model.status == "pending")
+            .values(
+                status="in_progress",
+                worker_id=worker_id,
+                attempts=model.attempts + 1,
+                heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if row_id is not None:
+            return db.get(model, row_id, populate_existing=True)
+        if db.scalar(select(model.id).where(model.status == "pending").limit(1)) is None:
+            db.commit()
+            return None
+
+
+def claim_next_job(db: Session, worker_id: str, lease_seconds: float) -> Optional[ScrapingJob]:
+    """
+    Reivindica o job pendente mais antigo para `worker_id`, que o divide em shards.
+
+    A escolha e a troca de `pending` para `in_progress` são um único UPDATE
+    condicionado ao status, então dois workers nunca recebem o mesmo job (no
+    SQLite o comando já começa com o lock de escrita). Quem perde a disputa
+    no PostgreSQL não altera nenhuma linha e tenta o próximo job pendente.
+
+    Args:
+        db: Sessão do banco de dados
+        worker_id: Identificação do worker
+        lease_seconds: Duração do lease; o worker deve renová-lo antes do fim
+
+    Returns:
+        ScrapingJob: Job reivindicado, ou None se a fila estiver vazia
+    """
+    job = _claim(db, ScrapingJob, worker_id, lease_seconds, ScrapingJob.id)
+    if job is not None:
+        logger.info(f"Job {job.id} reivindicado por {worker_id}")
+    return job
+
+
+def claim_next_shard(db: Session, worker_id: str, lease_seconds: float) -> Optional[ScrapingShard]:
+    """
+    Reivindica o próximo shard pendente (do job mais antigo) para `worker_id`.
+
+    Segue as mesmas regras de `claim_next_job`; shards de um mesmo job podem
+    ser executados em paralelo por workers diferentes.
+
+    Args:
+        db: Sessão do banco de dados
+        worker_id: Identificação do worker
+        lease_seconds: Duração do lease; o worker deve renová-lo antes do fim
+
+    Returns:
+        ScrapingShard: Shard reivindicado, ou None se não houver shards pendentes
+    """
+    shard = _claim(
+        db, ScrapingShard, worker_id, lease_seconds, ScrapingShard.job_id, ScrapingShard.position
+    )
+    if shard is not None:
+        logger.info(f"Shard {shard.position} do job {shard.job_id} reivindicado por {worker_id}")
+    return shard
+
+
+def renew_lease(
+    db: Session,
+    row_id: int,
+    worker_id: str,
+    lease_seconds: float,
+    model: LeasedModel = ScrapingJob,
+) -> bool:
+    """
+    Renova o lease de um job ou shard em execução (heartbeat).
+
+    Args:
+        db: Sessão do banco de dados
+        row_id: ID do job ou do shard
+        worker_id: Worker que o reivindicou
+        lease_seconds: Nova duração do lease a partir de agora
+        model: ScrapingJob (padrão) ou ScrapingShard
+
+    Returns:
+        bool: False se a linha não pertence mais ao worker (lease vencido e
+        reivindicado por outro, ou execução já encerrada)
+    """
+    now = _now()
+    renewed = _updated_rows(
+        db,
+        update(model)
+        .where(model.id == row_id, model.worker_id == worker_id, model.status == "in_progress")
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False),
+    )
+    db.commit()
+    return bool(renewed)
+
+
+def _recover(db: Session, model: LeasedModel, max_attempts: int, *criteria: Any) -> Tuple[int, int]:
+    """Reenfileira (ou encerra com erro) as linhas `in_progress` com lease vencido."""
+    now = _now()
+    stale = (
+        model.status == "in_progress",
+        or_(model.lease_expires_at.is_(None), model.lease_expires_at < now),
+        *criteria,
+    )
+    requeued = _updated_rows(
+        db,
+        update(model)
+        .where(*stale, model.attempts < max_attempts)
+        .values(status="pending", worker_id=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False),
+    )
+    failed = _updated_rows(
+        db,
+        update(model)
+        .where(*stale, model.attempts >= max_attempts)
+        .values(
+            status="error",
+            error_message=f"Worker interrompido em {max_attempts} tentativas",
+            completed_at=now,
+            lease_expires_at=None,
+        )
+        .execution_options(synchronize_session=False),
+    )
+    return requeued, failed
+
+
+def recover_stale_jobs(db: Session, max_attempts: int) -> int:
+    """
+    Devolve à fila os jobs e shards cujo worker parou de renovar o lease.
+
+    Jobs sem lease (iniciados por versões que executavam o scraping dentro da
+    API) também são considerados abandonados; jobs já divididos em shards não
+    têm lease próprio e são recuperados shard a shard. Execuções já iniciadas
+    `max_attempts` vezes são encerradas com erro em vez de voltar à fila.
+
+    Args:
+        db: Sessão do banco de dados
+        max_attempts: Máximo de execuções de um mesmo job ou shard
+
+    Returns:
+        int: Número de jobs e shards recuperados (reenfileirados ou encerrados)
+    """
+    has_shards = exists().where(ScrapingShard.job_id == ScrapingJob.id)
+    jobs_requeued, jobs_failed = _recover(db, ScrapingJob, max_attempts, ~has_shards)
+    shards_requeued, shards_failed = _recover(db, ScrapingShard, max_attempts)
+    db.commit()
+    requeued = jobs_requeued + shards_requeued
+    failed = jobs_failed + shards_failed
+    if requeued or failed:
+        logger.warning(
+            f"Execuções abandonadas: {requeued} reenfileiradas, {failed} encerradas com erro"
+        )
+    return requeued + failed
+
+
+def add_shards(db: Session, job: ScrapingJob, shards: Sequence[Tuple[str, Optional[int]]]) -> None:
+    """
+    Grava os shards planejados de um job e libera o lease do planejamento.
+
+    Args:
+        db: Sessão do banco de dados
+        job: Job reivindicado pelo worker que o planejou
+        shards: Pares (URL inicial, máximo de páginas), na ordem de execução
+    """
+    for position, (start_url, max_pages) in enumerate(shards):
+        db.add(
+            ScrapingShard(
+                job_id=job.id, position=position, start_url=start_url, max_pages=max_pages
+            )
+        )
+    # Daqui em diante o progresso (e a recuperação) é acompanhado pelos shards
+    job.worker_id = None
+    job.lease_expires_at = None
+    db.commit()
+
+
+def _shard_total(job_id: int, column: Any):
+    """Soma de um contador sobre os shards do job."""
+    return (
+        select(func.coalesce(func.sum(column), 0))
+        .where(ScrapingShard.job_id == job_id)
+        .scalar_subquery()
+    )
+
+
+def update_shard(db: Session, shard_id: int, worker_id: Optional[str], **values: Any) -> bool:
+    """
+    Atualiza um shard em execução, se ele ainda pertence ao worker.
+
+    O UPDATE é condicionado ao `worker_id` e ao lease em dia: um worker que
+    perdeu o lease (e cujo shard pode já ter sido reivindicado por outro)
+    não sobrescreve o estado gravado pelo novo dono.
+
+    Args:
+        db: Sessão do banco de dados
+        shard_id: ID do shard
+        worker_id: Worker que o reivindicou (None: execução sem lease)
+        **values: Colunas atualizadas
+
+    Returns:
+        bool: False se o shard não pertence mais ao worker (nada é gravado)
+    """
+    updated = _updated_rows(
+        db,
+        update(ScrapingShard)
+        .where(*_owned_by(ScrapingShard, shard_id, worker_id))
+        .values(**values)
+        .execution_options(synchronize_session=False),
+    )
+    if not updated:
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+def record_progress(
+    db: Session,
+    shard_id: int,
+    job_id: int,
+    scraped: int,
+    saved: int,
+    worker_id: Optional[str] = None,
+) -> bool:
+    """
+    Soma um lote gravado aos contadores do shard e atualiza os totais do job.
+
+    Chamado a cada lote da gravação em streaming: `books_scraped` e
+    `books_saved` do shard e do job acompanham a coleta enquanto ela acontece.
+
+    Args:
+        db: Sessão do banco de dados
+        shard_id: ID do shard em execução
+        job_id: ID do job do shard
+        scraped: Livros coletados no lote
+        saved: Livros gravados no banco no lote
+        worker_id: Worker que reivindicou o shard (ver `update_shard`)
+
+    Returns:
+        bool: False se o shard não pertence mais ao worker (nada é gravado)
+    """
+    updated = _updated_rows(
+        db,
+        update(ScrapingShard)
+        .where(*_owned_by(ScrapingShard, shard_id, worker_id))
+        .values(
+            books_scraped=func.coalesce(ScrapingShard.books_scraped, 0) + scraped,
+            books_saved=func.coalesce(ScrapingShard.books_saved, 0) + saved,
+        )
+        .execution_options(synchronize_session=False),
+    )
+    if not updated:
+        db.rollback()
+        return False
+    db.execute(
+        update(ScrapingJob)
+        .where(ScrapingJob.id == job_id)
+        .values(
+            books_scraped=_shard_total(job_id, ScrapingShard.books_scraped),
+            books_saved=_shard_total(job_id, ScrapingShard.books_saved),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return True
+
+
+def _job_shards(job_id: Any):
+    return select(ScrapingShard.id).where(ScrapingShard.job_id == job_id)
+
+
+def _finishable(job_id: Any) -> tuple:
+    """Critérios de um job pronto para encerrar: tem shards e nenhum está ativo."""
+    shards = _job_shards(job_id)
+    return (
+        exists(shards),
+        ~exists(shards.where(ScrapingShard.status.in_(ACTIVE_STATUSES))),
+    )
+
+
+def finishable_jobs(db: Session) -> List[int]:
+    """IDs dos jobs `in_progress` cujos shards já terminaram."""
+    return list(
+        db.scalars(
+            select(ScrapingJob.id).where(
+                ScrapingJob.status == "in_progress", *_finishable(ScrapingJob.id)
+            )
+        )
+    )
+
+
+def finish_job(db: Session, job_id: int) -> Optional[str]:
+    """
+    Encerra o job se todos os seus shards terminaram.
+
+    Um único UPDATE, condicionado a não haver shards pendentes ou em
+    execução, soma os contadores dos shards e define o status (`error` se
+    algum shard falhou). Se vários workers terminam shards ao mesmo tempo,
+    apenas um deles encerra o job.
+
+    Args:
+        db: Sessão do banco de dados
+        job_id: ID do job
+
+    Returns:
+        str: Novo status do job ("completed" ou "error") se esta chamada o
+        encerrou; None se ainda há shards ativos ou o job já estava encerrado
+    """
+
+    failed_shards = (
+        select(func.count())
+        .select_from(ScrapingShard)
+        .where(ScrapingShard.job_id == job_id, ScrapingShard.status == "error")
+        .scalar_subquery()
+    )
+    status = db.scalar(
+        update(ScrapingJob)
+        .where(ScrapingJob.id == job_id, ScrapingJob.status == "in_progress", *_finishable(job_id))
+        .values(
+            status=case((failed_shards > 0, "error"), else_="completed"),
+            error_message=case(
+                (failed_shards > 0, "Shards com erro; reenvie o job para retomá-lo"),
+                else_=None,
+            ),
+            completed_at=_now(),
+            books_scraped=_shard_total(job_id, ScrapingShard.books_scraped),
+            books_saved=_shard_total(job_id, ScrapingShard.books_saved),
+            pages_fetched=_shard_total(job_id, ScrapingShard.pages_fetched),
+            pages_not_modified=_shard_total(job_id, ScrapingShard.pages_not_modified),
+            pages_changed=_shard_total(job_id, ScrapingShard.pages_changed),
+            retries=_shard_total(job_id, ScrapingShard.retries),
+            throttled=_shard_total(job_id, ScrapingShard.throttled),
+        )
+        .returning(ScrapingJob.status)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if status is not None:
+        logger.info(f"Job {job_id} encerrado: {status}")
+    return status
+
+
+def resume_job(db: Session, job_id: int) -> bool:
+    """
+    Retoma um job encerrado com erro a partir dos shards não concluídos.
+
+    Os shards concluídos (e os livros que já gravaram) são mantidos; os
+    demais voltam para a fila com as tentativas zeradas.
+
+    Args:
+        db: Sessão do banco de dados
+        job_id: ID do job
+
+    Returns:
+        bool: True se o job foi retomado; False se não está com erro ou não
+        tem shards a retomar
+    """
+    reopened = _updated_rows(
+        db,
+        update(ScrapingJob)
+        .where(
+            ScrapingJob.id == job_id,
+            ScrapingJob.status == "error",
+            exists(_job_shards(job_id).where(ScrapingShard.status != "completed")),
+        )
+        .values(status="in_progress", error_message=None, completed_at=None)
+        .execution_options(synchronize_session=False),
+    )
+    if not reopened:
+        db.rollback()
+        return False
+    resumed = _updated_rows(
+        db,
+        update(ScrapingShard)
+        .where(ScrapingShard.job_id == job_id, ScrapingShard.status != "completed")
+        .values(
+            status="pending",
+            worker_id=None,
+            attempts=0,
+            lease_expires_at=None,
+            completed_at=None,
+            error_message=None,
+        )
+        .execution_options(synchronize_session=False),
+    )
+    db.commit()
+    logger.info(f"Job {job_id} retomado: {resumed} shards reenfileirados")
+    return True
+
+
+def shard_progress(shards: Sequence[ScrapingShard]) -> Dict[str, Any]:
+    """
+    Resume o progresso de um job a partir dos seus shards.
+
+    Args:
+        shards: Shards do job, na ordem de `position`
+
+    Returns:
+        dict: Total de shards e contagem por status
+    """
+    progress = {"total": len(shards), "pending": 0, "in_progress": 0, "completed": 0, "error": 0}
+    for shard in shards:
+        progress[shard.status] = progress.get(shard.status, 0) + 1
+    return progress
@@ -0,0 +1,104 @@
+"""Divisão dos jobs de scraping em shards (faixas de páginas do catálogo ou categorias)."""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+from src.conf import Conf
+
+from .core import BASE_URL, build_client, fetch_page, parse_category_links, parse_page_count
+from .fetch_policy import FetchPolicy
+
+logger = logging.getLogger(__name__)
+
+SHARD_STRATEGIES = ("none", "pages", "category")
+
+# (URL inicial, máximo de páginas de listagem; None = até a última)
+Shard = Tuple[str, Optional[int]]
+
+
+def catalogue_page_url(page: int) -> str:
+    """URL de uma página do catálogo completo."""
+    return urljoin(BASE_URL, f"catalogue/page-{page}.html")
+
+
+def page_range_shards(page_count: int, pages_per_shard: int) -> List[Shard]:
+    """
+    Divide as páginas do catálogo em faixas consecutivas.
+
+    Args:
+        page_count: Número de páginas do catálogo
+        pages_per_shard: Páginas por shard (a última faixa pode ser menor)
+
+    Returns:
+        list: Shards (URL da primeira página da faixa, páginas da faixa)
+    """
+    pages_per_shard = max(1, pages_per_shard)
+    return [
+        (catalogue_page_url(first), min(pages_per_shard, page_count - first + 1))
+        for first in range(1, page_count + 1, pages_per_shard)
+    ]
+
+
+async def plan_shards_async(
+    shard_by: Optional[str] = None,
+    pages_per_shard: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Shard]:
+    """
+    Planeja os shards de um job a partir da primeira página do site.
+
+    - "none": um único shard com o catálogo inteiro;
+    - "pages": faixas de `pages_per_shard` páginas do catálogo, a partir da
+      paginação ("Page 1 of N") da primeira página;
+    - "category": a listagem de cada categoria do menu lateral.
+
+    Se a página não puder ser buscada ou analisada, o job é executado como um
+    único shard.
+
+    Args:
+        shard_by: Estratégia de divisão (padrão: Conf.SCRAPING_SHARD_BY)
+        pages_per_shard: Páginas por shard em "pages" (padrão: Conf.SCRAPING_SHARD_PAGES)
+        client: Cliente HTTP a ser reutilizado (padrão: criado por `build_client`)
+
+    Returns:
+        list: Shards na ordem de execução
+
+    Raises:
+        ValueError: Se a estratégia não for conhecida
+    """
+    shard_by = shard_by or Conf.SCRAPING_SHARD_BY
+    if shard_by not in SHARD_STRATEGIES:
+        raise ValueError(f"Divisão em shards desconhecida: {shard_by}")
+    single: List[Shard] = [(catalogue_page_url(1), None)]
+    if shard_by == "none":
+        return single
+
+    if client is None:
+        async with build_client() as client:
+            return await plan_shards_async(shard_by, pages_per_shard, client)
+
+    policy = FetchPolicy()
+    if shard_by == "pages":
+        html_content = await fetch_page(client, catalogue_page_url(1), policy=policy)
+        page_count = parse_page_count(html_content) if html_content else None
+        if page_count:
+            return page_range_shards(page_count, pages_per_shard or Conf.SCRAPING_SHARD_PAGES)
+    else:
+        html_content = await fetch_page(client, BASE_URL, policy=policy)
+        links = parse_category_links(html_content, BASE_URL) if html_content else []
+        if links:
+            return [(link, None) for link in links]
+
+    logger.warning(f"Não foi possível dividir o job por {shard_by}; usando um único shard")
+    return single
+
+
+def plan_shards(
+    shard_by: Optional[str] = None, pages_per_shard: Optional[int] = None
+) -> List[Shard]:
+    """Wrapper síncrono para `plan_shards_async`."""
+    return asyncio.run(plan_shards_async(shard_by, pages_per_shard))
@@ -0,0 +1,607 @@
+"""Worker dedicado que executa os jobs de scraping enfileirados pela API."""
+
+import argparse
+import logging
+import os
+import pathlib
+import signal
+import socket
+import threading
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.conf import Conf
+from src.models.book import Book
+from src.models.scraping_job import ScrapingJob, ScrapingShard
+from src.services.metrics import start_multiprocess
+from src.services.profiling import profile_phase, profile_session
+
+from .cache import ValidatorCache
+from .core import create_parse_executor
+from .fetch_policy import FetchPolicy
+from .file_handler import merge_changes_into_csv
+from .pipeline import BookWriter, scrape_to_db
+from .queue import (
+    LeasedModel,
+    LeaseLostError,
+    add_shards,
+    claim_next_job,
+    claim_next_shard,
+    finish_job,
+    finishable_jobs,
+    record_progress,
+    recover_stale_jobs,
+    renew_lease,
+    update_shard,
+)
+from .sharding import plan_shards
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """Identificação do worker: host e PID do processo."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def plan_job(job_id: int, full: bool = False) -> Optional[int]:
+    """
+    Divide um job em shards (ver `plan_shards`).
+
+    A coleta é incremental quando há validadores HTTP da última coleta e o
+    banco já tem livros; caso contrário (ou com `full`/`job.full`) o job é
+    marcado como completo, os shards ignoram o cache e o CSV é recriado.
+
+    Args:
+        job_id: ID do job de scraping reivindicado
+        full: Ignora o cache de validadores e coleta o catálogo inteiro
+
+    Returns:
+        int: Número de shards do job, ou None se o planejamento falhou
+    """
+    from src.extensions import SessionLocal
+
+    db = SessionLocal()
+
+    try:
+        job = db.get(ScrapingJob, job_id)
+        if not job:
+            logger.error(f"Job {job_id} não encontrado")
+            return None
+        if job.shards:
+            return len(job.shards)
+
+        # Atualiza status para in_progress (o worker já o fez ao reivindicar o job)
+        job.status = "in_progress"
+
+        cache = ValidatorCache.load(pathlib.Path(Conf.SCRAPING_CACHE_FILE))
+        incremental = (
+            not (full or job.full) and len(cache) > 0 and db.query(Book.id).first() is not None
+        )
+        job.full = not incremental
+        job.shard_by = job.shard_by or Conf.SCRAPING_SHARD_BY
+        shards = plan_shards(job.shard_by)
+
+        # Na coleta completa cada shard acrescenta os seus livros a um CSV novo
+        csv_file = pathlib.Path(Conf.SCRAPING_CSV_FILE)
+        if not incremental:
+            csv_file.unlink(missing_ok=True)
+        job.csv_file = str(csv_file)
+
+        add_shards(db, job, shards)
+        logger.info(f"Job {job_id} dividido em {len(shards)} shards ({job.shard_by})")
+        return len(shards)
+
+    except Exception as e:
+        logger.error(f"Erro ao planejar o job {job_id}: {e}")
+        try:
+            db.rollback()
+            job = db.get(ScrapingJob, job_id)
+            if job:
+                job.status = "error"
+                job.error_message = str(e)
+                job.completed_at = datetime.now(timezone.utc)
+                job.lease_expires_at = None
+                db.commit()
+        except Exception as update_error:
+            logger.error(f"Erro ao atualizar status do job {job_id}: {update_error}")
+        return None
+    finally:
+        db.close()
+
+
+def run_shard(
+    shard_id: int,
+    lease: Optional["LeaseHeartbeat"] = None,
+    executor: Optional[Executor] = None,
+) -> None:
+    """
+    Executa um shard de um job de scraping.
+
+    O shard percorre a sua faixa de páginas (ou a listagem da sua categoria)
+    gravando os livros no banco e no CSV em lotes, à medida que são
+    analisados, com `books_scraped`/`books_saved` do shard e do job
+    atualizados a cada lote. Ao terminar, grava os validadores HTTP no cache
+    e é marcado como concluído: é o checkpoint a partir do qual um job
+    interrompido é retomado. Na coleta incremental só os livros novos ou
+    alterados são analisados e salvos.
+
+    Com `lease`, o shard é abandonado assim que o lease é perdido (verificado
+    a cada lote), e as gravações do estado do shard só valem enquanto ele
+    pertence ao worker (ver `update_shard`): o novo dono não é sobrescrito.
+
+    As transações do shard começam com BEGIN IMMEDIATE
+    (`src.extensions.WriteSessionLocal`): o upsert e o checkpoint leem antes
+    de gravar, e o lock de escrita é obtido já no início. Nenhuma transação
+    fica aberta durante a coleta, entre um lote e outro.
+
+    Args:
+        shard_id: ID do shard
+        lease: Heartbeat do lease do shard (None: execução sem lease)
+        executor: Pool de parsing reaproveitado entre os shards (padrão: um
+            pool criado e encerrado neste shard)
+
+    Raises:
+        BrokenProcessPool: Se um processo de `executor` morreu; o shard é
+            registrado com erro e quem forneceu o pool deve substituí-lo
+    """
+    from src.extensions import WriteSessionLocal
+
+    db = WriteSessionLocal()
+    policy = FetchPolicy()
+    worker_id = lease.worker_id if lease is not None else None
+
+    try:
+        shard = db.get(ScrapingShard, shard_id)
+        if not shard:
+            logger.error(f"Shard {shard_id} não encontrado")
+            return
+        job_id = shard.job_id
+        label = f"Job {job_id}, shard {shard.position}"
+
+        # Um shard reexecutado já gravou parte dos livros no CSV: como na coleta
+        # incremental, os lotes vão para o arquivo de alterações do job, aplicado
+        # ao CSV uma única vez no encerramento (ver `close_job`)
+        incremental = not shard.job.full
+        csv_file = pathlib.Path(Conf.SCRAPING_CSV_FILE)
+        if incremental or shard.books_scraped:
+            csv_file = changes_file(job_id)
+        # Lidos antes do commit: recarregar o shard depois abriria uma transação
+        # (e, com BEGIN IMMEDIATE, seguraria o lock de escrita) durante a coleta
+        start_url, max_pages = shard.start_url, shard.max_pages
+
+        # Atualiza status para in_progress (o worker já o fez ao reivindicar o shard)
+        if not update_shard(
+            db, shard_id, worker_id, status="in_progress", books_scraped=0, books_saved=0
+        ):
+            raise LeaseLostError(f"{label}: o shard não pertence mais a {worker_id}")
+
+        logger.info(f"{label}: coletando a partir de {start_url}")
+
+        # Carrega os validadores HTTP da última coleta
+        cache = ValidatorCache.load(pathlib.Path(Conf.SCRAPING_CACHE_FILE))
+        if not incremental:
+            cache.clear()
+
+        def on_batch(scraped: int, saved: int) -> None:
+            # Interrompe a coleta (e as gravações) quando o lease é perdido
+            if (lease is not None and lease.lost) or not record_progress(
+                db, shard_id, job_id, scraped, saved, worker_id
+            ):
+                raise LeaseLostError(f"{label}: lease perdido por {worker_id}")
+
+        # Executa o scraping; os livros são gravados em lotes durante a coleta
+        writer = BookWriter(db, csv_file, on_batch=on_batch, cache=cache)
+        scrape_to_db(
+            writer,
+            start_url=start_url,
+            max_pages=max_pages,
+            cache=cache,
+            policy=policy,
+            executor=executor,
+        )
+
+        counters = {
+            "pages_fetched": cache.pages_fetched,
+            "pages_not_modified": cache.pages_not_modified,
+            "pages_changed": cache.pages_changed,
+            "retries": policy.stats.retries,
+            "throttled": policy.stats.throttled,
+        }
+
+        # Na coleta incremental nenhum livro significa que nada mudou
+        if not writer.books_scraped and not (incremental and cache.pages_fetched):
+            if update_shard(
+                db,
+                shard_id,
+                worker_id,
+                status="error",
+                error_message="Nenhum dado foi coletado durante o scraping",
+                completed_at=datetime.now(timezone.utc),
+                lease_expires_at=None,
+                **counters,
+            ):
+                logger.error(f"{label} falhou: nenhum dado coletado")
+            return
+
+        logger.info(
+            f"{label}: {writer.books_scraped} livros coletados "
+            f"({cache.pages_not_modified} páginas sem alteração)"
+        )
+
+        # Os validadores só são gravados depois que os dados foram persistidos
+        cache.save()
+
+        # Atualiza o shard como completo (checkpoint)
+        if not update_shard(
+            db,
+            shard_id,
+            worker_id,
+            status="completed",
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None,
+            **counters,
+        ):
+            raise LeaseLostError(f"{label}: lease perdido por {worker_id} ao concluir")
+
+        logger.info(f"{label} concluído com sucesso")
+
+    except LeaseLostError as e:
+        # O shard voltou para a fila ou já é de outro worker: nada mais é gravado nele
+        db.rollback()
+        logger.warning(f"{e}; shard abandonado")
+    except Exception as e:
+        logger.error(f"Erro durante o shard {shard_id}: {e}")
+        try:
+            db.rollback()
+            update_shard(
+                db,
+                shard_id,
+                worker_id,
+                status="error",
+                error_message=str(e),
+                completed_at=datetime.now(timezone.utc),
+                lease_expires_at=None,
+                retries=policy.stats.retries,
+                throttled=policy.stats.throttled,
+            )
+        except Exception as update_error:
+            logger.error(f"Erro ao atualizar status do shard {shard_id}: {update_error}")
+        if executor is not None and isinstance(e, BrokenProcessPool):
+            # O pool não aceita mais tarefas: quem o forneceu cria outro
+            raise
+    finally:
+        db.close()
+
+
+def changes_file(job_id: int) -> pathlib.Path:
+    """Arquivo em que os shards do job acumulam os livros a mesclar no CSV."""
+    csv_file = pathlib.Path(Conf.SCRAPING_CSV_FILE)
+    return csv_file.with_name(f"{csv_file.stem}.job-{job_id}{csv_file.suffix}")
+
+
+def finish_and_merge(db: Session, job_id: int) -> Optional[str]:
+    """
+    Encerra o job (ver `finish_job`) e aplica ao CSV os livros acumulados pelos shards.
+
+    Apenas quem encerra o job mescla o arquivo de alterações, uma vez por
+    execução do job (um job retomado volta a acumular alterações).
+
+    Args:
+        db: Sessão do banco de dados
+        job_id: ID do job
+
+    Returns:
+        str: Novo status do job se esta chamada o encerrou; None caso contrário
+    """
+    status = finish_job(db, job_id)
+    if status is not None:
+        merge_changes_into_csv(pathlib.Path(Conf.SCRAPING_CSV_FILE), changes_file(job_id))
+    return status
+
+
+def close_job(job_id: int) -> Optional[str]:
+    """Encerra o job se todos os shards terminaram (ver `finish_and_merge`)."""
+    from src.extensions import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return finish_and_merge(db, job_id)
+    finally:
+        db.close()
+
+
+def run_scraping_job(job_id: int, full: bool = False):
+    """
+    Executa um job de scraping inteiro no processo atual.
+
+    O job é dividido em shards, que são executados em sequência com o mesmo
+    pool de parsing; com vários workers (`ScrapingWorker`) os shards de um
+    job rodam em paralelo.
+
+    Dentro de um perfil (`profile_session`) o planejamento, cada shard e o
+    encerramento são medidos como fases separadas.
+
+    Args:
+        job_id: ID do job de scraping
+        full: Ignora o cache de validadores e coleta o catálogo inteiro
+    """
+    from src.extensions import SessionLocal
+
+    with profile_phase("plan"):
+        if plan_job(job_id, full) is None:
+            return
+
+    db = SessionLocal()
+    try:
+        shard_ids: Sequence[int] = db.scalars(
+            select(ScrapingShard.id)
+            .where(ScrapingShard.job_id == job_id, ScrapingShard.status == "pending")
+            .order_by(ScrapingShard.position)
+        ).all()
+    finally:
+        db.close()
+
+    executor = create_parse_executor()
+    try:
+        for shard_id in shard_ids:
+            with profile_phase(f"shard {shard_id}"):
+                try:
+                    run_shard(shard_id, executor=executor)
+                except BrokenProcessPool:
+                    # Um processo do pool morreu: os shards seguintes usam um pool novo
+                    if executor is not None:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                    executor = create_parse_executor()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    with profile_phase("close"):
+        close_job(job_id)
+
+
+class LeaseHeartbeat:
+    """
+    Renova o lease de um job ou shard em uma thread enquanto ele é executado.
+
+    A renovação acontece a cada terço do lease, em uma sessão própria. Se a
+    execução deixar de pertencer ao worker (lease vencido e reivindicado por
+    outro), `lost` passa a ser True e a renovação é interrompida.
+
+    Args:
+        job_id: ID do job (ou do shard) reivindicado
+        worker_id: Worker que reivindicou o job
+        lease_seconds: Duração do lease
+        model: ScrapingJob (padrão) ou ScrapingShard
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        worker_id: str,
+        lease_seconds: float,
+        model: LeasedModel = ScrapingJob,
+    ):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.model = model
+        self.label = f"{'Shard' if model is ScrapingShard else 'Job'} {job_id}"
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"heartbeat-{model.__tablename__}-{job_id}", daemon=True
+        )
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        from src.extensions import SessionLocal
+
+        while not self._stop.wait(self.lease_seconds / 3):
+            db = SessionLocal()
+            try:
+                if not renew_lease(
+                    db, self.job_id, self.worker_id, self.lease_seconds, self.model
+                ):
+                    self.lost = True
+                    logger.warning(f"{self.label}: lease perdido por {self.worker_id}")
+                    return
+            except Exception as e:
+                # Uma falha isolada não encerra o job; o lease só vence após `lease_seconds`
+                logger.error(f"{self.label}: erro ao renovar o lease: {e}")
+            finally:
+                db.close()
+
+
+class ScrapingWorker:
+    """
+    Consome a fila de jobs de scraping das tabelas `scraping_jobs` e `scraping_shards`.
+
+    A cada ciclo o worker devolve à fila os jobs e shards abandonados por
+    workers interrompidos, encerra os jobs cujos shards terminaram e executa
+    o próximo shard pendente, renovando o lease; sem shards pendentes, divide
+    o próximo job da fila em shards. Vários workers podem consumir a mesma
+    fila, executando os shards de um job em paralelo.
+
+    Args:
+        worker_id: Identificação do worker (padrão: host e PID)
+        poll_interval: Espera (s) entre consultas com a fila vazia
+        lease_seconds: Duração do lease dos jobs reivindicados
+        max_attempts: Máximo de execuções de um job abandonado
+        profile: Grava o perfil de cada ciclo que executa trabalho (ver `run_profiled`)
+
+    O pool de processos do parsing é criado no primeiro shard e reaproveitado
+    nos seguintes (ver `parse_executor`); `close` o encerra.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        profile: bool = False,
+    ):
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = (
+            Conf.SCRAPING_WORKER_POLL_INTERVAL if poll_interval is None else poll_interval
+        )
+        self.lease_seconds = lease_seconds or Conf.SCRAPING_JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or Conf.SCRAPING_JOB_MAX_ATTEMPTS
+        self.profile = profile
+        self.stopping = threading.Event()
+        self._executor: Optional[Executor] = None
+
+    def parse_executor(self) -> Optional[Executor]:
+        """
+        Pool de parsing do worker, criado na primeira chamada.
+
+        Os processos "spawn" do pool importam o parser ao iniciar; criá-los a
+        cada shard repetiria esse custo. Um pool quebrado (um processo morreu
+        durante o shard, `BrokenProcessPool`) é encerrado por `run_once` e
+        recriado aqui no shard seguinte.
+
+        Returns:
+            O pool, ou None se o parsing é feito no event loop
+            (SCRAPING_PARSE_WORKERS=0)
+        """
+        if self._executor is None:
+            self._executor = create_parse_executor()
+        return self._executor
+
+    def close(self) -> None:
+        """Encerra o pool de parsing (recriado se o worker executar outro shard)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def run_once(self) -> Optional[int]:
+        """
+        Executa um ciclo: recupera execuções abandonadas e executa um shard
+        pendente ou, sem shards pendentes, planeja o próximo job da fila.
+
+        Returns:
+            ID do job do shard executado (ou do job planejado), ou None se a
+            fila estava vazia
+        """
+        from src.extensions import SessionLocal
+
+        with profile_phase("claim"):
+            db = SessionLocal()
+            try:
+                recover_stale_jobs(db, self.max_attempts)
+                for finished_id in finishable_jobs(db):
+                    finish_and_merge(db, finished_id)
+                shard = claim_next_shard(db, self.worker_id, self.lease_seconds)
+                if shard is not None:
+                    shard_id, job_id = shard.id, shard.job_id
+                else:
+                    job = claim_next_job(db, self.worker_id, self.lease_seconds)
+                    if job is None:
+                        return None
+                    job_id, full = job.id, bool(job.full)
+            finally:
+                db.close()
+
+        if shard is None:
+            with LeaseHeartbeat(job_id, self.worker_id, self.lease_seconds):
+                with profile_phase("plan"):
+                    plan_job(job_id, full)
+            return job_id
+
+        with LeaseHeartbeat(
+            shard_id, self.worker_id, self.lease_seconds, ScrapingShard
+        ) as heartbeat:
+            with profile_phase(f"shard {shard_id}"):
+                try:
+                    run_shard(shard_id, heartbeat, self.parse_executor())
+                except BrokenProcessPool:
+                    # O shard ficou com erro; o próximo usa um pool novo
+                    self.close()
+        with profile_phase("close"):
+            close_job(job_id)
+        return job_id
+
+    def run_profiled(self) -> Optional[int]:
+        """
+        Executa um ciclo (`run_once`) gravando o seu perfil no ring buffer de perfis.
+
+        As fases do perfil são a reivindicação ("claim"), o planejamento do job
+        ou o shard executado e o encerramento do job. Ciclos com a fila vazia
+        não são gravados.
+
+        Returns:
+            ID do job do ciclo, ou None se a fila estava vazia
+        """
+        with profile_session("job", f"worker {self.worker_id}") as session:
+            job_id = self.run_once()
+            session.name = f"job {job_id}"
+            session.meta["job_id"] = job_id
+            session.discard = job_id is None
+        return job_id
+
+    def run(self) -> None:
+        """Executa ciclos até `stop` ser chamado (o job em andamento é concluído)."""
+        logger.info(f"Worker de scraping {self.worker_id} aguardando jobs")
+        try:
+            while not self.stopping.is_set():
+                try:
+                    job_id = self.run_profiled() if self.profile else self.run_once()
+                except Exception as e:
+                    logger.error(f"Erro no worker de scraping: {e}")
+                    job_id = None
+                if job_id is None:
+                    self.stopping.wait(self.poll_interval)
+        finally:
+            self.close()
+        logger.info(f"Worker de scraping {self.worker_id} encerrado")
+
+    def stop(self, *args) -> None:
+        """Pede o encerramento do worker após o job em andamento."""
+        self.stopping.set()
+
+
+def main() -> None:
+    """Executa o worker de scraping até receber SIGINT/SIGTERM."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--once", action="store_true", help="executa um ciclo e termina")
+    parser.add_argument("--poll-interval", type=float, default=None)
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="grava o perfil (CPU e SQL por fase) de cada ciclo em PROFILING_DIR",
+    )
+    args = parser.parse_args()
+
+    # Com METRICS_MULTIPROC_DIR as métricas do worker aparecem no /metrics da API
+    start_multiprocess()
+    worker = ScrapingWorker(poll_interval=args.poll_interval, profile=args.profile)
+    if args.once:
+        try:
+            if args.profile:
+                worker.run_profiled()
+            else:
+                worker.run_once()
+        finally:
+            worker.close()
+        return
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,19 @@
+from .engine import (
+    StatsKey,
+    apply_changes,
+    get_snapshot,
+    rebuild_stats,
+    refresh_snapshot,
+    stats_key,
+    update_stats,
+)
+
+__all__ = [
+    "StatsKey",
+    "apply_changes",
+    "get_snapshot",
+    "rebuild_stats",
+    "refresh_snapshot",
+    "stats_key",
+    "update_stats",
+]
@@ -0,0 +1,353 @@
+"""Estatísticas do catálogo mantidas de forma incremental."""
+
+import logging
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+
+from sqlalchemy import bindparam, case, delete, func, insert, update
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Query, Session
+
+from src.models.book import Book
+from src.models.stats import CategoryStats, PriceCount, StatsSnapshot
+
+logger = logging.getLogger(__name__)
+
+RATINGS = (1, 2, 3, 4, 5)
+PERCENTILES = (25, 50, 75, 90)
+CENT = Decimal("0.01")
+
+# Campos de um livro que entram nas estatísticas: (categoria, preço, nota, disponível)
+StatsKey = Tuple[str, Decimal, int, bool]
+
+
+def stats_key(category: str, price: Any, rating: int, availability: bool) -> StatsKey:
+    """Normaliza os campos de um livro usados nas estatísticas."""
+    return (category, Decimal(str(price)).quantize(CENT), int(rating), bool(availability))
+
+
+def _increment(
+    db: Session, model: Any, keys: Tuple[str, ...], rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Soma os deltas de `rows` às linhas de um agregado, criando as que faltam.
+
+    A soma é feita pelo banco (`coluna = coluna + delta`), então jobs
+    gravando ao mesmo tempo não perdem incrementos um do outro.
+    """
+    table = model.__table__
+    columns = [column for column in rows[0] if column not in keys]
+    dialect = db.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import (  # type: ignore[assignment]
+                insert as dialect_insert,
+            )
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[key] for key in keys],
+            set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+        )
+        db.execute(stmt, rows)
+        return
+
+    # Dialetos sem ON CONFLICT: UPDATE atômico e INSERT das linhas que não existiam
+    increment = (
+        update(table)
+        .where(*[table.c[key] == bindparam(f"k_{key}") for key in keys])
+        .values({column: table.c[column] + bindparam(column) for column in columns})
+    )
+    for row in rows:
+        params = {**row, **{f"k_{key}": row[key] for key in keys}}
+        if cast(CursorResult, db.execute(increment, params)).rowcount == 0:
+            db.execute(insert(table).values(row))
+
+
+def apply_changes(
+    db: Session, changes: Iterable[Tuple[Optional[StatsKey], Optional[StatsKey]]]
+) -> int:
+    """
+    Aplica aos agregados as alterações de livros feitas por um job de scraping.
+
+    Cada alteração é um par (antes, depois): None em "antes" é um livro novo e
+    None em "depois" um livro removido. A contribuição antiga é subtraída e a
+    nova somada com `INSERT ... ON CONFLICT DO UPDATE SET coluna = coluna +
+    delta`, sem varrer a tabela books nem ler os agregados antes de gravá-los;
+    as linhas que ficam sem livros são removidas.
+
+    Args:
+        db: Sessão do banco de dados (o commit fica a cargo de quem chama)
+        changes: Pares (antes, depois) com os campos de `stats_key`
+
+    Returns:
+        Número de livros cujas estatísticas mudaram
+    """
+    category_deltas: Dict[str, Dict[str, Union[Decimal, int]]] = {}
+    price_deltas: Counter = Counter()
+    applied = 0
+
+    for old, new in changes:
+        if old == new:
+            continue
+        applied += 1
+        for key, sign in ((old, -1), (new, 1)):
+            if key is None:
+                continue
+            category, price, rating, available = key
+            delta = category_deltas.setdefault(
+                category,
+                {
+                    "books": 0,
+                    "price_sum": Decimal(0),
+                    "available": 0,
+                    **{f"rating_{rating}": 0 for rating in RATINGS},
+                },
+            )
+            delta["books"] += sign
+            delta["price_sum"] += sign * price
+            delta["available"] += sign * int(available)
+            if rating in RATINGS:
+                delta[f"rating_{rating}"] += sign
+            price_deltas[(category, price)] += sign
+
+    if not applied:
+        return 0
+
+    _increment(
+        db,
+        CategoryStats,
+        ("category",),
+        [{"category": category, **delta} for category, delta in category_deltas.items()],
+    )
+    price_rows = [
+        {"category": category, "price": price, "books": value}
+        for (category, price), value in price_deltas.items()
+        if value
+    ]
+    if price_rows:
+        _increment(db, PriceCount, ("category", "price"), price_rows)
+
+    # Categorias e preços que ficaram sem livros
+    categories = list(category_deltas)
+    for table in (CategoryStats.__table__, PriceCount.__table__):
+        db.execute(delete(table).where(table.c.category.in_(categories), table.c.books <= 0))
+    logger.info(
+        f"Estatísticas atualizadas: {applied} livros alterados em "
+        f"{len(category_deltas)} categorias"
+    )
+    return applied
+
+
+def rebuild_stats(db: Session) -> None:
+    """Recalcula todos os agregados a partir da tabela books (varredura completa)."""
+    db.execute(delete(PriceCount))
+    db.execute(delete(CategoryStats))
+
+    aggregates: Query[Any] = db.query(
+        Book.category,
+        func.count(),
+        func.sum(Book.price),
+        func.sum(case((Book.availability, 1), else_=0)),
+        *[func.sum(case((Book.rating == rating, 1), else_=0)) for rating in RATINGS],
+    ).group_by(Book.category)
+    category_rows = [
+        {
+            "category": category,
+            "books": books,
+            "price_sum": price_sum,
+            "available": available,
+            **{f"rating_{rating}": count for rating, count in zip(RATINGS, histogram)},
+        }
+        for category, books, price_sum, available, *histogram in aggregates
+    ]
+    price_counts: Query[Any] = db.query(Book.category, Book.price, func.count()).group_by(
+        Book.category, Book.price
+    )
+    price_rows = [
+        {"category": category, "price": price, "books": books}
+        for category, price, books in price_counts
+    ]
+    if category_rows:
+        db.execute(insert(CategoryStats), category_rows)
+    if price_rows:
+        db.execute(insert(PriceCount), price_rows)
+
+
+def _percentile(histogram: List[Tuple[Decimal, int]], total: int, percentile: int) -> float:
+    """Percentil pelo método nearest-rank sobre um histograma ordenado por preço."""
+    rank = max(1, math.ceil(percentile / 100 * total))
+    seen = 0
+    for price, count in histogram:
+        seen += count
+        if seen >= rank:
+            return float(price)
+    return float(histogram[-1][0])
+
+
+def _price_summary(
+    histogram: List[Tuple[Decimal, int]], total: int, price_sum: Decimal
+) -> Dict[str, Optional[float]]:
+    """Média, mínimo, máximo e percentis de preço a partir do histograma."""
+    if not total or not histogram:
+        return {"mean": None, "min": None, "max": None, **{f"p{p}": None for p in PERCENTILES}}
+    return {
+        "mean": round(float(Decimal(price_sum) / total), 2),
+        "min": float(histogram[0][0]),
+        "max": float(histogram[-1][0]),
+        **{f"p{p}": _percentile(histogram, total, p) for p in PERCENTILES},
+    }
+
+
+def _rating_summary(histogram: Dict[str, int]) -> Dict[str, Any]:
+    """Histograma e média das avaliações (livros sem nota ficam de fora da média)."""
+    rated = sum(histogram.values())
+    weighted = sum(int(rating) * count for rating, count in histogram.items())
+    return {
+        "rating_histogram": histogram,
+        "rating_mean": round(weighted / rated, 2) if rated else None,
+    }
+
+
+def refresh_snapshot(db: Session) -> StatsSnapshot:
+    """
+    Monta o snapshot servido pelas rotas /stats a partir dos agregados.
+
+    Lê apenas as tabelas de agregados (uma linha por categoria e por preço
+    distinto), nunca a tabela books, e registra a geração dos agregados
+    usada (`built_generation`).
+
+    Args:
+        db: Sessão do banco de dados (o commit fica a cargo de quem chama)
+
+    Returns:
+        StatsSnapshot: Snapshot atualizado
+    """
+    histograms: Dict[str, List[Tuple[Decimal, int]]] = defaultdict(list)
+    overall: Counter = Counter()
+    prices: Query[Any] = db.query(PriceCount.category, PriceCount.price, PriceCount.books).order_by(
+        PriceCount.category, PriceCount.price
+    )
+    for category, price, books in prices:
+        price = Decimal(price).quantize(CENT)
+        histograms[category].append((price, books))
+        overall[price] += books
+
+    categories = []
+    totals: Counter = Counter()
+    total_price = Decimal(0)
+    for stats in db.query(CategoryStats).order_by(CategoryStats.category):
+        ratings = {str(rating): getattr(stats, f"rating_{rating}") for rating in RATINGS}
+        totals.update({"books": stats.books, "available": stats.available, **ratings})
+        total_price += Decimal(stats.price_sum)
+        categories.append(
+            {
+                "name": stats.category,
+                "books": stats.books,
+                "available_books": stats.available,
+                "availability_ratio": round(stats.available / stats.books, 4),
+                "price": _price_summary(
+                    histograms[stats.category], stats.books, stats.price_sum
+                ),
+                **_rating_summary(ratings),
+            }
+        )
+
+    total = totals["books"]
+    overview = {
+        "total_books": total,
+        "total_categories": len(categories),
+        "available_books": totals["available"],
+        "availability_ratio": round(totals["available"] / total, 4) if total else None,
+        "price": _price_summary(sorted(overall.items()), total, total_price),
+        **_rating_summary({str(rating): totals[str(rating)] for rating in RATINGS}),
+    }
+
+    snapshot = db.get(StatsSnapshot, 1)
+    if snapshot is None:
+        snapshot = StatsSnapshot(id=1, generation=0)
+        db.add(snapshot)
+    snapshot.overview = overview
+    snapshot.categories = categories
+    snapshot.updated_at = datetime.now(timezone.utc)
+    snapshot.built_generation = snapshot.generation
+    db.flush()
+    return snapshot
+
+
+def update_stats(
+    db: Session, changes: Iterable[Tuple[Optional[StatsKey], Optional[StatsKey]]]
+) -> int:
+    """
+    Aplica as alterações aos agregados e marca o snapshot como desatualizado.
+
+    O snapshot não é refeito a cada lote gravado: a geração dos agregados é
+    incrementada e `get_snapshot` o refaz na próxima leitura. Sem snapshot os
+    agregados ainda não foram inicializados (banco populado antes deles
+    existirem): nesse caso é feito um único recálculo completo.
+
+    Args:
+        db: Sessão do banco de dados (o commit fica a cargo de quem chama)
+        changes: Pares (antes, depois) com os campos de `stats_key`
+
+    Returns:
+        Número de livros cujas estatísticas mudaram
+    """
+    if db.get(StatsSnapshot, 1) is None:
+        db.flush()
+        rebuild_stats(db)
+        refresh_snapshot(db)
+        return sum(1 for old, new in changes if old != new)
+    applied = apply_changes(db, changes)
+    if applied:
+        db.execute(
+            update(StatsSnapshot)
+            .where(StatsSnapshot.id == 1)
+            .values(generation=StatsSnapshot.generation + 1)
+        )
+    return applied
+
+
+def get_snapshot(db: Session) -> StatsSnapshot:
+    """
+    Retorna o snapshot das estatísticas, refazendo-o se estiver desatualizado.
+
+    Na primeira consulta o snapshot é criado com um recálculo completo; se
+    outra leitura concorrente o gravar primeiro, o snapshot dela é servido.
+    Depois disso ele é refeito a partir dos agregados quando eles mudaram
+    desde o último recálculo. Se outra gravação concorrente impedir o commit,
+    o snapshot anterior é servido e o recálculo fica para a próxima leitura.
+
+    Args:
+        db: Sessão do banco de dados
+
+    Returns:
+        StatsSnapshot: Snapshot atual
+    """
+    snapshot = db.get(StatsSnapshot, 1)
+    if snapshot is None:
+        # Banco populado antes dos agregados existirem: recálculo completo único
+        try:
+            rebuild_stats(db)
+            snapshot = refresh_snapshot(db)
+            db.commit()
+        except (IntegrityError, OperationalError):
+            # Outra leitura concorrente gravou o snapshot primeiro: serve o dela
+            db.rollback()
+            snapshot = db.get(StatsSnapshot, 1)
+            if snapshot is None:
+                raise
+    elif snapshot.built_generation != snapshot.generation:
+        try:
+            snapshot = refresh_snapshot(db)
+            db.commit()
+        except OperationalError as e:
+            db.rollback()
+            logger.warning(f"Snapshot das estatísticas não foi refeito: {e}")
+    return snapshot
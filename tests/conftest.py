@@ -4,20 +4,42 @@ import pytest
 import sys
 from pathlib import Path
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Adiciona src ao path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
 
 from src.app import app
 from src.models import Base
-from src.extensions import get_db
+from src.extensions import (
+    enable_sqlite_savepoints,
+    get_async_db,
+    get_db,
+    immediate_transactions,
+)
+from src.services.catalog import DatabaseGeneration
+from src.services.database import create_database_engine
+from src.services.response_cache import get_response_cache
 
 # Cria banco de dados de teste compartilhado
 TEST_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+# Mesmo perfil da aplicação (WAL): leituras não bloqueiam o worker e o heartbeat
+engine = create_database_engine(TEST_DATABASE_URL)
+enable_sqlite_savepoints(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessões de escrita do worker (BEGIN IMMEDIATE), como `src.extensions.WriteSessionLocal`
+TestingWriteSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=immediate_transactions(engine)
+)
+
+# Engine assíncrono sobre o mesmo arquivo; sem pool porque o TestClient pode
+# usar um event loop diferente a cada requisição
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 def override_get_db():
@@ -29,8 +51,19 @@ def override_get_db():
         db.close()
 
 
-# Sobrescreve a dependência do banco de dados globalmente
+async def override_get_async_db():
+    """Substitui a dependência assíncrona do banco de dados para testes."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
+# Sobrescreve as dependências do banco de dados globalmente
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# A geração do catálogo (cache de respostas e ETags) é lida do banco de teste
+# a cada requisição, como se o worker de scraping gravasse em outro processo
+get_response_cache().generations = DatabaseGeneration(TestingSessionLocal, ttl=0)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -45,6 +78,8 @@ def setup_database():
 def clean_database():
     """Limpa os dados entre cada teste, mantendo a estrutura das tabelas."""
     yield
+    # Descarta as respostas em cache, que refletem os dados do teste
+    get_response_cache().clear()
     # Limpa todas as tabelas após cada teste
     db = TestingSessionLocal()
     try:
@@ -69,3 +104,26 @@ def db():
         yield database
     finally:
         database.close()
+
+
+def fake_stream(*results):
+    """
+    Substituto de `stream_books` para `patch(..., side_effect=fake_stream(...))`.
+
+    Cada chamada entrega a próxima lista de livros de `results` (ou lança a
+    exceção informada no lugar da lista).
+    """
+    pending = iter(results)
+
+    def stream_books(**kwargs):
+        books = next(pending)
+
+        async def generate():
+            if isinstance(books, BaseException):
+                raise books
+            for book in books:
+                yield book
+
+        return generate()
+
+    return stream_books
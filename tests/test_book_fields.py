@@ -0,0 +1,101 @@
+"""Testes do parâmetro `fields` (projeção de colunas) das rotas de livros."""
+
+import pytest
+from sqlalchemy import event
+
+from src.api.schemas.book import BOOK_FIELDS, BookSchema, book_record_type, parse_fields
+from src.models.book import Book
+from src.services.response_cache import render_json
+from tests.conftest import async_engine
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro {i:02d}",
+            price=10 + i * 1.5,
+            rating=1 + i % 5,
+            availability=bool(i % 2),
+            category="Poetry" if i % 3 else "Travel",
+            image=f"https://books.toscrape.com/media/{i}.jpg",
+        )
+        for i in range(9)
+    )
+    db.commit()
+
+
+@pytest.fixture
+def statements():
+    """Registra as colunas lidas (trecho entre SELECT e FROM) das consultas sobre books."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and "FROM books" in statement:
+            captured.append(statement.split("FROM")[0])
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_parse_fields_is_canonical():
+    assert parse_fields("price, title") == ("title", "price")
+    assert parse_fields("title,title") == ("title",)
+    assert parse_fields(None) == BOOK_FIELDS
+    assert parse_fields(" , ") == BOOK_FIELDS
+    with pytest.raises(ValueError, match="Unknown fields: isbn"):
+        parse_fields("title,isbn")
+
+
+def test_record_types_are_cached_per_field_set():
+    assert book_record_type(parse_fields("price,title")) is book_record_type(
+        parse_fields("title,price")
+    )
+    assert book_record_type(("title",)).__annotations__.keys() == {"title"}
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/books/?fields=title,price",
+        "/books/?fields=title,price&cursor=",
+        "/books/search?category=poe&fields=title,price",
+        "/books/search?q=livro&fields=price,title&cursor=",
+    ],
+)
+def test_listings_return_only_requested_fields(client, books, statements, url):
+    payload = client.get(url).json()
+
+    assert payload["data"]
+    assert all(book.keys() == {"title", "price"} for book in payload["data"])
+    assert statements
+    assert all("image" not in columns and "category" not in columns for columns in statements)
+
+
+def test_cursor_pagination_without_id_field(client, books):
+    titles, url = [], "/books/?per_page=4&fields=title&cursor="
+    while url:
+        payload = client.get(url).json()
+        titles += [book["title"] for book in payload["data"]]
+        url = payload["next"]
+
+    assert titles == [f"Livro {i:02d}" for i in range(9)]
+
+
+def test_single_book_fields(client, db, books, statements):
+    book_id = db.query(Book.id).filter(Book.title == "Livro 03").scalar()
+
+    response = client.get(f"/books/{book_id}?fields=title,availability")
+    assert response.json() == {"title": "Livro 03", "availability": True}
+    assert statements == ["SELECT books.title, books.availability, books.id \n"]
+
+    full = client.get(f"/books/{book_id}")
+    assert full.content == render_json(BookSchema.model_validate(db.get(Book, book_id)))
+
+
+def test_unknown_field_is_rejected(client, books):
+    for url in ("/books/?fields=isbn", "/books/search?fields=title,isbn", "/books/1?fields=x"):
+        response = client.get(url)
+        assert response.status_code == 400
+        assert "Unknown fields" in response.json()["detail"]
@@ -0,0 +1,51 @@
+"""Testes da serialização em lote das listagens de livros."""
+
+import pytest
+from sqlalchemy import select
+
+from src.api.schemas.book import BookSchema
+from src.models.book import Book
+from src.services.response_cache import render_json
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro {i:02d} — edição",
+            price=10 + i * 1.25,
+            rating=1 + i % 5,
+            availability=bool(i % 2),
+            category="Poetry" if i % 3 else "Café",
+            image=None if i % 4 else f"https://books.toscrape.com/media/{i}.jpg",
+        )
+        for i in range(12)
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/books/?per_page=5",
+        "/books/?per_page=5&cursor=",
+        "/books/search?category=poe&per_page=5",
+        "/books/search?q=livro&per_page=5&cursor=",
+        "/books/top-rated?per_page=5",
+        "/books/price-range?min=12&max=20&per_page=5&cursor=",
+    ],
+)
+def test_listing_body_matches_schema_serialization(client, db, books, url):
+    """O JSON das listagens é byte a byte o que `BookSchema` + `render_json` gerariam."""
+    response = client.get(url)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["data"]
+
+    ids = [book["id"] for book in payload["data"]]
+    orm_books = {book.id: book for book in db.scalars(select(Book).where(Book.id.in_(ids)))}
+    expected = {
+        **payload,
+        "data": [BookSchema.model_validate(orm_books[book_id]) for book_id in ids],
+    }
+    assert response.content == render_json(expected)
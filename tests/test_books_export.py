@@ -0,0 +1,103 @@
+"""Testes para a exportação do catálogo em streaming (/books/export)."""
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from src.models.book import Book
+from src.services.catalog import export_query, stream_export
+from tests.conftest import TestingAsyncSessionLocal
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro {i:02d}" + (" Café" if i % 10 == 0 else ""),
+            price=10 + i,
+            rating=1 + i % 5,
+            availability=i % 2 == 0,
+            category="Poetry" if i % 3 else "Travel",
+            image=f"https://books.toscrape.com/media/{i}.jpg",
+        )
+        for i in range(25)
+    )
+    db.commit()
+
+
+def ndjson(content: bytes):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+def test_export_ndjson(client, books):
+    response = client.get("/books/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert 'filename="books.ndjson"' in response.headers["content-disposition"]
+    assert "etag" in response.headers
+    rows = ndjson(response.content)
+    assert len(rows) == 25
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert rows[1] == {
+        "id": rows[1]["id"],
+        "title": "Livro 01",
+        "price": 11.0,
+        "rating": 2,
+        "availability": False,
+        "category": "Poetry",
+        "image": "https://books.toscrape.com/media/1.jpg",
+    }
+
+
+def test_export_csv_gzip_with_filters(client, books):
+    response = client.get("/books/export?format=csv&compression=gzip&category=travel")
+
+    assert response.headers["content-type"] == "application/gzip"
+    assert 'filename="books.csv.gz"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 9
+    assert {row["category"] for row in rows} == {"Travel"}
+    assert rows[0]["price"] == "10.00"
+    assert rows[0]["availability"] == "true"
+
+
+def test_export_full_text_search(client, books):
+    rows = ndjson(client.get("/books/export?q=cafe").content)
+
+    assert [row["title"] for row in rows] == ["Livro 00 Café", "Livro 10 Café", "Livro 20 Café"]
+
+
+def test_export_zstd(client, books):
+    zstandard = pytest.importorskip("zstandard")
+
+    response = client.get("/books/export?compression=zstd")
+    assert response.headers["content-type"] == "application/zstd"
+    content = zstandard.ZstdDecompressor().decompressobj().decompress(response.content)
+    assert len(ndjson(content)) == 25
+
+
+def test_stream_export_reads_in_chunks(books):
+    async def collect():
+        async with TestingAsyncSessionLocal() as db:
+            return [chunk async for chunk in stream_export(db, export_query(), chunk_size=10)]
+
+    chunks = asyncio.run(collect())
+
+    assert [len(chunk.splitlines()) for chunk in chunks] == [10, 10, 5]
+
+
+def test_export_empty_catalogue(client):
+    response = client.get("/books/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.text == "id,title,price,rating,availability,category,image\n"
+
+
+def test_export_invalid_parameters(client):
+    assert client.get("/books/export?format=xml").status_code == 422
+    assert client.get("/books/export?compression=brotli").status_code == 422
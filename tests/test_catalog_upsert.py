@@ -0,0 +1,110 @@
+"""Testes para a persistência em lote dos livros (upsert)."""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from src.models.book import Book
+from src.models.stats import CategoryStats
+from src.services.catalog import upsert_books
+
+
+def make_book(title: str, **overrides):
+    book = {
+        "title": title,
+        "price": 10.0,
+        "rating": 3,
+        "availability": "In stock (5 available)",
+        "category": "Poetry",
+        "image_url": f"https://books.toscrape.com/media/{title}.jpg",
+    }
+    book.update(overrides)
+    return book
+
+
+def test_upsert_inserts_new_books(db):
+    saved = upsert_books(db, [make_book(f"Livro {i}") for i in range(25)], chunk_size=10)
+
+    assert saved == 25
+    assert db.query(Book).count() == 25
+    book = db.query(Book).filter_by(title="Livro 3").one()
+    assert book.availability is True
+    assert book.image == "https://books.toscrape.com/media/Livro 3.jpg"
+
+
+def test_upsert_updates_existing_books_by_title(db):
+    upsert_books(db, [make_book("A"), make_book("B")])
+    saved = upsert_books(
+        db, [make_book("A", price=99.5, availability="Out of stock"), make_book("C")]
+    )
+
+    assert saved == 2
+    assert db.query(Book).count() == 3
+    db.expire_all()
+    book = db.query(Book).filter_by(title="A").one()
+    assert float(book.price) == 99.5
+    assert book.availability is False
+
+
+def test_upsert_keeps_last_duplicate_in_batch(db):
+    saved = upsert_books(db, [make_book("A", rating=1), make_book("A", rating=5)])
+
+    assert saved == 1
+    assert db.query(Book).filter_by(title="A").one().rating == 5
+
+
+def test_upsert_isolates_failing_rows(db):
+    books = [make_book(f"Livro {i}") for i in range(10)]
+    books[4]["price"] = None  # viola NOT NULL e derruba o lote
+    del books[7]["category"]  # dicionário incompleto
+
+    saved = upsert_books(db, books, chunk_size=5)
+
+    assert saved == 8
+    titles = {title for (title,) in db.query(Book.title)}
+    assert "Livro 4" not in titles
+    assert "Livro 7" not in titles
+    assert len(titles) == 8
+
+
+def test_upsert_does_not_isolate_database_errors(db):
+    busy = OperationalError("INSERT", {}, Exception("database is locked"))
+
+    with patch("src.services.catalog.upsert._upsert", side_effect=busy) as upsert:
+        with pytest.raises(OperationalError):
+            upsert_books(db, [make_book(f"Livro {i}") for i in range(10)], chunk_size=5)
+    db.rollback()
+
+    # Sem refazer o lote livro a livro em uma transação que já falhou
+    assert upsert.call_count == 1
+    assert db.query(Book).count() == 0
+
+
+def test_upsert_reads_only_the_batch_titles(db):
+    upsert_books(db, [make_book(f"Livro {i}") for i in range(20)])
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT books.title"):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    try:
+        saved = upsert_books(
+            db, [make_book(f"Livro {i}", price=20.0) for i in range(3)], chunk_size=2
+        )
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert saved == 3
+    # Só os 3 títulos do lote, em consultas de até chunk_size títulos
+    assert [statement.split("WHERE")[1] for statement in statements] == [
+        " books.title IN (?, ?)",
+        " books.title IN (?)",
+    ]
+    # Os livros atualizados não são contados de novo nas estatísticas
+    stats = db.get(CategoryStats, "Poetry")
+    db.refresh(stats)
+    assert stats.books == 20
@@ -0,0 +1,81 @@
+"""Testes da tabela categories e dos totais mantidos pela gravação dos livros."""
+
+from sqlalchemy import select, text
+
+from src.models.book import Book
+from src.models.category import Category
+from src.routes.book_routes import filter_books
+from src.services.catalog import upsert_books
+from tests.test_catalog_upsert import make_book
+
+
+def totals(db):
+    db.commit()
+    return {
+        category.name: (category.book_count, float(category.avg_price or 0))
+        for category in db.scalars(select(Category).order_by(Category.name))
+    }
+
+
+def test_upsert_creates_categories_and_maintains_totals(db):
+    upsert_books(
+        db,
+        [
+            make_book("A", price=10.0),
+            make_book("B", price=20.0),
+            make_book("C", price=30.0, category="Travel"),
+        ],
+    )
+    assert totals(db) == {"Poetry": (2, 15.0), "Travel": (1, 30.0)}
+
+    # B muda de categoria: os totais das duas categorias são recalculados
+    upsert_books(db, [make_book("B", price=40.0, category="Travel")])
+    assert totals(db) == {"Poetry": (1, 10.0), "Travel": (2, 35.0)}
+
+    books = db.scalars(select(Book).order_by(Book.title)).all()
+    ids = {category.name: category.id for category in db.scalars(select(Category))}
+    assert [book.category_id for book in books] == [ids["Poetry"], ids["Travel"], ids["Travel"]]
+
+
+def test_orm_writes_maintain_totals(db):
+    book = Book(title="A", price=10, rating=3, availability=True, category="Poetry")
+    db.add_all([book, Book(title="B", price=30, rating=3, availability=True, category="Poetry")])
+    db.commit()
+    assert totals(db) == {"Poetry": (2, 20.0)}
+
+    book.category = "Travel"
+    book.price = 50
+    db.commit()
+    assert totals(db) == {"Poetry": (1, 30.0), "Travel": (1, 50.0)}
+
+    db.delete(book)
+    db.commit()
+    assert totals(db) == {"Poetry": (1, 30.0), "Travel": (0, 0.0)}
+
+
+def test_categories_route_lists_totals_and_skips_empty(client, db):
+    upsert_books(db, [make_book("A", price=10.0), make_book("B", category="Travel")])
+    upsert_books(db, [make_book("B", category="Poetry", price=20.0)])
+
+    data = client.get("/categories/").json()
+
+    assert data["total"] == 1
+    assert data["data"] == [{"name": "Poetry", "book_count": 2, "avg_price": 15.0}]
+    assert client.get("/scraping/status").json()["database"]["total_categories"] == 1
+
+
+def test_category_filter_compares_category_ids(client, db):
+    upsert_books(
+        db,
+        [make_book(f"Livro {i}", category="Travel" if i % 2 else "Poetry") for i in range(6)],
+    )
+
+    data = client.get("/books/search?category=trav").json()
+    assert data["total"] == 3
+    assert {book["category"] for book in data["data"]} == {"Travel"}
+
+    stmt = filter_books(select(Book), None, "trav").compile(
+        db.get_bind(), compile_kwargs={"literal_binds": True}
+    )
+    plan = " | ".join(row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {stmt}")))
+    assert "ix_books_category_id" in plan
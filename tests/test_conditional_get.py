@@ -0,0 +1,126 @@
+"""Testes para o GET condicional (ETag / 304) das rotas de leitura."""
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+
+from src.api.conditional import etag_matches
+from src.app import app
+from src.extensions import get_async_db, get_db
+from src.models.book import Book
+from src.services.catalog import DatabaseGeneration
+from src.services.response_cache import MemoryBackend, ResponseCache, get_response_cache
+from src.services.scraping.pipeline import BookWriter
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+def book(db):
+    book = Book(title="Etag", price=10, rating=4, availability=True, category="Poetry")
+    db.add(book)
+    db.commit()
+    return book
+
+
+@contextmanager
+def database_unavailable():
+    """Faz qualquer uso da sessão do banco falhar dentro do bloco."""
+
+    def broken_db():
+        raise AssertionError("o banco não deveria ser consultado")
+
+    dependencies = (get_db, get_async_db)
+    previous = {dependency: app.dependency_overrides[dependency] for dependency in dependencies}
+    app.dependency_overrides.update(dict.fromkeys(dependencies, broken_db))
+    try:
+        yield
+    finally:
+        app.dependency_overrides.update(previous)
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"old", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('W/"old"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+
+
+@pytest.mark.parametrize(
+    "url", ["/books/?per_page=5", "/books/search?q=etag", "/books/{id}", "/categories/"]
+)
+def test_matching_etag_returns_304_without_database(client, book, url):
+    url = url.format(id=book.id)
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert "must-revalidate" in response.headers["Cache-Control"]
+
+    with database_unavailable():
+        not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+
+def test_etag_depends_on_query_params(client, book):
+    first = client.get("/books/?page=1&per_page=5").headers["ETag"]
+    assert client.get("/books/?per_page=5&page=1").headers["ETag"] == first
+    assert client.get("/books/?page=1&per_page=6").headers["ETag"] != first
+
+    response = client.get("/books/?page=1&per_page=6", headers={"If-None-Match": first})
+    assert response.status_code == 200
+
+
+def test_new_catalogue_generation_changes_etag(client, db, book):
+    etag = client.get(f"/books/{book.id}").headers["ETag"]
+    book.price = 20
+    db.commit()
+    get_response_cache().invalidate()
+
+    response = client.get(f"/books/{book.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == 20
+    assert response.headers["ETag"] != etag
+
+
+def test_write_from_worker_process_changes_api_etag(client, db, book, tmp_path):
+    etag = client.get(f"/books/{book.id}").headers["ETag"]
+    assert client.get(f"/books/{book.id}", headers={"If-None-Match": etag}).status_code == 304
+
+    # O worker de scraping roda em outro processo, com o próprio cache de respostas
+    worker_cache = ResponseCache(
+        MemoryBackend(max_entries=16, max_bytes=1 << 20, ttl=60),
+        DatabaseGeneration(TestingSessionLocal, ttl=0),
+    )
+    scraped = {
+        "title": "Etag",
+        "price": 20,
+        "rating": 4,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": None,
+    }
+    with patch("src.services.response_cache.cache._response_cache", worker_cache):
+        BookWriter(db, tmp_path / "books.csv").write([scraped])
+
+    assert get_response_cache().generation() == worker_cache.generation()
+    response = client.get(f"/books/{book.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == 20
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_without_cache_backend(client, book):
+    cache = ResponseCache(None)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    try:
+        etag = client.get("/categories/").headers["ETag"]
+        assert client.get("/categories/", headers={"If-None-Match": etag}).status_code == 304
+
+        cache.invalidate()
+        assert client.get("/categories/", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        del app.dependency_overrides[get_response_cache]
@@ -0,0 +1,152 @@
+"""Testes dos perfis de banco de dados e das métricas do pool."""
+
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, SingletonThreadPool
+
+from src.conf import Conf
+from src.services.database import (
+    PoolMetrics,
+    create_async_database_engine,
+    create_database_engine,
+    engine_options,
+    sqlite_pragmas,
+)
+
+
+def test_engine_options_sqlite_file():
+    options = engine_options("sqlite:///books.db")
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert options["pool_size"] == Conf.DB_POOL_SIZE
+    assert options["max_overflow"] == Conf.DB_MAX_OVERFLOW
+    assert options["pool_pre_ping"] is False
+    assert options["pool_recycle"] == -1
+
+
+def test_engine_options_sqlite_memory_keeps_single_connection_pool():
+    options = engine_options("sqlite:///:memory:")
+    assert "pool_size" not in options
+    assert "max_overflow" not in options
+    engine = create_database_engine("sqlite:///:memory:")
+    assert isinstance(engine.pool, SingletonThreadPool)
+
+
+def test_engine_options_postgres(monkeypatch):
+    monkeypatch.setattr(Conf, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(Conf, "DB_POOL_RECYCLE", 600)
+    options = engine_options("postgresql+psycopg2://user:secret@db/books")
+    assert "connect_args" not in options
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 600
+
+    async_options = engine_options("postgresql+asyncpg://user:secret@db/books")
+    assert "connect_args" not in async_options
+    assert async_options["pool_size"] == 20
+
+
+def test_engine_options_measured_pool_class():
+    metrics = PoolMetrics("sync")
+    assert issubclass(engine_options("sqlite:///books.db", metrics)["poolclass"], QueuePool)
+    async_options = engine_options("sqlite+aiosqlite:///books.db", metrics)
+    assert issubclass(async_options["poolclass"], AsyncAdaptedQueuePool)
+
+
+def test_sqlite_pragmas_skip_empty(monkeypatch):
+    monkeypatch.setattr(Conf, "SQLITE_MMAP_SIZE", "")
+    pragmas = sqlite_pragmas()
+    assert "mmap_size" not in pragmas
+    assert list(pragmas)[:2] == ["busy_timeout", "journal_mode"]
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'books.db'}")
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        # synchronous=NORMAL é 1
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == int(
+            Conf.SQLITE_BUSY_TIMEOUT_MS
+        )
+        assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == int(
+            Conf.SQLITE_CACHE_SIZE
+        )
+    engine.dispose()
+
+
+def test_wal_allows_reads_during_write(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'books.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+        connection.exec_driver_sql("INSERT INTO t VALUES (1)")
+
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.exec_driver_sql("BEGIN IMMEDIATE")
+        writer.exec_driver_sql("INSERT INTO t VALUES (2)")
+        # No modo rollback-journal a leitura esperaria o fim da escrita
+        assert reader.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        writer.exec_driver_sql("COMMIT")
+    engine.dispose()
+
+
+def test_async_engine_applies_pragmas(tmp_path):
+    engine = create_async_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'books.db'}")
+
+    async def journal_mode():
+        async with engine.connect() as connection:
+            mode = (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+        await engine.dispose()
+        return mode
+
+    assert asyncio.run(journal_mode()) == "wal"
+
+
+def test_pool_metrics_under_contention(tmp_path, monkeypatch):
+    monkeypatch.setattr(Conf, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(Conf, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(Conf, "DB_POOL_TIMEOUT", 0.2)
+    metrics = PoolMetrics("sync")
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'books.db'}", metrics)
+
+    held = engine.connect()
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    released = threading.Timer(0.05, held.close)
+    released.start()
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SELECT 1")
+    released.join()
+
+    snapshot = metrics.snapshot(engine.pool)
+    assert snapshot["pool"] == "QueuePool"
+    assert snapshot["size"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["peak_checked_out"] == 1
+    assert snapshot["connects"] == 1
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkins"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait_ms"]["max"] >= 150
+
+    # As métricas continuam após a troca do pool
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert metrics.snapshot(engine.pool)["checkouts"] == 3
+
+
+def test_health_database(client):
+    client.get("/books/")
+    response = client.get("/health/database")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["dialect"] == "sqlite"
+    assert set(data["pools"]) == {"sync", "async"}
+    assert {"size", "checked_out", "peak_checked_out", "wait_ms", "queue_wait_ms"} <= set(
+        data["pools"]["sync"]
+    )
@@ -0,0 +1,191 @@
+"""Testes das métricas no formato do Prometheus (/metrics)."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.services.metrics import (
+    REGISTRY,
+    MetricsRegistry,
+    fingerprint,
+    instrument_queries,
+    merge_snapshots,
+    write_snapshot,
+)
+from src.services.scraping.pipeline import BookWriter, write_books
+from tests.test_scraping_core import FakeSite, run_crawl
+from tests.test_scraping_pipeline import books_of, make_book
+
+
+def value(sample, **labels):
+    return REGISTRY.get_sample_value(sample, labels) or 0.0
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requisições", ["route"])
+    in_progress = registry.gauge("app_in_progress", "Em andamento")
+    latency = registry.histogram("app_latency_seconds", "Latência", buckets=(0.1, 1.0))
+
+    requests.labels('/a"b').inc()
+    requests.labels('/a"b').inc(2)
+    in_progress.inc()
+    for seconds in (0.05, 0.1, 0.5, 3):
+        latency.observe(seconds)
+
+    assert registry.render().splitlines() == [
+        "# HELP app_in_progress Em andamento",
+        "# TYPE app_in_progress gauge",
+        "app_in_progress 1",
+        "# HELP app_latency_seconds Latência",
+        "# TYPE app_latency_seconds histogram",
+        'app_latency_seconds_bucket{le="0.1"} 2',
+        'app_latency_seconds_bucket{le="1"} 3',
+        'app_latency_seconds_bucket{le="+Inf"} 4',
+        "app_latency_seconds_sum 3.65",
+        "app_latency_seconds_count 4",
+        "# HELP app_requests_total Requisições",
+        "# TYPE app_requests_total counter",
+        'app_requests_total{route="/a\\"b"} 3',
+    ]
+    assert registry.counter("app_requests_total", "Requisições", ["route"]) is requests
+    with pytest.raises(ValueError):
+        registry.gauge("app_requests_total", "Requisições", ["route"])
+
+
+def test_concurrent_increments_are_not_lost():
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Acessos")
+    histogram = registry.histogram("work_seconds", "Trabalho", buckets=(1.0,))
+
+    def work():
+        for _ in range(10_000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.get_sample_value("hits_total") == 80_000
+    assert registry.get_sample_value("work_seconds_bucket", {"le": "1"}) == 80_000
+    assert registry.get_sample_value("work_seconds_sum") == 40_000
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    assert fingerprint("SELECT *\n  FROM books WHERE id IN (?, ?, ?) LIMIT 10") == (
+        "SELECT * FROM books WHERE id IN (...) LIMIT ?"
+    )
+    assert fingerprint("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == (
+        "INSERT INTO t (a, b) VALUES (...), ..."
+    )
+    assert fingerprint("SELECT 'it''s' FROM anon_1") == "SELECT ? FROM anon_1"
+    long = fingerprint("SELECT " + ", ".join(f"column_{i}" for i in range(100)) + " FROM t")
+    assert len(long) < 220 and long.endswith("]")
+
+
+def test_query_timing_by_engine_and_statement():
+    engine = create_engine("sqlite://")
+    timer = instrument_queries(engine, "test-sql")
+    timer.max_statements = 2
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text(f"SELECT {i}"))
+        conn.execute(text("SELECT 1 + 1"))
+        conn.execute(text("SELECT 2, 3"))
+
+    assert value("db_query_duration_seconds_count", engine="test-sql", statement="SELECT ?") == 3
+    assert value(
+        "db_query_duration_seconds_count", engine="test-sql", statement="SELECT ? + ?"
+    ) == 1
+    assert value("db_query_duration_seconds_count", engine="test-sql", statement="other") == 1
+
+
+def test_metrics_endpoint_counts_requests_by_route(client):
+    labels = {"method": "GET", "route": "/books/{book_id}", "status": "404"}
+    before = value("http_requests_total", **labels)
+    latency_before = value(
+        "http_request_duration_seconds_count", method="GET", route="/books/{book_id}"
+    )
+
+    client.get("/books/987654")
+    client.get("/books/987655")
+    client.get("/no-such-route/1")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert value("http_requests_total", **labels) == before + 2
+    assert value(
+        "http_request_duration_seconds_count", method="GET", route="/books/{book_id}"
+    ) == latency_before + 2
+    assert value("http_requests_total", method="GET", route="<unmatched>", status="404") >= 1
+    # Apenas a própria requisição de /metrics estava em andamento
+    assert 'http_requests_in_progress{method="GET"} 1' in response.text
+
+
+def test_scraping_counters():
+    fetched = value("scraping_pages_fetched_total", result="ok")
+    parsed = value("scraping_parse_duration_seconds_count", page="book")
+
+    run_crawl(FakeSite(pages=2, books_per_page=3), max_concurrency=2)
+
+    assert value("scraping_pages_fetched_total", result="ok") == fetched + 8
+    assert value("scraping_parse_duration_seconds_count", page="book") == parsed + 6
+
+
+def test_book_writer_counts_upserted_rows(db, tmp_path):
+    upserted = value("scraping_books_upserted_total")
+    writes = value("scraping_write_duration_seconds_count")
+
+    writer = BookWriter(db, tmp_path / "books.csv")
+    asyncio.run(write_books(books_of([make_book(f"M{i}") for i in range(5)]), writer, 2))
+
+    assert value("scraping_books_upserted_total") == upserted + 5
+    assert value("scraping_write_duration_seconds_count") == writes + 3
+
+
+def test_multiprocess_snapshots_are_summed(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ["kind"]).labels("full").inc(2)
+    registry.gauge("busy", "Ocupado").inc()
+    write_snapshot(registry, tmp_path)
+
+    # Snapshot de um processo já encerrado: o contador conta, o gauge não
+    dead = subprocess.run(
+        [sys.executable, "-c", "import os; print(os.getpid())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    pid = int(dead.stdout)
+    (tmp_path / f"metrics-{pid}.json").write_text(
+        json.dumps(
+            {
+                "pid": pid,
+                "metrics": {
+                    "jobs_total": {
+                        "type": "counter", "help": "Jobs", "labels": ["kind"], "buckets": [],
+                        "samples": [[["full"], [3]], [["incremental"], [1]]],
+                    },
+                    "busy": {
+                        "type": "gauge", "help": "Ocupado", "labels": [], "buckets": [],
+                        "samples": [[[], [5]]],
+                    },
+                },
+            }
+        )
+    )
+
+    lines = registry.render(merge_snapshots(tmp_path)).splitlines()
+    assert 'jobs_total{kind="full"} 5' in lines
+    assert 'jobs_total{kind="incremental"} 1' in lines
+    assert "busy 1" in lines
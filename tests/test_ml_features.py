@@ -0,0 +1,194 @@
+"""Testes para a exportação das features de ML (/ml/features e /ml/training-data)."""
+
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from src.conf import Conf
+from src.models.book import Book
+from src.services.ml import (
+    build_features,
+    iter_columns,
+    read_columns,
+    read_vocabulary,
+    split_mask,
+    stream_table,
+)
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro número {i}",
+            price=10 + i,
+            rating=1 + i % 5,
+            availability=i % 4 != 0,
+            category=["Poetry", "Art", "Travel"][i % 3],
+        )
+        for i in range(40)
+    )
+    db.commit()
+
+
+def test_read_columns_in_chunks(db, books):
+    columns = read_columns(db, chunk_size=7)
+
+    assert columns["id"].tolist() == sorted(columns["id"].tolist())
+    assert len(columns["id"]) == 40
+    assert columns["price"].dtype == np.float64
+    assert columns["availability"].sum() == 30
+
+
+def test_build_features():
+    columns = {
+        "title": np.array(["  A Light in the Attic ", "Sapiens", ""]),
+        "price": np.array([51.77, 54.23, 10.0]),
+        "rating": np.array([3, 5, 1]),
+        "availability": np.array([True, False, True]),
+        "category": np.array(["Poetry", "History", "Horror"]),
+    }
+
+    features = build_features(columns, ["History", "Poetry"])
+    assert features["title_length"].tolist() == [20, 7, 0]
+    assert features["title_tokens"].tolist() == [5, 1, 0]
+    assert features["availability"].tolist() == [1, 0, 1]
+    assert features["category_code"].tolist() == [1, 0, -1]
+
+    onehot = build_features(columns, ["History", "Poetry"], encoding="onehot")
+    assert onehot["category=History"].tolist() == [0, 1, 0]
+    assert onehot["category=Poetry"].tolist() == [1, 0, 0]
+    assert "category_code" not in onehot
+
+
+def test_split_mask_is_deterministic_and_stable():
+    ids = np.arange(1, 10001)
+    mask = split_mask(ids, 0.2, seed=7)
+
+    assert 0.18 < mask.mean() < 0.22
+    assert (split_mask(ids[::-1], 0.2, seed=7) == mask[::-1]).all()
+    assert (split_mask(ids[:100], 0.2, seed=7) == mask[:100]).all()
+    assert not (split_mask(ids, 0.2, seed=8) == mask).all()
+
+
+def test_features_json(client, books):
+    body = client.get("/ml/features").json()
+
+    assert body["rows"] == 40
+    assert body["categories"] == ["Art", "Poetry", "Travel"]
+    assert body["columns"] == [
+        "id", "price", "rating", "availability", "title_length", "title_tokens", "category_code"
+    ]
+    assert body["data"]["category_code"][:3] == [1, 0, 2]
+    assert body["data"]["title_tokens"][0] == 3
+
+
+def test_features_arrow_and_parquet_stream_by_block(client, books, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr(Conf, "ML_CHUNK_SIZE", 7)
+    expected = client.get("/ml/features?encoding=onehot").json()
+
+    response = client.get("/ml/features?format=arrow&encoding=onehot")
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert "ETag" in response.headers
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == expected["columns"]
+    assert table.to_pydict() == expected["data"]
+
+    response = client.get("/ml/features?format=parquet")
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == 40
+    assert parquet.metadata.num_row_groups == 6
+    assert parquet.schema_arrow.metadata[b"categories"] == b'["Art","Poetry","Travel"]'
+
+
+def test_training_data_split(client, books):
+    url = "/ml/training-data?target=rating&test_size=0.25&seed=3"
+    full = client.get(url).json()
+    train = client.get(f"{url}&split=train").json()
+    test = client.get(f"{url}&split=test").json()
+
+    assert "rating" not in full["columns"]
+    assert full["data"]["target"][:5] == [1, 2, 3, 4, 5]
+    assert train["rows"] + test["rows"] == 40
+    assert set(train["data"]["id"]).isdisjoint(test["data"]["id"])
+    assert set(test["data"]["split"]) == {"test"}
+    assert client.get(f"{url}&split=test").json() == test
+
+
+def test_training_data_is_cached_with_etag(client, books):
+    first = client.get("/ml/training-data")
+    assert first.status_code == 200
+
+    again = client.get(
+        "/ml/training-data", headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_stream_table_emits_one_chunk_per_block(db, books):
+    chunks = list(stream_table(iter_columns(db, chunk_size=7), "csv"))
+
+    assert len(chunks) == 6
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "title", "price", "rating", "availability", "category"]
+    assert len(rows) == 41
+    assert read_vocabulary(db) == ["Art", "Poetry", "Travel"]
+
+
+def test_training_data_csv_matches_json(client, books, monkeypatch):
+    monkeypatch.setattr(Conf, "ML_CHUNK_SIZE", 7)
+    url = "/ml/training-data?target=rating&split=train&test_size=0.25&seed=3"
+    expected = client.get(url).json()
+
+    response = client.get(f"{url}&format=csv")
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    [header, *rows] = list(csv.reader(io.StringIO(response.text)))
+    assert header == expected["columns"]
+    assert len(rows) == expected["rows"]
+    assert [int(row[0]) for row in rows] == expected["data"]["id"]
+    assert [int(row[header.index("target")]) for row in rows] == expected["data"]["target"]
+    assert {row[-1] for row in rows} == {"train"}
+
+    again = client.get(
+        f"{url}&format=csv", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_training_data_arrow_and_parquet_stream_by_block(client, books, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    monkeypatch.setattr(Conf, "ML_CHUNK_SIZE", 7)
+    expected = client.get("/ml/training-data?encoding=onehot").json()
+
+    response = client.get("/ml/training-data?encoding=onehot&format=arrow")
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == expected["columns"]
+    assert table.to_pydict() == expected["data"]
+
+    response = client.get("/ml/training-data?format=parquet")
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == 40
+    assert parquet.metadata.num_row_groups == 6
+    assert parquet.schema_arrow.metadata[b"categories"] == b'["Art","Poetry","Travel"]'
+
+
+def test_training_data_stream_of_empty_catalog(client):
+    response = client.get("/ml/training-data?format=csv")
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "id,rating,availability,title_length,title_tokens,category_code,target,split"
+    ]
+
+
+def test_invalid_parameters(client):
+    assert client.get("/ml/features?format=csv").status_code == 422
+    assert client.get("/ml/training-data?test_size=2").status_code == 422
@@ -0,0 +1,126 @@
+"""Testes para o modelo e o serviço de predições (/ml/predictions)."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src.app import app
+from src.services.ml import (
+    LinearModel,
+    MicroBatcher,
+    PredictionService,
+    build_features,
+    get_prediction_service,
+)
+
+FIELDS = ("title", "price", "rating", "availability", "category")
+BOOKS = [
+    dict(zip(FIELDS, row))
+    for row in [
+        ("A Light in the Attic", 51.77, 3, True, "Poetry"),
+        ("Sapiens", 54.23, 5, True, "History"),
+        ("Sharp Objects", 47.82, 4, False, "Mystery"),
+        ("The Black Maria", 52.15, 1, True, "Poetry"),
+        ("Soumission", 50.10, 1, True, "Fiction"),
+        ("Tipping the Velvet", 53.74, 1, True, "History"),
+    ]
+]
+
+
+def columns(books):
+    return {field: np.array([book[field] for book in books]) for field in BOOKS[0]}
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "model.npz"
+    LinearModel.fit(columns(BOOKS), target="price").save(path)
+    return path
+
+
+@pytest.fixture
+def service(model_path):
+    service = PredictionService(model_path, window=0.005, max_batch=64)
+    app.dependency_overrides[get_prediction_service] = lambda: service
+    yield service
+    del app.dependency_overrides[get_prediction_service]
+
+
+def test_model_roundtrip_and_shared_features(model_path):
+    model = LinearModel.load(model_path)
+
+    assert model.target == "price"
+    assert "price" not in model.features
+    assert model.vocabulary == ["Fiction", "History", "Mystery", "Poetry"]
+    offline = build_features(columns(BOOKS), model.vocabulary, model.encoding)
+    expected = np.column_stack([offline[name] for name in model.features])
+    assert (model.matrix(columns(BOOKS)) == expected).all()
+    # Ajuste com ridge pequeno: a predição do treino fica próxima do alvo
+    errors = model.predict(expected) - columns(BOOKS)["price"]
+    assert np.abs(errors).mean() < 2
+
+
+def test_predictions_route(client, service):
+    rows = [{key: value for key, value in book.items() if key != "price"} for book in BOOKS[:3]]
+    response = client.post("/ml/predictions", json={"books": rows})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["target"] == "price"
+    expected = service.predict(rows)
+    assert body["predictions"] == pytest.approx(expected.tolist(), abs=1e-3)
+
+
+def test_predictions_requires_model_inputs(client, service):
+    response = client.post(
+        "/ml/predictions", json={"books": [{"title": "X", "category": "Poetry"}]}
+    )
+    assert response.status_code == 422
+    assert "rating" in response.json()["detail"]
+
+
+def test_predictions_without_model(client, tmp_path):
+    service = PredictionService(tmp_path / "missing.npz", window=0, max_batch=1)
+    app.dependency_overrides[get_prediction_service] = lambda: service
+    try:
+        response = client.post("/ml/predictions", json={"books": [BOOKS[0]]})
+    finally:
+        del app.dependency_overrides[get_prediction_service]
+    assert response.status_code == 503
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    calls = []
+
+    def predict(rows):
+        calls.append(len(rows))
+        return np.array([row["value"] * 2 for row in rows])
+
+    async def run(batcher, requests):
+        return await asyncio.gather(*(batcher.submit(rows) for rows in requests))
+
+    requests = [[{"value": i}, {"value": i + 100}] for i in range(10)]
+    batcher = MicroBatcher(predict, window=0.01, max_batch=1000)
+    results = asyncio.run(run(batcher, requests))
+
+    assert calls == [20]
+    assert [result.tolist() for result in results] == [[2 * i, 2 * i + 200] for i in range(10)]
+
+    # Lote cheio é executado sem esperar a janela
+    calls.clear()
+    asyncio.run(run(MicroBatcher(predict, window=10, max_batch=4), requests[:4]))
+    assert calls == [4, 4]
+
+
+def test_micro_batcher_propagates_errors():
+    def predict(rows):
+        raise ValueError("falhou")
+
+    async def run():
+        batcher = MicroBatcher(predict, window=0.001, max_batch=10)
+        return await asyncio.gather(
+            batcher.submit([{}]), batcher.submit([{}]), return_exceptions=True
+        )
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
@@ -0,0 +1,93 @@
+"""Testes para a paginação por offset e por cursor (keyset)."""
+
+import pytest
+
+from src.api.pagination import decode_cursor, encode_cursor
+from src.models.book import Book
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro {i:02d}",
+            price=10 + i,
+            rating=1 + i % 5,
+            availability=True,
+            category=f"Categoria {i % 4}",
+        )
+        for i in range(23)
+    )
+    db.commit()
+
+
+def walk(client, url):
+    """Percorre todas as páginas seguindo o link `next`."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.json())
+        url = pages[-1]["next"]
+    return pages
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+    assert decode_cursor(encode_cursor("Poetry")) == "Poetry"
+    assert decode_cursor("") is None
+
+
+def test_books_cursor_mode_returns_same_items_as_offset(client, books):
+    offset_pages = walk(client, "/books/?per_page=5")
+    cursor_pages = walk(client, "/books/?per_page=5&cursor=")
+
+    offset_titles = [book["title"] for page in offset_pages for book in page["data"]]
+    cursor_titles = [book["title"] for page in cursor_pages for book in page["data"]]
+    assert len(cursor_pages) == 5
+    assert cursor_titles == offset_titles
+    assert len(cursor_titles) == 23
+    assert cursor_pages[0]["page"] is None
+    assert cursor_pages[-1]["next_cursor"] is None
+
+
+def test_offset_response_exposes_next_cursor(client, books):
+    first = client.get("/books/?per_page=10").json()
+    second = client.get(f"/books/?per_page=10&cursor={first['next_cursor']}").json()
+
+    assert second["data"][0]["id"] == first["data"][-1]["id"] + 1
+    assert first["next"].endswith("page=2&per_page=10")
+
+
+def test_include_total_false_skips_count(client, books):
+    data = client.get("/books/?per_page=10&include_total=false").json()
+
+    assert data["total"] is None
+    assert data["pages"] is None
+    assert data["next"] is not None
+    assert len(data["data"]) == 10
+
+
+def test_search_cursor_mode_keeps_filters(client, books):
+    pages = walk(client, "/books/search?category=Categoria 1&per_page=2&cursor=")
+
+    categories = {book["category"] for page in pages for book in page["data"]}
+    assert categories == {"Categoria 1"}
+    assert sum(len(page["data"]) for page in pages) == 6
+    assert pages[0]["total"] == 6
+
+
+def test_categories_cursor_mode(client, books):
+    pages = walk(client, "/categories/?per_page=3&cursor=&include_total=false")
+
+    names = [category["name"] for page in pages for category in page["data"]]
+    assert names == [f"Categoria {i}" for i in range(4)]
+
+
+def test_per_page_is_bounded(client):
+    assert client.get("/books/?per_page=1000").status_code == 422
+    assert client.get("/categories/?per_page=1000").status_code == 422
+
+
+def test_invalid_cursor_returns_400(client):
+    assert client.get("/books/?cursor=%%%").status_code == 400
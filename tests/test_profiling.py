@@ -0,0 +1,199 @@
+"""Testes dos perfis sob demanda (X-Profile, ring buffer e perfis do worker)."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.app import app
+from src.conf import Conf
+from src.models.scraping_job import ScrapingJob
+from src.routes.admin_routes import router as admin_router
+from src.services.profiling import (
+    ProfileSession,
+    ProfileStore,
+    ProfilingMiddleware,
+    active_session,
+    create_profiler,
+    get_profile_store,
+    instrument_profiling,
+    profile_phase,
+    profile_session,
+    resolve_backend,
+    token_matches,
+)
+from src.services.scraping.worker import ScrapingWorker, run_scraping_job
+from tests.conftest import async_engine, engine, fake_stream
+from tests.test_scraping_worker import SHARDS, add_job, scraped_book, worker_sessions  # noqa: F401
+
+# Os engines de teste substituem os de src.extensions, que já são instrumentados
+instrument_profiling(engine)
+instrument_profiling(async_engine.sync_engine)
+
+
+@pytest.fixture(autouse=True)
+def profiling_token(monkeypatch):
+    monkeypatch.setattr(Conf, "PROFILING_TOKEN", "s3cret")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(tmp_path / "profiles", max_profiles=3)
+
+
+def profiled_client(store, **kwargs):
+    """TestClient da API com o middleware de perfis gravando em `store`."""
+    return TestClient(ProfilingMiddleware(app, store=store, **kwargs))
+
+
+def admin_client(store):
+    admin = FastAPI()
+    admin.include_router(admin_router)
+    admin.dependency_overrides[get_profile_store] = lambda: store
+    return TestClient(admin)
+
+
+def test_header_profiles_request_with_sql(store, monkeypatch):
+    monkeypatch.setattr(Conf, "PROFILING_BACKEND", "cprofile")
+    client = profiled_client(store, sample_rate=0)
+
+    response = client.get("/books/search?title=zzz", headers={"X-Profile": "s3cret"})
+
+    assert response.status_code == 200
+    profile = store.get(response.headers["X-Profile-Id"])
+    assert profile["kind"] == "request"
+    assert profile["name"] == "GET /books/search"
+    assert profile["meta"] == {
+        "method": "GET", "path": "/books/search", "query": "title=zzz", "status": 200
+    }
+    [phase] = profile["phases"]
+    assert phase["name"] == "request"
+    assert "cumulative" in phase["report"]
+    assert phase["sql"]["count"] == len(phase["sql"]["statements"]) > 0
+    assert any("FROM books" in sql["statement"] for sql in phase["sql"]["statements"])
+
+
+def test_wrong_token_or_no_header_is_not_profiled(store):
+    client = profiled_client(store, sample_rate=0)
+
+    assert "X-Profile-Id" not in client.get("/health", headers={"X-Profile": "nope"}).headers
+    assert "X-Profile-Id" not in client.get("/health").headers
+    assert store.list() == []
+
+
+def test_sampling_only_on_configured_paths(store):
+    draws = iter([0.9, 0.1])
+    client = profiled_client(store, sample_rate=0.5, paths=["/books"], rng=lambda: next(draws))
+
+    assert "X-Profile-Id" not in client.get("/books/search?title=a").headers
+    assert "X-Profile-Id" in client.get("/books/search?title=a").headers
+    # Fora dos caminhos sorteados o rng nem é consultado
+    assert "X-Profile-Id" not in client.get("/health").headers
+    assert len(store.list()) == 1
+
+
+def test_ring_buffer_keeps_most_recent(store):
+    ids = []
+    for i in range(5):
+        session = ProfileSession("job", f"job {i}")
+        with active_session(session), session.phase("work"):
+            pass
+        store.save(session.as_dict())
+        ids.append(session.id)
+
+    assert [profile["id"] for profile in store.list()] == ids[:1:-1]
+    [latest] = store.list(limit=1)
+    assert latest["id"] == ids[-1]
+    assert latest["phases"][0]["name"] == "work"
+    assert latest["phases"][0]["sql_count"] == 0
+    assert store.get(ids[0]) is None
+    assert store.get("../../etc") is None
+
+
+def test_admin_endpoints_require_token(store):
+    with profile_session("job", "job 1", store=store) as session:
+        with profile_phase("plan"):
+            pass
+    client = admin_client(store)
+
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Profile": "nope"}).status_code == 403
+
+    headers = {"X-Profile": "s3cret"}
+    [summary] = client.get("/admin/profiles", headers=headers).json()
+    assert summary["id"] == session.id
+    assert summary["phases"][0]["name"] == "plan"
+    profile = client.get(f"/admin/profiles/{session.id}", headers=headers).json()
+    assert profile["phases"][0]["report"]
+    assert client.get("/admin/profiles/0123456789ab", headers=headers).status_code == 404
+
+
+def test_profiling_requires_a_token(store, monkeypatch):
+    monkeypatch.setattr(Conf, "PROFILING_TOKEN", "")
+
+    with pytest.raises(RuntimeError, match="PROFILING_TOKEN"):
+        ProfilingMiddleware(app, store=store)
+    assert admin_client(store).get("/admin/profiles", headers={"X-Profile": ""}).status_code == 403
+    assert not token_matches("anything")
+
+
+def test_run_scraping_job_records_phases(db, store):
+    job_id = add_job(db, full=True)
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+        patch(
+            "src.services.scraping.pipeline.stream_books",
+            side_effect=fake_stream([scraped_book("A")], [scraped_book("B")]),
+        ),
+        profile_session("job", f"job {job_id}", store=store) as session,
+    ):
+        run_scraping_job(job_id)
+
+    names = [phase.name for phase in session.phases]
+    assert names[0] == "plan" and names[-1] == "close"
+    assert [name.split()[0] for name in names[1:-1]] == ["shard", "shard"]
+    assert all(phase.report for phase in session.phases)
+    assert all(phase.sql_count for phase in session.phases)
+    assert store.get(session.id)["duration_ms"] > 0
+
+
+def test_worker_profiles_only_cycles_with_work(db, store):
+    worker = ScrapingWorker(worker_id="worker-a", lease_seconds=60, profile=True)
+
+    with (
+        patch("src.services.profiling.store._profile_store", store),
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+    ):
+        assert worker.run_profiled() is None
+        job_id = add_job(db, full=True)
+        assert worker.run_profiled() == job_id
+
+    db.commit()
+    assert len(db.get(ScrapingJob, job_id).shards) == 2
+    [profile] = store.list()
+    assert profile["name"] == f"job {job_id}"
+    assert [phase["name"] for phase in profile["phases"]] == ["claim", "plan"]
+
+
+def test_phases_are_noops_outside_a_session():
+    with profile_phase("plan") as phase:
+        assert phase is None
+
+
+def test_unknown_or_missing_backend():
+    with pytest.raises(ValueError):
+        create_profiler("perf")
+    with patch.dict("sys.modules", {"pyinstrument": None}):
+        with pytest.raises(RuntimeError, match="tech_challenge_1\\[profiling\\]"):
+            create_profiler("pyinstrument")
+
+
+def test_auto_backend_prefers_pyinstrument():
+    with patch.dict("sys.modules", {"pyinstrument": None}):
+        assert resolve_backend("auto") == "cprofile"
+        assert ProfileSession("job", "job 1", backend="auto").backend == "cprofile"
+    with patch.dict("sys.modules", {"pyinstrument": object()}):
+        assert resolve_backend("auto") == "pyinstrument"
+    assert resolve_backend("cprofile") == "cprofile"
@@ -0,0 +1,209 @@
+"""Testes para o cache de respostas das rotas do catálogo."""
+
+import asyncio
+import fnmatch
+from unittest.mock import patch
+
+import pytest
+
+from src.app import app
+from src.conf import Conf
+from src.models.book import Book
+from src.models.scraping_job import ScrapingJob
+from src.services.catalog import DatabaseGeneration
+from src.services.response_cache import (
+    MemoryBackend,
+    RedisBackend,
+    ResponseCache,
+    create_backend,
+    get_response_cache,
+)
+from src.services.scraping.worker import run_scraping_job
+from tests.conftest import TestingSessionLocal
+
+
+class DictRedis:
+    """Cliente mínimo com a API do redis-py usada pelo RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def scan_iter(self, match):
+        return [key for key in self.data if fnmatch.fnmatch(key, match)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def book(db):
+    book = Book(title="Cached", price=10, rating=4, availability=True, category="Poetry")
+    db.add(book)
+    db.commit()
+    return book
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2, max_bytes=1024, ttl=60)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.stats()["evictions"] == 1
+
+
+def test_memory_backend_respects_byte_limit_and_ttl():
+    backend = MemoryBackend(max_entries=100, max_bytes=10, ttl=60)
+    backend.set("a", b"12345")
+    backend.set("b", b"12345")
+    backend.set("huge", b"x" * 100)
+    assert backend.get("a") is None
+    assert backend.get("huge") is None
+    assert backend.stats()["bytes"] <= 10
+
+    expired = MemoryBackend(max_entries=100, max_bytes=1024, ttl=0)
+    expired.set("a", b"1")
+    assert expired.get("a") is None
+    assert expired.stats()["expirations"] == 1
+
+
+def test_repeated_request_is_served_from_cache(client, db, book):
+    cache = get_response_cache()
+    first = client.get("/books/?page=1&per_page=5")
+    book.price = 99
+    db.commit()
+    second = client.get("/books/?per_page=5&page=1")
+
+    assert second.json() == first.json()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalidate_serves_fresh_catalogue(client, db, book):
+    assert client.get(f"/books/{book.id}").json()["price"] == 10
+    book.price = 99
+    db.commit()
+
+    get_response_cache().invalidate()
+    assert client.get(f"/books/{book.id}").json()["price"] == 99
+
+
+def test_completed_scraping_job_invalidates_cache(client, monkeypatch, tmp_path):
+    from tests.conftest import TestingSessionLocal, TestingWriteSessionLocal, fake_stream
+
+    monkeypatch.setattr(Conf, "SCRAPING_CACHE_FILE", str(tmp_path / "http_cache.json"))
+    monkeypatch.setattr(Conf, "SCRAPING_CSV_FILE", str(tmp_path / "books.csv"))
+    monkeypatch.setattr(Conf, "SCRAPING_SHARD_BY", "none")
+    with TestingSessionLocal() as session:
+        job = ScrapingJob(status="pending")
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    scraped = {
+        "title": "Fresh",
+        "price": 12.5,
+        "rating": 5,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": None,
+    }
+    cache = get_response_cache()
+    generation = cache.generation()
+
+    assert client.get("/books/").json()["total"] == 0
+    with (
+        patch("src.extensions.SessionLocal", TestingSessionLocal),
+        patch("src.extensions.WriteSessionLocal", TestingWriteSessionLocal),
+        patch("src.services.scraping.pipeline.stream_books", side_effect=fake_stream([scraped])),
+    ):
+        run_scraping_job(job_id)
+
+    assert cache.generation() == generation + 1
+    assert client.get("/books/").json()["total"] == 1
+
+
+def test_errors_are_not_cached(client):
+    assert client.get("/books/12345").status_code == 404
+    assert get_response_cache().stats()["entries"] == 0
+
+
+def test_cache_stats_endpoint(client, book):
+    client.get("/categories/")
+    client.get("/categories/")
+    stats = client.get("/health/cache").json()
+    assert stats["backend"] == "memory"
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_redis_backend_shares_generation_and_entries():
+    client = DictRedis()
+    first, second = RedisBackend(client=client), RedisBackend(client=client)
+
+    first.set("key", b"value")
+    assert second.get("key") == b"value"
+
+    assert first.bump_generation() == 1
+    assert second.generation() == 1
+
+    second.clear()
+    assert first.get("key") is None
+    assert first.generation() == 1
+
+
+def test_async_routes_call_blocking_backend_outside_event_loop(client, book):
+    class LoopCheckingRedis(DictRedis):
+        def get(self, key):
+            with pytest.raises(RuntimeError):
+                asyncio.get_running_loop()
+            return super().get(key)
+
+    cache = ResponseCache(RedisBackend(client=LoopCheckingRedis()))
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    try:
+        first = client.get(f"/books/{book.id}")
+        second = client.get(f"/books/{book.id}")
+    finally:
+        del app.dependency_overrides[get_response_cache]
+
+    assert second.json() == first.json()
+    assert (cache.hits, cache.misses, cache.errors) == (1, 1, 0)
+
+
+def test_async_routes_read_generation_outside_event_loop(client, book):
+    def session_factory():
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        return TestingSessionLocal()
+
+    cache = ResponseCache(
+        MemoryBackend(max_entries=16, max_bytes=1 << 20, ttl=60),
+        DatabaseGeneration(session_factory, ttl=0),
+    )
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    try:
+        for url in (f"/books/{book.id}", f"/books/{book.id}", "/categories/", "/books/export"):
+            assert client.get(url).status_code == 200
+    finally:
+        del app.dependency_overrides[get_response_cache]
+
+    assert (cache.hits, cache.misses, cache.errors) == (1, 2, 0)
+
+
+def test_create_backend():
+    assert create_backend("none") is None
+    assert isinstance(create_backend("memory"), MemoryBackend)
+    with pytest.raises(ValueError):
+        create_backend("memcached")
@@ -0,0 +1,204 @@
+"""Testes para a coleta incremental com cache de validadores HTTP."""
+
+import asyncio
+import csv
+
+import httpx
+
+from src.services.scraping.cache import ValidatorCache
+from src.services.scraping.core import build_client, fetch_page
+from src.services.scraping.file_handler import (
+    append_books_to_csv,
+    merge_books_into_csv,
+    merge_changes_into_csv,
+)
+
+URL = "https://books.toscrape.com/catalogue/book/index.html"
+
+
+class ConditionalServer:
+    """Servidor simulado que responde 304 quando o ETag enviado confere."""
+
+    def __init__(self, body: str = "<html>v1</html>", etag: str = '"v1"'):
+        self.body = body
+        self.etag = etag
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.etag and request.headers.get("If-None-Match") == self.etag:
+            return httpx.Response(304)
+        headers = {"ETag": self.etag} if self.etag else {}
+        return httpx.Response(200, text=self.body, headers=headers)
+
+
+def fetch(server: ConditionalServer, cache: ValidatorCache, url: str = URL):
+    async def _run():
+        transport = httpx.MockTransport(server.handler)
+        async with build_client(2, transport=transport) as client:
+            return await fetch_page(client, url, cache)
+
+    return asyncio.run(_run())
+
+
+def persist(cache: ValidatorCache, url: str = URL, title: str = "A"):
+    """Simula a gravação do livro da página, como o `BookWriter` faz a cada lote."""
+    cache.link(url, title)
+    cache.confirm([title])
+
+
+def test_fetch_page_sends_conditional_request(tmp_path):
+    server = ConditionalServer()
+    cache = ValidatorCache(tmp_path / "cache.json")
+
+    assert fetch(server, cache) == "<html>v1</html>"
+    assert "If-None-Match" not in server.requests[0].headers
+    persist(cache)
+
+    assert fetch(server, cache) is None
+    assert server.requests[1].headers["If-None-Match"] == '"v1"'
+
+    assert cache.pages_fetched == 2
+    assert cache.pages_changed == 1
+    assert cache.pages_not_modified == 1
+
+
+def test_fetch_page_skips_same_content_without_validators(tmp_path):
+    server = ConditionalServer(etag=None)
+    cache = ValidatorCache(tmp_path / "cache.json")
+
+    assert fetch(server, cache) == "<html>v1</html>"
+    persist(cache)
+    assert fetch(server, cache) is None
+
+    server.body = "<html>v2</html>"
+    assert fetch(server, cache) == "<html>v2</html>"
+    assert (cache.pages_changed, cache.pages_not_modified) == (2, 1)
+
+
+def test_cache_round_trip_and_clear(tmp_path):
+    path = tmp_path / "data" / "cache.json"
+    cache = ValidatorCache(path)
+    fetch(ConditionalServer(), cache)
+    persist(cache)
+    cache.save()
+
+    loaded = ValidatorCache.load(path)
+    assert len(loaded) == 1
+    assert loaded.conditional_headers(URL) == {"If-None-Match": '"v1"'}
+
+    loaded.clear()
+    assert loaded.conditional_headers(URL) == {}
+
+
+def test_load_ignores_missing_or_corrupt_file(tmp_path):
+    assert len(ValidatorCache.load(tmp_path / "missing.json")) == 0
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    assert len(ValidatorCache.load(corrupt)) == 0
+
+
+def test_merge_books_into_csv_updates_only_changed_rows(tmp_path):
+    csv_file = tmp_path / "books.csv"
+    book = {
+        "title": "A",
+        "price": 1.0,
+        "rating": 1,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": "a.jpg",
+    }
+    assert merge_books_into_csv(csv_file, [book, {**book, "title": "B"}])
+    assert merge_books_into_csv(csv_file, [{**book, "price": 2.0}, {**book, "title": "C"}])
+
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["title"], row["price"]) for row in rows] == [
+        ("A", "2.0"),
+        ("B", "1.0"),
+        ("C", "1.0"),
+    ]
+
+
+def test_merge_changes_into_csv_rewrites_the_file_once(tmp_path):
+    csv_file, changes = tmp_path / "books.csv", tmp_path / "books.job-1.csv"
+    book = {
+        "title": "A",
+        "price": 1.0,
+        "rating": 1,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": "a.jpg",
+    }
+    assert merge_changes_into_csv(csv_file, changes)  # sem alterações
+    assert not csv_file.exists()
+
+    append_books_to_csv(csv_file, [book, {**book, "title": "B"}])
+    append_books_to_csv(changes, [{**book, "price": 2.0}, {**book, "title": "C"}])
+    append_books_to_csv(changes, [{**book, "price": 3.0}])
+    assert merge_changes_into_csv(csv_file, changes)
+
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["title"], row["price"]) for row in rows] == [
+        ("A", "3.0"),
+        ("B", "1.0"),
+        ("C", "1.0"),
+    ]
+    assert not changes.exists()
+
+
+def test_save_merges_entries_written_by_other_shards(tmp_path):
+    path = tmp_path / "http_cache.json"
+    first = ValidatorCache.load(path)
+    second = ValidatorCache.load(path)
+    other_url = URL.replace("book", "other")
+
+    fetch(ConditionalServer(), first)
+    persist(first)
+    first.save()
+
+    fetch(ConditionalServer(etag='"o1"'), second, other_url)
+    persist(second, other_url)
+    second.save()
+
+    # O segundo shard não apaga as URLs gravadas pelo primeiro
+    reloaded = ValidatorCache.load(path)
+    assert len(reloaded) == 2
+    assert reloaded.conditional_headers(URL) == {"If-None-Match": '"v1"'}
+    assert reloaded.conditional_headers(other_url) == {"If-None-Match": '"o1"'}
+
+
+def test_only_persisted_pages_are_saved(tmp_path):
+    path = tmp_path / "http_cache.json"
+    cache = ValidatorCache(path)
+    urls = [URL.replace("book", name) for name in ("saved", "failed", "unparsed")]
+    for url in urls:
+        fetch(ConditionalServer(), cache, url)
+    cache.link(urls[0], "Saved")
+    cache.link(urls[1], "Failed")
+    cache.discard(urls[2])
+
+    # Só o lote do primeiro livro foi gravado no banco
+    cache.confirm(["Saved"])
+    cache.save()
+
+    reloaded = ValidatorCache.load(path)
+    assert len(reloaded) == 1
+    assert reloaded.conditional_headers(urls[0]) == {"If-None-Match": '"v1"'}
+    assert reloaded.conditional_headers(urls[1]) == {}
+
+
+def test_unchanged_page_is_saved_without_confirmation(tmp_path):
+    path = tmp_path / "http_cache.json"
+    cache = ValidatorCache(path)
+    fetch(ConditionalServer(etag=None), cache)
+    persist(cache)
+    cache.save()
+
+    # Mesmo conteúdo: o livro já está no banco, o novo ETag vale de imediato
+    cache = ValidatorCache.load(path)
+    assert fetch(ConditionalServer(etag='"v2"'), cache) is None
+    cache.save()
+    assert ValidatorCache.load(path).conditional_headers(URL) == {"If-None-Match": '"v2"'}
@@ -0,0 +1,239 @@
+"""Testes para o motor de crawling em src/services/scraping/core.py."""
+
+import asyncio
+
+import httpx
+
+from src.services.scraping.core import (
+    CrawlEngine,
+    build_client,
+    parse_catalogue_page,
+    parse_category_links,
+    parse_page_count,
+    scrape_all_books_async,
+)
+from src.services.scraping.sharding import page_range_shards, plan_shards_async
+
+START_URL = "https://books.toscrape.com/catalogue/page-1.html"
+
+
+def catalogue_html(page: int, books_per_page: int, last_page: int) -> str:
+    links = "".join(
+        f'<h3><a href="book-{page}-{i}/index.html">Livro</a></h3>'
+        for i in range(books_per_page)
+    )
+    next_link = (
+        f'<li class="next"><a href="page-{page + 1}.html">next</a></li>'
+        if page < last_page
+        else ""
+    )
+    current = f'<li class="current">Page {page} of {last_page}</li>'
+    return f"<html><body>{links}<ul class='pager'>{current}{next_link}</ul></body></html>"
+
+
+def book_html(title: str) -> str:
+    return f"""
+    <html><body>
+    <ul class="breadcrumb">
+      <li><a href="/">Home</a></li><li><a href="/books">Books</a></li>
+      <li><a href="/poetry">Poetry</a></li><li class="active">{title}</li>
+    </ul>
+    <div id="product_gallery"><div class="item"><img src="../../media/{title}.jpg"/></div></div>
+    <h1>{title}</h1>
+    <p class="price_color">£51.77</p>
+    <p class="instock availability"> In stock (22 available) </p>
+    <p class="star-rating Three"></p>
+    </body></html>
+    """
+
+
+class FakeSite:
+    """Simula o books.toscrape.com registrando o pico de requisições simultâneas."""
+
+    def __init__(self, pages: int, books_per_page: int, delay: float = 0.001):
+        self.pages = pages
+        self.books_per_page = books_per_page
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            path = request.url.path
+            if "/page-" in path:
+                page = int(path.rsplit("page-", 1)[1].split(".")[0])
+                body = catalogue_html(page, self.books_per_page, self.pages)
+            else:
+                body = book_html(path.split("/")[-2])
+            return httpx.Response(200, text=body)
+        finally:
+            self.in_flight -= 1
+
+
+def run_crawl(
+    site: FakeSite,
+    max_concurrency: int,
+    parse_workers: int = 0,
+    start_url: str = START_URL,
+    max_pages=None,
+):
+    async def _run():
+        transport = httpx.MockTransport(site.handler)
+        async with build_client(max_concurrency, transport=transport) as client:
+            return await scrape_all_books_async(
+                start_url,
+                client=client,
+                max_concurrency=max_concurrency,
+                parse_workers=parse_workers,
+                max_pages=max_pages,
+            )
+
+    return asyncio.run(_run())
+
+
+def test_parse_catalogue_page_returns_links_and_next():
+    links, next_url = parse_catalogue_page(catalogue_html(1, 2, 3), START_URL)
+    assert links == [
+        "https://books.toscrape.com/catalogue/book-1-0/index.html",
+        "https://books.toscrape.com/catalogue/book-1-1/index.html",
+    ]
+    assert next_url == "https://books.toscrape.com/catalogue/page-2.html"
+
+
+def test_parse_catalogue_page_last_page_has_no_next():
+    _, next_url = parse_catalogue_page(catalogue_html(3, 1, 3), START_URL)
+    assert next_url is None
+
+
+def test_crawl_collects_all_books_in_catalogue_order():
+    site = FakeSite(pages=3, books_per_page=4)
+    books = run_crawl(site, max_concurrency=5)
+
+    assert [book["title"] for book in books] == [
+        f"book-{page}-{i}" for page in range(1, 4) for i in range(4)
+    ]
+    assert books[0]["price"] == 51.77
+    assert books[0]["rating"] == 3
+    assert books[0]["category"] == "Poetry"
+
+
+def test_crawl_respects_global_concurrency_limit():
+    site = FakeSite(pages=4, books_per_page=10)
+    books = run_crawl(site, max_concurrency=3)
+
+    assert len(books) == 40
+    assert site.max_in_flight <= 3
+
+
+def test_crawl_parses_in_process_pool():
+    site = FakeSite(pages=2, books_per_page=5)
+    inline = run_crawl(site, max_concurrency=4, parse_workers=0)
+    pooled = run_crawl(site, max_concurrency=4, parse_workers=2)
+
+    assert pooled == inline
+    assert len(pooled) == 10
+
+
+def test_crawl_stops_when_catalogue_page_fails():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("falha", request=request)
+
+    async def _run():
+        async with build_client(2, transport=httpx.MockTransport(handler)) as client:
+            return await CrawlEngine(client, 2).crawl(START_URL)
+
+    assert asyncio.run(_run()) == []
+
+
+def test_crawl_stops_after_max_pages():
+    site = FakeSite(pages=5, books_per_page=2)
+    books = run_crawl(
+        site,
+        max_concurrency=3,
+        start_url="https://books.toscrape.com/catalogue/page-2.html",
+        max_pages=2,
+    )
+
+    assert [book["title"] for book in books] == [
+        f"book-{page}-{i}" for page in (2, 3) for i in range(2)
+    ]
+
+
+def test_parse_page_count():
+    assert parse_page_count(catalogue_html(1, 1, 50)) == 50
+    assert parse_page_count("<html><body></body></html>") is None
+
+
+def test_parse_category_links():
+    html = """
+    <div class="side_categories"><ul><li><a href="catalogue/category/books_1/index.html">Books</a>
+      <ul>
+        <li><a href="catalogue/category/books/travel_2/index.html">Travel</a></li>
+        <li><a href="catalogue/category/books/poetry_23/index.html">Poetry</a></li>
+      </ul>
+    </li></ul></div>
+    """
+    assert parse_category_links(html, "https://books.toscrape.com/") == [
+        "https://books.toscrape.com/catalogue/category/books/travel_2/index.html",
+        "https://books.toscrape.com/catalogue/category/books/poetry_23/index.html",
+    ]
+
+
+def test_page_range_shards():
+    assert page_range_shards(25, 10) == [
+        ("https://books.toscrape.com/catalogue/page-1.html", 10),
+        ("https://books.toscrape.com/catalogue/page-11.html", 10),
+        ("https://books.toscrape.com/catalogue/page-21.html", 5),
+    ]
+
+
+def test_plan_shards_by_pages_and_fallback():
+    site = FakeSite(pages=7, books_per_page=1)
+
+    async def _plan(handler, shard_by):
+        async with build_client(2, transport=httpx.MockTransport(handler)) as client:
+            return await plan_shards_async(shard_by, 3, client)
+
+    shards = asyncio.run(_plan(site.handler, "pages"))
+    assert [max_pages for _, max_pages in shards] == [3, 3, 1]
+    assert shards[2][0].endswith("catalogue/page-7.html")
+
+    # Sem o menu de categorias o job é executado como um único shard
+    assert asyncio.run(_plan(site.handler, "category")) == [(START_URL, None)]
+
+
+def test_stream_applies_backpressure():
+    site = FakeSite(pages=10, books_per_page=10)
+
+    async def _run():
+        async with build_client(2, transport=httpx.MockTransport(site.handler)) as client:
+            engine = CrawlEngine(client, 2)
+            titles = []
+            async for book in engine.stream(START_URL, buffer_size=2):
+                titles.append(book["title"])
+                if len(titles) == 3:
+                    break
+            await asyncio.sleep(0.05)
+            return titles
+
+    titles = asyncio.run(_run())
+    assert len(titles) == 3
+    # O consumidor parou: o crawling espera em vez de acumular os 100 livros
+    assert site.requests < 20
+
+
+def test_stream_yields_every_book():
+    site = FakeSite(pages=3, books_per_page=4)
+
+    async def _run():
+        async with build_client(3, transport=httpx.MockTransport(site.handler)) as client:
+            return [book["title"] async for book in CrawlEngine(client, 3).stream(START_URL)]
+
+    assert sorted(asyncio.run(_run())) == sorted(
+        f"book-{page}-{i}" for page in range(1, 4) for i in range(4)
+    )
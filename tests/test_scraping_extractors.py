@@ -0,0 +1,81 @@
+"""Testes para os backends de extração em src/services/scraping/extractors.py."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.services.scraping.core import BASE_URL, parse_book_details
+from src.services.scraping.extractors import (
+    EXTRACTORS,
+    LxmlExtractor,
+    Rating,
+    SoupExtractor,
+    get_extractor,
+)
+
+CORPUS_DIR = Path(__file__).parent / "fixtures" / "books_toscrape"
+CORPUS = sorted(CORPUS_DIR.glob("*.html"))
+# Saída do parse_book_details original (bs4) para cada página do corpus
+EXPECTED = json.loads((CORPUS_DIR / "expected.json").read_text(encoding="utf-8"))
+
+
+def page_url(page: Path) -> str:
+    return f"{BASE_URL}catalogue/{page.stem}/index.html"
+
+
+def test_expected_covers_the_corpus():
+    assert sorted(EXPECTED) == [page.stem for page in CORPUS]
+
+
+@pytest.mark.parametrize("page", CORPUS, ids=[page.stem for page in CORPUS])
+@pytest.mark.parametrize("backend", sorted(EXTRACTORS))
+def test_backend_matches_original_parser(backend, page):
+    html_content = page.read_text(encoding="utf-8")
+    result = get_extractor(backend).extract(html_content, page_url(page), BASE_URL)
+
+    assert json.loads(json.dumps(result)) == EXPECTED[page.stem]
+
+
+@pytest.mark.parametrize("page", CORPUS, ids=[page.stem for page in CORPUS])
+@pytest.mark.parametrize("backend", sorted(set(EXTRACTORS) - {"bs4"}))
+def test_backend_matches_reference_extractor(backend, page):
+    html_content = page.read_text(encoding="utf-8")
+    expected = get_extractor("bs4").extract(html_content, str(page), BASE_URL)
+    result = get_extractor(backend).extract(html_content, str(page), BASE_URL)
+
+    # repr() também compara os tipos (ex.: Rating vs int, float vs str)
+    assert repr(result) == repr(expected)
+
+
+def test_extractor_reads_all_fields():
+    html_content = (CORPUS_DIR / "a-light-in-the-attic_1000.html").read_text(
+        encoding="utf-8"
+    )
+    book = LxmlExtractor().extract(html_content, "url", BASE_URL)
+
+    assert book["title"] == "A Light in the Attic"
+    assert book["price"] == 51.77
+    assert book["rating"] is Rating.THREE
+    assert book["availability"] == "In stock (22 available)"
+    assert book["category"] == "Poetry"
+    assert book["image_url"].startswith("https://books.toscrape.com/media/cache/")
+
+
+def test_extractor_returns_none_for_incomplete_page():
+    html_content = (CORPUS_DIR / "broken-page.html").read_text(encoding="utf-8")
+    assert SoupExtractor().extract(html_content, "url", BASE_URL) is None
+    assert LxmlExtractor().extract(html_content, "url", BASE_URL) is None
+    assert LxmlExtractor().extract("", "url", BASE_URL) is None
+
+
+def test_parse_book_details_uses_selected_backend():
+    html_content = (CORPUS_DIR / "sharp-objects_997.html").read_text(encoding="utf-8")
+    assert parse_book_details(html_content, "url", backend="lxml") == parse_book_details(
+        html_content, "url", backend="bs4"
+    )
+
+
+def test_get_extractor_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        get_extractor("regex")
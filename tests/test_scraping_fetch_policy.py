@@ -0,0 +1,213 @@
+"""Testes da política de requisições do crawler em src/services/scraping/fetch_policy.py."""
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from src.services.scraping.core import fetch_page
+from src.services.scraping.fetch_policy import (
+    AimdLimiter,
+    FetchPolicy,
+    RetryPolicy,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responde a cada caminho com a sequência de respostas programada no servidor."""
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+            script = self.server.scripts.get(self.path, [])
+            status, headers = script.pop(0) if len(script) > 1 else (script or [(200, {})])[0]
+        body = f"<html>{self.path} {status}</html>".encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Servidor HTTP local; `server.scripts[path]` lista as respostas (status, cabeçalhos)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.scripts = {}
+    server.hits = {}
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fast_policy(max_retries=3, **kwargs):
+    return FetchPolicy(
+        rate=0, retry=RetryPolicy(max_retries, base_delay=0.001, max_delay=0.05), **kwargs
+    )
+
+
+async def fetch(url, policy):
+    async with httpx.AsyncClient() as client:
+        return await fetch_page(client, url, policy=policy)
+
+
+def test_retries_server_errors_and_honours_retry_after(stub_server):
+    stub_server.scripts["/page"] = [
+        (503, {}),
+        (429, {"Retry-After": "0"}),
+        (200, {}),
+    ]
+    policy = fast_policy()
+
+    html = asyncio.run(fetch(f"{stub_server.base_url}/page", policy))
+
+    assert html == "<html>/page 200</html>"
+    assert stub_server.hits["/page"] == 3
+    assert policy.stats.as_dict() == {"requests": 3, "retries": 2, "throttled": 1, "failures": 0}
+
+
+def test_exhausted_retries_and_client_errors_return_none(stub_server):
+    stub_server.scripts["/down"] = [(503, {})]
+    stub_server.scripts["/missing"] = [(404, {})]
+    policy = fast_policy(max_retries=2)
+
+    assert asyncio.run(fetch(f"{stub_server.base_url}/down", policy)) is None
+    assert asyncio.run(fetch(f"{stub_server.base_url}/missing", policy)) is None
+
+    assert stub_server.hits == {"/down": 3, "/missing": 1}
+    assert policy.stats.retries == 2
+    assert policy.stats.failures == 1
+
+
+def test_network_errors_are_retried_then_reported():
+    policy = fast_policy(max_retries=1)
+    # Porta fechada: a conexão é recusada em todas as tentativas
+    assert asyncio.run(fetch("http://127.0.0.1:9/", policy)) is None
+    assert policy.stats.requests == 2
+    assert policy.stats.failures == 1
+
+
+def test_parse_retry_after():
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(format_datetime(now + timedelta(seconds=30), usegmt=True), now) == 30
+    assert parse_retry_after(format_datetime(now - timedelta(seconds=30), usegmt=True), now) == 0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("amanhã") is None
+
+
+def test_retry_delay_is_capped():
+    retry = RetryPolicy(max_retries=5, base_delay=1, max_delay=4)
+    assert all(0 <= retry.delay(attempt) <= 4 for attempt in range(10))
+    assert retry.delay(0, retry_after=60) == 4
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_bucket(bucket, clock, requests, monkeypatch):
+    """Adquire `requests` tokens avançando o relógio falso a cada espera."""
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(seconds)
+        clock.now += seconds
+
+    async def main():
+        for _ in range(requests):
+            await bucket.acquire()
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    asyncio.run(main())
+    monkeypatch.undo()
+    return waits
+
+
+def test_token_bucket_limits_rate_after_burst(monkeypatch):
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    waits = run_bucket(bucket, clock, 5, monkeypatch)
+
+    # Dois tokens da rajada, depois um a cada 0,1 s
+    assert len(waits) == 3
+    assert clock.now == pytest.approx(0.3)
+
+
+def test_token_bucket_defer_suspends_host(monkeypatch):
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0, burst=1, clock=clock)
+    bucket.defer(5)
+
+    run_bucket(bucket, clock, 2, monkeypatch)
+
+    assert clock.now == pytest.approx(5)
+
+
+def test_aimd_halves_on_errors_and_recovers_additively():
+    limiter = AimdLimiter(max_limit=16, min_limit=1, latency_target=1.0, error_threshold=0.1)
+
+    limiter.in_flight = 1
+    limiter.release(latency=0.1, error=True)
+    assert limiter.capacity == 8
+    # Erros seguintes dentro da mesma janela não reduzem de novo
+    for _ in range(3):
+        limiter.in_flight = 1
+        limiter.release(latency=0.1, error=True)
+    assert limiter.capacity == 8
+    assert limiter.decreases == 1
+
+    for _ in range(200):
+        limiter.in_flight = 1
+        limiter.release(latency=0.1, error=False)
+    assert limiter.capacity == 16
+
+
+def test_aimd_reduces_on_high_latency_but_not_below_minimum():
+    limiter = AimdLimiter(max_limit=4, min_limit=2, latency_target=0.5, error_threshold=0.5)
+
+    for _ in range(20):
+        limiter.in_flight = 1
+        limiter.release(latency=2.0, error=False)
+
+    assert limiter.capacity == 2
+
+
+def test_aimd_bounds_concurrent_requests():
+    limiter = AimdLimiter(max_limit=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        await limiter.acquire()
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.001)
+        limiter.release(latency=0.001, error=False)
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(10)))
+
+    asyncio.run(main())
+
+    assert peak == 2
+    assert limiter.in_flight == 0
@@ -0,0 +1,113 @@
+"""Testes da gravação em streaming dos livros coletados."""
+
+import asyncio
+import csv
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.conf import Conf
+from src.models.book import Book
+from src.models.scraping_job import ScrapingJob
+from src.services.scraping.cache import ValidatorCache
+from src.services.scraping.pipeline import BookWriter, write_books
+from src.services.scraping.worker import run_scraping_job
+from tests.conftest import TestingSessionLocal, TestingWriteSessionLocal
+
+
+def make_book(title, price=10.0):
+    return {
+        "title": title,
+        "price": price,
+        "rating": 4,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": None,
+    }
+
+
+async def books_of(books):
+    for book in books:
+        yield book
+
+
+def read_titles(path):
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        return [row["title"] for row in csv.DictReader(csvfile)]
+
+
+def test_write_books_in_batches(db, tmp_path):
+    batches = []
+    writer = BookWriter(db, tmp_path / "books.csv", on_batch=lambda *sizes: batches.append(sizes))
+
+    asyncio.run(write_books(books_of([make_book(f"B{i}") for i in range(5)]), writer, 2))
+
+    assert batches == [(2, 2), (2, 2), (1, 1)]
+    assert (writer.books_scraped, writer.books_saved) == (5, 5)
+    assert db.query(Book).count() == 5
+    assert read_titles(tmp_path / "books.csv") == [f"B{i}" for i in range(5)]
+
+
+def test_validators_confirmed_only_for_saved_batches(db, tmp_path):
+    cache = ValidatorCache(tmp_path / "http_cache.json")
+    books = [make_book("A"), make_book("B"), make_book("C", price=None)]
+    urls = [f"https://books.toscrape.com/catalogue/{book['title']}/" for book in books]
+    for url, book in zip(urls, books):
+        cache.update(url, httpx.Response(200, text=book["title"], headers={"ETag": "v1"}))
+        cache.link(url, book["title"])
+    writer = BookWriter(db, tmp_path / "books.csv", cache=cache)
+
+    writer.write(books[:2])
+    writer.write(books[2:])  # o livro C não é gravado (preço nulo)
+    cache.save()
+
+    # A página de C é buscada de novo na próxima coleta
+    saved = ValidatorCache.load(tmp_path / "http_cache.json")
+    assert [saved.conditional_headers(url) for url in urls] == [
+        {"If-None-Match": "v1"},
+        {"If-None-Match": "v1"},
+        {},
+    ]
+
+
+@pytest.fixture
+def worker_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(Conf, "SCRAPING_CACHE_FILE", str(tmp_path / "http_cache.json"))
+    monkeypatch.setattr(Conf, "SCRAPING_CSV_FILE", str(tmp_path / "books.csv"))
+    monkeypatch.setattr(Conf, "SCRAPING_SHARD_BY", "none")
+    monkeypatch.setattr(Conf, "SCRAPING_WRITE_BATCH_SIZE", 1)
+    with (
+        patch("src.extensions.SessionLocal", TestingSessionLocal),
+        patch("src.extensions.WriteSessionLocal", TestingWriteSessionLocal),
+    ):
+        yield tmp_path
+
+
+def test_job_progress_is_visible_during_crawl(db, worker_files):
+    job = ScrapingJob(status="pending")
+    db.add(job)
+    db.commit()
+    job_id = job.id
+    seen = []
+
+    def stream_books(**kwargs):
+        async def generate():
+            for i in range(3):
+                # Os lotes anteriores já estão no banco enquanto a coleta continua
+                with TestingSessionLocal() as session:
+                    running = session.get(ScrapingJob, job_id)
+                    seen.append((running.books_saved, session.query(Book).count()))
+                yield make_book(f"B{i}")
+
+        return generate()
+
+    with patch("src.services.scraping.pipeline.stream_books", side_effect=stream_books):
+        run_scraping_job(job_id)
+
+    assert seen == [(None, 0), (1, 1), (2, 2)]
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "completed"
+    assert (job.books_scraped, job.books_saved) == (3, 3)
+    assert read_titles(worker_files / "books.csv") == ["B0", "B1", "B2"]
@@ -20,11 +20,10 @@ def test_scraping_status_empty_database(client):
 
 def test_scraping_trigger_returns_immediately(client):
     """Testa que /scraping/trigger retorna imediatamente com ID do job."""
-    with patch("src.routes.scraping_routes.scrape_all_books") as mock_scrape:
-        # Simula a função de scraping para evitar scraping real
-        mock_scrape.return_value = []
-
+    with patch("src.services.scraping.pipeline.stream_books") as mock_scrape:
         response = client.post("/scraping/trigger")
+        # A API apenas enfileira: o scraping é executado pelo worker
+        mock_scrape.assert_not_called()
         assert response.status_code == 200
 
         data = response.json()
@@ -36,37 +35,33 @@ def test_scraping_trigger_returns_immediately(client):
 
 def test_scraping_trigger_creates_job(client, db):
     """Testa que /scraping/trigger cria um job no banco de dados."""
-    with patch("src.routes.scraping_routes.scrape_all_books") as mock_scrape:
-        mock_scrape.return_value = []
-
-        response = client.post("/scraping/trigger")
-        assert response.status_code == 200
+    response = client.post("/scraping/trigger?full=true")
+    assert response.status_code == 200
 
-        data = response.json()
-        job_id = data["job_id"]
+    data = response.json()
+    job_id = data["job_id"]
 
-        # Verifica que o job foi criado
-        job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
-        assert job is not None
-        assert job.status in ["pending", "in_progress"]
+    # Verifica que o job foi enfileirado
+    job = db.query(ScrapingJob).filter(ScrapingJob.id == job_id).first()
+    assert job is not None
+    assert job.status == "pending"
+    assert job.full is True
+    assert job.worker_id is None
 
 
 def test_scraping_prevents_concurrent_jobs(client):
     """Testa que apenas um job de scraping pode executar por vez."""
-    with patch("src.routes.scraping_routes.scrape_all_books") as mock_scrape:
-        mock_scrape.return_value = []
-
-        # Cria primeiro job
-        response1 = client.post("/scraping/trigger")
-        assert response1.status_code == 200
+    # Cria primeiro job
+    response1 = client.post("/scraping/trigger")
+    assert response1.status_code == 200
 
-        # Tenta criar segundo job imediatamente
-        response2 = client.post("/scraping/trigger")
-        assert response2.status_code == 200
+    # Tenta criar segundo job imediatamente: o primeiro continua na fila
+    response2 = client.post("/scraping/trigger")
+    assert response2.status_code == 200
 
-        data2 = response2.json()
-        # Deve obter status "already_running" ou ser permitido se o primeiro completou
-        assert data2["status"] in ["started", "already_running"]
+    data2 = response2.json()
+    assert data2["status"] == "already_running"
+    assert data2["job_id"] == response1.json()["job_id"]
 
 
 def test_scraping_status_with_job_id(client, db):
@@ -0,0 +1,517 @@
+"""Testes da fila de jobs de scraping, dos shards e do worker dedicado."""
+
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.conf import Conf
+from src.models.book import Book
+from src.models.scraping_job import ScrapingJob, ScrapingShard
+from src.services.scraping import (
+    claim_next_job,
+    claim_next_shard,
+    enqueue_job,
+    finish_job,
+    recover_stale_jobs,
+    renew_lease,
+    resume_job,
+)
+from src.services.scraping.worker import LeaseHeartbeat, ScrapingWorker, run_shard
+from tests.conftest import TestingSessionLocal, TestingWriteSessionLocal, fake_stream
+
+SHARDS = [
+    ("https://books.toscrape.com/catalogue/page-1.html", 2),
+    ("https://books.toscrape.com/catalogue/page-3.html", None),
+]
+
+
+@pytest.fixture(autouse=True)
+def worker_sessions(tmp_path, monkeypatch):
+    """O worker usa as sessões de `src.extensions`; nos testes, as do banco de teste."""
+    monkeypatch.setattr(Conf, "SCRAPING_CACHE_FILE", str(tmp_path / "http_cache.json"))
+    monkeypatch.setattr(Conf, "SCRAPING_CSV_FILE", str(tmp_path / "books.csv"))
+    with (
+        patch("src.extensions.SessionLocal", TestingSessionLocal),
+        patch("src.extensions.WriteSessionLocal", TestingWriteSessionLocal),
+    ):
+        yield
+
+
+def scraped_book(title):
+    return {
+        "title": title,
+        "price": 10,
+        "rating": 4,
+        "availability": "In stock",
+        "category": "Poetry",
+        "image_url": None,
+    }
+
+
+def add_sharded_job(db, statuses, **fields):
+    job = ScrapingJob(**{"status": "in_progress", "full": True, **fields})
+    for position, status in enumerate(statuses):
+        job.shards.append(
+            ScrapingShard(
+                position=position,
+                start_url=f"https://books.toscrape.com/catalogue/page-{position + 1}.html",
+                max_pages=1,
+                status=status,
+                books_scraped=1 if status == "completed" else None,
+            )
+        )
+    db.add(job)
+    db.flush()
+    job_id = job.id
+    db.commit()
+    return job_id
+
+
+def add_job(db, **fields):
+    job = ScrapingJob(**{"status": "pending", **fields})
+    db.add(job)
+    db.flush()
+    job_id = job.id
+    # Encerra a transação: com WAL, uma leitura aberta não veria as gravações do worker
+    db.commit()
+    return job_id
+
+
+def test_claim_takes_oldest_pending_job_once(db):
+    first = enqueue_job(db)
+    second = enqueue_job(db, full=True)
+    db.commit()
+
+    claimed = claim_next_job(db, "worker-a", 60)
+    assert claimed.id == first.id
+    assert claimed.status == "in_progress"
+    assert claimed.worker_id == "worker-a"
+    assert claimed.attempts == 1
+    assert claimed.lease_expires_at > claimed.heartbeat_at
+
+    with TestingSessionLocal() as other:
+        claimed_by_b = claim_next_job(other, "worker-b", 60)
+        assert claimed_by_b.id == second.id
+        assert claimed_by_b.full is True
+        assert claim_next_job(other, "worker-b", 60) is None
+
+
+def test_concurrent_claims_get_distinct_jobs(db):
+    jobs = {add_job(db) for _ in range(4)}
+    claimed = []
+
+    def claim(worker_id):
+        with TestingSessionLocal() as session:
+            claimed.append(claim_next_job(session, worker_id, 60).id)
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(jobs)
+
+
+def test_renew_lease_only_for_owner(db):
+    add_job(db)
+    job = claim_next_job(db, "worker-a", 1)
+    expires = job.lease_expires_at
+
+    assert renew_lease(db, job.id, "worker-a", 60) is True
+    db.refresh(job)
+    assert job.lease_expires_at > expires
+    assert renew_lease(db, job.id, "worker-b", 60) is False
+
+    add_sharded_job(db, ["pending"])
+    shard = claim_next_shard(db, "worker-a", 60)
+    assert renew_lease(db, shard.id, "worker-a", 60, ScrapingShard) is True
+    assert renew_lease(db, shard.id, "worker-b", 60, ScrapingShard) is False
+
+
+def test_recover_stale_jobs(db):
+    now = datetime.now(timezone.utc)
+    past, future = now - timedelta(seconds=1), now + timedelta(minutes=1)
+    expired = add_job(db, status="in_progress", worker_id="gone", attempts=1, lease_expires_at=past)
+    exhausted = add_job(
+        db, status="in_progress", worker_id="gone", attempts=3, lease_expires_at=past
+    )
+    # Iniciado dentro da API, antes da fila com lease
+    legacy = add_job(db, status="in_progress")
+    alive = add_job(
+        db, status="in_progress", worker_id="alive", attempts=1, lease_expires_at=future
+    )
+
+    assert recover_stale_jobs(db, max_attempts=3) == 3
+    db.commit()
+    assert db.get(ScrapingJob, expired).status == "pending"
+    assert db.get(ScrapingJob, expired).worker_id is None
+    assert db.get(ScrapingJob, legacy).status == "pending"
+    assert db.get(ScrapingJob, exhausted).status == "error"
+    assert "3 tentativas" in db.get(ScrapingJob, exhausted).error_message
+    assert db.get(ScrapingJob, alive).status == "in_progress"
+
+    # O job recuperado volta a ser reivindicado, agora na segunda tentativa
+    assert claim_next_job(db, "worker-b", 60).attempts == 2
+
+
+def test_worker_plans_job_then_runs_shards(db):
+    job_id = add_job(db, full=True)
+    worker = ScrapingWorker(worker_id="worker-a", lease_seconds=60)
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS) as plan,
+        patch(
+            "src.services.scraping.pipeline.stream_books",
+            side_effect=fake_stream([scraped_book("A"), scraped_book("B")], [scraped_book("C")]),
+        ) as scrape,
+    ):
+        # Primeiro ciclo: o job é dividido em shards
+        assert worker.run_once() == job_id
+        plan.assert_called_once_with(Conf.SCRAPING_SHARD_BY)
+        scrape.assert_not_called()
+        db.commit()
+        job = db.get(ScrapingJob, job_id)
+        assert [shard.status for shard in job.shards] == ["pending", "pending"]
+        assert job.status == "in_progress"
+
+        # Um shard por ciclo; o último encerra o job
+        assert worker.run_once() == job_id
+        assert scrape.call_args.kwargs["start_url"] == SHARDS[0][0]
+        assert scrape.call_args.kwargs["max_pages"] == 2
+        db.commit()
+        assert db.get(ScrapingJob, job_id).status == "in_progress"
+
+        assert worker.run_once() == job_id
+        assert worker.run_once() is None
+
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "completed"
+    assert job.books_scraped == 3
+    assert job.books_saved == 3
+    assert [shard.status for shard in job.shards] == ["completed", "completed"]
+    assert all(shard.worker_id == "worker-a" for shard in job.shards)
+
+
+def test_worker_reuses_its_parse_pool(db):
+    job_id = add_job(db, full=True)
+    worker = ScrapingWorker(worker_id="worker-a", lease_seconds=60)
+    pool = MagicMock()
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+        patch(
+            "src.services.scraping.worker.create_parse_executor", return_value=pool
+        ) as create,
+        patch(
+            "src.services.scraping.pipeline.stream_books",
+            side_effect=fake_stream([scraped_book("A")], [scraped_book("B")]),
+        ) as scrape,
+    ):
+        while worker.run_once() is not None:
+            pass
+        worker.close()
+
+    # Um pool para os dois shards, encerrado só com o worker
+    create.assert_called_once_with()
+    assert [call.kwargs["executor"] for call in scrape.call_args_list] == [pool, pool]
+    pool.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    db.commit()
+    assert db.get(ScrapingJob, job_id).status == "completed"
+
+
+def test_worker_replaces_a_broken_parse_pool(db):
+    job_id = add_job(db, full=True)
+    worker = ScrapingWorker(worker_id="worker-a", lease_seconds=60)
+    broken, fresh = MagicMock(), MagicMock()
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+        patch(
+            "src.services.scraping.worker.create_parse_executor", side_effect=[broken, fresh]
+        ),
+        patch(
+            "src.services.scraping.pipeline.stream_books",
+            side_effect=fake_stream(BrokenProcessPool("um processo morreu"), [scraped_book("B")]),
+        ) as scrape,
+    ):
+        while worker.run_once() is not None:
+            pass
+
+    # O shard em que o pool quebrou fica com erro; o seguinte usa um pool novo
+    assert [call.kwargs["executor"] for call in scrape.call_args_list] == [broken, fresh]
+    broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+    assert worker.parse_executor() is fresh
+    worker.close()
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert [shard.status for shard in job.shards] == ["error", "completed"]
+
+
+def test_worker_recovers_abandoned_job(db):
+    job_id = add_job(
+        db,
+        status="in_progress",
+        worker_id="crashed",
+        attempts=1,
+        lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+    )
+    worker = ScrapingWorker(worker_id="worker-a", lease_seconds=60)
+
+    with patch("src.services.scraping.worker.plan_job") as plan:
+        assert worker.run_once() == job_id
+        plan.assert_called_once_with(job_id, False)
+    assert db.get(ScrapingJob, job_id).attempts == 2
+
+
+def test_concurrent_claims_get_distinct_shards(db):
+    job_id = add_sharded_job(db, ["pending"] * 4)
+    claimed = []
+
+    def claim(worker_id):
+        with TestingSessionLocal() as session:
+            claimed.append(claim_next_shard(session, worker_id, 60).position)
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == [0, 1, 2, 3]
+    # Com shards ativos o job não é encerrado
+    assert finish_job(db, job_id) is None
+
+
+def test_recover_stale_shards(db):
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    job_id = add_sharded_job(db, ["in_progress", "in_progress"])
+    db.query(ScrapingShard).filter(ScrapingShard.position == 0).update(
+        {"attempts": 1, "lease_expires_at": past}
+    )
+    db.query(ScrapingShard).filter(ScrapingShard.position == 1).update(
+        {"attempts": 3, "lease_expires_at": past}
+    )
+    db.commit()
+
+    # O job dividido em shards não tem lease próprio e não é recuperado
+    assert recover_stale_jobs(db, max_attempts=3) == 2
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "in_progress"
+    assert [shard.status for shard in job.shards] == ["pending", "error"]
+
+
+def test_finish_job_aggregates_and_resume_skips_completed_shards(db):
+    job_id = add_sharded_job(db, ["completed", "error", "completed"])
+
+    assert finish_job(db, job_id) == "error"
+    assert finish_job(db, job_id) is None
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.books_scraped == 2
+    assert job.error_message
+
+    assert resume_job(db, job_id) is True
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "in_progress"
+    assert [shard.status for shard in job.shards] == ["completed", "pending", "completed"]
+    assert resume_job(db, job_id) is False
+
+    # Só o shard com erro é executado novamente
+    with patch(
+        "src.services.scraping.pipeline.stream_books", side_effect=fake_stream([scraped_book("B")])
+    ) as scrape:
+        assert ScrapingWorker(worker_id="worker-a").run_once() == job_id
+        scrape.assert_called_once()
+        assert scrape.call_args.kwargs["start_url"].endswith("page-2.html")
+
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "completed"
+    assert job.books_scraped == 3
+    assert job.error_message is None
+
+
+def test_failed_shard_does_not_discard_completed_ones(db):
+    job_id = add_job(db, full=True)
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+        patch(
+            "src.services.scraping.pipeline.stream_books",
+            side_effect=fake_stream([scraped_book("A")], RuntimeError("conexão perdida")),
+        ),
+    ):
+        from src.services.scraping.worker import run_scraping_job
+
+        run_scraping_job(job_id)
+
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "error"
+    assert [shard.status for shard in job.shards] == ["completed", "error"]
+    assert job.shards[1].error_message == "conexão perdida"
+    assert job.books_saved == 1
+
+
+def test_incremental_shards_merge_the_csv_once_at_close(db, tmp_path):
+    csv_file = tmp_path / "books.csv"
+    csv_file.write_text(
+        "title,price,rating,availability,category,image_url\n"
+        "A,10,4,In stock,Poetry,\n"
+        "B,10,4,In stock,Poetry,\n"
+    )
+    job_id = add_sharded_job(db, ["pending", "pending"], full=False)
+    worker = ScrapingWorker(worker_id="worker-a")
+
+    with patch(
+        "src.services.scraping.pipeline.stream_books",
+        side_effect=fake_stream([{**scraped_book("A"), "price": 20}], [scraped_book("C")]),
+    ):
+        assert worker.run_once() == job_id
+        # Os lotes ficam no arquivo de alterações do job; o CSV ainda não mudou
+        assert "A,10," in csv_file.read_text()
+        assert (tmp_path / f"books.job-{job_id}.csv").exists()
+
+        assert worker.run_once() == job_id
+    worker.close()
+
+    assert csv_file.read_text().splitlines()[1:] == [
+        "A,20,4,In stock,Poetry,",
+        "B,10,4,In stock,Poetry,",
+        "C,10,4,In stock,Poetry,",
+    ]
+    assert not (tmp_path / f"books.job-{job_id}.csv").exists()
+
+
+def test_heartbeat_renews_lease_while_job_runs(db):
+    add_job(db)
+    job = claim_next_job(db, "worker-a", 0.15)
+    heartbeat = job.heartbeat_at
+
+    with LeaseHeartbeat(job.id, "worker-a", 0.15) as running:
+        time.sleep(0.25)
+    db.commit()
+    db.refresh(job)
+    assert job.heartbeat_at > heartbeat
+    assert running.lost is False
+
+    # Reivindicado por outro worker: o heartbeat para de renovar
+    job.worker_id = "worker-b"
+    db.commit()
+    with LeaseHeartbeat(job.id, "worker-a", 0.15) as lost:
+        time.sleep(0.1)
+    assert lost.lost is True
+
+
+def test_shard_stolen_by_another_worker_is_not_overwritten(db):
+    job_id = add_sharded_job(db, ["pending"])
+    shard = claim_next_shard(db, "worker-a", 60)
+    shard_id = shard.id
+
+    # O lease de worker-a venceu e o shard foi reivindicado por worker-b
+    shard.worker_id = "worker-b"
+    shard.books_scraped = 7
+    db.commit()
+
+    with patch(
+        "src.services.scraping.pipeline.stream_books",
+        side_effect=fake_stream([scraped_book("A"), scraped_book("B")]),
+    ) as scrape:
+        run_shard(shard_id, LeaseHeartbeat(shard_id, "worker-a", 60, ScrapingShard))
+
+    scrape.assert_not_called()
+    db.commit()
+    shard = db.get(ScrapingShard, shard_id)
+    assert (shard.worker_id, shard.status, shard.books_scraped) == ("worker-b", "in_progress", 7)
+    assert shard.completed_at is None
+    assert db.get(ScrapingJob, job_id).books_scraped is None
+
+
+def test_lost_heartbeat_stops_shard_after_batch(db, monkeypatch):
+    monkeypatch.setattr(Conf, "SCRAPING_WRITE_BATCH_SIZE", 1)
+    add_sharded_job(db, ["pending"])
+    shard_id = claim_next_shard(db, "worker-a", 60).id
+    lease = LeaseHeartbeat(shard_id, "worker-a", 60, ScrapingShard)
+    lease.lost = True
+
+    with patch(
+        "src.services.scraping.pipeline.stream_books",
+        side_effect=fake_stream([scraped_book("A"), scraped_book("B"), scraped_book("C")]),
+    ):
+        run_shard(shard_id, lease)
+
+    db.commit()
+    shard = db.get(ScrapingShard, shard_id)
+    # Só o primeiro lote foi gravado; o progresso e a conclusão não
+    assert db.query(Book).count() == 1
+    assert (shard.status, shard.books_scraped, shard.completed_at) == ("in_progress", 0, None)
+
+
+def test_trigger_then_worker_completes_job(client, db, tmp_path):
+    job_id = client.post("/scraping/trigger?shard_by=none").json()["job_id"]
+
+    worker = ScrapingWorker(worker_id="worker-a")
+    with patch(
+        "src.services.scraping.pipeline.stream_books",
+        side_effect=fake_stream([scraped_book("Queued")]),
+    ):
+        # Planejamento e execução do único shard
+        assert worker.run_once() == job_id
+        assert worker.run_once() == job_id
+
+    status = client.get(f"/scraping/status?job_id={job_id}").json()
+    assert status["last_job"]["status"] == "completed"
+    assert status["last_job"]["shard_by"] == "none"
+    assert status["last_job"]["progress"]["completed"] == 1
+    assert status["last_job"]["shards"][0]["worker_id"] == "worker-a"
+    assert status["database"]["total_books"] == 1
+    assert (tmp_path / "books.csv").read_text().count("Queued") == 1
+
+
+def test_trigger_resumes_failed_job(client, db):
+    job_id = add_sharded_job(db, ["completed", "error"], status="error")
+
+    data = client.post("/scraping/trigger").json()
+    assert data["status"] == "resumed"
+    assert data["job_id"] == job_id
+
+    progress = client.get(f"/scraping/status?job_id={job_id}").json()["last_job"]["progress"]
+    assert progress == {"total": 2, "pending": 1, "in_progress": 0, "completed": 1, "error": 0}
+
+    # Com resume=false um novo job é criado (depois que o retomado terminar)
+    db.query(ScrapingJob).filter(ScrapingJob.id == job_id).update({"status": "error"})
+    db.commit()
+    data = client.post("/scraping/trigger?resume=false").json()
+    assert data["status"] == "started"
+    assert data["job_id"] != job_id
+
+
+def test_shard_records_retries_and_throttling(db):
+    job_id = add_job(db, full=True)
+    stream = fake_stream([scraped_book("A")], [scraped_book("B")])
+
+    def throttled_stream(**kwargs):
+        # Simula um servidor que pediu para desacelerar durante a coleta do shard
+        kwargs["policy"].stats.retries += 2
+        kwargs["policy"].stats.throttled += 1
+        return stream(**kwargs)
+
+    with (
+        patch("src.services.scraping.worker.plan_shards", return_value=SHARDS),
+        patch("src.services.scraping.pipeline.stream_books", side_effect=throttled_stream),
+    ):
+        from src.services.scraping.worker import run_scraping_job
+
+        run_scraping_job(job_id)
+
+    db.commit()
+    job = db.get(ScrapingJob, job_id)
+    assert job.status == "completed"
+    assert [(shard.retries, shard.throttled) for shard in job.shards] == [(2, 1), (2, 1)]
+    assert (job.retries, job.throttled) == (4, 2)
@@ -0,0 +1,83 @@
+"""Testes para a busca textual (`q=`) em /books/search."""
+
+import pytest
+from sqlalchemy import delete
+
+from src.models.book import Book
+from src.services.catalog import upsert_books
+from src.services.response_cache import get_response_cache
+
+
+def make_book(title, category, **overrides):
+    return {
+        "title": title,
+        "price": 10.0,
+        "rating": 3,
+        "availability": "In stock",
+        "category": category,
+        "image_url": None,
+        **overrides,
+    }
+
+
+@pytest.fixture
+def books(db):
+    upsert_books(
+        db,
+        [
+            make_book("Café com Leite", "Food and Drink"),
+            make_book("Cafeteria Stories", "Fiction"),
+            make_book("The Coffee Table", "Cafe Culture"),
+            make_book("Sharp Objects", "Mystery"),
+            make_book("Cafe Cafe Cafe", "Food and Drink"),
+        ],
+    )
+
+
+def titles(response):
+    assert response.status_code == 200
+    return [book["title"] for book in response.json()["data"]]
+
+
+def test_q_matches_prefix_ignoring_accents_and_case(client, books):
+    found = titles(client.get("/books/search?q=CAFÉ"))
+    assert sorted(found) == [
+        "Cafe Cafe Cafe",
+        "Cafeteria Stories",
+        "Café com Leite",
+        "The Coffee Table",
+    ]
+
+
+def test_q_results_are_ranked_by_relevance(client, books):
+    assert titles(client.get("/books/search?q=cafe"))[0] == "Cafe Cafe Cafe"
+
+
+def test_q_requires_all_terms_and_combines_with_filters(client, books):
+    assert titles(client.get("/books/search?q=caf leite")) == ["Café com Leite"]
+    assert sorted(titles(client.get("/books/search?q=cafe&category=Food"))) == [
+        "Cafe Cafe Cafe",
+        "Café com Leite",
+    ]
+    assert titles(client.get("/books/search?q=!!!")) == []
+
+
+def test_q_cursor_pagination_walks_ranked_results(client, books):
+    url = "/books/search?q=cafe&per_page=1&cursor="
+    seen = []
+    while url:
+        response = client.get(url)
+        seen += titles(response)
+        url = response.json()["next"]
+    assert seen == titles(client.get("/books/search?q=cafe"))
+
+
+def test_index_follows_upserts_and_deletes(client, db, books):
+    upsert_books(db, [make_book("Sharp Objects", "Café Noir")])
+    assert titles(client.get("/books/search?q=noir")) == ["Sharp Objects"]
+    assert titles(client.get("/books/search?q=mystery")) == []
+
+    db.execute(delete(Book).where(Book.title == "Sharp Objects"))
+    db.commit()
+    get_response_cache().invalidate()
+    assert titles(client.get("/books/search?q=noir")) == []
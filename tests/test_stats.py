@@ -0,0 +1,215 @@
+"""Testes para as estatísticas pré-calculadas do catálogo (/stats)."""
+
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from src.models.book import Book
+from src.models.stats import CategoryStats, PriceCount, StatsSnapshot
+from src.services.catalog import upsert_books
+from src.services.stats import (
+    get_snapshot,
+    rebuild_stats,
+    refresh_snapshot,
+    stats_key,
+    update_stats,
+)
+from tests.conftest import TestingSessionLocal
+from tests.test_catalog_upsert import make_book
+
+
+def snapshot_data(db):
+    db.expire_all()
+    snapshot = get_snapshot(db)
+    return snapshot.overview, snapshot.categories
+
+
+@pytest.fixture
+def sql_statements(db):
+    """Registra os comandos SQL executados no banco de teste."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", record)
+    yield statements
+    event.remove(db.get_bind(), "before_cursor_execute", record)
+
+
+def reads(statements, table):
+    """Consultas (SELECT) de `statements` que leem a tabela `table`."""
+    return [s for s in statements if s.startswith("SELECT") and f"FROM {table}" in s]
+
+
+def test_overview_and_categories(client, db):
+    upsert_books(
+        db,
+        [
+            make_book("A", price=10.0, rating=1),
+            make_book("B", price=20.0, rating=5, availability="Out of stock"),
+            make_book("C", price=30.0, rating=5, category="Travel"),
+            make_book("D", price=40.0, rating=0, category="Travel"),
+        ],
+    )
+
+    overview = client.get("/stats/overview").json()
+    assert overview["total_books"] == 4
+    assert overview["total_categories"] == 2
+    assert overview["available_books"] == 3
+    assert overview["availability_ratio"] == 0.75
+    assert overview["price"] == {
+        "mean": 25.0,
+        "min": 10.0,
+        "max": 40.0,
+        "p25": 10.0,
+        "p50": 20.0,
+        "p75": 30.0,
+        "p90": 40.0,
+    }
+    assert overview["rating_histogram"] == {"1": 1, "2": 0, "3": 0, "4": 0, "5": 2}
+    assert overview["rating_mean"] == 3.67
+
+    categories = client.get("/stats/categories").json()["data"]
+    assert [category["name"] for category in categories] == ["Poetry", "Travel"]
+    travel = categories[1]
+    assert travel["books"] == 2
+    assert travel["availability_ratio"] == 1.0
+    assert travel["price"]["mean"] == 35.0
+    assert travel["price"]["min"] == 30.0
+    assert travel["rating_mean"] == 5.0
+
+
+def test_empty_catalogue(client):
+    overview = client.get("/stats/overview").json()
+
+    assert overview["total_books"] == 0
+    assert overview["price"]["mean"] is None
+    assert client.get("/stats/categories").json()["data"] == []
+
+
+def test_incremental_update_matches_full_rebuild(db):
+    upsert_books(db, [make_book(f"Livro {i}", price=10 + i, rating=1 + i % 5) for i in range(20)])
+    upsert_books(
+        db,
+        [
+            make_book("Livro 1", price=99.0, category="Travel"),
+            make_book("Livro 2", availability="Out of stock"),
+            make_book("Livro 3", price=12.0),  # preço já usado por outro livro
+            make_book("Livro 4", price=14.0, rating=5),  # sem alteração
+            make_book("Novo", price=5.5, category="Travel"),
+        ],
+    )
+    incremental = snapshot_data(db)
+
+    rebuild_stats(db)
+    refresh_snapshot(db)
+    db.commit()
+    assert snapshot_data(db) == incremental
+    assert incremental[0]["total_books"] == 21
+    assert {category["name"]: category["books"] for category in incremental[1]} == {
+        "Poetry": 19,
+        "Travel": 2,
+    }
+
+
+def test_removing_last_book_drops_category(db):
+    upsert_books(db, [make_book("A"), make_book("B", category="Travel")])
+
+    update_stats(db, [(stats_key("Travel", 10.0, 3, True), None)])
+    db.commit()
+
+    assert db.get(CategoryStats, "Travel") is None
+    assert db.query(PriceCount).filter_by(category="Travel").count() == 0
+    assert [category["name"] for category in snapshot_data(db)[1]] == ["Poetry"]
+
+
+def test_incremental_update_does_not_scan_books(db, sql_statements):
+    upsert_books(db, [make_book(f"Livro {i}", price=10 + i) for i in range(10)])
+    sql_statements.clear()
+
+    applied = update_stats(
+        db, [(stats_key("Poetry", 11.0, 3, True), stats_key("Poetry", 50.0, 3, False))]
+    )
+    db.commit()
+
+    assert applied == 1
+    assert not [s for s in sql_statements if "FROM books" in s]
+    # Os agregados são somados pelo banco, sem serem lidos antes
+    assert not reads(sql_statements, "category_stats")
+    assert not reads(sql_statements, "price_counts")
+    assert [s for s in sql_statements if "books = (category_stats.books + excluded.books)" in s]
+    assert snapshot_data(db)[0]["price"]["max"] == 50.0
+
+
+def test_snapshot_is_rebuilt_on_read(db, sql_statements):
+    upsert_books(db, [make_book("A", price=10.0)])
+    assert get_snapshot(db).overview["total_books"] == 1
+    sql_statements.clear()
+
+    upsert_books(db, [make_book("B", price=20.0)])
+    upsert_books(db, [make_book("C", price=30.0)])
+
+    # Os lotes só marcam o snapshot como desatualizado
+    assert not reads(sql_statements, "price_counts")
+    db.expire_all()
+    snapshot = db.get(StatsSnapshot, 1)
+    assert snapshot.overview["total_books"] == 1
+    assert snapshot.generation == snapshot.built_generation + 2
+
+    assert get_snapshot(db).overview["total_books"] == 3
+    db.expire_all()
+    snapshot = db.get(StatsSnapshot, 1)
+    assert snapshot.built_generation == snapshot.generation
+    assert snapshot.overview["price"]["max"] == 30.0
+
+
+def test_unchanged_rescrape_keeps_snapshot(db):
+    books = [make_book(f"Livro {i}") for i in range(5)]
+    upsert_books(db, books)
+    updated_at = db.get(StatsSnapshot, 1).updated_at
+
+    upsert_books(db, books)
+    db.expire_all()
+
+    assert db.get(StatsSnapshot, 1).updated_at == updated_at
+
+
+def test_snapshot_bootstraps_from_existing_books(client, db):
+    # Livros gravados sem passar pelo upsert (banco anterior às estatísticas)
+    db.add_all(
+        Book(title=f"Livro {i}", price=10 + i, rating=4, availability=True, category="Poetry")
+        for i in range(3)
+    )
+    db.commit()
+
+    overview = client.get("/stats/overview").json()
+    assert overview["total_books"] == 3
+    assert overview["price"]["mean"] == 11.0
+
+    # A partir daí as coletas atualizam os agregados de forma incremental
+    upsert_books(db, [make_book("Novo", price=31.0)])
+    db.expire_all()
+    assert get_snapshot(db).overview["total_books"] == 4
+
+
+def test_concurrent_first_reads_share_the_snapshot(db):
+    db.add_all(
+        Book(title=f"Livro {i}", price=10 + i, rating=4, availability=True, category="Poetry")
+        for i in range(2)
+    )
+    db.commit()
+
+    def other_read_wins(session):
+        # Outra leitura cria o snapshot enquanto esta ainda o recalcula
+        with TestingSessionLocal() as other:
+            rebuild_stats(other)
+            refresh_snapshot(other)
+            other.commit()
+        rebuild_stats(session)
+
+    with patch("src.services.stats.engine.rebuild_stats", side_effect=other_read_wins):
+        snapshot = get_snapshot(db)
+
+    assert snapshot.overview["total_books"] == 2
@@ -0,0 +1,105 @@
+"""Testes para /books/top-rated e /books/price-range e seus índices."""
+
+import pytest
+from sqlalchemy import event, text
+
+from src.models.book import Book
+from tests.conftest import async_engine
+
+
+@pytest.fixture
+def books(db):
+    db.add_all(
+        Book(
+            title=f"Livro {i:02d}",
+            price=10 + (i * 7) % 40,
+            rating=1 + i % 5,
+            availability=True,
+            category=f"Categoria {i % 3}",
+        )
+        for i in range(30)
+    )
+    db.commit()
+
+
+def walk(client, url):
+    """Percorre todas as páginas seguindo o link `next`."""
+    items = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        items += response.json()["data"]
+        url = response.json()["next"]
+    return items
+
+
+@pytest.fixture
+def explain_plans():
+    """Registra o plano (EXPLAIN QUERY PLAN) de cada SELECT sobre books ou categories."""
+    plans = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT") and (
+            "FROM books" in statement or "FROM categories" in statement
+        ):
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append((statement, " | ".join(row[-1] for row in rows)))
+
+    # As rotas usam o engine assíncrono; os eventos ficam no engine síncrono dele
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield plans
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_top_rated_orders_by_rating_then_id(client, books):
+    items = walk(client, "/books/top-rated?per_page=4&cursor=")
+    assert len(items) == 30
+    assert items == sorted(items, key=lambda book: (-book["rating"], book["id"]))
+    assert [book["id"] for book in items] == [
+        book["id"] for book in walk(client, "/books/top-rated?per_page=4")
+    ]
+
+
+def test_top_rated_min_rating(client, books):
+    data = client.get("/books/top-rated?min_rating=4&per_page=100").json()
+    assert data["total"] == 12
+    assert {book["rating"] for book in data["data"]} == {4, 5}
+
+
+def test_price_range_filters_and_orders_by_price(client, books):
+    items = walk(client, "/books/price-range?min=20&max=35&per_page=3&cursor=")
+    assert items
+    assert all(20 <= book["price"] <= 35 for book in items)
+    assert items == sorted(items, key=lambda book: (book["price"], book["id"]))
+
+    total = client.get("/books/price-range?min=20&max=35").json()["total"]
+    assert total == len(items)
+
+
+def test_price_range_rejects_inverted_bounds(client):
+    assert client.get("/books/price-range?min=50&max=10").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "url, index",
+    [
+        ("/books/top-rated?per_page=5&cursor=", "ix_books_rating_id"),
+        ("/books/price-range?min=20&per_page=5&cursor=", "ix_books_price_id"),
+        ("/categories/?per_page=2&cursor=", "ix_categories_name"),
+    ],
+)
+def test_listings_use_composite_indexes(client, books, explain_plans, url, index):
+    """Cada página em modo cursor é uma busca no índice, sem ordenação extra."""
+    first = client.get(url).json()
+    client.get(first["next"])
+
+    pages = [plan for statement, plan in explain_plans if "LIMIT" in statement]
+    assert len(pages) == 2
+    for plan in pages:
+        assert index in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_indexes_exist(db):
+    indexes = {row[1] for row in db.execute(text("PRAGMA index_list('books')"))}
+    assert {"ix_books_rating_id", "ix_books_price_id", "ix_books_category_id"} <= indexes